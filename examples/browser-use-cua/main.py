@@ -12,7 +12,7 @@ import base64
 import os
 from io import BytesIO
 
-from agent_sandbox import Sandbox
+from agent_sandbox import AsyncSandbox, Sandbox
 from agent_sandbox.browser.types.action import (
     Action_Click,
     Action_DoubleClick,
@@ -35,6 +35,11 @@ load_dotenv()
 sandbox_url = os.getenv("SANDBOX_BASE_URL", "http://localhost:8080")
 sandbox = Sandbox(base_url=sandbox_url)
 cdp_url = sandbox.browser.get_info().data.cdp_url
+async_sandbox = AsyncSandbox(base_url=sandbox_url)
+# runs each CUA turn's actions and returns the screenshot taken after them, read into one reused buffer
+cua = async_sandbox.browser.cua(format="png", settle=0.1)
+# computer_call round trips per fallback invocation
+MAX_CUA_TURNS = 5
 
 browser_session = BrowserSession(
     browser_profile=BrowserProfile(cdp_url=cdp_url, is_local=True)
@@ -48,233 +53,107 @@ class SandboxGUIAction(BaseModel):
     description: str = Field(..., description="Description of your next goal")
 
 
-async def take_screenshot() -> str | None:
-    """Take a screenshot from sandbox and return as base64 string."""
-    try:
-        screenshot_bytes = b""
-        async for chunk in sandbox.browser.screenshot():
-            screenshot_bytes += chunk
-
-        if not screenshot_bytes:
-            return None
-
-        return base64.b64encode(screenshot_bytes).decode("utf-8")
-    except Exception as e:
-        print(f"Error taking screenshot: {e}")
-        return None
+def to_viewport_png(screenshot: bytes, viewport_width: int, viewport_height: int) -> str:
+    """Rescale a screenshot to the viewport size if needed and return it as base64 PNG."""
+    image = Image.open(BytesIO(screenshot))
+    if image.size == (viewport_width, viewport_height):
+        return base64.b64encode(screenshot).decode("utf-8")
+    print(f"Rescaling screenshot from {image.size[0]}x{image.size[1]} to {viewport_width}x{viewport_height}")
+    buffer = BytesIO()
+    image.resize((viewport_width, viewport_height)).save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
 
 
-async def handle_cua_action(action: "ComputerAction") -> ActionResult:
+def cua_actions(action: "ComputerAction") -> tuple[list, str]:
     """
-    Map OpenAI CUA action to sandbox execute_action API.
-    This bridges the CUA response format to our sandbox's action types.
+    Map an OpenAI CUA action to the sandbox actions that perform it.
+    Returns the actions (run together with the follow-up screenshot by cua.step) and a summary.
     """
-    action_type = action.type
-    ERROR_MSG: str = "Could not execute the GUI action."
-
-    try:
-        match action_type:
-            case "click":
-                x, y = action.x, action.y
-                button = action.button
-
-                print(f"Action: click at ({x}, {y}) with button '{button}'")
-
-                # Map CUA button to sandbox button
-                from agent_sandbox.browser.types.action import Button
-
-                button_map = {
-                    "left": Button.LEFT,
-                    "right": Button.RIGHT,
-                    "middle": Button.MIDDLE,
-                }
-                sandbox_button = button_map.get(button, Button.LEFT)
-
-                await sandbox.browser.execute_action(
-                    request=Action_Click(
-                        action_type="CLICK",
-                        x=float(x),
-                        y=float(y),
-                        button=sandbox_button,
-                        num_clicks=1,
-                    )
-                )
-
-                msg = f"Clicked at ({x}, {y}) with button {button}"
-                return ActionResult(
-                    extracted_content=msg, include_in_memory=True, long_term_memory=msg
-                )
-
-            case "double_click":
-                x, y = action.x, action.y
-                print(f"Action: double click at ({x}, {y})")
-
-                await sandbox.browser.execute_action(
-                    request=Action_DoubleClick(
-                        action_type="DOUBLE_CLICK",
-                        x=float(x),
-                        y=float(y),
-                    )
-                )
-
-                msg = f"Double clicked at ({x}, {y})"
-                return ActionResult(
-                    extracted_content=msg, include_in_memory=True, long_term_memory=msg
-                )
-
-            case "scroll":
-                x, y = action.x, action.y
-                scroll_x, scroll_y = action.scroll_x, action.scroll_y
-                print(
-                    f"Action: scroll at ({x}, {y}) with offsets (scroll_x={scroll_x}, scroll_y={scroll_y})"
-                )
-
-                # First move to position
-                await sandbox.browser.execute_action(
-                    request=Action_MoveTo(
-                        action_type="MOVE_TO",
-                        x=float(x),
-                        y=float(y),
-                    )
-                )
-
-                # Then scroll
-                await sandbox.browser.execute_action(
-                    request=Action_Scroll(
-                        action_type="SCROLL",
-                        dx=int(scroll_x) if scroll_x else 0,
-                        dy=int(scroll_y) if scroll_y else 0,
-                    )
-                )
-
-                msg = f"Scrolled at ({x}, {y}) with offsets (scroll_x={scroll_x}, scroll_y={scroll_y})"
-                return ActionResult(
-                    extracted_content=msg, include_in_memory=True, long_term_memory=msg
-                )
-
-            case "keypress":
-                keys = action.keys
-                print(f"Action: keypress '{keys}'")
-
-                for key in keys:
-                    # Map common key names
-                    key_map = {
-                        "enter": "Return",
-                        "space": "space",
-                        "tab": "Tab",
-                        "escape": "Escape",
-                        "backspace": "BackSpace",
-                        "delete": "Delete",
-                    }
-                    mapped_key = key_map.get(key.lower(), key)
-
-                    await sandbox.browser.execute_action(
-                        request=Action_Press(
-                            action_type="PRESS",
-                            key=mapped_key,
-                        )
-                    )
-
-                msg = f"Pressed keys: {keys}"
-                return ActionResult(
-                    extracted_content=msg, include_in_memory=True, long_term_memory=msg
-                )
-
-            case "type":
-                text = action.text
-                print(f"Action: type text: {text}")
-
-                await sandbox.browser.execute_action(
-                    request=Action_Typing(
-                        action_type="TYPING",
-                        text=text,
-                        use_clipboard=False,
-                    )
-                )
-
-                msg = f"Typed text: {text}"
-                return ActionResult(
-                    extracted_content=msg, include_in_memory=True, long_term_memory=msg
-                )
-
-            case "drag":
-                # CUA drag action: drag from current position or specified start to end
-                start_x = getattr(action, "start_x", None)
-                start_y = getattr(action, "start_y", None)
-                end_x = action.x
-                end_y = action.y
-
-                print(f"Action: drag from ({start_x}, {start_y}) to ({end_x}, {end_y})")
-
-                if start_x is not None and start_y is not None:
-                    # Move to start position first
-                    await sandbox.browser.execute_action(
-                        request=Action_MoveTo(
-                            action_type="MOVE_TO",
-                            x=float(start_x),
-                            y=float(start_y),
-                        )
-                    )
-
-                # Execute drag to target
-                await sandbox.browser.execute_action(
-                    request=Action_DragTo(
-                        action_type="DRAG_TO",
-                        x=float(end_x),
-                        y=float(end_y),
-                    )
-                )
-
-                msg = f"Dragged to ({end_x}, {end_y})"
-                return ActionResult(
-                    extracted_content=msg, include_in_memory=True, long_term_memory=msg
-                )
-
-            case "wait":
-                print("Action: wait")
-                await sandbox.browser.execute_action(
-                    request=Action_Wait(
-                        action_type="WAIT",
-                        duration=2.0,
-                    )
-                )
-                msg = "Waited for 2 seconds"
-                return ActionResult(
-                    extracted_content=msg, include_in_memory=True, long_term_memory=msg
-                )
-
-            case "screenshot":
-                # Screenshot is automatically taken, no action needed
-                print("Action: screenshot (already taken)")
-                return ActionResult(
-                    extracted_content="Screenshot captured",
-                    include_in_memory=True,
-                )
-
-            case "move":
-                x, y = action.x, action.y
-                print(f"Action: move to ({x}, {y})")
-
-                await sandbox.browser.execute_action(
-                    request=Action_MoveTo(
-                        action_type="MOVE_TO",
-                        x=float(x),
-                        y=float(y),
-                    )
-                )
-
-                msg = f"Moved mouse to ({x}, {y})"
-                return ActionResult(
-                    extracted_content=msg, include_in_memory=True, long_term_memory=msg
-                )
-
-            case _:
-                print(f"Unrecognized action type: {action_type}")
-                return ActionResult(error=ERROR_MSG)
-
-    except Exception as e:
-        print(f"Error handling action {action}: {e}")
-        return ActionResult(error=f"{ERROR_MSG}: {e}")
+    match action.type:
+        case "click":
+            # Map CUA button to sandbox button
+            from agent_sandbox.browser.types.action import Button
+
+            button_map = {
+                "left": Button.LEFT,
+                "right": Button.RIGHT,
+                "middle": Button.MIDDLE,
+            }
+            click = Action_Click(
+                action_type="CLICK",
+                x=float(action.x),
+                y=float(action.y),
+                button=button_map.get(action.button, Button.LEFT),
+                num_clicks=1,
+            )
+            return [click], f"Clicked at ({action.x}, {action.y}) with button {action.button}"
+
+        case "double_click":
+            double_click = Action_DoubleClick(
+                action_type="DOUBLE_CLICK", x=float(action.x), y=float(action.y)
+            )
+            return [double_click], f"Double clicked at ({action.x}, {action.y})"
+
+        case "scroll":
+            # Move to position, then scroll
+            actions = [
+                Action_MoveTo(action_type="MOVE_TO", x=float(action.x), y=float(action.y)),
+                Action_Scroll(
+                    action_type="SCROLL",
+                    dx=int(action.scroll_x) if action.scroll_x else 0,
+                    dy=int(action.scroll_y) if action.scroll_y else 0,
+                ),
+            ]
+            msg = (
+                f"Scrolled at ({action.x}, {action.y}) with offsets "
+                f"(scroll_x={action.scroll_x}, scroll_y={action.scroll_y})"
+            )
+            return actions, msg
+
+        case "keypress":
+            # Map common key names
+            key_map = {
+                "enter": "Return",
+                "space": "space",
+                "tab": "Tab",
+                "escape": "Escape",
+                "backspace": "BackSpace",
+                "delete": "Delete",
+            }
+            presses = [
+                Action_Press(action_type="PRESS", key=key_map.get(key.lower(), key))
+                for key in action.keys
+            ]
+            return presses, f"Pressed keys: {action.keys}"
+
+        case "type":
+            type_text = Action_Typing(action_type="TYPING", text=action.text, use_clipboard=False)
+            return [type_text], f"Typed text: {action.text}"
+
+        case "drag":
+            # CUA drag action: drag from current position or specified start to end
+            start_x = getattr(action, "start_x", None)
+            start_y = getattr(action, "start_y", None)
+            actions = []
+            if start_x is not None and start_y is not None:
+                # Move to start position first
+                actions.append(Action_MoveTo(action_type="MOVE_TO", x=float(start_x), y=float(start_y)))
+            actions.append(Action_DragTo(action_type="DRAG_TO", x=float(action.x), y=float(action.y)))
+            return actions, f"Dragged to ({action.x}, {action.y})"
+
+        case "wait":
+            return [Action_Wait(action_type="WAIT", duration=2.0)], "Waited for 2 seconds"
+
+        case "screenshot":
+            # cua.step without actions only takes the screenshot
+            return [], "Screenshot captured"
+
+        case "move":
+            move = Action_MoveTo(action_type="MOVE_TO", x=float(action.x), y=float(action.y))
+            return [move], f"Moved mouse to ({action.x}, {action.y})"
+
+        case _:
+            raise ValueError(f"Unrecognized action type: {action.type}")
 
 
 tools = Tools()
@@ -282,8 +161,8 @@ tools = Tools()
 
 @tools.registry.action(
     "Use Sandbox GUI as a fallback when standard browser actions cannot achieve the desired goal. "
-    "This action takes a screenshot and uses OpenAI CUA to determine the next GUI action, "
-    "then executes it via the sandbox browser API.",
+    "This action takes a screenshot and uses OpenAI CUA to determine the next GUI actions, "
+    "then executes them via the sandbox browser API.",
     param_model=SandboxGUIAction,
 )
 async def sandbox_gui_fallback(
@@ -292,59 +171,44 @@ async def sandbox_gui_fallback(
     """
     Fallback action that uses OpenAI's CUA to analyze screenshots and perform
     complex GUI interactions via the sandbox browser API.
+
+    Each CUA turn runs its actions with cua.step, which returns the screenshot
+    taken after them; that screenshot is sent back as the computer_call_output.
     """
 
     print(f"GUI Action Starting - Goal: {params.description}")
 
     try:
         # Get browser info for viewport dimensions
-        browser_info = await sandbox.browser.get_info()
+        browser_info = await async_sandbox.browser.get_info()
         viewport_width = browser_info.data.width or 1920
         viewport_height = browser_info.data.height or 1080
 
         print(f"Viewport size: {viewport_width}x{viewport_height}")
 
-        # Take screenshot from sandbox
-        screenshot_b64 = await take_screenshot()
-        if not screenshot_b64:
-            return ActionResult(error="Failed to take screenshot from sandbox")
-
+        screenshot_b64 = to_viewport_png(await cua.screenshot(), viewport_width, viewport_height)
         print(f"Screenshot captured (base64 length: {len(screenshot_b64)} chars)")
 
-        # Check and resize screenshot to match viewport
-        image = Image.open(BytesIO(base64.b64decode(screenshot_b64)))
-        print(f"Screenshot actual dimensions: {image.size[0]}x{image.size[1]}")
-
-        if image.size != (viewport_width, viewport_height):
-            image = image.resize((viewport_width, viewport_height))
-            buffer = BytesIO()
-            image.save(buffer, format="PNG")
-            buffer.seek(0)
-            screenshot_b64 = base64.b64encode(buffer.getvalue()).decode("utf-8")
-            print(f"Rescaled screenshot to viewport size: {viewport_width}x{viewport_height}")
-
-        # Use OpenAI CUA to determine the action
+        # Use OpenAI CUA to determine the actions
         from openai import AsyncOpenAI
 
         client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        print("Sending request to OpenAI CUA...")
-
+        computer_tool = {
+            "type": "computer_use_preview",
+            "display_width": viewport_width,
+            "display_height": viewport_height,
+            "environment": "browser",
+        }
         prompt = f"""
         You will be given an action to execute and screenshot of the current screen.
-        Output one computer_call object that will achieve this goal.
+        Output the computer_call objects that will achieve this goal.
         Goal: {params.description}
         """
 
+        print("Sending request to OpenAI CUA...")
         response = await client.responses.create(
             model="computer-use-preview",
-            tools=[
-                {
-                    "type": "computer_use_preview",
-                    "display_width": viewport_width,
-                    "display_height": viewport_height,
-                    "environment": "browser",
-                }
-            ],
+            tools=[computer_tool],
             input=[
                 {
                     "role": "user",
@@ -362,24 +226,50 @@ async def sandbox_gui_fallback(
             temperature=0.1,
         )
 
-        print(f"CUA response received: {response}")
-
-        # Extract computer call from response
-        computer_calls = [item for item in response.output if item.type == "computer_call"]
-        computer_call = computer_calls[0] if computer_calls else None
+        performed = []
+        for _ in range(MAX_CUA_TURNS):
+            # Extract computer call from response
+            computer_call = next((item for item in response.output if item.type == "computer_call"), None)
+            if not computer_call:
+                break
+
+            action = computer_call.action
+            print(f"Executing CUA action: {action.type} - {action}")
+            actions, msg = cua_actions(action)
+
+            # Run the actions and take the screenshot after them in one step
+            step = await cua.step(actions)
+            print(
+                f"{msg} ({step.action_seconds * 1000:.0f} ms actions, "
+                f"{step.screenshot_seconds * 1000:.0f} ms screenshot)"
+            )
+            performed.append(msg)
+            screenshot_b64 = to_viewport_png(step.screenshot, viewport_width, viewport_height)
+
+            response = await client.responses.create(
+                model="computer-use-preview",
+                tools=[computer_tool],
+                previous_response_id=response.id,
+                input=[
+                    {
+                        "type": "computer_call_output",
+                        "call_id": computer_call.call_id,
+                        "acknowledged_safety_checks": computer_call.pending_safety_checks,
+                        "output": {
+                            "type": "computer_screenshot",
+                            "image_url": f"data:image/png;base64,{screenshot_b64}",
+                        },
+                    }
+                ],
+                truncation="auto",
+            )
 
-        if not computer_call:
+        if not performed:
             return ActionResult(error="No computer calls found in CUA response")
 
-        action = computer_call.action
-        print(f"Executing CUA action: {action.type} - {action}")
-
-        # Execute the action via sandbox API
-        action_result = await handle_cua_action(action)
-        await asyncio.sleep(0.1)
-
         print("GUI action completed successfully")
-        return action_result
+        msg = "; ".join(performed)
+        return ActionResult(extracted_content=msg, include_in_memory=True, long_term_memory=msg)
 
     except Exception as e:
         msg = f"Error executing GUI action: {e}"
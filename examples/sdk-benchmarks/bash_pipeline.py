@@ -0,0 +1,63 @@
+"""Benchmark: a 30-command script with sequential bash.exec calls vs. one bash.pipeline call."""
+
+import os
+import time
+
+from dotenv import load_dotenv
+from agent_sandbox import Sandbox
+
+load_dotenv()
+
+ROUNDS = 5
+
+
+def make_script(home_dir: str) -> list:
+    # absolute paths only: `cd` would carry over inside a pipeline but not between exec calls
+    repo = f"{home_dir}/bench_repo"
+    commands = [f"mkdir -p {repo}", f"git -C {repo} init -q 2>/dev/null || true"]
+    for i in range(8):
+        commands += [f"echo 'line {i}' > {repo}/file_{i}.txt", f"cat {repo}/file_{i}.txt", f"ls {repo}"]
+    commands += [f"git -C {repo} status --short", f"wc -l {repo}/file_*.txt", f"ls {home_dir}"]
+    return commands[:30]
+
+
+def sequential(client: Sandbox, session_id: str, commands: list) -> tuple:
+    start = time.perf_counter()
+    outputs = [client.bash.exec(command=command, session_id=session_id).data.stdout for command in commands]
+    return time.perf_counter() - start, outputs
+
+
+def pipelined(client: Sandbox, session_id: str, commands: list) -> tuple:
+    start = time.perf_counter()
+    result = client.bash.pipeline(commands, session_id=session_id)
+    return time.perf_counter() - start, [step.stdout for step in result.results]
+
+
+def main():
+    sandbox_url = os.getenv("SANDBOX_BASE_URL", "http://localhost:8080")
+    client = Sandbox(base_url=sandbox_url)
+    home_dir = client.sandbox.get_context().home_dir
+    commands = make_script(home_dir)
+    session_id = client.bash.create_session().data.session_id
+
+    results = {"sequential": [], "pipeline": []}
+    try:
+        for _ in range(ROUNDS):
+            elapsed, expected = sequential(client, session_id, commands)
+            results["sequential"].append(elapsed)
+            elapsed, outputs = pipelined(client, session_id, commands)
+            results["pipeline"].append(elapsed)
+            mismatched = sum(a.strip() != b.strip() for a, b in zip(expected, outputs))
+            if mismatched:
+                print(f"  warning: {mismatched} commands produced different output")
+    finally:
+        client.bash.close_session(session_id)
+
+    print(f"{len(commands)}-command script, best of {ROUNDS} rounds")
+    for name, timings in results.items():
+        print(f"  {name:<12} {min(timings) * 1000:8.1f} ms")
+    print(f"  speedup      {min(results['sequential']) / min(results['pipeline']):8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
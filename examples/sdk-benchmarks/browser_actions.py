@@ -0,0 +1,57 @@
+"""Benchmark: a form-filling action sequence, one `browser.execute_action` call per action vs. `execute_actions()`."""
+
+import os
+import time
+
+from dotenv import load_dotenv
+from agent_sandbox import Sandbox
+from agent_sandbox.browser import Action_Click, Action_Press, Action_Scroll, Action_Typing, Action_Wait
+
+load_dotenv()
+
+ROUNDS = 3
+FIELDS = 6
+
+
+def form_actions():
+    actions = []
+    for i in range(FIELDS):
+        actions.append(Action_Click(x=400.0, y=200.0 + 40 * i))
+        # an agent typically types a field in pieces, pausing between them
+        actions.extend(Action_Typing(text=word + " ") for word in f"field {i} value".split())
+        actions.append(Action_Wait(duration=0.05))
+        actions.append(Action_Press(key="Tab"))
+    actions.extend(Action_Scroll(dy=2) for _ in range(5))
+    return actions
+
+
+def sequential(client: Sandbox) -> float:
+    start = time.perf_counter()
+    for action in form_actions():
+        client.browser.execute_action(request=action)
+    return time.perf_counter() - start
+
+
+def batched(client: Sandbox) -> float:
+    start = time.perf_counter()
+    result = client.browser.execute_actions(form_actions())
+    if not result.ok:
+        print(f"  warning: action {result.failed_index} failed")
+    return time.perf_counter() - start
+
+
+def main():
+    client = Sandbox(base_url=os.getenv("SANDBOX_BASE_URL", "http://localhost:8080"))
+    actions = form_actions()
+    requests = client.browser.execute_actions(actions).requests
+
+    before = min(sequential(client) for _ in range(ROUNDS))
+    after = min(batched(client) for _ in range(ROUNDS))
+    print(f"{len(actions)} actions, best of {ROUNDS}")
+    print(f"  one call per action {before:8.2f} s   {len(actions):4d} requests")
+    print(f"  execute_actions     {after:8.2f} s   {requests:4d} requests")
+    print(f"  speedup             {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Benchmark: throughput of a CPU-bound function with one `code.execute_code` call per input vs. `client.code.map()`."""
+
+import os
+import time
+
+from dotenv import load_dotenv
+from agent_sandbox import Sandbox
+
+load_dotenv()
+
+ROUNDS = 3
+INPUTS = list(range(1, 201))
+WORKERS = [1, 4, 8]
+FUNC = """
+def collatz(n):
+    steps = 0
+    while n != 1:
+        n = n // 2 if n % 2 == 0 else 3 * n + 1
+        steps += 1
+    return steps
+"""
+
+
+def per_call(client: Sandbox) -> float:
+    start = time.perf_counter()
+    for n in INPUTS:
+        client.code.execute_code(language="python", code=f"{FUNC}\nprint(collatz({n}))")
+    return time.perf_counter() - start
+
+
+def mapped(client: Sandbox, sandboxes, workers: int) -> float:
+    start = time.perf_counter()
+    results = list(client.code.map(FUNC, INPUTS, workers=workers, sandboxes=sandboxes))
+    elapsed = time.perf_counter() - start
+    if len(results) != len(INPUTS):
+        print(f"  warning: expected {len(INPUTS)} results, got {len(results)}")
+    return elapsed
+
+
+def main():
+    # comma-separated SANDBOX_BASE_URLS spreads the workers over several sandboxes
+    urls = os.getenv("SANDBOX_BASE_URLS", os.getenv("SANDBOX_BASE_URL", "http://localhost:8080")).split(",")
+    sandboxes = [Sandbox(base_url=url.strip()) for url in urls]
+    client = sandboxes[0]
+
+    results = {"per call": min(per_call(client) for _ in range(ROUNDS))}
+    for workers in WORKERS:
+        results[f"map x{workers}"] = min(mapped(client, sandboxes, workers) for _ in range(ROUNDS))
+
+    print(f"{len(INPUTS)} inputs on {len(sandboxes)} sandbox(es), best of {ROUNDS}")
+    for name, elapsed in results.items():
+        print(f"  {name:<10} {elapsed:8.2f} s   {len(INPUTS) / elapsed:8.1f} items/s")
+    print(f"  speedup    {results['per call'] / min(results.values()):8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
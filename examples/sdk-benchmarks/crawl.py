@@ -0,0 +1,110 @@
+"""Benchmark: crawling a static site served inside the sandbox, one tab with `navigate` vs. `browser_tabs.crawler()`.
+
+Besides the rates, it checks that every crawl reached all pages of the site, that no page was reported as a duplicate
+of another (every page has distinct content), and that the crawler wrote one JSONL record per page to its file sink.
+The site's HTTP server is stopped at the end.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+from dotenv import load_dotenv
+from agent_sandbox import Sandbox
+
+load_dotenv()
+
+PAGES = 60
+PORT = 8765
+SITE_DIR = "/tmp/crawl-site"
+TABS = [1, 4, 8]
+# each page links to three others, so a breadth-first crawl from the index reaches every page
+GENERATE = f"""python3 - <<'PY'
+import os
+os.makedirs("{SITE_DIR}", exist_ok=True)
+for i in range({PAGES}):
+    targets = [(i + 1) % {PAGES}, (i * 3 + 2) % {PAGES}, (i * 7 + 5) % {PAGES}]
+    links = "".join(f'<li><a href="/p{{t}}.html">page {{t}}</a></li>' for t in targets)
+    body = "<p>" + f"Section {{i}} of the stand-in documentation. " * 200 + "</p>"
+    with open(f"{SITE_DIR}/p{{i}}.html", "w") as f:
+        f.write(f"<html><head><title>Page {{i}}</title></head><body><h1>Page {{i}}</h1>")
+        f.write(f"{{body}}<ul>{{links}}</ul></body></html>")
+with open("{SITE_DIR}/index.html", "w") as f:
+    f.write('<html><head><title>Index</title></head><body><a href="/p0.html">start</a></body></html>')
+PY
+nohup python3 -m http.server {PORT} --directory {SITE_DIR} >/dev/null 2>&1 &
+echo $! > {SITE_DIR}.pid
+sleep 1"""
+STOP = f"kill $(cat {SITE_DIR}.pid) 2>/dev/null; rm -rf {SITE_DIR} {SITE_DIR}.pid"
+SEED = f"http://localhost:{PORT}/index.html"
+URLS = {SEED} | {f"http://localhost:{PORT}/p{i}.html" for i in range(PAGES)}
+
+
+def sequential(client: Sandbox):
+    """One tab: navigate, then markdown, text and links one after another, following links breadth-first."""
+    seen, queue, pages = {SEED}, [SEED], 0
+    start = time.perf_counter()
+    while queue:
+        url = queue.pop(0)
+        client.browser_page.navigate(url=url)
+        client.browser_page.get_markdown()
+        client.browser_page.get_text()
+        links = client.browser_page.evaluate(expression="Array.from(document.links, (a) => a.href)").data
+        links = links.get("result", []) if isinstance(links, dict) else links or []
+        pages += 1
+        for link in links:
+            if link.startswith(f"http://localhost:{PORT}/") and link not in seen:
+                seen.add(link)
+                queue.append(link)
+    return pages, pages / (time.perf_counter() - start)
+
+
+def check_crawl(stats, path):
+    """Failures of one crawler run: pages reached, duplicates and errors, and the records in its JSONL sink."""
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    problems = []
+    if stats.pages != len(URLS) or stats.duplicates or stats.errors:
+        problems.append(f"{stats.pages} pages, {stats.duplicates} duplicates, {stats.errors} errors")
+    bad = [record["url"] for record in records if "duplicate_of" in record or "error" in record]
+    if bad:
+        problems.append(f"duplicate or failed records for {bad[:3]}")
+    urls = [record.get("final_url") for record in records]
+    if len(records) != len(URLS) or set(urls) != URLS:
+        problems.append(f"{len(records)} records, missing {sorted(URLS - set(urls))[:3]}")
+    if any(not record.get("markdown") or not record.get("content_hash") for record in records):
+        problems.append("records without markdown or content hash")
+    return problems
+
+
+def main():
+    client = Sandbox(base_url=os.getenv("SANDBOX_BASE_URL", "http://localhost:8080"))
+    client.shell.exec_command(command=GENERATE)
+
+    results = {}
+    try:
+        pages, rate = sequential(client)
+        results["navigate, 1 tab"] = rate, [] if pages == len(URLS) else [f"{pages} pages"]
+        with tempfile.TemporaryDirectory() as directory:
+            for tabs in TABS:
+                path = os.path.join(directory, f"crawl-{tabs}.jsonl")
+                crawler = client.browser_tabs.crawler(
+                    [SEED], sink=path, tabs=tabs, per_domain=tabs, max_depth=20, max_pages=PAGES + 1
+                )
+                stats = crawler.run()
+                results[f"crawler, {tabs} tabs"] = stats.pages_per_second, check_crawl(stats, path)
+    finally:
+        client.shell.exec_command(command=STOP)
+
+    print(f"{len(URLS)} pages")
+    failures = 0
+    for name, (rate, problems) in results.items():
+        failures += bool(problems)
+        print(f"  {name:<18} {rate:8.1f} pages/s   {'ok' if not problems else 'FAILED (' + '; '.join(problems) + ')'}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
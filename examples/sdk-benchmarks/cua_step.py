@@ -0,0 +1,51 @@
+"""Benchmark: computer-use step latency, action + sleep + concatenated screenshot vs. `client.browser.cua().step()`."""
+
+import os
+import time
+
+from dotenv import load_dotenv
+from agent_sandbox import Sandbox
+from agent_sandbox.browser import Action_MoveTo
+
+load_dotenv()
+
+ROUNDS = 3
+STEPS = 20
+SETTLE = 0.1
+
+
+def actions():
+    return [Action_MoveTo(x=float(100 + 10 * i), y=float(100 + 5 * i)) for i in range(STEPS)]
+
+
+def sequential(client: Sandbox, format: str) -> float:
+    start = time.perf_counter()
+    for action in actions():
+        client.browser.execute_action(request=action)
+        time.sleep(SETTLE)
+        screenshot = b""
+        for chunk in client.browser.screenshot(format=format):
+            screenshot += chunk
+    return (time.perf_counter() - start) / STEPS
+
+
+def stepped(client: Sandbox, format: str) -> float:
+    cua = client.browser.cua(format=format, settle=SETTLE)
+    start = time.perf_counter()
+    for action in actions():
+        cua.step(action)
+    return (time.perf_counter() - start) / STEPS
+
+
+def main():
+    client = Sandbox(base_url=os.getenv("SANDBOX_BASE_URL", "http://localhost:8080"))
+
+    print(f"{STEPS} steps, {SETTLE * 1000:.0f} ms settle, best of {ROUNDS}")
+    for format in ["png", "jpeg"]:
+        before = min(sequential(client, format) for _ in range(ROUNDS))
+        after = min(stepped(client, format) for _ in range(ROUNDS))
+        print(f"  {format:<5} sequential {before * 1000:7.1f} ms/step   cua.step {after * 1000:7.1f} ms/step")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark: 20-edit refactor with sequential str_replace_editor calls vs. one edit transaction."""
+
+import os
+import time
+
+from dotenv import load_dotenv
+from agent_sandbox import Sandbox
+
+load_dotenv()
+
+EDITS = 20
+ROUNDS = 5
+
+
+def make_source() -> str:
+    return "".join(f"def handler_{i}(event):\n    return event + {i}\n\n\n" for i in range(EDITS))
+
+
+def sequential(client: Sandbox, path: str) -> float:
+    start = time.perf_counter()
+    for i in range(EDITS):
+        client.file.str_replace_editor(
+            command="str_replace",
+            path=path,
+            old_str=f"def handler_{i}(",
+            new_str=f"def on_event_{i}(",
+        )
+    return time.perf_counter() - start
+
+
+def transactional(client: Sandbox, path: str) -> float:
+    start = time.perf_counter()
+    with client.file.edit(path=path) as tx:
+        for i in range(EDITS):
+            tx.str_replace(f"def handler_{i}(", f"def on_event_{i}(")
+    return time.perf_counter() - start
+
+
+def main():
+    sandbox_url = os.getenv("SANDBOX_BASE_URL", "http://localhost:8080")
+    client = Sandbox(base_url=sandbox_url)
+    home_dir = client.sandbox.get_context().home_dir
+    path = f"{home_dir}/bench_edit.py"
+
+    results = {"sequential": [], "transaction": []}
+    for _ in range(ROUNDS):
+        client.file.write_file(file=path, content=make_source())
+        results["sequential"].append(sequential(client, path))
+        expected = client.file.read_file(file=path).data.content
+
+        client.file.write_file(file=path, content=make_source())
+        results["transaction"].append(transactional(client, path))
+        assert client.file.read_file(file=path).data.content == expected
+
+    print(f"{EDITS}-edit refactor, best of {ROUNDS} rounds")
+    for name, timings in results.items():
+        print(f"  {name:<12} {min(timings) * 1000:8.1f} ms")
+    print(f"  speedup      {min(results['sequential']) / min(results['transaction']):8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Benchmark: running one command on 30 sandboxes one after another vs. with client-side Fleet broadcast.
+
+Runs against in-process stand-in sandboxes, so it needs no sandbox: six local HTTP servers answer /v1/bash/exec
+after an injected delay, one of them slowly, one with a non-zero exit code and one with HTTP 500, and five
+"sandboxes" share each server. Besides the timings, it checks that results stream in completion order, that the
+global and per-host concurrency caps hold, and that `stats` reports the right counts, percentiles and stragglers.
+"""
+
+import asyncio
+import collections
+import json
+import math
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from agent_sandbox import Sandbox
+from agent_sandbox.fleet import AsyncFleet, Fleet
+
+FAST = 0.05
+SLOW = 0.6
+PER_HOST = 5
+MAX_CONCURRENCY = 8
+PER_HOST_LIMIT = 2
+
+
+class StandIns:
+    """Local HTTP servers standing in for sandbox hosts; tracks requests in flight per host and overall."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = collections.Counter()
+        self.peak = collections.Counter()
+        self.total = 0
+        self.peak_total = 0
+        self.servers = []
+
+    def start(self, delay, exit_code=0, http_status=200):
+        stand_ins = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                host = f"127.0.0.1:{self.server.server_address[1]}"
+                self.rfile.read(int(self.headers["content-length"]))
+                stand_ins.enter(host)
+                try:
+                    time.sleep(delay)
+                finally:
+                    stand_ins.leave(host)
+                data = {
+                    "session_id": "s",
+                    "command_id": "c",
+                    "command": "true",
+                    "status": "completed",
+                    "stdout": "",
+                    "stderr": "",
+                    "exit_code": exit_code,
+                }
+                body = json.dumps({"success": True, "message": "", "data": data}).encode()
+                self.send_response(http_status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    def enter(self, host):
+        with self.lock:
+            self.in_flight[host] += 1
+            self.total += 1
+            self.peak[host] = max(self.peak[host], self.in_flight[host])
+            self.peak_total = max(self.peak_total, self.total)
+
+    def leave(self, host):
+        with self.lock:
+            self.in_flight[host] -= 1
+            self.total -= 1
+
+    def reset(self):
+        self.peak.clear()
+        self.peak_total = 0
+
+    def close(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+
+def percentile(ordered, pct):
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+def check(name, ok, detail):
+    print(f"  {name:<22} {'ok' if ok else 'FAILED'} ({detail})")
+    return not ok
+
+
+def check_broadcast(stand_ins, broadcast, results, first_at, slow, exit_failure, http_failure):
+    failures = 0
+    targets = [result.target for result in results]
+    slow_positions = [position for position, target in enumerate(targets) if target == slow]
+    failures += check(
+        "completion order",
+        first_at < SLOW and slow_positions == list(range(len(targets) - PER_HOST, len(targets))),
+        f"first result after {first_at * 1000:.0f} ms, slow host at positions {slow_positions}",
+    )
+    failures += check(
+        "global cap",
+        stand_ins.peak_total == MAX_CONCURRENCY,
+        f"peak {stand_ins.peak_total} in flight, cap {MAX_CONCURRENCY}",
+    )
+    failures += check(
+        "per-host cap",
+        max(stand_ins.peak.values()) <= PER_HOST_LIMIT,
+        f"peak per host {dict(stand_ins.peak)}, cap {PER_HOST_LIMIT}",
+    )
+
+    stats = broadcast.stats
+    latencies = sorted(result.latency for result in results)
+    failed = {result.target for result in results if not result.ok}
+    failures += check(
+        "counts",
+        (stats.total, stats.completed, stats.succeeded, stats.failed, stats.pending)
+        == (len(results), len(results), len(results) - 2 * PER_HOST, 2 * PER_HOST, [])
+        and failed == {exit_failure, http_failure},
+        f"{stats.completed}/{stats.total} completed, {stats.succeeded} succeeded, success rate "
+        f"{stats.success_rate:.2f}",
+    )
+    expected = [percentile(latencies, pct) for pct in (50, 90, 99)] + [latencies[-1]]
+    failures += check(
+        "percentiles",
+        [stats.p50, stats.p90, stats.p99, stats.max] == expected and stats.p50 < SLOW <= stats.max,
+        f"p50 {stats.p50 * 1000:.0f} ms, p90 {stats.p90 * 1000:.0f} ms, p99 {stats.p99 * 1000:.0f} ms, "
+        f"max {stats.max * 1000:.0f} ms",
+    )
+    failures += check(
+        "stragglers",
+        stats.stragglers == [slow] * PER_HOST,
+        f"{len(stats.stragglers)} stragglers over {stats.p50 * 3 * 1000:.0f} ms, {set(stats.stragglers)}",
+    )
+    return failures
+
+
+def main():
+    stand_ins = StandIns()
+    hosts = [stand_ins.start(FAST) for _ in range(3)]
+    slow = stand_ins.start(SLOW)
+    exit_failure = stand_ins.start(FAST, exit_code=1)
+    http_failure = stand_ins.start(FAST, http_status=500)
+    hosts += [slow, exit_failure, http_failure]
+    targets = [host for host in hosts for _ in range(PER_HOST)]
+
+    start = time.perf_counter()
+    for target in targets:
+        try:
+            Sandbox(base_url=target).bash.exec(command="true")
+        except Exception:
+            pass
+    sequential = time.perf_counter() - start
+
+    stand_ins.reset()
+    start = time.perf_counter()
+    first_at = None
+    with Fleet(targets, max_concurrency=MAX_CONCURRENCY, per_host_limit=PER_HOST_LIMIT) as fleet:
+        broadcast = fleet.bash_exec(command="true")
+        results = []
+        for result in broadcast:
+            first_at = first_at or time.perf_counter() - start
+            results.append(result)
+    broadcast_time = time.perf_counter() - start
+
+    print(f"one command on {len(targets)} sandboxes over {len(hosts)} hosts")
+    print(f"  sequential           {sequential * 1000:8.1f} ms")
+    print(f"  Fleet.bash_exec      {broadcast_time * 1000:8.1f} ms")
+    print("sync broadcast")
+    failures = check_broadcast(stand_ins, broadcast, results, first_at, slow, exit_failure, http_failure)
+
+    async def run_async():
+        start = time.perf_counter()
+        first_at = None
+        async with AsyncFleet(targets, max_concurrency=MAX_CONCURRENCY, per_host_limit=PER_HOST_LIMIT) as fleet:
+            broadcast = fleet.bash_exec(command="true")
+            results = []
+            async for result in broadcast:
+                first_at = first_at or time.perf_counter() - start
+                results.append(result)
+        return broadcast, results, first_at
+
+    stand_ins.reset()
+    broadcast, results, first_at = asyncio.run(run_async())
+    print("async broadcast")
+    failures += check_broadcast(stand_ins, broadcast, results, first_at, slow, exit_failure, http_failure)
+    stand_ins.close()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark: moving a large NumPy array out of a Jupyter kernel with `jupyter.fetch` vs. printing it to stdout."""
+
+import base64
+import os
+import time
+
+import numpy as np
+from dotenv import load_dotenv
+from agent_sandbox import Sandbox
+
+load_dotenv()
+
+ROUNDS = 3
+SIZE_MB = int(os.getenv("FETCH_SIZE_MB", "1024"))
+# printing a gigabyte through the execute response is impractical, so the print path moves a slice
+# and its throughput is extrapolated to the full array
+PRINT_MB = int(os.getenv("FETCH_PRINT_MB", "64"))
+PRINT_CHUNK = 4 * 1024 * 1024
+
+
+def fetch(client: Sandbox, session_id: str) -> float:
+    start = time.perf_counter()
+    array = client.jupyter.fetch(session_id, "big")
+    float(array[-1])  # touch the mapping so the last page is actually read
+    return time.perf_counter() - start
+
+
+def printed(client: Sandbox, session_id: str) -> float:
+    count = PRINT_MB * 1024 * 1024 // 8
+    start = time.perf_counter()
+    raw = bytearray()
+    for offset in range(0, count * 8, PRINT_CHUNK):
+        piece = f"big.view('u1')[{offset}:{min(offset + PRINT_CHUNK, count * 8)}]"
+        code = f"import base64\nprint(base64.b64encode({piece}.tobytes()).decode())"
+        result = client.jupyter.execute_code(code=code, session_id=session_id).data
+        raw += base64.b64decode("".join(o.text or "" for o in result.outputs if o.output_type == "stream"))
+    np.frombuffer(bytes(raw), dtype=np.float64)
+    return time.perf_counter() - start
+
+
+def main():
+    sandbox_url = os.getenv("SANDBOX_BASE_URL", "http://localhost:8080")
+    client = Sandbox(base_url=sandbox_url)
+
+    session_id = client.jupyter.create_session(kernel_name="python3").data.session_id
+    try:
+        client.jupyter.execute_code(
+            code=f"import numpy as np\nbig = np.random.rand({SIZE_MB * 1024 * 1024 // 8})", session_id=session_id
+        )
+        fetch_times = [fetch(client, session_id) for _ in range(ROUNDS)]
+        print_times = [printed(client, session_id) for _ in range(ROUNDS)]
+    finally:
+        client.jupyter.delete_session(session_id)
+
+    best_fetch = min(fetch_times)
+    best_print = min(print_times) * SIZE_MB / PRINT_MB
+    print(f"transfer of a {SIZE_MB} MB float64 array, best of {ROUNDS}")
+    print(f"  fetch    {best_fetch:8.2f} s   {SIZE_MB / best_fetch:8.1f} MB/s")
+    print(f"  print    {best_print:8.2f} s   {SIZE_MB / best_print:8.1f} MB/s  (extrapolated from {PRINT_MB} MB)")
+    print(f"  speedup  {best_print / best_fetch:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark: first-execution latency of a task on a fresh Jupyter session vs. a kernel leased from a warm pool."""
+
+import os
+import time
+
+from dotenv import load_dotenv
+from agent_sandbox import Sandbox
+
+load_dotenv()
+
+ROUNDS = 5
+PRELOAD = "import numpy as np\nimport pandas as pd"
+TASK = "pd.DataFrame(np.arange(1000).reshape(100, 10)).describe().shape"
+
+
+def fresh_session(client: Sandbox) -> float:
+    start = time.perf_counter()
+    session_id = client.jupyter.create_session(kernel_name="python3").data.session_id
+    result = client.jupyter.execute_code(code=f"{PRELOAD}\n{TASK}", session_id=session_id).data
+    elapsed = time.perf_counter() - start
+    client.jupyter.delete_session(session_id)
+    if result.status != "ok":
+        print(f"  warning: task failed on a fresh session ({result.status})")
+    return elapsed
+
+
+def pooled(client: Sandbox, pool) -> float:
+    start = time.perf_counter()
+    with pool.lease(kernel_name="python3") as kernel:
+        result = client.jupyter.execute_code(code=TASK, session_id=kernel.session_id).data
+        elapsed = time.perf_counter() - start
+    if result.status != "ok":
+        print(f"  warning: task failed on a pooled kernel ({result.status})")
+    return elapsed
+
+
+def main():
+    sandbox_url = os.getenv("SANDBOX_BASE_URL", "http://localhost:8080")
+    client = Sandbox(base_url=sandbox_url)
+
+    results = {"fresh": [], "pooled": []}
+    with client.jupyter.kernel_pool(size=2, preload=PRELOAD) as pool:
+        pool.warm(kernel_name="python3")
+        for _ in range(ROUNDS):
+            results["fresh"].append(fresh_session(client))
+            results["pooled"].append(pooled(client, pool))
+
+    print(f"time to first result (create + preload + task), {ROUNDS} rounds")
+    for name, timings in results.items():
+        ordered = sorted(timings)
+        print(f"  {name:<8} best {ordered[0] * 1000:8.1f} ms   median {ordered[len(ordered) // 2] * 1000:8.1f} ms")
+    print(f"  speedup  {min(results['fresh']) / min(results['pooled']):8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
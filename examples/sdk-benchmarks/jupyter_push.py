@@ -0,0 +1,57 @@
+"""Benchmark: moving a local NumPy array into a Jupyter kernel with `jupyter.push` vs. embedding it in the code."""
+
+import base64
+import os
+import time
+
+import numpy as np
+from dotenv import load_dotenv
+from agent_sandbox import Sandbox
+
+load_dotenv()
+
+ROUNDS = 3
+SIZE_MB = int(os.getenv("PUSH_SIZE_MB", "256"))
+# a code string of hundreds of megabytes is impractical, so the embedded path moves a slice
+# and its throughput is extrapolated to the full array
+EMBED_MB = int(os.getenv("PUSH_EMBED_MB", "32"))
+
+
+def push(client: Sandbox, session_id: str, array: np.ndarray) -> float:
+    start = time.perf_counter()
+    client.jupyter.push(session_id, "big", array)
+    client.jupyter.execute_code(code="float(big[-1])", session_id=session_id)
+    return time.perf_counter() - start
+
+
+def embedded(client: Sandbox, session_id: str, array: np.ndarray) -> float:
+    piece = array[: EMBED_MB * 1024 * 1024 // 8]
+    start = time.perf_counter()
+    encoded = base64.b64encode(piece.tobytes()).decode()
+    code = f"import base64, numpy as np\nbig = np.frombuffer(base64.b64decode('{encoded}'), dtype=np.float64)"
+    client.jupyter.execute_code(code=code, session_id=session_id)
+    return time.perf_counter() - start
+
+
+def main():
+    sandbox_url = os.getenv("SANDBOX_BASE_URL", "http://localhost:8080")
+    client = Sandbox(base_url=sandbox_url)
+    array = np.random.rand(SIZE_MB * 1024 * 1024 // 8)
+
+    session_id = client.jupyter.create_session(kernel_name="python3").data.session_id
+    try:
+        push_times = [push(client, session_id, array) for _ in range(ROUNDS)]
+        embed_times = [embedded(client, session_id, array) for _ in range(ROUNDS)]
+    finally:
+        client.jupyter.delete_session(session_id)
+
+    best_push = min(push_times)
+    best_embed = min(embed_times) * SIZE_MB / EMBED_MB
+    print(f"transfer of a {SIZE_MB} MB float64 array into a kernel, best of {ROUNDS}")
+    print(f"  push     {best_push:8.2f} s   {SIZE_MB / best_push:8.1f} MB/s")
+    print(f"  embedded {best_embed:8.2f} s   {SIZE_MB / best_embed:8.1f} MB/s  (extrapolated from {EMBED_MB} MB)")
+    print(f"  speedup  {best_embed / best_push:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
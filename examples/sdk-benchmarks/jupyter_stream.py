@@ -0,0 +1,348 @@
+"""Benchmark: time to first output of a chunked cell with execute_code vs. execute_code_stream.
+
+Runs against in-process stand-ins for the sandbox's Jupyter and bash APIs, so it needs no sandbox: the Jupyter
+stand-in runs every execute request in an IPython InteractiveShell on the main thread, as ipykernel does (SIGINT
+interrupts a running cell and is ignored while the kernel is idle), and the bash stand-in runs commands in real local
+shells, so the spool follower and `kill -INT` run as they would in the sandbox. Besides the timings, it checks that
+magics, shell escapes, top-level await, display(), errors and the output of threads started by the cell come through
+the stream, that a cell can install signal handlers and still triggers post-execute hooks, that the output hooks are
+removed once the cell has finished, and that leaving the loop early interrupts the cell.
+"""
+
+import collections
+import concurrent.futures
+import json
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+import httpx
+from IPython.core.displayhook import DisplayHook
+from IPython.core.displaypub import DisplayPublisher
+from IPython.core.interactiveshell import InteractiveShell
+from agent_sandbox import Sandbox
+
+CHUNKS = 10
+CHUNK_DELAY = 0.2
+CELL = f"import time\nfor i in range({CHUNKS}):\n    print(f'chunk {{i}}', flush=True)\n    time.sleep({CHUNK_DELAY})"
+CHECKS = [
+    ("line magic", "%time x = 20\nx + 22", "42", "ok"),
+    ("shell escape", "!echo from-shell", "from-shell", "ok"),
+    ("top-level await", "import asyncio\nawait asyncio.sleep(0.01)\n'awaited'", "'awaited'", "ok"),
+    (
+        "child thread",
+        "import threading\nt = threading.Thread(target=lambda: print('from-thread'))\nt.start()\nt.join()",
+        "from-thread",
+        "ok",
+    ),
+    ("display", "from IPython.display import display\ndisplay('shown')", "'shown'", "ok"),
+    ("error", "print('before')\n1 / 0", "ZeroDivisionError", "error"),
+    ("signal handler", "import signal\nsignal.signal(signal.SIGUSR1, signal.SIG_IGN)\n'installed'", "installed", "ok"),
+]
+
+
+class KernelStdout:
+    """Collects what the kernel's main thread prints during one execute request, like ipykernel's OutStream."""
+
+    def __init__(self, terminal):
+        self.terminal = terminal
+        self.captured = None
+
+    def write(self, text):
+        if self.captured is not None and threading.current_thread() is threading.main_thread():
+            self.captured.append(text)
+        else:
+            self.terminal.write(text)
+        return len(text)
+
+    def flush(self):
+        self.terminal.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.terminal, name)
+
+
+class ResultHook(DisplayHook):
+    """Sends the final expression's value as an execute_result, like ipykernel's displayhook."""
+
+    def write_output_prompt(self):
+        pass
+
+    def write_format_data(self, format_dict, md_dict=None):
+        self.kernel.outputs.append({"output_type": "execute_result", "data": format_dict, "metadata": md_dict or {}})
+
+
+class Publisher(DisplayPublisher):
+    """Sends display() calls as display_data, like ipykernel's display publisher."""
+
+    def publish(self, data, metadata=None, *args, **kwargs):
+        self.kernel.outputs.append({"output_type": "display_data", "data": data, "metadata": metadata or {}})
+
+
+class StandInKernel:
+    """Runs execute requests one at a time on the main thread, like ipykernel."""
+
+    def __init__(self):
+        self.stdout = KernelStdout(sys.stdout)
+        sys.stdout = self.stdout
+        self.shell = InteractiveShell.instance()
+        hook = ResultHook(shell=self.shell, cache_size=0)
+        hook.kernel = self
+        self.shell.displayhook = self.shell.display_trap.hook = hook
+        self.shell.display_pub = Publisher(shell=self.shell)
+        self.shell.display_pub.kernel = self
+        self.shell._showtraceback = self.traceback
+        self.outputs = []
+        self.requests = queue.Queue()
+
+    def traceback(self, etype, evalue, stb):
+        self.outputs.append({"output_type": "error", "ename": etype.__name__, "evalue": str(evalue), "traceback": stb})
+
+    def handle(self, path, body):
+        if path.endswith("/sessions/create"):
+            return {"session_id": uuid.uuid4().hex, "kernel_name": "python3", "message": "created"}
+        if path.endswith("/execute"):
+            reply = concurrent.futures.Future()
+            self.requests.put((body["code"], reply))
+            return reply.result()
+        return None
+
+    def serve(self):
+        # like ipykernel: SIGINT is ignored while idle and raises KeyboardInterrupt in a running cell
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+            code, reply = request
+            reply.set_result(self.execute(code))
+
+    def stop(self):
+        self.requests.put(None)
+
+    def execute(self, code):
+        self.outputs, self.stdout.captured = [], []
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        try:
+            result = self.shell.run_cell(code, store_history=False)
+        finally:
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            text, self.stdout.captured = "".join(self.stdout.captured), None
+        outputs = [{"output_type": "stream", "name": "stdout", "text": text}] if text else []
+        error = result.error_before_exec or result.error_in_exec
+        return {
+            "kernel_name": "python3",
+            "status": "error" if error is not None else "ok",
+            "outputs": outputs + self.outputs,
+            "code": code,
+        }
+
+
+class Command:
+    """One command of the bash stand-in, run in a local shell; its output is kept for offset-based reads."""
+
+    def __init__(self, session_id, command):
+        self.session_id = session_id
+        self.command_id = uuid.uuid4().hex
+        self.command = command
+        self.cond = threading.Condition()
+        self.output = {"stdout": bytearray(), "stderr": bytearray()}
+        self.status = "running"
+        self.exit_code = None
+        self.killed = False
+        self.process = subprocess.Popen(["bash", "-c", command], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.readers = [
+            threading.Thread(target=self.read, args=(name, pipe), daemon=True)
+            for name, pipe in (("stdout", self.process.stdout), ("stderr", self.process.stderr))
+        ]
+        for reader in self.readers:
+            reader.start()
+        threading.Thread(target=self.wait, daemon=True).start()
+
+    def read(self, name, pipe):
+        for chunk in iter(lambda: pipe.read1(65536), b""):
+            with self.cond:
+                self.output[name] += chunk
+                self.cond.notify_all()
+
+    def wait(self):
+        exit_code = self.process.wait()
+        for reader in self.readers:
+            reader.join()
+        with self.cond:
+            self.status = "killed" if self.killed else "completed"
+            self.exit_code = exit_code
+            self.cond.notify_all()
+
+    def kill(self):
+        with self.cond:
+            self.killed = self.status == "running"
+        self.process.kill()
+
+    def result(self, offset=0, stderr_offset=0):
+        stdout, stderr = self.output["stdout"], self.output["stderr"]
+        return {
+            "session_id": self.session_id,
+            "stdout": stdout[offset:].decode(errors="replace"),
+            "stderr": stderr[stderr_offset:].decode(errors="replace"),
+            "offset": len(stdout),
+            "stderr_offset": len(stderr),
+            "command": {
+                "command_id": self.command_id,
+                "command": self.command,
+                "status": self.status,
+                "exit_code": self.exit_code,
+            },
+        }
+
+
+class StandInBash:
+    def __init__(self):
+        self.commands = {}
+        self.executed = collections.Counter()
+
+    def handle(self, path, body):
+        if path.endswith("/bash/exec"):
+            session_id = body.get("session_id") or uuid.uuid4().hex
+            command = self.commands[session_id] = Command(session_id, body["command"])
+            self.executed[body["command"].split()[0]] += 1
+            with command.cond:
+                if not body.get("async_mode"):
+                    command.cond.wait_for(lambda: command.status != "running")
+                result = command.result()
+            del result["command"]
+            return dict(result, command_id=command.command_id, command=command.command, status=command.status)
+        if path.endswith("/bash/output"):
+            command = self.commands[body["session_id"]]
+            offset, stderr_offset = body.get("offset") or 0, body.get("stderr_offset") or 0
+            with command.cond:
+                if body.get("wait"):
+                    command.cond.wait_for(
+                        lambda: (
+                            len(command.output["stdout"]) > offset
+                            or len(command.output["stderr"]) > stderr_offset
+                            or command.status != "running"
+                        ),
+                        timeout=body.get("wait_timeout") or 30,
+                    )
+                return command.result(offset, stderr_offset)
+        if path.endswith("/close"):
+            command = self.commands.pop(path.split("/")[-2], None)
+            if command is not None:
+                command.kill()
+        return None
+
+    def close(self):
+        for command in self.commands.values():
+            command.kill()
+
+
+def text_of(output) -> str:
+    if output.output_type == "stream":
+        return output.text or ""
+    if output.output_type == "error":
+        return f"{output.ename}: {output.evalue}"
+    return (output.data or {}).get("text/plain", "")
+
+
+def run_checks(kernel, bash):
+    def handle(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        body = json.loads(request.content) if request.content else {}
+        data = bash.handle(path, body) if path.startswith("/v1/bash/") else kernel.handle(path, body)
+        return httpx.Response(200, json={"success": True, "message": "", "data": data})
+
+    client = Sandbox(base_url="http://stand-in", httpx_client=httpx.Client(transport=httpx.MockTransport(handle)))
+    session_id = client.jupyter.create_session().data.session_id
+
+    start = time.perf_counter()
+    client.jupyter.execute_code(code=CELL, session_id=session_id)
+    blocking = time.perf_counter() - start
+
+    start = time.perf_counter()
+    first = None
+    received = ""
+    for output in client.jupyter.execute_code_stream(code=CELL, session_id=session_id, poll_wait=0.5):
+        first = first or time.perf_counter() - start
+        received += text_of(output)
+    streamed = time.perf_counter() - start
+
+    print(f"time to first output of a cell printing {CHUNKS} chunks {CHUNK_DELAY * 1000:.0f} ms apart")
+    print(f"  execute_code         first {blocking * 1000:8.1f} ms   total {blocking * 1000:8.1f} ms")
+    print(f"  execute_code_stream  first {first * 1000:8.1f} ms   total {streamed * 1000:8.1f} ms")
+    failures = 0
+    if received.count("chunk ") != CHUNKS or first > blocking / 2:
+        print(
+            f"  FAILED: stream delivered {received.count('chunk ')} of {CHUNKS} chunks, the first after {first:.2f} s"
+        )
+        failures += 1
+
+    def check(name, ok, detail):
+        print(f"  {name:<16} {'ok' if ok else f'FAILED ({detail})'}")
+        return not ok
+
+    print("stream behaviour")
+    hook = "get_ipython().events.register('post_run_cell', lambda result: post_run.append(result.info.raw_cell))"
+    client.jupyter.execute_code(code=f"post_run = []\n{hook}", session_id=session_id)
+    client.jupyter.execute_code(code=f"checked = {[code for _, code, _, _ in CHECKS]!r}", session_id=session_id)
+    for name, code, expected, status in CHECKS:
+        stream = client.jupyter.execute_code_stream(code=code, session_id=session_id, poll_wait=0.5)
+        text = "".join(text_of(output) for output in stream)
+        failures += check(name, expected in text and stream.status == status, f"status {stream.status}, {text!r}")
+
+    after = client.jupyter.execute_code(
+        code="import sys\nprint(sum(code in post_run for code in checked), type(sys.stdout).__name__)",
+        session_id=session_id,
+    ).data
+    printed = "".join(output.text or "" for output in after.outputs if output.output_type == "stream").split()
+    failures += check("post-run hooks", printed[:1] == [str(len(CHECKS))], f"fired for {printed[:1]} cells")
+    failures += check(
+        "hooks removed",
+        printed[1:] == ["KernelStdout"]
+        and sys.stderr is sys.__stderr__
+        and "publish" not in vars(kernel.shell.display_pub),
+        f"stdout {printed[1:]}, stderr {sys.stderr!r}",
+    )
+
+    stream = client.jupyter.execute_code_stream(
+        code="import itertools, time\nfor i in itertools.count():\n    print(i, flush=True)\n    time.sleep(0.01)",
+        session_id=session_id,
+        poll_wait=0.5,
+    )
+    with stream:
+        next(iter(stream))
+    alive = client.jupyter.execute_code(code="print('alive')", session_id=session_id).data.status == "ok"
+    failures += check(
+        "early exit",
+        stream.status == "cancelled" and alive and bash.executed["kill"] == 1,
+        f"status {stream.status}, kernel alive {alive}, {bash.executed['kill']} kill commands",
+    )
+    return failures
+
+
+def main():
+    kernel = StandInKernel()
+    bash = StandInBash()
+    results = {}
+
+    def client_side():
+        try:
+            results["failures"] = run_checks(kernel, bash)
+        finally:
+            kernel.stop()
+
+    # the kernel keeps the main thread, where SIGINT lands, as it does in its own process
+    thread = threading.Thread(target=client_side)
+    thread.start()
+    kernel.serve()
+    thread.join()
+    bash.close()
+    sys.exit(1 if results.get("failures", 1) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark: load time and bytes transferred for local test pages with and without each network profile."""
+
+import os
+import time
+
+from dotenv import load_dotenv
+from agent_sandbox import Sandbox
+from agent_sandbox.browser_network.profiles import NETWORK_PROFILES
+
+load_dotenv()
+
+PAGES = 5
+PORT = 8766
+SITE_DIR = "/tmp/profile-site"
+ROUNDS = 3
+# every page pulls a stylesheet, a web font, four large images and a preloaded video, all served with
+# `Cache-Control: no-store` so every round downloads them again
+GENERATE = f"""python3 - <<'PY'
+import os
+os.makedirs("{SITE_DIR}", exist_ok=True)
+assets = {{"site.css": 40_000, "font.woff2": 120_000, "clip.mp4": 2_000_000}}
+assets.update({{f"img{{n}}.jpg": 400_000 for n in range(4)}})
+for name, size in assets.items():
+    with open(f"{SITE_DIR}/{{name}}", "wb") as f:
+        f.write(b"/* */" * (size // 5) if name.endswith(".css") else os.urandom(size))
+for i in range({PAGES}):
+    images = "".join(f'<img src="/img{{n}}.jpg?page={{i}}">' for n in range(4))
+    text = "<p>" + f"Paragraph {{i}} of the stand-in article. " * 300 + "</p>"
+    with open(f"{SITE_DIR}/p{{i}}.html", "w") as f:
+        f.write(f'<html><head><title>Page {{i}}</title><link rel="stylesheet" href="/site.css?page={{i}}">')
+        font = f"@font-face {{{{font-family: x; src: url(/font.woff2?page={{i}})}}}}"
+        f.write(f"<style>{{font}} body {{{{font-family: x}}}}</style>")
+        f.write(f'</head><body><h1>Page {{i}}</h1>{{images}}<video src="/clip.mp4?page={{i}}" preload="auto"></video>')
+        f.write(f"{{text}}</body></html>")
+PY
+cat > {SITE_DIR}/serve.py <<'PY'
+import functools, http.server
+
+class NoStore(http.server.SimpleHTTPRequestHandler):
+    def end_headers(self):
+        self.send_header("Cache-Control", "no-store")
+        super().end_headers()
+
+handler = functools.partial(NoStore, directory="{SITE_DIR}")
+http.server.ThreadingHTTPServer(("", {PORT}), handler).serve_forever()
+PY
+nohup python3 {SITE_DIR}/serve.py >/dev/null 2>&1 &
+sleep 1"""
+URLS = [f"http://localhost:{PORT}/p{i}.html" for i in range(PAGES)]
+TRANSFERRED = """(() => {
+  const entries = [...performance.getEntriesByType("navigation"), ...performance.getEntriesByType("resource")];
+  return entries.reduce((total, entry) => total + (entry.transferSize || 0), 0);
+})()"""
+
+
+def load_pages(client: Sandbox) -> tuple:
+    """Best-of-ROUNDS seconds to load every page, and the bytes the pages transferred."""
+    best, transferred = float("inf"), 0
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        transferred = 0
+        for url in URLS:
+            client.browser_page.navigate(url=url)
+            result = client.browser_page.evaluate(expression=TRANSFERRED).data
+            transferred += int(result.get("result", 0) if isinstance(result, dict) else result or 0)
+        best = min(best, time.perf_counter() - start)
+    return best, transferred
+
+
+def main():
+    client = Sandbox(base_url=os.getenv("SANDBOX_BASE_URL", "http://localhost:8080"))
+    client.shell.exec_command(command=GENERATE)
+
+    results = {"no profile": load_pages(client)}
+    for name in NETWORK_PROFILES:
+        client.browser_network.apply_profile(name)
+        try:
+            results[name] = load_pages(client)
+        finally:
+            client.browser_network.remove_profile(name)
+
+    print(f"{PAGES} pages, best of {ROUNDS}")
+    for name, (seconds, transferred) in results.items():
+        print(f"  {name:<12} {seconds * 1000:8.1f} ms {transferred / 1e6:8.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark: 100 `nodejs.execute_code` calls shipping the same modules inline vs. via `client.nodejs.blob_store()`."""
+
+import os
+import time
+
+import httpx
+from dotenv import load_dotenv
+from agent_sandbox import Sandbox
+
+load_dotenv()
+
+CALLS = 100
+MODULES = 12
+MODULE_SIZE = 256 * 1024
+FILES = {f"lib/helper_{i}.js": f"module.exports = {{ id: {i}, pad: '{'x' * MODULE_SIZE}' }};\n" for i in range(MODULES)}
+CODE = "const total = Object.keys(require('./lib/helper_0.js')).length; console.log(total + %d);"
+
+
+class RequestBytes:
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, request: httpx.Request):
+        self.total += int(request.headers.get("content-length", 0))
+
+
+def run(execute) -> float:
+    start = time.perf_counter()
+    for i in range(CALLS):
+        execute(code=CODE % i, files=FILES)
+    return time.perf_counter() - start
+
+
+def main():
+    counter = RequestBytes()
+    client = Sandbox(
+        base_url=os.getenv("SANDBOX_BASE_URL", "http://localhost:8080"),
+        httpx_client=httpx.Client(timeout=120, event_hooks={"request": [counter]}),
+    )
+
+    results = {}
+    store = client.nodejs.blob_store()
+    for name, execute in [("inline", client.nodejs.execute_code), ("blob store", store.execute_code)]:
+        counter.total = 0
+        elapsed = run(execute)
+        results[name] = (elapsed, counter.total)
+
+    size = sum(len(text) for text in FILES.values())
+    print(f"{CALLS} calls, {MODULES} modules / {size / 2**20:.1f} MB per call")
+    for name, (elapsed, sent) in results.items():
+        print(f"  {name:<10} {elapsed:8.2f} s   {elapsed / CALLS * 1000:8.1f} ms/call   {sent / 2**20:9.1f} MB sent")
+    print(f"  bytes sent {results['inline'][1] / results['blob store'][1]:8.1f}x fewer")
+
+
+if __name__ == "__main__":
+    main()
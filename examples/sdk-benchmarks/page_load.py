@@ -0,0 +1,70 @@
+"""Benchmark: navigate, wait, get_markdown and get_elements one after another vs. `browser_page.load_and_extract()`."""
+
+import os
+import time
+
+from dotenv import load_dotenv
+from agent_sandbox import Sandbox
+
+load_dotenv()
+
+PAGES = 10
+PORT = 8767
+SITE_DIR = "/tmp/page-load-site"
+ROUNDS = 3
+GENERATE = f"""python3 - <<'PY'
+import os
+os.makedirs("{SITE_DIR}", exist_ok=True)
+for i in range({PAGES}):
+    rows = "".join(f'<li><a href="/p{{n}}.html">item {{n}}</a> <button>open {{n}}</button></li>' for n in range(100))
+    text = "<p>" + f"Paragraph {{i}} of the stand-in article. " * 300 + "</p>"
+    with open(f"{SITE_DIR}/p{{i}}.html", "w") as f:
+        f.write(f"<html><head><title>Page {{i}}</title></head><body><h1>Page {{i}}</h1>")
+        f.write(f"{{text}}<ul>{{rows}}</ul></body></html>")
+PY
+nohup python3 -m http.server {PORT} --directory {SITE_DIR} >/dev/null 2>&1 &
+sleep 1"""
+URLS = [f"http://localhost:{PORT}/p{i}.html" for i in range(PAGES)]
+
+
+def sequential(client: Sandbox, url: str) -> None:
+    client.browser_page.navigate(url=url)
+    client.browser_page.wait(type="network_idle")
+    client.browser_page.get_markdown()
+    client.browser_page.get_elements()
+
+
+def composite(client: Sandbox, url: str) -> None:
+    client.browser_page.load_and_extract(url, wait="network_idle", extract=["markdown", "elements"])
+
+
+def best_of(client: Sandbox, read) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for url in URLS:
+            read(client, url)
+        best = min(best, time.perf_counter() - start)
+    return best / PAGES
+
+
+def main():
+    client = Sandbox(base_url=os.getenv("SANDBOX_BASE_URL", "http://localhost:8080"))
+    client.shell.exec_command(command=GENERATE)
+
+    results = {
+        "navigate + wait + markdown + elements": best_of(client, sequential),
+        "load_and_extract": best_of(client, composite),
+    }
+    print(f"{PAGES} pages, best of {ROUNDS}")
+    for name, seconds in results.items():
+        print(f"  {name:<38} {seconds * 1000:8.1f} ms/page")
+
+    page = client.browser_page.load_and_extract(URLS[0], extract=["markdown", "elements"])
+    print("load_and_extract phases, one page")
+    for phase in ("navigate", "wait", "extract", "total"):
+        print(f"  {phase:<38} {getattr(page.timings, phase) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Checks for client.shell.exec_command_stream() and client.shell.spawn() against a stand-in SSE server.
+
+Runs against an in-process stand-in for the sandbox's shell API, so it needs no sandbox: the stand-in serves
+/v1/shell/exec and /v1/shell/view as Server-Sent Events from a scripted event log, dropping the connection in the
+middle of an event or closing it after a `no_change_timeout` status where the script says so. It checks that the
+stream resumes through `view` with `Last-Event-ID` without repeating or losing output, stays open across
+`no_change_timeout`, releases the connection when the loop is left early, and that `expect()` returns as soon as a
+prompt arrives after a quiet period.
+"""
+
+import asyncio
+import json
+import sys
+import time
+
+import httpx
+from agent_sandbox import AsyncSandbox, Sandbox
+
+SESSION = "s1"
+DROP = "drop"
+CLOSE = "close"
+
+
+def output(text):
+    return {"session_id": SESSION, "output": text}
+
+
+def status(name, exit_code=None):
+    return {"session_id": SESSION, "status": name, "exit_code": exit_code}
+
+
+class EventStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """One SSE response; records whether the client closed it before the server was done."""
+
+    def __init__(self, chunks, drop):
+        self.chunks = chunks
+        self.drop = drop
+        self.finished = False
+        self.closed_early = False
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            yield chunk
+            time.sleep(0.001)
+        yield from self.end()
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+            await asyncio.sleep(0.001)
+        for chunk in self.end():
+            yield chunk
+
+    def end(self):
+        if self.drop is not None:
+            # half an event, then the connection goes away
+            yield self.drop[: len(self.drop) // 2]
+            raise httpx.ReadError("connection reset by peer")
+        self.finished = True
+
+    def close(self):
+        self.closed_early = not self.finished
+
+    async def aclose(self):
+        self.close()
+
+
+class StandInShell:
+    """Streams a scripted event log; DROP and CLOSE markers end a connection, the next one resumes after them."""
+
+    def __init__(self, script):
+        self.events = []
+        self.breaks = {}
+        for item in script:
+            if item in (DROP, CLOSE):
+                self.breaks[len(self.events)] = item
+            else:
+                self.events.append(item)
+        self.requests = []
+        self.streams = []
+
+    def frame(self, index):
+        event = self.events[index]
+        kind = "status" if "status" in event else "output"
+        return f"id: {index + 1}\nevent: {kind}\ndata: {json.dumps(event)}\n\n".encode()
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if not path.endswith(("/shell/exec", "/shell/view")):
+            return httpx.Response(200, json={"success": True, "message": "", "data": None})
+        last_event_id = request.headers.get("last-event-id")
+        self.requests.append((path.rsplit("/", 1)[-1], last_event_id))
+        start = int(last_event_id) if last_event_id else 0
+        end = next((index for index in sorted(self.breaks) if index > start), len(self.events))
+        drop = self.frame(end) if self.breaks.get(end) == DROP else None
+        stream = EventStream([self.frame(index) for index in range(start, end)], drop)
+        self.streams.append(stream)
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, stream=stream)
+
+
+def sync_client(server):
+    return Sandbox(base_url="http://stand-in", httpx_client=httpx.Client(transport=httpx.MockTransport(server.handle)))
+
+
+def outputs(events):
+    return "".join(event.output for event in events if event.type == "output")
+
+
+def check_resume():
+    server = StandInShell([output("line 1\n"), output("line 2\n"), DROP, output("line 3\n"), status("completed", 0)])
+    with sync_client(server).shell.exec_command_stream(command="make", id=SESSION) as stream:
+        events = list(stream)
+    ok = (
+        outputs(events) == "line 1\nline 2\nline 3\n"
+        and events[-1].status == "completed"
+        and server.requests == [("exec", None), ("view", "2")]
+    )
+    return ok, f"output {outputs(events)!r}, requests {server.requests}"
+
+
+def check_resume_async():
+    server = StandInShell([output("a\n"), DROP, output("b\n"), DROP, output("c\n"), status("completed", 0)])
+
+    async def run():
+        transport = httpx.MockTransport(server.handle)
+        client = AsyncSandbox(base_url="http://stand-in", httpx_client=httpx.AsyncClient(transport=transport))
+        async with client.shell.exec_command_stream(command="make", id=SESSION) as stream:
+            return [event async for event in stream]
+
+    events = asyncio.run(run())
+    ok = outputs(events) == "a\nb\nc\n" and server.requests == [("exec", None), ("view", "1"), ("view", "2")]
+    return ok, f"output {outputs(events)!r}, requests {server.requests}"
+
+
+def check_quiet():
+    server = StandInShell(
+        [output("building\n"), status("no_change_timeout"), CLOSE, output("done\n"), status("completed", 0)]
+    )
+    start = time.perf_counter()
+    with sync_client(server).shell.exec_command_stream(command="make", id=SESSION) as stream:
+        events = list(stream)
+    elapsed = time.perf_counter() - start
+    statuses = [event.status for event in events if event.type == "status"]
+    # re-attaching after a clean close must not wait out the reconnect delay (1 s)
+    ok = statuses == ["no_change_timeout", "completed"] and outputs(events) == "building\ndone\n" and elapsed < 0.5
+    return ok, f"statuses {statuses}, {elapsed * 1000:.0f} ms, requests {server.requests}"
+
+
+def check_early_exit():
+    server = StandInShell([output(f"{i}\n") for i in range(1000)] + [status("completed", 0)])
+    with sync_client(server).shell.exec_command_stream(command="yes", id=SESSION) as stream:
+        next(iter(stream))
+    ok = len(server.requests) == 1 and server.streams[0].closed_early
+    return ok, f"requests {server.requests}, connection closed {server.streams[0].closed_early}"
+
+
+def check_expect():
+    server = StandInShell(
+        [output(">>> "), status("no_change_timeout"), CLOSE, output("42\n>>> "), status("completed", 0)]
+    )
+    client = sync_client(server)
+    with client.shell.spawn(command="python3 -i", id=SESSION) as proc:
+        start = time.perf_counter()
+        proc.expect(r"(\d+)\n>>> ", timeout=5)
+        elapsed = time.perf_counter() - start
+        exit_code = proc.wait(timeout=5)
+    ok = proc.match.group(1) == "42" and exit_code == 0 and elapsed < 0.5
+    return ok, f"match {proc.match.group(1)!r} after {elapsed * 1000:.0f} ms, exit code {exit_code}"
+
+
+def main():
+    failures = 0
+    for name, check in [
+        ("mid-event resume", check_resume),
+        ("async resume", check_resume_async),
+        ("quiet period", check_quiet),
+        ("early exit", check_early_exit),
+        ("expect after quiet", check_expect),
+    ]:
+        ok, detail = check()
+        failures += not ok
+        print(f"  {name:<20} {'ok' if ok else 'FAILED'} ({detail})")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
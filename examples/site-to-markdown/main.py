@@ -1,6 +1,5 @@
 import os
 import asyncio
-import base64
 from dotenv import load_dotenv
 from playwright.async_api import async_playwright
 from agent_sandbox import Sandbox
@@ -26,25 +25,29 @@ async def site_to_markdown():
         )
         await page.goto("https://sandbox.agent-infra.com/", wait_until="networkidle")
         html = await page.content()
-        screenshot_b64 = base64.b64encode(
-            await page.screenshot(full_page=False, type='png')
-        ).decode('utf-8')
+        screenshot = await page.screenshot(full_page=False, type='png')
 
     # Jupyter: Run code in sandbox to convert html to markdown
+    # the page is pushed as binary data rather than pasted into the code string
+    session_id = c.jupyter.create_session().data.session_id
+    c.jupyter.push(session_id, "html", html)
+    c.jupyter.push(session_id, "screenshot", screenshot)
     c.jupyter.execute_code(
+        session_id=session_id,
         code=f"""
+import base64
 from markdownify import markdownify
-html = '''{html}'''
-screenshot_b64 = "{screenshot_b64}"
 
+screenshot_b64 = base64.b64encode(screenshot).decode('utf-8')
 md = f"{{markdownify(html)}}\\n\\n![Screenshot](data:image/png;base64,{{screenshot_b64}})"
 
 with open('{home_dir}/site.md', 'w') as f:
     f.write(md)
 
 print("Done!")
-"""
+""",
     )
+    c.jupyter.delete_session(session_id)
 
     # BasH: execute command to list files in sandbox
     list_result = c.shell.exec_command(command=f"ls -lh {home_dir}")
@@ -0,0 +1,454 @@
+import gzip
+import posixpath
+import re
+import shlex
+import typing
+import uuid
+
+from ..core.envelope import unwrap_response
+from ..core.request_options import RequestOptions
+from ..file.client import AsyncFileClient, FileClient
+from ..file.reader import _with_range
+from ..types.bash_exec_result import BashExecResult
+from ..types.shell_command_result import ShellCommandResult
+from .client import AsyncBashClient, BashClient
+
+if typing.TYPE_CHECKING:
+    from ..shell.client import AsyncShellClient, ShellClient
+
+ResultT = typing.TypeVar("ResultT")
+
+# this is used as the default value for optional parameters
+OMIT = typing.cast(typing.Any, ...)
+
+DEFAULT_LOG_DIR = "/tmp/agent-sandbox-logs"
+# seconds between progress lines written to the terminal while a shell command's output goes to files
+DEFAULT_HEARTBEAT = 30.0
+
+_HEARTBEAT_PREFIX = "[agent-sandbox capture] still running"
+_HEARTBEAT_LINE = re.compile(r"^" + re.escape(_HEARTBEAT_PREFIX) + r"[^\n]*\n?", re.MULTILINE)
+
+
+def _log_paths(log_dir: str, streams: typing.Sequence[str]) -> typing.Dict[str, str]:
+    stem = posixpath.join(log_dir, uuid.uuid4().hex[:16])
+    return {stream: f"{stem}.{stream}.log" for stream in streams}
+
+
+def _capture_script(
+    command: str,
+    log_dir: str,
+    paths: typing.Mapping[str, str],
+    preview_bytes: int,
+    merge_stderr: bool,
+    heartbeat: typing.Optional[float] = None,
+) -> str:
+    """
+    Runs ``command`` in the current shell with its output redirected to files in
+    the sandbox, then prints each file if it fits in ``preview_bytes`` (deleting
+    it) or its head and tail around a note naming the saved file. The server only
+    ever sees the preview, and the command's exit code is preserved.
+
+    With ``heartbeat``, a progress line is printed to the terminal that often
+    while the command runs, so a shell session does not report
+    ``no_change_timeout`` for a long, busy command; ``_strip_heartbeats``
+    removes those lines from the returned output.
+    """
+    half = preview_bytes // 2
+    out = shlex.quote(paths["stdout"])
+    if merge_stderr:
+        redirect = f"> {out} 2>&1"
+        show = f"__cap_show {out}"
+    else:
+        err = shlex.quote(paths["stderr"])
+        redirect = f"> {out} 2> {err}"
+        show = f"__cap_show {out}; __cap_show {err} >&2"
+    return "\n".join(
+        [
+            "__cap_show() {",
+            '  __cap_size=$(wc -c < "$1")',
+            f'  if [ "$__cap_size" -le {preview_bytes} ]; then cat "$1"; rm -f "$1"; else',
+            f'    head -c {half} "$1"',
+            f"    printf '\\n[... %s bytes truncated, full output saved to %s ...]\\n' "
+            f'"$((__cap_size - {2 * half}))" "$1"',
+            f'    tail -c {half} "$1"',
+            "  fi",
+            "}",
+            f"mkdir -p {shlex.quote(log_dir)}",
+            *_heartbeat_start(paths, heartbeat),
+            f"{{ eval {shlex.quote(command)}; }} {redirect}",
+            "__cap_rc=$?",
+            *(['kill "$__cap_hb" 2>/dev/null; unset __cap_hb'] if heartbeat else []),
+            show,
+            "unset -f __cap_show; unset __cap_size",
+            '(exit "$__cap_rc")',
+        ]
+    )
+
+
+def _heartbeat_start(paths: typing.Mapping[str, str], heartbeat: typing.Optional[float]) -> typing.List[str]:
+    if not heartbeat:
+        return []
+    log = shlex.quote(paths["stdout"])
+    line = shlex.quote(f"{_HEARTBEAT_PREFIX}, %s bytes captured\\n")
+    # started from a command substitution, the loop is not a job of the interactive shell, so starting and killing
+    # it prints no job notices; it writes to the terminal through fd 3
+    loop = f'while sleep {heartbeat:g}; do printf {line} "$(wc -c < {log} 2>/dev/null)"; done'
+    return [f"{{ __cap_hb=$( ({loop}) >&3 2>/dev/null & echo $!); }} 3>&1"]
+
+
+def _heartbeat_interval(heartbeat: typing.Optional[float], no_change_timeout: typing.Any) -> typing.Optional[float]:
+    # beat at least twice per `no_change_timeout` when the caller set one
+    if heartbeat and isinstance(no_change_timeout, (int, float)) and no_change_timeout > 0:
+        return min(heartbeat, no_change_timeout / 2)
+    return heartbeat or None
+
+
+def _strip_heartbeats(result: ResultT) -> ResultT:
+    """
+    Copy of a shell command result without the progress lines printed while its output was captured.
+    """
+    output = getattr(result, "output", None)
+    if not output or _HEARTBEAT_PREFIX not in output:
+        return result
+    return type(result)(**{**result.dict(), "output": _HEARTBEAT_LINE.sub("", output)})  # type: ignore[attr-defined]
+
+
+def _saved_streams(
+    paths: typing.Mapping[str, str], previews: typing.Mapping[str, typing.Optional[str]], finished: bool
+) -> typing.List[str]:
+    # a command that did not finish (timeout, kill) never reached the preview step, so all its logs are kept
+    return [
+        stream
+        for stream, path in paths.items()
+        if not finished or f"full output saved to {path} ...]" in (previews.get(stream) or "")
+    ]
+
+
+class _BaseCapturedOutput:
+    def __init__(self, *, path: str, stream: str, request_options: typing.Optional[RequestOptions] = None):
+        self.path = path
+        self.stream = stream
+        self._request_options = request_options
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(path={self.path!r}, stream={self.stream!r})"
+
+
+class CapturedOutput(_BaseCapturedOutput):
+    """
+    Full output of a command, kept in a file inside the sandbox because it did
+    not fit in the returned preview. Read it in chunks with ``iter_bytes`` or
+    save it locally with ``save``; neither loads the whole log into memory.
+    """
+
+    def __init__(self, file_client: "FileClient", bash_client: "BashClient", **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._file_client = file_client
+        self._bash_client = bash_client
+
+    def iter_bytes(self, offset: int = 0) -> typing.Iterator[bytes]:
+        """
+        Stream the log from byte ``offset``, using a ranged download when the server supports it.
+        """
+        options = _with_range(self._request_options, offset) if offset else self._request_options
+        with self._file_client.with_raw_response.download_file(path=self.path, request_options=options) as response:
+            skip = offset if offset and "content-range" not in response.headers else 0
+            for chunk in response.data:
+                if skip:
+                    if len(chunk) <= skip:
+                        skip -= len(chunk)
+                        continue
+                    chunk, skip = chunk[skip:], 0
+                yield chunk
+
+    def save(self, local_path: str, *, compress: bool = False) -> int:
+        """
+        Write the log to ``local_path``, gzip-compressed if ``compress``. Returns the bytes downloaded.
+        """
+        size = 0
+        with (gzip.open(local_path, "wb") if compress else open(local_path, "wb")) as f:
+            for chunk in self.iter_bytes():
+                f.write(chunk)
+                size += len(chunk)
+        return size
+
+    def delete(self) -> None:
+        """
+        Remove the log file from the sandbox.
+        """
+        # an explicit session, closed afterwards: `exec` without one creates a session that is never closed
+        session = unwrap_response(self._bash_client.create_session(request_options=self._request_options))
+        try:
+            unwrap_response(
+                self._bash_client.exec(
+                    command=f"rm -f -- {shlex.quote(self.path)}",
+                    session_id=session.session_id,
+                    request_options=self._request_options,
+                )
+            )
+        finally:
+            self._bash_client.close_session(session.session_id, request_options=self._request_options)
+
+
+class AsyncCapturedOutput(_BaseCapturedOutput):
+    """
+    Async counterpart of ``CapturedOutput``.
+    """
+
+    def __init__(self, file_client: "AsyncFileClient", bash_client: "AsyncBashClient", **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._file_client = file_client
+        self._bash_client = bash_client
+
+    async def iter_bytes(self, offset: int = 0) -> typing.AsyncIterator[bytes]:
+        """
+        Stream the log from byte ``offset``, using a ranged download when the server supports it.
+        """
+        options = _with_range(self._request_options, offset) if offset else self._request_options
+        async with self._file_client.with_raw_response.download_file(
+            path=self.path, request_options=options
+        ) as response:
+            skip = offset if offset and "content-range" not in response.headers else 0
+            async for chunk in response.data:
+                if skip:
+                    if len(chunk) <= skip:
+                        skip -= len(chunk)
+                        continue
+                    chunk, skip = chunk[skip:], 0
+                yield chunk
+
+    async def save(self, local_path: str, *, compress: bool = False) -> int:
+        """
+        Write the log to ``local_path``, gzip-compressed if ``compress``. Returns the bytes downloaded.
+        """
+        size = 0
+        with (gzip.open(local_path, "wb") if compress else open(local_path, "wb")) as f:
+            async for chunk in self.iter_bytes():
+                f.write(chunk)
+                size += len(chunk)
+        return size
+
+    async def delete(self) -> None:
+        """
+        Remove the log file from the sandbox.
+        """
+        session = unwrap_response(await self._bash_client.create_session(request_options=self._request_options))
+        try:
+            unwrap_response(
+                await self._bash_client.exec(
+                    command=f"rm -f -- {shlex.quote(self.path)}",
+                    session_id=session.session_id,
+                    request_options=self._request_options,
+                )
+            )
+        finally:
+            await self._bash_client.close_session(session.session_id, request_options=self._request_options)
+
+
+OutputT = typing.TypeVar("OutputT", CapturedOutput, AsyncCapturedOutput)
+
+
+class CapturedResult(typing.Generic[ResultT, OutputT]):
+    """
+    Result of a captured command: the regular ``result`` (with bounded previews
+    of the output) plus handles to the full logs of the streams that were cut.
+    """
+
+    def __init__(self, result: ResultT, logs: typing.Dict[str, OutputT]):
+        self.result = result
+        self.logs = logs
+
+    @property
+    def truncated(self) -> bool:
+        return bool(self.logs)
+
+    @property
+    def stdout_log(self) -> typing.Optional[OutputT]:
+        """
+        Full stdout; for shell commands, the combined terminal output.
+        """
+        return self.logs.get("stdout")
+
+    @property
+    def stderr_log(self) -> typing.Optional[OutputT]:
+        return self.logs.get("stderr")
+
+    def __repr__(self) -> str:
+        return f"CapturedResult(result={self.result!r}, logs={self.logs!r})"
+
+
+def exec_captured(
+    bash: "BashClient",
+    *,
+    command: str,
+    session_id: typing.Optional[str] = OMIT,
+    exec_dir: typing.Optional[str] = OMIT,
+    env: typing.Optional[typing.Dict[str, typing.Optional[str]]] = OMIT,
+    timeout: typing.Optional[float] = OMIT,
+    hard_timeout: typing.Optional[float] = OMIT,
+    preview_bytes: int = 20_000,
+    log_dir: str = DEFAULT_LOG_DIR,
+    request_options: typing.Optional[RequestOptions] = None,
+) -> CapturedResult[BashExecResult, CapturedOutput]:
+    """
+    Runs ``command`` through ``bash.exec`` with stdout and stderr captured to files in the sandbox.
+    """
+    paths = _log_paths(log_dir, ("stdout", "stderr"))
+    result = unwrap_response(
+        bash.exec(
+            command=_capture_script(command, log_dir, paths, preview_bytes, merge_stderr=False),
+            session_id=session_id,
+            exec_dir=exec_dir,
+            env=env,
+            timeout=timeout,
+            hard_timeout=hard_timeout,
+            # leave room for the truncation note so the server never cuts the preview itself
+            max_output_length=preview_bytes + 1024,
+            request_options=request_options,
+        )
+    )
+    previews = {"stdout": result.stdout, "stderr": result.stderr}
+    file_client = FileClient(client_wrapper=bash._raw_client._client_wrapper)
+    logs = {
+        stream: CapturedOutput(file_client, bash, path=paths[stream], stream=stream, request_options=request_options)
+        for stream in _saved_streams(paths, previews, finished=result.status == "completed")
+    }
+    return CapturedResult(result, logs)
+
+
+async def exec_captured_async(
+    bash: "AsyncBashClient",
+    *,
+    command: str,
+    session_id: typing.Optional[str] = OMIT,
+    exec_dir: typing.Optional[str] = OMIT,
+    env: typing.Optional[typing.Dict[str, typing.Optional[str]]] = OMIT,
+    timeout: typing.Optional[float] = OMIT,
+    hard_timeout: typing.Optional[float] = OMIT,
+    preview_bytes: int = 20_000,
+    log_dir: str = DEFAULT_LOG_DIR,
+    request_options: typing.Optional[RequestOptions] = None,
+) -> CapturedResult[BashExecResult, AsyncCapturedOutput]:
+    """
+    Async counterpart of ``exec_captured``.
+    """
+    paths = _log_paths(log_dir, ("stdout", "stderr"))
+    result = unwrap_response(
+        await bash.exec(
+            command=_capture_script(command, log_dir, paths, preview_bytes, merge_stderr=False),
+            session_id=session_id,
+            exec_dir=exec_dir,
+            env=env,
+            timeout=timeout,
+            hard_timeout=hard_timeout,
+            max_output_length=preview_bytes + 1024,
+            request_options=request_options,
+        )
+    )
+    previews = {"stdout": result.stdout, "stderr": result.stderr}
+    file_client = AsyncFileClient(client_wrapper=bash._raw_client._client_wrapper)
+    logs = {
+        stream: AsyncCapturedOutput(
+            file_client, bash, path=paths[stream], stream=stream, request_options=request_options
+        )
+        for stream in _saved_streams(paths, previews, finished=result.status == "completed")
+    }
+    return CapturedResult(result, logs)
+
+
+def exec_command_captured(
+    shell: "ShellClient",
+    *,
+    command: str,
+    id: typing.Optional[str] = OMIT,
+    exec_dir: typing.Optional[str] = OMIT,
+    timeout: typing.Optional[float] = OMIT,
+    no_change_timeout: typing.Optional[int] = OMIT,
+    hard_timeout: typing.Optional[float] = OMIT,
+    preview_bytes: int = 20_000,
+    log_dir: str = DEFAULT_LOG_DIR,
+    heartbeat: typing.Optional[float] = DEFAULT_HEARTBEAT,
+    request_options: typing.Optional[RequestOptions] = None,
+) -> CapturedResult[ShellCommandResult, CapturedOutput]:
+    """
+    Runs ``command`` through ``shell.exec_command`` with its combined output captured to a file in the sandbox.
+    """
+    paths = _log_paths(log_dir, ("stdout",))
+    result = unwrap_response(
+        shell.exec_command(
+            command=_capture_script(
+                command,
+                log_dir,
+                paths,
+                preview_bytes,
+                merge_stderr=True,
+                heartbeat=_heartbeat_interval(heartbeat, no_change_timeout),
+            ),
+            id=id,
+            exec_dir=exec_dir,
+            timeout=timeout,
+            no_change_timeout=no_change_timeout,
+            hard_timeout=hard_timeout,
+            request_options=request_options,
+        )
+    )
+    result = _strip_heartbeats(result)
+    client_wrapper = shell._raw_client._client_wrapper
+    file_client = FileClient(client_wrapper=client_wrapper)
+    bash_client = BashClient(client_wrapper=client_wrapper)
+    logs = {
+        stream: CapturedOutput(
+            file_client, bash_client, path=paths[stream], stream=stream, request_options=request_options
+        )
+        for stream in _saved_streams(paths, {"stdout": result.output}, finished=result.status == "completed")
+    }
+    return CapturedResult(result, logs)
+
+
+async def exec_command_captured_async(
+    shell: "AsyncShellClient",
+    *,
+    command: str,
+    id: typing.Optional[str] = OMIT,
+    exec_dir: typing.Optional[str] = OMIT,
+    timeout: typing.Optional[float] = OMIT,
+    no_change_timeout: typing.Optional[int] = OMIT,
+    hard_timeout: typing.Optional[float] = OMIT,
+    preview_bytes: int = 20_000,
+    log_dir: str = DEFAULT_LOG_DIR,
+    heartbeat: typing.Optional[float] = DEFAULT_HEARTBEAT,
+    request_options: typing.Optional[RequestOptions] = None,
+) -> CapturedResult[ShellCommandResult, AsyncCapturedOutput]:
+    """
+    Async counterpart of ``exec_command_captured``.
+    """
+    paths = _log_paths(log_dir, ("stdout",))
+    result = unwrap_response(
+        await shell.exec_command(
+            command=_capture_script(
+                command,
+                log_dir,
+                paths,
+                preview_bytes,
+                merge_stderr=True,
+                heartbeat=_heartbeat_interval(heartbeat, no_change_timeout),
+            ),
+            id=id,
+            exec_dir=exec_dir,
+            timeout=timeout,
+            no_change_timeout=no_change_timeout,
+            hard_timeout=hard_timeout,
+            request_options=request_options,
+        )
+    )
+    result = _strip_heartbeats(result)
+    client_wrapper = shell._raw_client._client_wrapper
+    file_client = AsyncFileClient(client_wrapper=client_wrapper)
+    bash_client = AsyncBashClient(client_wrapper=client_wrapper)
+    logs = {
+        stream: AsyncCapturedOutput(
+            file_client, bash_client, path=paths[stream], stream=stream, request_options=request_options
+        )
+        for stream in _saved_streams(paths, {"stdout": result.output}, finished=result.status == "completed")
+    }
+    return CapturedResult(result, logs)
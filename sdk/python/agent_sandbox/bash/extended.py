@@ -0,0 +1,570 @@
+import typing
+
+from ..core.request_options import RequestOptions
+from ..types.bash_exec_result import BashExecResult
+from .capture import (
+    DEFAULT_LOG_DIR,
+    AsyncCapturedOutput,
+    CapturedOutput,
+    CapturedResult,
+    exec_captured,
+    exec_captured_async,
+)
+from .client import AsyncBashClient, BashClient
+from .follow import AsyncBashFollower, BashFollower, OutputSink
+from .multiplex import BashOutputMultiplexer
+from .pipeline import BashPipelineResult, _demux_output, _new_marker, _pack_commands
+
+# this is used as the default value for optional parameters
+OMIT = typing.cast(typing.Any, ...)
+
+
+class ExtendedBashClient(BashClient):
+    """
+    `BashClient` with output following, multiplexing, pipelines and full-output capture.
+    """
+
+    def follow(
+        self,
+        *,
+        session_id: str,
+        command_id: typing.Optional[str] = None,
+        offset: int = 0,
+        stderr_offset: int = 0,
+        wait_timeout: float = 30,
+        sink: typing.Optional[OutputSink] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> BashFollower:
+        """
+        Follow a command's output until it finishes, long-polling `output` with `wait=True`
+
+        Yields `BashOutputChunk` for new stdout/stderr data and a final `BashCommandFinished`
+        once the command is `completed`, `timed_out` or `killed`.
+
+        Parameters
+        ----------
+        session_id : str
+            Target session ID
+
+        command_id : typing.Optional[str]
+            Target a specific async command. If not set, uses session-level output.
+
+        offset : int
+            Stdout byte offset to start reading from
+
+        stderr_offset : int
+            Stderr byte offset to start reading from
+
+        wait_timeout : float
+            Max seconds each long-poll waits for new output
+
+        sink : typing.Optional[OutputSink]
+            Optional destination that also receives every chunk, e.g. `OutputRingBuffer` or `OutputFileSink`
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        BashFollower
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        started = client.bash.exec(command="make build", async_mode=True).data
+        for event in client.bash.follow(
+            session_id=started.session_id,
+            command_id=started.command_id,
+        ):
+            print(event)
+        """
+        return BashFollower(
+            self,
+            session_id=session_id,
+            command_id=command_id,
+            offset=offset,
+            stderr_offset=stderr_offset,
+            wait_timeout=wait_timeout,
+            sink=sink,
+            request_options=request_options,
+        )
+
+    def pipeline(
+        self,
+        commands: typing.Sequence[str],
+        *,
+        stop_on_error: bool = True,
+        session_id: typing.Optional[str] = OMIT,
+        exec_dir: typing.Optional[str] = OMIT,
+        env: typing.Optional[typing.Dict[str, typing.Optional[str]]] = OMIT,
+        timeout: typing.Optional[float] = OMIT,
+        hard_timeout: typing.Optional[float] = OMIT,
+        max_output_length: typing.Optional[int] = OMIT,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> BashPipelineResult:
+        """
+        Run a batch of commands in one round trip and split the output back per command
+
+        The commands are packed into a single script run by `exec` in one session, in order and
+        in the same shell, so `cd` and exports carry over from one command to the next within the
+        pipeline (unlike separate `exec` calls, where they do not persist). Each command's stdout,
+        stderr and exit code are recovered from markers written around it.
+
+        Parameters
+        ----------
+        commands : typing.Sequence[str]
+            Commands to run, in order
+
+        stop_on_error : bool
+            Skip the remaining commands after the first non-zero exit code; if False, run them all
+
+        session_id : typing.Optional[str]
+            Target session ID. If not set, a new session is created.
+
+        exec_dir : typing.Optional[str]
+            Working directory for the batch
+
+        env : typing.Optional[typing.Dict[str, typing.Optional[str]]]
+            Environment variables for the batch
+
+        timeout : typing.Optional[float]
+            Timeout for the whole batch in seconds
+
+        hard_timeout : typing.Optional[float]
+            Hard timeout for the whole batch in seconds
+
+        max_output_length : typing.Optional[int]
+            Max characters of combined output; commands whose output is cut off are reported as `incomplete`
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        BashPipelineResult
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        result = client.bash.pipeline(["git status --short", "ls", "cat README.md"])
+        for step in result.results:
+            print(step.command, step.exit_code, step.stdout)
+        """
+        if isinstance(commands, str):
+            raise TypeError("commands must be a sequence of command strings, not a single string")
+        marker = _new_marker()
+        response = self.exec(
+            command=_pack_commands(commands, marker, stop_on_error),
+            session_id=session_id,
+            exec_dir=exec_dir,
+            env=env,
+            timeout=timeout,
+            hard_timeout=hard_timeout,
+            max_output_length=max_output_length,
+            request_options=request_options,
+        )
+        return _demux_output(commands, marker, stop_on_error, response)
+
+    def exec_captured(
+        self,
+        *,
+        command: str,
+        session_id: typing.Optional[str] = OMIT,
+        exec_dir: typing.Optional[str] = OMIT,
+        env: typing.Optional[typing.Dict[str, typing.Optional[str]]] = OMIT,
+        timeout: typing.Optional[float] = OMIT,
+        hard_timeout: typing.Optional[float] = OMIT,
+        preview_bytes: int = 20_000,
+        log_dir: str = DEFAULT_LOG_DIR,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> CapturedResult[BashExecResult, CapturedOutput]:
+        """
+        Execute a command without losing output to truncation
+
+        The command's stdout and stderr go to files inside the sandbox. A stream that fits in
+        `preview_bytes` is returned as usual and its file removed; a larger one is returned as
+        its head and tail around a note naming the file, and the file is kept and exposed as a
+        handle that streams the full log.
+
+        Parameters
+        ----------
+        command : str
+            Command to execute
+
+        session_id : typing.Optional[str]
+            Target session ID. If not set, a new session is created.
+
+        exec_dir : typing.Optional[str]
+            Working directory for the command
+
+        env : typing.Optional[typing.Dict[str, typing.Optional[str]]]
+            Environment variables for the command
+
+        timeout : typing.Optional[float]
+            Command timeout in seconds
+
+        hard_timeout : typing.Optional[float]
+            Hard timeout in seconds; logs of a command stopped this way are always kept
+
+        preview_bytes : int
+            Max bytes of each stream returned inline
+
+        log_dir : str
+            Directory inside the sandbox for the full logs
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        CapturedResult[BashExecResult, CapturedOutput]
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        captured = client.bash.exec_captured(command="make test")
+        print(captured.result.stdout)
+        if captured.truncated:
+            captured.stdout_log.save("make-test.log.gz", compress=True)
+        """
+        return exec_captured(
+            self,
+            command=command,
+            session_id=session_id,
+            exec_dir=exec_dir,
+            env=env,
+            timeout=timeout,
+            hard_timeout=hard_timeout,
+            preview_bytes=preview_bytes,
+            log_dir=log_dir,
+            request_options=request_options,
+        )
+
+
+class AsyncExtendedBashClient(AsyncBashClient):
+    """
+    `AsyncBashClient` with output following, multiplexing, pipelines and full-output capture.
+    """
+
+    def follow(
+        self,
+        *,
+        session_id: str,
+        command_id: typing.Optional[str] = None,
+        offset: int = 0,
+        stderr_offset: int = 0,
+        wait_timeout: float = 30,
+        sink: typing.Optional[OutputSink] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> AsyncBashFollower:
+        """
+        Follow a command's output until it finishes, long-polling `output` with `wait=True`
+
+        Yields `BashOutputChunk` for new stdout/stderr data and a final `BashCommandFinished`
+        once the command is `completed`, `timed_out` or `killed`.
+
+        Parameters
+        ----------
+        session_id : str
+            Target session ID
+
+        command_id : typing.Optional[str]
+            Target a specific async command. If not set, uses session-level output.
+
+        offset : int
+            Stdout byte offset to start reading from
+
+        stderr_offset : int
+            Stderr byte offset to start reading from
+
+        wait_timeout : float
+            Max seconds each long-poll waits for new output
+
+        sink : typing.Optional[OutputSink]
+            Optional destination that also receives every chunk, e.g. `OutputRingBuffer` or `OutputFileSink`
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        AsyncBashFollower
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            started = (await client.bash.exec(command="make build", async_mode=True)).data
+            async for event in client.bash.follow(
+                session_id=started.session_id,
+                command_id=started.command_id,
+            ):
+                print(event)
+
+
+        asyncio.run(main())
+        """
+        return AsyncBashFollower(
+            self,
+            session_id=session_id,
+            command_id=command_id,
+            offset=offset,
+            stderr_offset=stderr_offset,
+            wait_timeout=wait_timeout,
+            sink=sink,
+            request_options=request_options,
+        )
+
+    def multiplexer(
+        self,
+        *,
+        max_in_flight: int = 8,
+        wait_timeout: float = 2.0,
+        queue_size: int = 0,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> BashOutputMultiplexer:
+        """
+        Follow many commands at once with a bounded number of concurrent `output` long-polls
+
+        Commands are polled round-robin and each one's events are routed to its own queue;
+        finished commands are dropped automatically.
+
+        Parameters
+        ----------
+        max_in_flight : int
+            Maximum number of `output` requests in flight at any time
+
+        wait_timeout : float
+            Max seconds each long-poll waits for new output; keep it short when following many idle commands
+
+        queue_size : int
+            Maximum events buffered per command before its poller waits for the consumer (0 means unbounded)
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        BashOutputMultiplexer
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            started = [(await client.bash.exec(command=f"./job.sh {i}", async_mode=True)).data for i in range(50)]
+            async with client.bash.multiplexer(max_in_flight=8) as mux:
+                follows = [mux.follow(session_id=s.session_id, command_id=s.command_id) for s in started]
+                finished = await asyncio.gather(*(f.wait() for f in follows))
+            print([f.exit_code for f in finished])
+
+
+        asyncio.run(main())
+        """
+        return BashOutputMultiplexer(
+            self,
+            max_in_flight=max_in_flight,
+            wait_timeout=wait_timeout,
+            queue_size=queue_size,
+            request_options=request_options,
+        )
+
+    async def pipeline(
+        self,
+        commands: typing.Sequence[str],
+        *,
+        stop_on_error: bool = True,
+        session_id: typing.Optional[str] = OMIT,
+        exec_dir: typing.Optional[str] = OMIT,
+        env: typing.Optional[typing.Dict[str, typing.Optional[str]]] = OMIT,
+        timeout: typing.Optional[float] = OMIT,
+        hard_timeout: typing.Optional[float] = OMIT,
+        max_output_length: typing.Optional[int] = OMIT,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> BashPipelineResult:
+        """
+        Run a batch of commands in one round trip and split the output back per command
+
+        The commands are packed into a single script run by `exec` in one session, in order and
+        in the same shell, so `cd` and exports carry over from one command to the next within the
+        pipeline (unlike separate `exec` calls, where they do not persist). Each command's stdout,
+        stderr and exit code are recovered from markers written around it.
+
+        Parameters
+        ----------
+        commands : typing.Sequence[str]
+            Commands to run, in order
+
+        stop_on_error : bool
+            Skip the remaining commands after the first non-zero exit code; if False, run them all
+
+        session_id : typing.Optional[str]
+            Target session ID. If not set, a new session is created.
+
+        exec_dir : typing.Optional[str]
+            Working directory for the batch
+
+        env : typing.Optional[typing.Dict[str, typing.Optional[str]]]
+            Environment variables for the batch
+
+        timeout : typing.Optional[float]
+            Timeout for the whole batch in seconds
+
+        hard_timeout : typing.Optional[float]
+            Hard timeout for the whole batch in seconds
+
+        max_output_length : typing.Optional[int]
+            Max characters of combined output; commands whose output is cut off are reported as `incomplete`
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        BashPipelineResult
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            result = await client.bash.pipeline(["git status --short", "ls", "cat README.md"])
+            print(result.ok)
+
+
+        asyncio.run(main())
+        """
+        if isinstance(commands, str):
+            raise TypeError("commands must be a sequence of command strings, not a single string")
+        marker = _new_marker()
+        response = await self.exec(
+            command=_pack_commands(commands, marker, stop_on_error),
+            session_id=session_id,
+            exec_dir=exec_dir,
+            env=env,
+            timeout=timeout,
+            hard_timeout=hard_timeout,
+            max_output_length=max_output_length,
+            request_options=request_options,
+        )
+        return _demux_output(commands, marker, stop_on_error, response)
+
+    async def exec_captured(
+        self,
+        *,
+        command: str,
+        session_id: typing.Optional[str] = OMIT,
+        exec_dir: typing.Optional[str] = OMIT,
+        env: typing.Optional[typing.Dict[str, typing.Optional[str]]] = OMIT,
+        timeout: typing.Optional[float] = OMIT,
+        hard_timeout: typing.Optional[float] = OMIT,
+        preview_bytes: int = 20_000,
+        log_dir: str = DEFAULT_LOG_DIR,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> CapturedResult[BashExecResult, AsyncCapturedOutput]:
+        """
+        Execute a command without losing output to truncation
+
+        The command's stdout and stderr go to files inside the sandbox. A stream that fits in
+        `preview_bytes` is returned as usual and its file removed; a larger one is returned as
+        its head and tail around a note naming the file, and the file is kept and exposed as a
+        handle that streams the full log.
+
+        Parameters
+        ----------
+        command : str
+            Command to execute
+
+        session_id : typing.Optional[str]
+            Target session ID. If not set, a new session is created.
+
+        exec_dir : typing.Optional[str]
+            Working directory for the command
+
+        env : typing.Optional[typing.Dict[str, typing.Optional[str]]]
+            Environment variables for the command
+
+        timeout : typing.Optional[float]
+            Command timeout in seconds
+
+        hard_timeout : typing.Optional[float]
+            Hard timeout in seconds; logs of a command stopped this way are always kept
+
+        preview_bytes : int
+            Max bytes of each stream returned inline
+
+        log_dir : str
+            Directory inside the sandbox for the full logs
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        CapturedResult[BashExecResult, AsyncCapturedOutput]
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            captured = await client.bash.exec_captured(command="make test")
+            if captured.truncated:
+                await captured.stdout_log.save("make-test.log.gz", compress=True)
+
+
+        asyncio.run(main())
+        """
+        return await exec_captured_async(
+            self,
+            command=command,
+            session_id=session_id,
+            exec_dir=exec_dir,
+            env=env,
+            timeout=timeout,
+            hard_timeout=hard_timeout,
+            preview_bytes=preview_bytes,
+            log_dir=log_dir,
+            request_options=request_options,
+        )
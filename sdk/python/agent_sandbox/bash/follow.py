@@ -0,0 +1,332 @@
+import collections
+import io
+import typing
+
+import pydantic
+from ..core.envelope import unwrap_response
+from ..core.pydantic_utilities import IS_PYDANTIC_V2, UniversalBaseModel
+from ..core.request_options import RequestOptions
+from ..types.bash_output_result import BashOutputResult
+from ..types.command_status import CommandStatus
+
+if typing.TYPE_CHECKING:
+    from .client import AsyncBashClient, BashClient
+
+TERMINAL_STATUSES = ("completed", "timed_out", "killed")
+
+OutputStream = typing.Literal["stdout", "stderr"]
+
+
+class BashOutputChunk(UniversalBaseModel):
+    """
+    New output read from a bash command
+    """
+
+    type: typing.Literal["output"] = "output"
+    stream: OutputStream = pydantic.Field()
+    """
+    Which pipe the data was read from
+    """
+
+    data: str = pydantic.Field()
+    """
+    Output text
+    """
+
+    offset: int = pydantic.Field()
+    """
+    Byte offset of the stream after this chunk
+    """
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+class BashCommandFinished(UniversalBaseModel):
+    """
+    Final status of a followed bash command
+    """
+
+    type: typing.Literal["status"] = "status"
+    session_id: str = pydantic.Field()
+    command_id: typing.Optional[str] = pydantic.Field(default=None)
+    status: CommandStatus = pydantic.Field()
+    """
+    Terminal command status: `completed`, `timed_out` or `killed`
+    """
+
+    exit_code: typing.Optional[int] = pydantic.Field(default=None)
+    offset: int = pydantic.Field()
+    """
+    Final stdout offset
+    """
+
+    stderr_offset: int = pydantic.Field()
+    """
+    Final stderr offset
+    """
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+BashFollowEvent = typing.Union[BashOutputChunk, BashCommandFinished]
+
+
+class OutputSink(typing.Protocol):
+    def write(self, stream: OutputStream, data: str) -> None: ...
+
+
+class OutputRingBuffer:
+    """
+    Keeps only the last ``max_chars`` characters of each stream, so following a
+    runaway command cannot exhaust local memory.
+    """
+
+    def __init__(self, max_chars: int = 1_000_000):
+        self._max_chars = max_chars
+        self._chunks: typing.Dict[str, typing.Deque[str]] = {
+            "stdout": collections.deque(),
+            "stderr": collections.deque(),
+        }
+        self._sizes = {"stdout": 0, "stderr": 0}
+        self.dropped = {"stdout": 0, "stderr": 0}
+
+    def write(self, stream: OutputStream, data: str) -> None:
+        chunks = self._chunks[stream]
+        chunks.append(data)
+        self._sizes[stream] += len(data)
+        while self._sizes[stream] > self._max_chars:
+            excess = self._sizes[stream] - self._max_chars
+            head = chunks[0]
+            if len(head) <= excess:
+                chunks.popleft()
+                self._sizes[stream] -= len(head)
+                self.dropped[stream] += len(head)
+            else:
+                chunks[0] = head[excess:]
+                self._sizes[stream] -= excess
+                self.dropped[stream] += excess
+
+    @property
+    def stdout(self) -> str:
+        return "".join(self._chunks["stdout"])
+
+    @property
+    def stderr(self) -> str:
+        return "".join(self._chunks["stderr"])
+
+
+class OutputFileSink:
+    """
+    Appends each stream to a local file. ``stderr_path`` defaults to the stdout
+    file, interleaving both streams in arrival order.
+    """
+
+    def __init__(self, stdout_path: str, stderr_path: typing.Optional[str] = None, encoding: str = "utf-8"):
+        self._files: typing.Dict[str, typing.IO[str]] = {}
+        stdout = io.open(stdout_path, "a", encoding=encoding)
+        self._files["stdout"] = stdout
+        self._files["stderr"] = (
+            io.open(stderr_path, "a", encoding=encoding) if stderr_path and stderr_path != stdout_path else stdout
+        )
+
+    def __enter__(self) -> "OutputFileSink":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def write(self, stream: OutputStream, data: str) -> None:
+        self._files[stream].write(data)
+
+    def close(self) -> None:
+        for f in set(self._files.values()):
+            f.close()
+
+
+class _BaseBashFollower:
+    def __init__(
+        self,
+        *,
+        session_id: str,
+        command_id: typing.Optional[str] = None,
+        offset: int = 0,
+        stderr_offset: int = 0,
+        wait_timeout: float = 30,
+        sink: typing.Optional[OutputSink] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ):
+        self.session_id = session_id
+        self.command_id = command_id
+        self.offset = offset
+        self.stderr_offset = stderr_offset
+        self._wait_timeout = wait_timeout
+        self._sink = sink
+        self._request_options = request_options
+        self.finished: typing.Optional[BashCommandFinished] = None
+
+    def _poll_kwargs(self, wait: bool) -> typing.Dict[str, typing.Any]:
+        kwargs: typing.Dict[str, typing.Any] = dict(
+            session_id=self.session_id,
+            offset=self.offset,
+            stderr_offset=self.stderr_offset,
+            wait=wait,
+            request_options=self._request_options,
+        )
+        if wait:
+            kwargs["wait_timeout"] = self._wait_timeout
+        if self.command_id is not None:
+            kwargs["command_id"] = self.command_id
+        return kwargs
+
+    def _consume(self, result: BashOutputResult) -> typing.List[BashOutputChunk]:
+        chunks = []
+        if result.stdout:
+            self.offset = result.offset if result.offset is not None else self.offset + len(result.stdout.encode())
+            chunks.append(BashOutputChunk(stream="stdout", data=result.stdout, offset=self.offset))
+        if result.stderr:
+            self.stderr_offset = (
+                result.stderr_offset
+                if result.stderr_offset is not None
+                else self.stderr_offset + len(result.stderr.encode())
+            )
+            chunks.append(BashOutputChunk(stream="stderr", data=result.stderr, offset=self.stderr_offset))
+        if self._sink is not None:
+            for chunk in chunks:
+                self._sink.write(chunk.stream, chunk.data)
+        return chunks
+
+    def _finish(self, result: BashOutputResult) -> typing.Optional[BashCommandFinished]:
+        command = result.command
+        if command is None or command.status not in TERMINAL_STATUSES:
+            return None
+        if self.command_id is None:
+            self.command_id = command.command_id
+        self.finished = BashCommandFinished(
+            session_id=self.session_id,
+            command_id=command.command_id,
+            status=command.status,
+            exit_code=command.exit_code,
+            offset=self.offset,
+            stderr_offset=self.stderr_offset,
+        )
+        return self.finished
+
+
+class BashFollower(_BaseBashFollower):
+    """
+    Follows the output of a bash command by long-polling `/v1/bash/output`,
+    feeding the returned offsets back on every call.
+
+    Yields ``BashOutputChunk`` for every new piece of stdout/stderr and a single
+    ``BashCommandFinished`` once the command is `completed`, `timed_out` or
+    `killed`, after draining any output still buffered on the server. Pass a
+    ``sink`` (``OutputRingBuffer``, ``OutputFileSink`` or anything with a
+    ``write(stream, data)`` method) to also keep the output around.
+
+    Examples
+    --------
+    from agent_sandbox import Sandbox
+
+    client = Sandbox(
+        base_url="https://yourhost.com/path/to/api",
+    )
+    started = client.bash.exec(command="make build", async_mode=True).data
+    for event in client.bash.follow(session_id=started.session_id, command_id=started.command_id):
+        if event.type == "output":
+            print(event.data, end="")
+        else:
+            print("exit code:", event.exit_code)
+    """
+
+    def __init__(self, client: "BashClient", **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._client = client
+
+    def __iter__(self) -> typing.Iterator[BashFollowEvent]:
+        wait = True
+        while self.finished is None:
+            result = unwrap_response(self._client.output(**self._poll_kwargs(wait)))
+            chunks = self._consume(result)
+            yield from chunks
+            command = result.command
+            if command is not None and command.status in TERMINAL_STATUSES and chunks:
+                # the command has exited; drain what is left without waiting
+                wait = False
+                continue
+            finished = self._finish(result)
+            if finished is not None:
+                yield finished
+
+    def wait(self) -> BashCommandFinished:
+        """
+        Consume the command to completion (feeding the sink) and return its final status.
+        """
+        for _ in self:
+            pass
+        return typing.cast(BashCommandFinished, self.finished)
+
+
+class AsyncBashFollower(_BaseBashFollower):
+    """
+    Async counterpart of ``BashFollower``.
+
+    Examples
+    --------
+    import asyncio
+
+    from agent_sandbox import AsyncSandbox
+
+    client = AsyncSandbox(
+        base_url="https://yourhost.com/path/to/api",
+    )
+
+
+    async def main() -> None:
+        started = (await client.bash.exec(command="make build", async_mode=True)).data
+        async for event in client.bash.follow(session_id=started.session_id, command_id=started.command_id):
+            print(event)
+
+
+    asyncio.run(main())
+    """
+
+    def __init__(self, client: "AsyncBashClient", **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._client = client
+
+    async def __aiter__(self) -> typing.AsyncIterator[BashFollowEvent]:
+        wait = True
+        while self.finished is None:
+            result = unwrap_response(await self._client.output(**self._poll_kwargs(wait)))
+            chunks = self._consume(result)
+            for chunk in chunks:
+                yield chunk
+            command = result.command
+            if command is not None and command.status in TERMINAL_STATUSES and chunks:
+                wait = False
+                continue
+            finished = self._finish(result)
+            if finished is not None:
+                yield finished
+
+    async def wait(self) -> BashCommandFinished:
+        """
+        Consume the command to completion (feeding the sink) and return its final status.
+        """
+        async for _ in self:
+            pass
+        return typing.cast(BashCommandFinished, self.finished)
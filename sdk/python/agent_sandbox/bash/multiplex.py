@@ -0,0 +1,252 @@
+import asyncio
+import typing
+
+from ..core.envelope import unwrap_response
+from ..core.request_options import RequestOptions
+from .follow import TERMINAL_STATUSES, BashCommandFinished, BashFollowEvent, OutputSink, _BaseBashFollower
+
+if typing.TYPE_CHECKING:
+    from .client import AsyncBashClient
+
+CommandKey = typing.Tuple[str, typing.Optional[str]]
+FollowQueue = "asyncio.Queue[typing.Union[BashFollowEvent, BaseException]]"
+
+
+class _TrackedCommand(_BaseBashFollower):
+    def __init__(self, queue_size: int, **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self.queue: FollowQueue = asyncio.Queue(maxsize=queue_size)
+        self.draining = False
+        self.cancelled = False
+
+    @property
+    def key(self) -> CommandKey:
+        return (self.session_id, self.command_id)
+
+
+class BashOutputMultiplexer:
+    """
+    Follows the output of many bash commands from one event loop with a small,
+    fixed number of in-flight `/v1/bash/output` long-polls.
+
+    Each tracked ``(session_id, command_id)`` keeps its own offsets and gets its
+    own ``asyncio.Queue`` of ``BashOutputChunk`` / ``BashCommandFinished``
+    events. Commands are polled round-robin by ``max_in_flight`` workers, so a
+    chatty command cannot starve quiet ones, and a command is dropped as soon
+    as it reaches a terminal status. Keep ``wait_timeout`` short when tracking
+    many mostly-idle commands: it bounds how long one quiet command can hold a
+    worker. A full per-command queue (``queue_size``) applies backpressure to
+    its worker.
+
+    Examples
+    --------
+    import asyncio
+
+    from agent_sandbox import AsyncSandbox
+
+    client = AsyncSandbox(
+        base_url="https://yourhost.com/path/to/api",
+    )
+
+
+    async def main() -> None:
+        shards = [(await client.bash.exec(command=f"pytest -k shard{i}", async_mode=True)).data for i in range(100)]
+        async with client.bash.multiplexer(max_in_flight=8) as mux:
+            results = await asyncio.gather(
+                *(mux.follow(session_id=s.session_id, command_id=s.command_id).wait() for s in shards)
+            )
+        print(sum(r.exit_code == 0 for r in results), "shards passed")
+
+
+    asyncio.run(main())
+    """
+
+    def __init__(
+        self,
+        client: "AsyncBashClient",
+        *,
+        max_in_flight: int = 8,
+        wait_timeout: float = 2.0,
+        queue_size: int = 0,
+        request_options: typing.Optional[RequestOptions] = None,
+    ):
+        if max_in_flight <= 0:
+            raise ValueError("max_in_flight must be positive")
+        self._client = client
+        self._max_in_flight = max_in_flight
+        self._wait_timeout = wait_timeout
+        self._queue_size = queue_size
+        self._request_options = request_options
+        self._tracked: typing.Dict[CommandKey, _TrackedCommand] = {}
+        self._ready: typing.Optional["asyncio.Queue[_TrackedCommand]"] = None
+        self._workers: typing.List["asyncio.Task[None]"] = []
+        self._in_flight = 0
+        self.polls = 0
+        self.completed = 0
+        self.failed = 0
+        self.peak_in_flight = 0
+
+    async def __aenter__(self) -> "BashOutputMultiplexer":
+        return self
+
+    async def __aexit__(self, *args: typing.Any) -> None:
+        await self.close()
+
+    @property
+    def active(self) -> int:
+        """
+        Number of commands still being followed.
+        """
+        return len(self._tracked)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def track(
+        self,
+        *,
+        session_id: str,
+        command_id: typing.Optional[str] = None,
+        offset: int = 0,
+        stderr_offset: int = 0,
+        sink: typing.Optional[OutputSink] = None,
+    ) -> FollowQueue:
+        """
+        Start following a command and return the queue its events are routed to.
+
+        The queue receives output chunks, then a ``BashCommandFinished``; if polling
+        fails, the exception is put on the queue instead and the command is dropped.
+        Must be called from within the running event loop.
+        """
+        key = (session_id, command_id)
+        if key in self._tracked:
+            return self._tracked[key].queue
+        tracked = _TrackedCommand(
+            self._queue_size,
+            session_id=session_id,
+            command_id=command_id,
+            offset=offset,
+            stderr_offset=stderr_offset,
+            wait_timeout=self._wait_timeout,
+            sink=sink,
+            request_options=self._request_options,
+        )
+        self._tracked[key] = tracked
+        self._ensure_started().put_nowait(tracked)
+        return tracked.queue
+
+    def follow(
+        self,
+        *,
+        session_id: str,
+        command_id: typing.Optional[str] = None,
+        offset: int = 0,
+        stderr_offset: int = 0,
+        sink: typing.Optional[OutputSink] = None,
+    ) -> "MultiplexedFollow":
+        """
+        Track a command and return an async iterator over its events.
+        """
+        queue = self.track(
+            session_id=session_id, command_id=command_id, offset=offset, stderr_offset=stderr_offset, sink=sink
+        )
+        return MultiplexedFollow(queue)
+
+    def untrack(self, *, session_id: str, command_id: typing.Optional[str] = None) -> None:
+        """
+        Stop following a command; its queue receives no further events.
+        """
+        tracked = self._tracked.pop((session_id, command_id), None)
+        if tracked is not None:
+            tracked.cancelled = True
+
+    async def close(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._ready = None
+        for tracked in self._tracked.values():
+            tracked.cancelled = True
+        self._tracked.clear()
+
+    def _ensure_started(self) -> "asyncio.Queue[_TrackedCommand]":
+        if self._ready is None:
+            self._ready = asyncio.Queue()
+            self._workers = [asyncio.ensure_future(self._worker(self._ready)) for _ in range(self._max_in_flight)]
+        return self._ready
+
+    def _drop(self, tracked: _TrackedCommand) -> None:
+        if self._tracked.get(tracked.key) is tracked:
+            del self._tracked[tracked.key]
+
+    async def _worker(self, ready: "asyncio.Queue[_TrackedCommand]") -> None:
+        while True:
+            tracked = await ready.get()
+            if tracked.cancelled:
+                continue
+            self._in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+            try:
+                self.polls += 1
+                response = await self._client.output(**tracked._poll_kwargs(not tracked.draining))
+                result = unwrap_response(response)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self.failed += 1
+                self._drop(tracked)
+                await tracked.queue.put(exc)
+                continue
+            finally:
+                self._in_flight -= 1
+
+            if tracked.cancelled:
+                continue
+            chunks = tracked._consume(result)
+            for chunk in chunks:
+                await tracked.queue.put(chunk)
+            command = result.command
+            if command is not None and command.status in TERMINAL_STATUSES and chunks:
+                tracked.draining = True
+                ready.put_nowait(tracked)
+                continue
+            finished = tracked._finish(result)
+            if finished is None:
+                ready.put_nowait(tracked)
+                continue
+            self.completed += 1
+            self._drop(tracked)
+            await tracked.queue.put(finished)
+
+
+class MultiplexedFollow:
+    """
+    Async iterator over the queue of one command tracked by ``BashOutputMultiplexer``.
+    """
+
+    def __init__(self, queue: FollowQueue):
+        self._queue = queue
+        self.finished: typing.Optional[BashCommandFinished] = None
+
+    def __aiter__(self) -> "MultiplexedFollow":
+        return self
+
+    async def __anext__(self) -> BashFollowEvent:
+        if self.finished is not None:
+            raise StopAsyncIteration
+        event = await self._queue.get()
+        if isinstance(event, BaseException):
+            raise event
+        if isinstance(event, BashCommandFinished):
+            self.finished = event
+        return event
+
+    async def wait(self) -> BashCommandFinished:
+        """
+        Consume the command's events to completion and return its final status.
+        """
+        async for _ in self:
+            pass
+        return typing.cast(BashCommandFinished, self.finished)
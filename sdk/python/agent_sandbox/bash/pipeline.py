@@ -0,0 +1,156 @@
+import re
+import shlex
+import typing
+import uuid
+
+import pydantic
+from ..core.envelope import unwrap_response
+from ..core.pydantic_utilities import IS_PYDANTIC_V2, UniversalBaseModel
+from ..types.bash_exec_result import BashExecResult
+from ..types.command_status import CommandStatus
+
+PipelineCommandStatus = typing.Literal["completed", "skipped", "incomplete"]
+
+
+class BashPipelineCommandResult(UniversalBaseModel):
+    """
+    Outcome of one command of a pipelined batch
+    """
+
+    index: int = pydantic.Field()
+    """
+    Position of the command in the batch
+    """
+
+    command: str = pydantic.Field()
+    status: PipelineCommandStatus = pydantic.Field()
+    """
+    `completed` when the command ran to the end, `skipped` when it was not run because an earlier
+    command failed, `incomplete` when the batch ended (timeout, kill, truncated output) before its
+    end marker was seen
+    """
+
+    stdout: str = pydantic.Field(default="")
+    stderr: str = pydantic.Field(default="")
+    exit_code: typing.Optional[int] = pydantic.Field(default=None)
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "completed" and self.exit_code == 0
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+class BashPipelineResult(UniversalBaseModel):
+    """
+    Per-command results of a batch run in one round trip
+    """
+
+    session_id: str = pydantic.Field()
+    command_id: typing.Optional[str] = pydantic.Field(default=None)
+    status: CommandStatus = pydantic.Field()
+    """
+    Status of the combined script
+    """
+
+    results: typing.List[BashPipelineCommandResult] = pydantic.Field()
+
+    @property
+    def ok(self) -> bool:
+        """
+        True when every command completed with exit code 0.
+        """
+        return all(result.ok for result in self.results)
+
+    @property
+    def failed(self) -> typing.Optional[BashPipelineCommandResult]:
+        """
+        First command that did not complete successfully, if any.
+        """
+        return next((result for result in self.results if not result.ok), None)
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+def _new_marker() -> str:
+    return f"__BASH_PIPELINE_{uuid.uuid4().hex}__"
+
+
+def _pack_commands(commands: typing.Sequence[str], marker: str, stop_on_error: bool) -> str:
+    """
+    Builds one script that runs every command in the current shell (so `cd` and
+    exports carry over within the pipeline, though not to later `exec` calls) and
+    frames its output on both streams with start/end markers carrying the exit
+    code. Each command goes through `eval`, so a syntax error fails that command
+    only.
+    """
+    lines = ["__pl_rc=0"]
+    for index, command in enumerate(commands):
+        body = (
+            f"printf '%s\\n' '{marker}:start:{index}'; printf '%s\\n' '{marker}:start:{index}' >&2; "
+            f"eval {shlex.quote(command)}; __pl_rc=$?; "
+            f"printf '\\n%s:%d\\n' '{marker}:end:{index}' \"$__pl_rc\"; "
+            f"printf '\\n%s:%d\\n' '{marker}:end:{index}' \"$__pl_rc\" >&2"
+        )
+        if stop_on_error and index > 0:
+            body = f'if [ "$__pl_rc" -eq 0 ]; then {body}; fi'
+        lines.append(body)
+    lines.append("unset __pl_rc")
+    return "\n".join(lines)
+
+
+def _sections(output: str, marker: str) -> typing.Dict[int, typing.Tuple[str, typing.Optional[int]]]:
+    sections: typing.Dict[int, typing.Tuple[str, typing.Optional[int]]] = {}
+    pattern = re.compile(rf"^{re.escape(marker)}:start:(\d+)\n", re.MULTILINE)
+    end = re.compile(rf"\n{re.escape(marker)}:end:(\d+):(-?\d+)\n?")
+    for match in pattern.finditer(output):
+        index = int(match.group(1))
+        closing = end.search(output, match.end())
+        if closing is not None and int(closing.group(1)) == index:
+            sections[index] = (output[match.end() : closing.start()], int(closing.group(2)))
+        else:
+            next_start = pattern.search(output, match.end())
+            sections[index] = (output[match.end() : next_start.start() if next_start else len(output)], None)
+    return sections
+
+
+def _demux_output(
+    commands: typing.Sequence[str], marker: str, stop_on_error: bool, response: typing.Any
+) -> BashPipelineResult:
+    data: BashExecResult = unwrap_response(response)
+    stdout = _sections(data.stdout or "", marker)
+    stderr = _sections(data.stderr or "", marker)
+    results = []
+    stopped = False
+    for index, command in enumerate(commands):
+        out, exit_code = stdout.get(index, ("", None))
+        err, _ = stderr.get(index, ("", None))
+        if exit_code is not None:
+            status: PipelineCommandStatus = "completed"
+            stopped = stop_on_error and exit_code != 0
+        elif stopped and index not in stdout:
+            status = "skipped"
+        else:
+            status = "incomplete"
+        results.append(
+            BashPipelineCommandResult(
+                index=index, command=command, status=status, stdout=out, stderr=err, exit_code=exit_code
+            )
+        )
+    return BashPipelineResult(
+        session_id=data.session_id, command_id=data.command_id, status=data.status, results=results
+    )
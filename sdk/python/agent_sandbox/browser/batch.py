@@ -0,0 +1,326 @@
+import asyncio
+import math
+import time
+import typing
+
+import pydantic
+from ..core.pydantic_utilities import IS_PYDANTIC_V2, UniversalBaseModel
+from ..core.request_options import RequestOptions
+from ..types.action_response import ActionResponse
+from .types.action import (
+    Action,
+    Action_KeyUp,
+    Action_MouseUp,
+    Action_Scroll,
+    Action_Typing,
+    Action_Wait,
+)
+
+if typing.TYPE_CHECKING:
+    from .client import AsyncBrowserClient, BrowserClient
+
+ActionStatus = typing.Literal["ok", "failed", "skipped"]
+
+
+def _variants() -> typing.Dict[str, typing.Type[UniversalBaseModel]]:
+    variants = {}
+    for variant in typing.get_args(Action):
+        fields = variant.model_fields if IS_PYDANTIC_V2 else variant.__fields__  # type: ignore[attr-defined]
+        variants[fields["action_type"].default] = variant
+    return variants
+
+
+_VARIANTS = _variants()
+
+
+class ActionOutcome(UniversalBaseModel):
+    """
+    Result of one action of a batch
+    """
+
+    index: int = pydantic.Field()
+    action: Action = pydantic.Field()
+    status: ActionStatus = pydantic.Field()
+    response: typing.Optional[ActionResponse] = pydantic.Field(default=None)
+    """
+    Response of the request that carried this action; shared by actions that were coalesced into one request
+    """
+
+    error: typing.Optional[str] = pydantic.Field(default=None)
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+class ActionBatchResult(UniversalBaseModel):
+    """
+    Per-action results of `browser.execute_actions`
+    """
+
+    results: typing.List[ActionOutcome] = pydantic.Field()
+    ok: bool = pydantic.Field()
+    failed_index: typing.Optional[int] = pydantic.Field(default=None)
+    released: typing.List[Action] = pydantic.Field()
+    """
+    Key and mouse releases sent after a failure so nothing stays held down
+    """
+
+    requests: int = pydantic.Field()
+    """
+    Action requests sent, after coalescing
+    """
+
+    seconds: float = pydantic.Field()
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+class _Group:
+    """
+    Consecutive actions sent as one request, or a client-side wait when ``action`` is an ``Action_Wait``.
+    """
+
+    def __init__(self, index: int, action: typing.Any):
+        self.indices = [index]
+        self.action = action
+
+
+def validate_actions(actions: typing.Iterable[typing.Any]) -> typing.List[Action]:
+    """
+    Parses ``actions`` (``Action`` models or dicts with an ``action_type``) and checks them before anything is sent.
+
+    Raises ``ValueError`` listing every invalid action by index.
+    """
+    parsed: typing.List[Action] = []
+    problems = []
+    for index, item in enumerate(actions):
+        mapping = isinstance(item, typing.Mapping)
+        action_type = item.get("action_type") if mapping else getattr(item, "action_type", None)
+        variant = _VARIANTS.get(typing.cast(str, action_type))
+        if variant is None:
+            problems.append(f"action {index}: unknown action_type {action_type!r}")
+            continue
+        if mapping:
+            try:
+                item = variant(**item)
+            except pydantic.ValidationError as e:
+                problems.append(f"action {index}: {e}")
+                continue
+        problem = _check(item)
+        if problem:
+            problems.append(f"action {index} ({action_type}): {problem}")
+        parsed.append(typing.cast(Action, item))
+    if problems:
+        raise ValueError("Invalid action batch:\n" + "\n".join(problems))
+    return parsed
+
+
+def _check(action: typing.Any) -> typing.Optional[str]:
+    for name in ("x", "y", "x_offset", "y_offset"):
+        value = getattr(action, name, None)
+        if value is not None and not math.isfinite(value):
+            return f"{name} must be finite"
+    if isinstance(action, Action_Wait) and action.duration <= 0:
+        return "duration must be positive"
+    if getattr(action, "num_clicks", None) is not None and action.num_clicks < 1:
+        return "num_clicks must be at least 1"
+    if getattr(action, "key", None) == "":
+        return "key must not be empty"
+    if getattr(action, "keys", None) == []:
+        return "keys must not be empty"
+    return None
+
+
+def _plan(actions: typing.Sequence[Action], coalesce: bool) -> typing.List[_Group]:
+    """
+    Groups the batch into requests; with ``coalesce``, runs of typing, scrolls along one axis in one direction and waits become one
+    step each.
+    """
+    groups: typing.List[_Group] = []
+    for index, action in enumerate(actions):
+        last = groups[-1] if groups else None
+        merged = _merge(last.action, action) if coalesce and last is not None else None
+        if merged is not None and last is not None:
+            last.action = merged
+            last.indices.append(index)
+        else:
+            groups.append(_Group(index, action))
+    return groups
+
+
+def _merge(first: typing.Any, second: typing.Any) -> typing.Optional[Action]:
+    if isinstance(first, Action_Typing) and isinstance(second, Action_Typing):
+        if bool(first.use_clipboard) == bool(second.use_clipboard):
+            return Action_Typing(text=first.text + second.text, use_clipboard=first.use_clipboard)
+    if isinstance(first, Action_Scroll) and isinstance(second, Action_Scroll):
+        # only scrolls along the same axis and in the same direction are merged: down and back up is not the same
+        # as not scrolling, and down then right is not one diagonal scroll
+        first_dx, first_dy, second_dx, second_dy = first.dx or 0, first.dy or 0, second.dx or 0, second.dy or 0
+        if first_dx and first_dy or second_dx and second_dy:
+            return None
+        if first_dx * second_dx > 0 and not first_dy and not second_dy:
+            return Action_Scroll(dx=first_dx + second_dx, dy=0)
+        if first_dy * second_dy > 0 and not first_dx and not second_dx:
+            return Action_Scroll(dx=0, dy=first_dy + second_dy)
+        return None
+    if isinstance(first, Action_Wait) and isinstance(second, Action_Wait):
+        return Action_Wait(duration=first.duration + second.duration)
+    return None
+
+
+class _Held:
+    """
+    Keys and mouse buttons pressed by the batch so far, to release them if it stops halfway.
+    """
+
+    def __init__(self) -> None:
+        self.keys: typing.List[str] = []
+        self.buttons: typing.List[typing.Any] = []
+
+    def track(self, action: typing.Any) -> None:
+        action_type = action.action_type
+        if action_type == "KEY_DOWN" and action.key not in self.keys:
+            self.keys.append(action.key)
+        elif action_type == "KEY_UP" and action.key in self.keys:
+            self.keys.remove(action.key)
+        elif action_type == "MOUSE_DOWN" and (action.button or "left") not in self.buttons:
+            self.buttons.append(action.button or "left")
+        elif action_type == "MOUSE_UP" and (action.button or "left") in self.buttons:
+            self.buttons.remove(action.button or "left")
+
+    def releases(self) -> typing.List[Action]:
+        releases: typing.List[Action] = [Action_MouseUp(button=button) for button in reversed(self.buttons)]
+        releases.extend(Action_KeyUp(key=key) for key in reversed(self.keys))
+        return releases
+
+
+def _failure(response: ActionResponse) -> typing.Optional[str]:
+    if response.success is False:
+        return response.message or "action failed"
+    return None
+
+
+def _result(
+    actions: typing.Sequence[Action],
+    outcomes: typing.Dict[int, typing.Tuple[ActionStatus, typing.Optional[ActionResponse], typing.Optional[str]]],
+    failed_index: typing.Optional[int],
+    released: typing.List[Action],
+    requests: int,
+    start: float,
+) -> ActionBatchResult:
+    results = []
+    for index, action in enumerate(actions):
+        status, response, error = outcomes.get(index, ("skipped", None, None))
+        results.append(ActionOutcome(index=index, action=action, status=status, response=response, error=error))
+    return ActionBatchResult(
+        results=results,
+        ok=failed_index is None,
+        failed_index=failed_index,
+        released=released,
+        requests=requests,
+        seconds=time.perf_counter() - start,
+    )
+
+
+def execute_actions(
+    browser: "BrowserClient",
+    actions: typing.Iterable[typing.Any],
+    *,
+    coalesce: bool = True,
+    release_on_failure: bool = True,
+    request_options: typing.Optional[RequestOptions] = None,
+) -> ActionBatchResult:
+    """
+    Runs ``actions`` back to back, stopping at the first failure.
+    """
+    parsed = validate_actions(actions)
+    start = time.perf_counter()
+    outcomes: typing.Dict[int, typing.Tuple[ActionStatus, typing.Optional[ActionResponse], typing.Optional[str]]] = {}
+    held = _Held()
+    requests = 0
+    failed_index = None
+    for group in _plan(parsed, coalesce):
+        if coalesce and isinstance(group.action, Action_Wait):
+            # a wait needs no round trip: the next request is simply sent later
+            time.sleep(group.action.duration)
+            outcomes.update((index, ("ok", None, None)) for index in group.indices)
+            continue
+        requests += 1
+        try:
+            response = browser.execute_action(request=group.action, request_options=request_options)
+            error = _failure(response)
+        except Exception as e:
+            response, error = None, str(e) or type(e).__name__
+        if error is not None:
+            failed_index = group.indices[0]
+            outcomes.update((index, ("failed", response, error)) for index in group.indices)
+            break
+        held.track(group.action)
+        outcomes.update((index, ("ok", response, None)) for index in group.indices)
+    released: typing.List[Action] = []
+    if failed_index is not None and release_on_failure:
+        for release in held.releases():
+            try:
+                browser.execute_action(request=release, request_options=request_options)
+                released.append(release)
+            except Exception:
+                pass
+    return _result(parsed, outcomes, failed_index, released, requests, start)
+
+
+async def execute_actions_async(
+    browser: "AsyncBrowserClient",
+    actions: typing.Iterable[typing.Any],
+    *,
+    coalesce: bool = True,
+    release_on_failure: bool = True,
+    request_options: typing.Optional[RequestOptions] = None,
+) -> ActionBatchResult:
+    """
+    Async counterpart of ``execute_actions``.
+    """
+    parsed = validate_actions(actions)
+    start = time.perf_counter()
+    outcomes: typing.Dict[int, typing.Tuple[ActionStatus, typing.Optional[ActionResponse], typing.Optional[str]]] = {}
+    held = _Held()
+    requests = 0
+    failed_index = None
+    for group in _plan(parsed, coalesce):
+        if coalesce and isinstance(group.action, Action_Wait):
+            await asyncio.sleep(group.action.duration)
+            outcomes.update((index, ("ok", None, None)) for index in group.indices)
+            continue
+        requests += 1
+        try:
+            response = await browser.execute_action(request=group.action, request_options=request_options)
+            error = _failure(response)
+        except Exception as e:
+            response, error = None, str(e) or type(e).__name__
+        if error is not None:
+            failed_index = group.indices[0]
+            outcomes.update((index, ("failed", response, error)) for index in group.indices)
+            break
+        held.track(group.action)
+        outcomes.update((index, ("ok", response, None)) for index in group.indices)
+    released: typing.List[Action] = []
+    if failed_index is not None and release_on_failure:
+        for release in held.releases():
+            try:
+                await browser.execute_action(request=release, request_options=request_options)
+                released.append(release)
+            except Exception:
+                pass
+    return _result(parsed, outcomes, failed_index, released, requests, start)
@@ -0,0 +1,305 @@
+import asyncio
+import threading
+import time
+import typing
+
+import pydantic
+from ..core.envelope import unwrap_response
+from ..core.pydantic_utilities import IS_PYDANTIC_V2, UniversalBaseModel
+from ..core.request_options import RequestOptions
+from ..types.action_response import ActionResponse
+from .types.action import Action
+from .types.format import Format
+
+if typing.TYPE_CHECKING:
+    from .client import AsyncBrowserClient, BrowserClient
+
+Actions = typing.Union[Action, typing.Sequence[Action]]
+
+
+class CuaStep(UniversalBaseModel):
+    """
+    Outcome of one computer-use step: the actions' responses and the screenshot taken after them
+    """
+
+    responses: typing.List[ActionResponse] = pydantic.Field()
+    screenshot: bytes = pydantic.Field()
+    """
+    Encoded image of the display once the actions settled
+    """
+
+    content_type: typing.Optional[str] = pydantic.Field(default=None)
+    headers: typing.Dict[str, str] = pydantic.Field()
+    """
+    Headers of the screenshot response, which carry the display and screenshot dimensions
+    """
+
+    frames: int = pydantic.Field()
+    """
+    Screenshots taken; more than one when waiting for the display to become stable
+    """
+
+    action_seconds: float = pydantic.Field()
+    screenshot_seconds: float = pydantic.Field()
+    """
+    Seconds from the last action's response until the screenshot was ready, including what was left of `settle`
+    """
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+class _FrameBuffer:
+    """
+    Reusable capture buffer sized from ``Content-Length``, so a frame is written in place instead of re-concatenated.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._size = 0
+
+    def begin(self, headers: typing.Mapping[str, str]) -> None:
+        expected = int(headers.get("content-length") or 0)
+        if expected > len(self._buffer):
+            self._buffer = bytearray(expected)
+        self._size = 0
+
+    def write(self, chunk: bytes) -> None:
+        end = self._size + len(chunk)
+        # past the preallocated size (no Content-Length) the slice assignment extends the buffer, amortized
+        self._buffer[self._size : min(end, len(self._buffer))] = chunk
+        self._size = end
+
+    def getvalue(self) -> bytes:
+        return bytes(memoryview(self._buffer)[: self._size])
+
+
+class _BaseCuaRuntime:
+    def __init__(
+        self,
+        *,
+        format: typing.Optional[Format] = None,
+        quality: typing.Optional[int] = None,
+        settle: float = 0.0,
+        stable: bool = False,
+        max_frames: int = 5,
+        request_options: typing.Optional[RequestOptions] = None,
+    ):
+        if max_frames < 1:
+            raise ValueError("max_frames must be at least 1")
+        self._format = format
+        self._quality = quality
+        self._settle = settle
+        self._stable = stable
+        self._max_frames = max_frames
+        self._request_options = request_options
+        self._frame = _FrameBuffer()
+
+    def _options(self, **kwargs: typing.Any) -> typing.Dict[str, typing.Any]:
+        options = {
+            "format": self._format,
+            "quality": self._quality,
+            "settle": self._settle,
+            "stable": self._stable,
+        }
+        options.update({key: value for key, value in kwargs.items() if value is not None})
+        return options
+
+    @staticmethod
+    def _actions(actions: Actions) -> typing.List[Action]:
+        return list(actions) if isinstance(actions, (list, tuple)) else [typing.cast(Action, actions)]
+
+    @staticmethod
+    def _remaining(settle: float, sent: float) -> float:
+        # the settle delay runs from when the last action was sent, so it overlaps that action's round trip
+        return settle - (time.perf_counter() - sent)
+
+    @staticmethod
+    def _result(
+        responses: typing.List[ActionResponse],
+        screenshot: bytes,
+        headers: typing.Dict[str, str],
+        frames: int,
+        start: float,
+        acted: float,
+    ) -> CuaStep:
+        return CuaStep(
+            responses=responses,
+            screenshot=screenshot,
+            content_type=headers.get("content-type"),
+            headers=headers,
+            frames=frames,
+            action_seconds=acted - start,
+            screenshot_seconds=max(0.0, time.perf_counter() - acted),
+        )
+
+
+class CuaRuntime(_BaseCuaRuntime):
+    """
+    Runs computer-use actions and returns the screenshot taken after them in one call.
+
+    Each ``step`` sends its actions in order and requests the screenshot only once
+    the last one has returned, so the frame never predates an action. ``settle``
+    is counted from when the last action was sent, so the action's round trip
+    uses it up and only what is left of it is waited. The frame is read into
+    a reused buffer. With ``stable=True`` it keeps capturing until two consecutive
+    frames are identical (at most ``max_frames``), so animations finish without a
+    fixed sleep.
+
+    Examples
+    --------
+    from agent_sandbox import Sandbox
+    from agent_sandbox.browser import Action_Click
+
+    client = Sandbox(
+        base_url="https://yourhost.com/path/to/api",
+    )
+    cua = client.browser.cua(format="jpeg", quality=80, settle=0.1)
+    step = cua.step(Action_Click(x=100, y=200))
+    open("after.jpg", "wb").write(step.screenshot)
+    """
+
+    def __init__(self, browser: "BrowserClient", **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._browser = browser
+        self._lock = threading.Lock()
+
+    def step(
+        self,
+        actions: Actions,
+        *,
+        format: typing.Optional[Format] = None,
+        quality: typing.Optional[int] = None,
+        settle: typing.Optional[float] = None,
+        stable: typing.Optional[bool] = None,
+    ) -> CuaStep:
+        """
+        Execute ``actions`` in order and capture the display once they settled.
+
+        Raises ``ApiError`` when an action fails.
+        """
+        options = self._options(format=format, quality=quality, settle=settle, stable=stable)
+        pending = self._actions(actions)
+        start = sent = time.perf_counter()
+        responses = []
+        for action in pending:
+            sent = time.perf_counter()
+            responses.append(self._act(action))
+        acted = time.perf_counter()
+        remaining = self._remaining(options["settle"], sent)
+        if remaining > 0:
+            time.sleep(remaining)
+        screenshot, headers = self._capture(options["format"], options["quality"])
+        frames = 1
+        while options["stable"] and frames < self._max_frames:
+            previous = screenshot
+            screenshot, headers = self._capture(options["format"], options["quality"])
+            frames += 1
+            if screenshot == previous:
+                break
+        return self._result(responses, screenshot, headers, frames, start, acted)
+
+    def _act(self, action: Action) -> ActionResponse:
+        response = self._browser.execute_action(request=action, request_options=self._request_options)
+        unwrap_response(response)
+        return response
+
+    def screenshot(self, *, format: typing.Optional[Format] = None, quality: typing.Optional[int] = None) -> bytes:
+        """
+        Capture the display without running an action.
+        """
+        options = self._options(format=format, quality=quality)
+        return self._capture(options["format"], options["quality"])[0]
+
+    def _capture(
+        self, format: typing.Optional[Format], quality: typing.Optional[int]
+    ) -> typing.Tuple[bytes, typing.Dict[str, str]]:
+        # the capture buffer is shared, so concurrent captures on one runtime take turns
+        with self._lock, self._browser.with_raw_response.screenshot(
+            format=format, quality=quality, request_options=self._request_options
+        ) as response:
+            self._frame.begin(response.headers)
+            for chunk in response.data:
+                self._frame.write(chunk)
+            return self._frame.getvalue(), response.headers
+
+
+class AsyncCuaRuntime(_BaseCuaRuntime):
+    """
+    Async counterpart of ``CuaRuntime``.
+    """
+
+    def __init__(self, browser: "AsyncBrowserClient", **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._browser = browser
+        self._lock: typing.Optional[asyncio.Lock] = None
+
+    async def step(
+        self,
+        actions: Actions,
+        *,
+        format: typing.Optional[Format] = None,
+        quality: typing.Optional[int] = None,
+        settle: typing.Optional[float] = None,
+        stable: typing.Optional[bool] = None,
+    ) -> CuaStep:
+        """
+        Execute ``actions`` in order and capture the display once they settled.
+
+        Raises ``ApiError`` when an action fails.
+        """
+        options = self._options(format=format, quality=quality, settle=settle, stable=stable)
+        pending = self._actions(actions)
+        start = sent = time.perf_counter()
+        responses = []
+        for action in pending:
+            sent = time.perf_counter()
+            responses.append(await self._act(action))
+        acted = time.perf_counter()
+        remaining = self._remaining(options["settle"], sent)
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+        screenshot, headers = await self._capture(options["format"], options["quality"])
+        frames = 1
+        while options["stable"] and frames < self._max_frames:
+            previous = screenshot
+            screenshot, headers = await self._capture(options["format"], options["quality"])
+            frames += 1
+            if screenshot == previous:
+                break
+        return self._result(responses, screenshot, headers, frames, start, acted)
+
+    async def _act(self, action: Action) -> ActionResponse:
+        response = await self._browser.execute_action(request=action, request_options=self._request_options)
+        unwrap_response(response)
+        return response
+
+    async def screenshot(
+        self, *, format: typing.Optional[Format] = None, quality: typing.Optional[int] = None
+    ) -> bytes:
+        """
+        Capture the display without running an action.
+        """
+        options = self._options(format=format, quality=quality)
+        return (await self._capture(options["format"], options["quality"]))[0]
+
+    async def _capture(
+        self, format: typing.Optional[Format], quality: typing.Optional[int]
+    ) -> typing.Tuple[bytes, typing.Dict[str, str]]:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # the capture buffer is shared, so concurrent captures on one runtime take turns
+        async with self._lock:
+            async with self._browser.with_raw_response.screenshot(
+                format=format, quality=quality, request_options=self._request_options
+            ) as response:
+                self._frame.begin(response.headers)
+                async for chunk in response.data:
+                    self._frame.write(chunk)
+                return self._frame.getvalue(), response.headers
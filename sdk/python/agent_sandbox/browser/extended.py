@@ -0,0 +1,414 @@
+import functools
+import typing
+
+from ..core.request_options import RequestOptions
+from .batch import ActionBatchResult, execute_actions, execute_actions_async
+from .client import AsyncBrowserClient, BrowserClient
+from .cua import AsyncCuaRuntime, CuaRuntime
+from .frames import AsyncFrameDiffer, FrameDiffer
+from .types.action import Action
+from .types.format import Format
+
+
+class ExtendedBrowserClient(BrowserClient):
+    """
+    `BrowserClient` with computer-use steps, frame diffing and batched actions.
+    """
+
+    def cua(
+        self,
+        *,
+        format: typing.Optional[Format] = None,
+        quality: typing.Optional[int] = None,
+        settle: float = 0.0,
+        stable: bool = False,
+        max_frames: int = 5,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> CuaRuntime:
+        """
+        Computer-use runtime whose `step` runs actions and returns the screenshot taken after them
+
+        Parameters
+        ----------
+        format : typing.Optional[Format]
+            Screenshot format, `png` or `jpeg`; can be overridden per step
+
+        quality : typing.Optional[int]
+            JPEG quality
+
+        settle : float
+            Seconds to let the display settle, counted from when the last action was sent; the screenshot
+            is requested once that action has returned and what is left of them has passed
+
+        stable : bool
+            Keep capturing until two consecutive screenshots are identical
+
+        max_frames : int
+            Most screenshots taken per step when `stable` is set
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        CuaRuntime
+            Runtime reusing one capture buffer across steps
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+        from agent_sandbox.browser import Action_Click
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        cua = client.browser.cua(format="jpeg", quality=80, settle=0.1)
+        step = cua.step(Action_Click(x=100, y=200))
+        """
+        return CuaRuntime(
+            self,
+            format=format,
+            quality=quality,
+            settle=settle,
+            stable=stable,
+            max_frames=max_frames,
+            request_options=request_options,
+        )
+
+    def frame_differ(
+        self,
+        *,
+        format: str = "auto",
+        quality: typing.Optional[int] = None,
+        tile: int = 32,
+        block: int = 8,
+        threshold: float = 3.0,
+        full_frame_ratio: float = 0.6,
+        target_seconds: float = 0.25,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> FrameDiffer:
+        """
+        Screenshot pipeline that reports unchanged frames and returns only the changed region otherwise
+
+        Requires NumPy and Pillow locally.
+
+        Parameters
+        ----------
+        format : str
+            `png`, `jpeg`, or `auto` to step between PNG and JPEG qualities as throughput allows
+
+        quality : typing.Optional[int]
+            JPEG quality when `format` is fixed
+
+        tile : int
+            Tile size in pixels; changed regions are reported at this granularity
+
+        block : int
+            Cell size in pixels whose mean luminance is compared; `tile` must be a multiple of it
+
+        threshold : float
+            Luminance change (0-255) of a cell that marks its tile as changed
+
+        full_frame_ratio : float
+            Changed share of the frame above which the full screenshot is returned instead of a crop
+
+        target_seconds : float
+            Transfer time per frame that `auto` aims for, counted from the first chunk of the response
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        FrameDiffer
+            Pipeline whose `capture()` returns a `FrameDiff`
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        frames = client.browser.frame_differ()
+        frame = frames.capture()
+        if frame.changed:
+            print(frame.bbox, len(frame.image))
+        """
+        return FrameDiffer(
+            functools.partial(self.screenshot, request_options=request_options),
+            format=format,
+            quality=quality,
+            tile=tile,
+            block=block,
+            threshold=threshold,
+            full_frame_ratio=full_frame_ratio,
+            target_seconds=target_seconds,
+        )
+
+    def execute_actions(
+        self,
+        actions: typing.Sequence[typing.Union[Action, typing.Dict[str, typing.Any]]],
+        *,
+        coalesce: bool = True,
+        release_on_failure: bool = True,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> ActionBatchResult:
+        """
+        Execute a sequence of actions back to back, stopping at the first failure
+
+        The whole batch is validated locally before anything is sent. With `coalesce`, runs of typing and of
+        scrolls are sent as one action and waits happen client-side, so they cost no round trip.
+
+        Parameters
+        ----------
+        actions : typing.Sequence[typing.Union[Action, typing.Dict[str, typing.Any]]]
+            `Action` models, or dicts with an `action_type`
+
+        coalesce : bool
+            Merge consecutive typing, wait, and same-axis same-direction scroll actions
+
+        release_on_failure : bool
+            After a failure, release keys and mouse buttons the batch pressed
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        ActionBatchResult
+            Per-action status (`ok`, `failed` or `skipped`) and responses
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+        from agent_sandbox.browser import Action_Click, Action_Press, Action_Typing
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        result = client.browser.execute_actions(
+            [Action_Click(x=400, y=300), Action_Typing(text="hello"), Action_Press(key="Return")]
+        )
+        if not result.ok:
+            print(result.results[result.failed_index].error)
+        """
+        return execute_actions(
+            self,
+            actions,
+            coalesce=coalesce,
+            release_on_failure=release_on_failure,
+            request_options=request_options,
+        )
+
+
+class AsyncExtendedBrowserClient(AsyncBrowserClient):
+    """
+    `AsyncBrowserClient` with computer-use steps, frame diffing and batched actions.
+    """
+
+    def cua(
+        self,
+        *,
+        format: typing.Optional[Format] = None,
+        quality: typing.Optional[int] = None,
+        settle: float = 0.0,
+        stable: bool = False,
+        max_frames: int = 5,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> AsyncCuaRuntime:
+        """
+        Computer-use runtime whose `step` runs actions and returns the screenshot taken after them
+
+        Parameters
+        ----------
+        format : typing.Optional[Format]
+            Screenshot format, `png` or `jpeg`; can be overridden per step
+
+        quality : typing.Optional[int]
+            JPEG quality
+
+        settle : float
+            Seconds to let the display settle, counted from when the last action was sent; the screenshot
+            is requested once that action has returned and what is left of them has passed
+
+        stable : bool
+            Keep capturing until two consecutive screenshots are identical
+
+        max_frames : int
+            Most screenshots taken per step when `stable` is set
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        AsyncCuaRuntime
+            Runtime reusing one capture buffer across steps
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+        from agent_sandbox.browser import Action_Click
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            cua = client.browser.cua(format="jpeg", quality=80, settle=0.1)
+            step = await cua.step(Action_Click(x=100, y=200))
+
+
+        asyncio.run(main())
+        """
+        return AsyncCuaRuntime(
+            self,
+            format=format,
+            quality=quality,
+            settle=settle,
+            stable=stable,
+            max_frames=max_frames,
+            request_options=request_options,
+        )
+
+    def frame_differ(
+        self,
+        *,
+        format: str = "auto",
+        quality: typing.Optional[int] = None,
+        tile: int = 32,
+        block: int = 8,
+        threshold: float = 3.0,
+        full_frame_ratio: float = 0.6,
+        target_seconds: float = 0.25,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> AsyncFrameDiffer:
+        """
+        Screenshot pipeline that reports unchanged frames and returns only the changed region otherwise
+
+        Requires NumPy and Pillow locally.
+
+        Parameters
+        ----------
+        format : str
+            `png`, `jpeg`, or `auto` to step between PNG and JPEG qualities as throughput allows
+
+        quality : typing.Optional[int]
+            JPEG quality when `format` is fixed
+
+        tile : int
+            Tile size in pixels; changed regions are reported at this granularity
+
+        block : int
+            Cell size in pixels whose mean luminance is compared; `tile` must be a multiple of it
+
+        threshold : float
+            Luminance change (0-255) of a cell that marks its tile as changed
+
+        full_frame_ratio : float
+            Changed share of the frame above which the full screenshot is returned instead of a crop
+
+        target_seconds : float
+            Transfer time per frame that `auto` aims for, counted from the first chunk of the response
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        AsyncFrameDiffer
+            Pipeline whose `capture()` returns a `FrameDiff`
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            frames = client.browser.frame_differ()
+            frame = await frames.capture()
+
+
+        asyncio.run(main())
+        """
+        return AsyncFrameDiffer(
+            functools.partial(self.screenshot, request_options=request_options),
+            format=format,
+            quality=quality,
+            tile=tile,
+            block=block,
+            threshold=threshold,
+            full_frame_ratio=full_frame_ratio,
+            target_seconds=target_seconds,
+        )
+
+    async def execute_actions(
+        self,
+        actions: typing.Sequence[typing.Union[Action, typing.Dict[str, typing.Any]]],
+        *,
+        coalesce: bool = True,
+        release_on_failure: bool = True,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> ActionBatchResult:
+        """
+        Execute a sequence of actions back to back, stopping at the first failure
+
+        The whole batch is validated locally before anything is sent. With `coalesce`, runs of typing and of
+        scrolls are sent as one action and waits happen client-side, so they cost no round trip.
+
+        Parameters
+        ----------
+        actions : typing.Sequence[typing.Union[Action, typing.Dict[str, typing.Any]]]
+            `Action` models, or dicts with an `action_type`
+
+        coalesce : bool
+            Merge consecutive typing, wait, and same-axis same-direction scroll actions
+
+        release_on_failure : bool
+            After a failure, release keys and mouse buttons the batch pressed
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        ActionBatchResult
+            Per-action status (`ok`, `failed` or `skipped`) and responses
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+        from agent_sandbox.browser import Action_Click, Action_Press, Action_Typing
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            result = await client.browser.execute_actions(
+                [Action_Click(x=400, y=300), Action_Typing(text="hello"), Action_Press(key="Return")]
+            )
+
+
+        asyncio.run(main())
+        """
+        return await execute_actions_async(
+            self,
+            actions,
+            coalesce=coalesce,
+            release_on_failure=release_on_failure,
+            request_options=request_options,
+        )
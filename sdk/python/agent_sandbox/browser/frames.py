@@ -0,0 +1,317 @@
+import asyncio
+import io
+import threading
+import time
+import typing
+
+import pydantic
+from ..core.pydantic_utilities import IS_PYDANTIC_V2, UniversalBaseModel
+
+# (format, quality) from the sharpest to the smallest encoding; "auto" moves along this ladder
+QUALITY_LADDER: typing.Tuple[typing.Tuple[str, typing.Optional[int]], ...] = (
+    ("png", None),
+    ("jpeg", 90),
+    ("jpeg", 75),
+    ("jpeg", 60),
+    ("jpeg", 45),
+)
+
+_PIL_FORMATS = {"png": "PNG", "jpg": "JPEG", "jpeg": "JPEG"}
+
+
+class FrameDiff(UniversalBaseModel):
+    """
+    A screenshot compared with the previous frame the caller was given
+    """
+
+    changed: bool = pydantic.Field()
+    bbox: typing.Optional[typing.Tuple[int, int, int, int]] = pydantic.Field(default=None)
+    """
+    Changed region as (left, top, right, bottom) screenshot pixels; the whole frame for the first screenshot
+    """
+
+    image: typing.Optional[bytes] = pydantic.Field(default=None)
+    """
+    Encoded crop of `bbox`, or the full screenshot when `full`; None when nothing changed
+    """
+
+    full: bool = pydantic.Field()
+    format: str = pydantic.Field()
+    quality: typing.Optional[int] = pydantic.Field(default=None)
+    width: int = pydantic.Field()
+    height: int = pydantic.Field()
+    changed_tiles: int = pydantic.Field()
+    tiles: int = pydantic.Field()
+    received_bytes: int = pydantic.Field()
+    """
+    Size of the screenshot as transferred from the sandbox
+    """
+
+    seconds: float = pydantic.Field()
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+def _require(module: str) -> typing.Any:
+    try:
+        return __import__(module, fromlist=["_"])
+    except ImportError as e:
+        package = {"PIL": "Pillow"}.get(module.split(".")[0], module.split(".")[0])
+        raise ImportError(f"Frame diffing requires {package} to be installed locally") from e
+
+
+class _BaseFrameDiffer:
+    def __init__(
+        self,
+        *,
+        format: str = "auto",
+        quality: typing.Optional[int] = None,
+        tile: int = 32,
+        block: int = 8,
+        threshold: float = 3.0,
+        full_frame_ratio: float = 0.6,
+        target_seconds: float = 0.25,
+    ):
+        if tile <= 0 or block <= 0 or tile % block:
+            raise ValueError("tile must be a positive multiple of block")
+        if format != "auto" and format not in _PIL_FORMATS:
+            raise ValueError(f"Unsupported screenshot format {format!r}")
+        self._numpy = _require("numpy")
+        self._image = _require("PIL.Image")
+        self._fixed = None if format == "auto" else (format, quality)
+        self._level = 0
+        self._tile = tile
+        self._block = block
+        self._threshold = threshold
+        self._full_frame_ratio = full_frame_ratio
+        self._target_seconds = target_seconds
+        self._bandwidth: typing.Optional[float] = None
+        self._latency: typing.Optional[float] = None
+        self._previous: typing.Any = None
+
+    @property
+    def encoding(self) -> typing.Tuple[str, typing.Optional[int]]:
+        """
+        Format and quality the next screenshot is requested with.
+        """
+        return self._fixed or QUALITY_LADDER[self._level]
+
+    @property
+    def bandwidth(self) -> typing.Optional[float]:
+        """
+        Smoothed screenshot throughput in bytes per second, measured after the first chunk arrived.
+        """
+        return self._bandwidth
+
+    @property
+    def latency(self) -> typing.Optional[float]:
+        """
+        Smoothed seconds until the first chunk of a screenshot arrives (request round trip and capture).
+        """
+        return self._latency
+
+    def reset(self) -> None:
+        """
+        Forget the previous frame, so the next screenshot is reported in full.
+        """
+        self._previous = None
+
+    def _adapt(self, size: int, first_size: int, latency: float, transfer: float) -> None:
+        """
+        Moves along the quality ladder so a frame of this size transfers within ``target_seconds``.
+
+        Only the bytes after the first chunk and the time they took count towards the bandwidth:
+        the wait for the first chunk is request latency and server-side capture, which a smaller
+        encoding does not shorten.
+        """
+        self._latency = latency if self._latency is None else 0.7 * self._latency + 0.3 * latency
+        if transfer > 0 and size > first_size:
+            sample = (size - first_size) / transfer
+            self._bandwidth = sample if self._bandwidth is None else 0.7 * self._bandwidth + 0.3 * sample
+        if self._fixed is not None or not self._bandwidth:
+            return
+        expected = size / self._bandwidth
+        if expected > self._target_seconds and self._level < len(QUALITY_LADDER) - 1:
+            self._level += 1
+        elif expected < self._target_seconds / 4 and self._level > 0:
+            self._level -= 1
+
+    def _signature(self, image: typing.Any) -> typing.Any:
+        """
+        Mean luminance of each ``block`` x ``block`` cell, computed over the whole frame at once.
+        """
+        numpy = self._numpy
+        gray = numpy.asarray(image.convert("L"), dtype=numpy.float32)
+        rows, cols = gray.shape[0] // self._block, gray.shape[1] // self._block
+        if rows == 0 or cols == 0:
+            return gray.reshape(1, 1, -1).mean(axis=2)
+        cells = gray[: rows * self._block, : cols * self._block]
+        return cells.reshape(rows, self._block, cols, self._block).mean(axis=(1, 3))
+
+    def _changed_tiles(self, signature: typing.Any) -> typing.Any:
+        """
+        Boolean grid of tiles with any cell whose mean moved by more than ``threshold``.
+        """
+        numpy = self._numpy
+        per_tile = self._tile // self._block
+        delta = numpy.abs(signature - self._previous)
+        rows = -(-delta.shape[0] // per_tile) * per_tile
+        cols = -(-delta.shape[1] // per_tile) * per_tile
+        padded = numpy.zeros((rows, cols), dtype=delta.dtype)
+        padded[: delta.shape[0], : delta.shape[1]] = delta
+        tiles = padded.reshape(rows // per_tile, per_tile, cols // per_tile, per_tile).max(axis=(1, 3))
+        return tiles > self._threshold
+
+    def _diff(self, data: bytes, fmt: str, quality: typing.Optional[int], seconds: float) -> FrameDiff:
+        numpy = self._numpy
+        image = self._image.open(io.BytesIO(data))
+        image.load()
+        width, height = image.size
+        signature = self._signature(image)
+        common = dict(
+            format=fmt,
+            quality=quality,
+            width=width,
+            height=height,
+            received_bytes=len(data),
+            seconds=seconds,
+        )
+        if self._previous is None or self._previous.shape != signature.shape:
+            self._previous = signature
+            tiles = -(-width // self._tile) * -(-height // self._tile)
+            return FrameDiff(
+                changed=True,
+                bbox=(0, 0, width, height),
+                image=data,
+                full=True,
+                changed_tiles=tiles,
+                tiles=tiles,
+                **common,
+            )
+        changed = self._changed_tiles(signature)
+        if not changed.any():
+            # the previous frame stays the reference, so slow drift is still caught once it adds up
+            return FrameDiff(changed=False, full=False, changed_tiles=0, tiles=int(changed.size), **common)
+        self._previous = signature
+        rows = numpy.flatnonzero(changed.any(axis=1))
+        cols = numpy.flatnonzero(changed.any(axis=0))
+        bbox = (
+            int(cols[0]) * self._tile,
+            int(rows[0]) * self._tile,
+            min(width, (int(cols[-1]) + 1) * self._tile),
+            min(height, (int(rows[-1]) + 1) * self._tile),
+        )
+        area = (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])
+        full = area >= self._full_frame_ratio * width * height
+        return FrameDiff(
+            changed=True,
+            bbox=bbox,
+            image=data if full else self._encode(image.crop(bbox), fmt, quality),
+            full=full,
+            changed_tiles=int(changed.sum()),
+            tiles=int(changed.size),
+            **common,
+        )
+
+    @staticmethod
+    def _encode(image: typing.Any, fmt: str, quality: typing.Optional[int]) -> bytes:
+        buffer = io.BytesIO()
+        pil_format = _PIL_FORMATS[fmt]
+        if pil_format == "JPEG":
+            image = image.convert("RGB")
+        options = {"quality": quality} if quality is not None and pil_format == "JPEG" else {}
+        image.save(buffer, format=pil_format, **options)
+        return buffer.getvalue()
+
+
+class FrameDiffer(_BaseFrameDiffer):
+    """
+    Screenshot pipeline that reports unchanged frames and crops changed ones.
+
+    Every ``capture`` takes a screenshot, hashes it into a grid of tiles (the mean
+    luminance of ``block``-pixel cells, computed with NumPy over the whole frame), and
+    compares the grid with the last frame the caller was given. Nothing changed:
+    ``changed`` is False and no image is returned. Otherwise ``bbox`` covers the
+    changed tiles and ``image`` is that crop, or the full screenshot once the region
+    exceeds ``full_frame_ratio`` of the frame. With ``format="auto"`` the format and
+    quality follow the measured throughput, stepping from PNG down through JPEG
+    qualities so a frame transfers within ``target_seconds``. The transfer time is
+    measured from the first chunk of the response, so request latency and capture
+    time on the sandbox do not push the quality down.
+
+    Requires NumPy and Pillow locally.
+
+    Examples
+    --------
+    from agent_sandbox import Sandbox
+
+    client = Sandbox(
+        base_url="https://yourhost.com/path/to/api",
+    )
+    frames = client.browser.frame_differ()
+    frame = frames.capture()
+    if frame.changed:
+        send_to_model(frame.image, frame.bbox)
+    """
+
+    def __init__(self, screenshot: typing.Callable[..., typing.Iterator[bytes]], **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._screenshot = screenshot
+        self._lock = threading.Lock()
+
+    def capture(self) -> FrameDiff:
+        """
+        Take a screenshot and compare it with the previous frame.
+        """
+        with self._lock:
+            fmt, quality = self.encoding
+            start = time.perf_counter()
+            chunks = []
+            first = start
+            for chunk in self._screenshot(format=fmt, quality=quality):
+                if not chunks:
+                    first = time.perf_counter()
+                chunks.append(chunk)
+            end = time.perf_counter()
+            data = b"".join(chunks)
+            self._adapt(len(data), len(chunks[0]) if chunks else 0, first - start, end - first)
+            return self._diff(data, fmt, quality, end - start)
+
+
+class AsyncFrameDiffer(_BaseFrameDiffer):
+    """
+    Async counterpart of ``FrameDiffer``; decoding and hashing run in the default executor.
+    """
+
+    def __init__(self, screenshot: typing.Callable[..., typing.AsyncIterator[bytes]], **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._screenshot = screenshot
+        self._lock: typing.Optional[asyncio.Lock] = None
+
+    async def capture(self) -> FrameDiff:
+        """
+        Take a screenshot and compare it with the previous frame.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            fmt, quality = self.encoding
+            start = time.perf_counter()
+            chunks = []
+            first = start
+            async for chunk in self._screenshot(format=fmt, quality=quality):
+                if not chunks:
+                    first = time.perf_counter()
+                chunks.append(chunk)
+            end = time.perf_counter()
+            data = b"".join(chunks)
+            self._adapt(len(data), len(chunks[0]) if chunks else 0, first - start, end - first)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._diff, data, fmt, quality, end - start)
@@ -0,0 +1,195 @@
+import typing
+
+from ..core.request_options import RequestOptions
+from .client import AsyncBrowserNetworkClient, BrowserNetworkClient
+from .profiles import NetworkProfile, apply_profile, apply_profile_async, remove_profile, remove_profile_async
+
+
+class ExtendedBrowserNetworkClient(BrowserNetworkClient):
+    """
+    `BrowserNetworkClient` with named network profiles.
+    """
+
+    def apply_profile(
+        self,
+        profile: typing.Union[str, NetworkProfile],
+        *,
+        base_headers: typing.Optional[typing.Dict[str, str]] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> NetworkProfile:
+        """
+        Apply a named network profile: block its URL patterns and send its extra headers
+
+        Built-in profiles are `text-only` (images, fonts, media, stylesheets and trackers blocked), `no-media`
+        (images, fonts and media blocked) and `no-trackers`. Blocking rules are installed with `add_route`; if one
+        fails, those already installed are removed again.
+
+        Parameters
+        ----------
+        profile : typing.Union[str, NetworkProfile]
+            Name of a profile in `NETWORK_PROFILES`, or a custom `NetworkProfile`
+
+        base_headers : typing.Optional[typing.Dict[str, str]]
+            Extra headers to keep alongside the profile's; `set_headers` replaces all extra headers
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        NetworkProfile
+            The applied profile
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        client.browser_network.apply_profile("text-only")
+        client.browser_page.navigate(url="https://example.com")
+        client.browser_network.remove_profile("text-only")
+        """
+        return apply_profile(self, profile, base_headers=base_headers, request_options=request_options)
+
+    def remove_profile(
+        self,
+        profile: typing.Union[str, NetworkProfile],
+        *,
+        base_headers: typing.Optional[typing.Dict[str, str]] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> None:
+        """
+        Revert `apply_profile`: remove the profile's routes with `remove_route` and restore the extra headers
+
+        Routes shared with another applied profile are removed as well.
+
+        Parameters
+        ----------
+        profile : typing.Union[str, NetworkProfile]
+            Name of a profile in `NETWORK_PROFILES`, or a custom `NetworkProfile`
+
+        base_headers : typing.Optional[typing.Dict[str, str]]
+            Extra headers to leave in place once the profile's headers are dropped
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        None
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        client.browser_network.remove_profile("text-only")
+        """
+        remove_profile(self, profile, base_headers=base_headers, request_options=request_options)
+
+
+class AsyncExtendedBrowserNetworkClient(AsyncBrowserNetworkClient):
+    """
+    `AsyncBrowserNetworkClient` with named network profiles.
+    """
+
+    async def apply_profile(
+        self,
+        profile: typing.Union[str, NetworkProfile],
+        *,
+        base_headers: typing.Optional[typing.Dict[str, str]] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> NetworkProfile:
+        """
+        Apply a named network profile: block its URL patterns and send its extra headers
+
+        Built-in profiles are `text-only` (images, fonts, media, stylesheets and trackers blocked), `no-media`
+        (images, fonts and media blocked) and `no-trackers`. Blocking rules are installed concurrently with
+        `add_route`; if one fails, those already installed are removed again.
+
+        Parameters
+        ----------
+        profile : typing.Union[str, NetworkProfile]
+            Name of a profile in `NETWORK_PROFILES`, or a custom `NetworkProfile`
+
+        base_headers : typing.Optional[typing.Dict[str, str]]
+            Extra headers to keep alongside the profile's; `set_headers` replaces all extra headers
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        NetworkProfile
+            The applied profile
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            await client.browser_network.apply_profile("text-only")
+            await client.browser_page.navigate(url="https://example.com")
+            await client.browser_network.remove_profile("text-only")
+
+
+        asyncio.run(main())
+        """
+        return await apply_profile_async(self, profile, base_headers=base_headers, request_options=request_options)
+
+    async def remove_profile(
+        self,
+        profile: typing.Union[str, NetworkProfile],
+        *,
+        base_headers: typing.Optional[typing.Dict[str, str]] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> None:
+        """
+        Revert `apply_profile`: remove the profile's routes with `remove_route` and restore the extra headers
+
+        Routes shared with another applied profile are removed as well.
+
+        Parameters
+        ----------
+        profile : typing.Union[str, NetworkProfile]
+            Name of a profile in `NETWORK_PROFILES`, or a custom `NetworkProfile`
+
+        base_headers : typing.Optional[typing.Dict[str, str]]
+            Extra headers to leave in place once the profile's headers are dropped
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        None
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            await client.browser_network.remove_profile("text-only")
+
+
+        asyncio.run(main())
+        """
+        await remove_profile_async(self, profile, base_headers=base_headers, request_options=request_options)
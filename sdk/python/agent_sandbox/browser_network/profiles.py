@@ -0,0 +1,187 @@
+import asyncio
+import typing
+
+import pydantic
+from ..core.envelope import unwrap_response
+from ..core.pydantic_utilities import IS_PYDANTIC_V2, UniversalBaseModel
+from ..core.request_options import RequestOptions
+
+if typing.TYPE_CHECKING:
+    from .client import AsyncBrowserNetworkClient, BrowserNetworkClient
+
+
+class NetworkProfile(UniversalBaseModel):
+    """
+    Named set of blocked URL patterns and extra request headers
+    """
+
+    name: str = pydantic.Field()
+    block: typing.List[str] = pydantic.Field()
+    """
+    URL glob patterns aborted with `add_route(abort=True)`
+    """
+
+    headers: typing.Dict[str, str] = pydantic.Field(default_factory=dict)
+    """
+    Extra headers sent with every request while the profile is applied
+    """
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+def _extensions(*extensions: str) -> typing.List[str]:
+    # with and without a query string, since a glob has to match the whole URL
+    group = "{" + ",".join(extensions) + "}"
+    return [f"**/*.{group}", f"**/*.{group}?*"]
+
+
+_IMAGES = _extensions("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp")
+_FONTS = _extensions("woff", "woff2", "ttf", "otf", "eot")
+_MEDIA = _extensions("mp4", "webm", "ogg", "ogv", "mp3", "wav", "m4a", "mov", "m3u8")
+_STYLES = _extensions("css")
+_TRACKERS = [
+    f"**{host}/**"
+    for host in (
+        "google-analytics.com",
+        "googletagmanager.com",
+        "doubleclick.net",
+        "googlesyndication.com",
+        "connect.facebook.net",
+        "hotjar.com",
+        "segment.io",
+        "cdn.segment.com",
+        "mixpanel.com",
+        "clarity.ms",
+        "scorecardresearch.com",
+        "newrelic.com",
+        "nr-data.net",
+    )
+]
+
+NETWORK_PROFILES: typing.Dict[str, NetworkProfile] = {
+    profile.name: profile
+    for profile in (
+        NetworkProfile(
+            name="text-only",
+            block=_IMAGES + _FONTS + _MEDIA + _STYLES + _TRACKERS,
+            headers={"Save-Data": "on"},
+        ),
+        NetworkProfile(name="no-media", block=_IMAGES + _FONTS + _MEDIA, headers={"Save-Data": "on"}),
+        NetworkProfile(name="no-trackers", block=_TRACKERS),
+    )
+}
+
+
+def _resolve(profile: typing.Union[str, NetworkProfile]) -> NetworkProfile:
+    if isinstance(profile, NetworkProfile):
+        return profile
+    try:
+        return NETWORK_PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown network profile {profile!r}; expected one of {sorted(NETWORK_PROFILES)}") from None
+
+
+def apply_profile(
+    network: "BrowserNetworkClient",
+    profile: typing.Union[str, NetworkProfile],
+    *,
+    base_headers: typing.Optional[typing.Dict[str, str]] = None,
+    request_options: typing.Optional[RequestOptions] = None,
+) -> NetworkProfile:
+    """
+    Installs the profile's blocking routes and headers; routes already installed are removed again if one fails.
+    """
+    resolved = _resolve(profile)
+    installed: typing.List[str] = []
+    try:
+        for pattern in resolved.block:
+            unwrap_response(network.add_route(url_pattern=pattern, abort=True, request_options=request_options))
+            installed.append(pattern)
+        if resolved.headers:
+            headers = {**(base_headers or {}), **resolved.headers}
+            unwrap_response(network.set_headers(headers=headers, request_options=request_options))
+    except Exception:
+        for pattern in installed:
+            try:
+                network.remove_route(url_pattern=pattern, request_options=request_options)
+            except Exception:
+                pass
+        raise
+    return resolved
+
+
+def remove_profile(
+    network: "BrowserNetworkClient",
+    profile: typing.Union[str, NetworkProfile],
+    *,
+    base_headers: typing.Optional[typing.Dict[str, str]] = None,
+    request_options: typing.Optional[RequestOptions] = None,
+) -> None:
+    """
+    Removes the profile's routes and puts the extra headers back to ``base_headers``.
+    """
+    resolved = _resolve(profile)
+    for pattern in resolved.block:
+        unwrap_response(network.remove_route(url_pattern=pattern, request_options=request_options))
+    if resolved.headers:
+        unwrap_response(network.set_headers(headers=dict(base_headers or {}), request_options=request_options))
+
+
+async def apply_profile_async(
+    network: "AsyncBrowserNetworkClient",
+    profile: typing.Union[str, NetworkProfile],
+    *,
+    base_headers: typing.Optional[typing.Dict[str, str]] = None,
+    request_options: typing.Optional[RequestOptions] = None,
+) -> NetworkProfile:
+    """
+    Async counterpart of ``apply_profile``; the routes are independent, so they are installed concurrently.
+    """
+    resolved = _resolve(profile)
+
+    async def add(pattern: str) -> None:
+        unwrap_response(await network.add_route(url_pattern=pattern, abort=True, request_options=request_options))
+
+    outcomes = await asyncio.gather(*(add(pattern) for pattern in resolved.block), return_exceptions=True)
+    failure = next((outcome for outcome in outcomes if isinstance(outcome, BaseException)), None)
+    if failure is None and resolved.headers:
+        headers = {**(base_headers or {}), **resolved.headers}
+        try:
+            unwrap_response(await network.set_headers(headers=headers, request_options=request_options))
+        except Exception as e:
+            failure = e
+    if failure is not None:
+        installed = [pattern for pattern, outcome in zip(resolved.block, outcomes) if outcome is None]
+        await asyncio.gather(
+            *(network.remove_route(url_pattern=pattern, request_options=request_options) for pattern in installed),
+            return_exceptions=True,
+        )
+        raise failure
+    return resolved
+
+
+async def remove_profile_async(
+    network: "AsyncBrowserNetworkClient",
+    profile: typing.Union[str, NetworkProfile],
+    *,
+    base_headers: typing.Optional[typing.Dict[str, str]] = None,
+    request_options: typing.Optional[RequestOptions] = None,
+) -> None:
+    """
+    Async counterpart of ``remove_profile``.
+    """
+    resolved = _resolve(profile)
+
+    async def remove(pattern: str) -> None:
+        unwrap_response(await network.remove_route(url_pattern=pattern, request_options=request_options))
+
+    await asyncio.gather(*(remove(pattern) for pattern in resolved.block))
+    if resolved.headers:
+        unwrap_response(await network.set_headers(headers=dict(base_headers or {}), request_options=request_options))
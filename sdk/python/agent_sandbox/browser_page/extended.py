@@ -0,0 +1,306 @@
+import functools
+import typing
+
+from ..browser.frames import AsyncFrameDiffer, FrameDiffer
+from ..core.request_options import RequestOptions
+from .client import AsyncBrowserPageClient, BrowserPageClient
+from .extract import DEFAULT_EXTRACT, PageExtract, PageLoad, load_and_extract, load_and_extract_async
+from .types.type import Type
+
+
+class ExtendedBrowserPageClient(BrowserPageClient):
+    """
+    `BrowserPageClient` with frame diffing and the navigate-wait-extract pipeline.
+    """
+
+    def frame_differ(
+        self,
+        *,
+        full_page: typing.Optional[bool] = None,
+        format: str = "auto",
+        quality: typing.Optional[int] = None,
+        tile: int = 32,
+        block: int = 8,
+        threshold: float = 3.0,
+        full_frame_ratio: float = 0.6,
+        target_seconds: float = 0.25,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> FrameDiffer:
+        """
+        Screenshot pipeline that reports unchanged frames and returns only the changed region otherwise
+
+        Requires NumPy and Pillow locally.
+
+        Parameters
+        ----------
+        full_page : typing.Optional[bool]
+            Capture the whole scrollable page instead of the viewport
+
+        format : str
+            `png`, `jpeg`, or `auto` to step between PNG and JPEG qualities as throughput allows
+
+        quality : typing.Optional[int]
+            JPEG quality when `format` is fixed
+
+        tile : int
+            Tile size in pixels; changed regions are reported at this granularity
+
+        block : int
+            Cell size in pixels whose mean luminance is compared; `tile` must be a multiple of it
+
+        threshold : float
+            Luminance change (0-255) of a cell that marks its tile as changed
+
+        full_frame_ratio : float
+            Changed share of the frame above which the full screenshot is returned instead of a crop
+
+        target_seconds : float
+            Transfer time per frame that `auto` aims for, counted from the first chunk of the response
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        FrameDiffer
+            Pipeline whose `capture()` returns a `FrameDiff`
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        frames = client.browser_page.frame_differ()
+        frame = frames.capture()
+        if frame.changed:
+            print(frame.bbox, len(frame.image))
+        """
+        return FrameDiffer(
+            functools.partial(self.screenshot, full_page=full_page, request_options=request_options),
+            format=format,
+            quality=quality,
+            tile=tile,
+            block=block,
+            threshold=threshold,
+            full_frame_ratio=full_frame_ratio,
+            target_seconds=target_seconds,
+        )
+
+    def load_and_extract(
+        self,
+        url: str,
+        *,
+        wait: typing.Optional[Type] = "network_idle",
+        wait_options: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        extract: typing.Sequence[PageExtract] = DEFAULT_EXTRACT,
+        timeout: typing.Optional[float] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> PageLoad:
+        """
+        Navigate to a URL, wait for it to be ready and extract its content in one call
+
+        The steps are issued back to back: a `load` or `network_idle` wait is done by `navigate` itself,
+        saving the separate `wait` round trip, and the extractions are requested concurrently once it is met.
+
+        Parameters
+        ----------
+        url : str
+
+        wait : typing.Optional[Type]
+            Condition to wait for before extracting, as for `wait`; None to extract as soon as the navigation commits
+
+        wait_options : typing.Optional[typing.Dict[str, typing.Any]]
+            Further `wait` arguments, such as `selector` or `expression`
+
+        extract : typing.Sequence[PageExtract]
+            Content to fetch: `markdown`, `text`, `elements` and/or `html`
+
+        timeout : typing.Optional[float]
+            Seconds the navigation and the wait may each take
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        PageLoad
+            Extracted content with per-phase `timings`
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        page = client.browser_page.load_and_extract("https://example.com", extract=["markdown", "elements"])
+        print(page.markdown)
+        print(page.timings)
+        """
+        return load_and_extract(
+            self,
+            url,
+            wait=wait,
+            wait_options=wait_options,
+            extract=extract,
+            timeout=timeout,
+            request_options=request_options,
+        )
+
+
+class AsyncExtendedBrowserPageClient(AsyncBrowserPageClient):
+    """
+    `AsyncBrowserPageClient` with frame diffing and the navigate-wait-extract pipeline.
+    """
+
+    def frame_differ(
+        self,
+        *,
+        full_page: typing.Optional[bool] = None,
+        format: str = "auto",
+        quality: typing.Optional[int] = None,
+        tile: int = 32,
+        block: int = 8,
+        threshold: float = 3.0,
+        full_frame_ratio: float = 0.6,
+        target_seconds: float = 0.25,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> AsyncFrameDiffer:
+        """
+        Screenshot pipeline that reports unchanged frames and returns only the changed region otherwise
+
+        Requires NumPy and Pillow locally.
+
+        Parameters
+        ----------
+        full_page : typing.Optional[bool]
+            Capture the whole scrollable page instead of the viewport
+
+        format : str
+            `png`, `jpeg`, or `auto` to step between PNG and JPEG qualities as throughput allows
+
+        quality : typing.Optional[int]
+            JPEG quality when `format` is fixed
+
+        tile : int
+            Tile size in pixels; changed regions are reported at this granularity
+
+        block : int
+            Cell size in pixels whose mean luminance is compared; `tile` must be a multiple of it
+
+        threshold : float
+            Luminance change (0-255) of a cell that marks its tile as changed
+
+        full_frame_ratio : float
+            Changed share of the frame above which the full screenshot is returned instead of a crop
+
+        target_seconds : float
+            Transfer time per frame that `auto` aims for, counted from the first chunk of the response
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        AsyncFrameDiffer
+            Pipeline whose `capture()` returns a `FrameDiff`
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            frames = client.browser_page.frame_differ()
+            frame = await frames.capture()
+
+
+        asyncio.run(main())
+        """
+        return AsyncFrameDiffer(
+            functools.partial(self.screenshot, full_page=full_page, request_options=request_options),
+            format=format,
+            quality=quality,
+            tile=tile,
+            block=block,
+            threshold=threshold,
+            full_frame_ratio=full_frame_ratio,
+            target_seconds=target_seconds,
+        )
+
+    async def load_and_extract(
+        self,
+        url: str,
+        *,
+        wait: typing.Optional[Type] = "network_idle",
+        wait_options: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        extract: typing.Sequence[PageExtract] = DEFAULT_EXTRACT,
+        timeout: typing.Optional[float] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> PageLoad:
+        """
+        Navigate to a URL, wait for it to be ready and extract its content in one call
+
+        The steps are issued back to back: a `load` or `network_idle` wait is done by `navigate` itself,
+        saving the separate `wait` round trip, and the extractions are requested concurrently once it is met.
+
+        Parameters
+        ----------
+        url : str
+
+        wait : typing.Optional[Type]
+            Condition to wait for before extracting, as for `wait`; None to extract as soon as the navigation commits
+
+        wait_options : typing.Optional[typing.Dict[str, typing.Any]]
+            Further `wait` arguments, such as `selector` or `expression`
+
+        extract : typing.Sequence[PageExtract]
+            Content to fetch: `markdown`, `text`, `elements` and/or `html`
+
+        timeout : typing.Optional[float]
+            Seconds the navigation and the wait may each take
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        PageLoad
+            Extracted content with per-phase `timings`
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            page = await client.browser_page.load_and_extract("https://example.com", extract=["markdown", "elements"])
+            print(page.markdown)
+            print(page.timings)
+
+
+        asyncio.run(main())
+        """
+        return await load_and_extract_async(
+            self,
+            url,
+            wait=wait,
+            wait_options=wait_options,
+            extract=extract,
+            timeout=timeout,
+            request_options=request_options,
+        )
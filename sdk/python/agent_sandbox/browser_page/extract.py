@@ -0,0 +1,237 @@
+import asyncio
+import concurrent.futures
+import time
+import typing
+
+import pydantic
+from ..core.envelope import unwrap_response
+from ..core.pydantic_utilities import IS_PYDANTIC_V2, UniversalBaseModel
+from ..core.request_options import RequestOptions
+from .types.navigate_request_wait_until import NavigateRequestWaitUntil
+from .types.type import Type
+
+if typing.TYPE_CHECKING:
+    from .client import AsyncBrowserPageClient, BrowserPageClient
+
+PageExtract = typing.Literal["markdown", "text", "elements", "html"]
+
+DEFAULT_EXTRACT: typing.Tuple[PageExtract, ...] = ("markdown", "text")
+# waits `navigate` can do itself, which saves the separate `wait` round trip
+_NAVIGATE_WAITS: typing.Dict[str, NavigateRequestWaitUntil] = {"load": "load", "network_idle": "networkidle"}
+
+
+class LoadTimings(UniversalBaseModel):
+    """
+    Seconds spent in each phase of `browser_page.load_and_extract`
+    """
+
+    navigate: float = pydantic.Field()
+    wait: float = pydantic.Field()
+    """
+    Separate wait call; 0 when the wait condition was handled by `navigate`
+    """
+
+    extract: float = pydantic.Field()
+    """
+    Wall time of all extractions, which run concurrently
+    """
+
+    extractions: typing.Dict[str, float] = pydantic.Field()
+    total: float = pydantic.Field()
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+class PageLoad(UniversalBaseModel):
+    """
+    A loaded page and the content extracted from it
+    """
+
+    url: str = pydantic.Field()
+    navigation: typing.Optional[typing.Dict[str, typing.Optional[typing.Any]]] = pydantic.Field(default=None)
+    """
+    Data returned by `navigate`
+    """
+
+    markdown: typing.Optional[str] = pydantic.Field(default=None)
+    text: typing.Optional[str] = pydantic.Field(default=None)
+    elements: typing.Optional[typing.List[typing.Optional[typing.Any]]] = pydantic.Field(default=None)
+    html: typing.Optional[str] = pydantic.Field(default=None)
+    timings: LoadTimings = pydantic.Field()
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+def _check_extract(extract: typing.Sequence[str]) -> typing.List[PageExtract]:
+    unknown = [name for name in extract if name not in typing.get_args(PageExtract)]
+    if unknown:
+        raise ValueError(f"Unknown extractions {unknown}; expected any of {list(typing.get_args(PageExtract))}")
+    # duplicates would only fetch the same content twice
+    return typing.cast(typing.List[PageExtract], list(dict.fromkeys(extract)))
+
+
+def _markdown(data: typing.Any) -> typing.Optional[str]:
+    if isinstance(data, dict):
+        for key in ("markdown", "content", "text"):
+            if isinstance(data.get(key), str):
+                return data[key]
+    return None if data is None else str(data)
+
+
+def _plan(
+    wait: typing.Optional[Type],
+    wait_options: typing.Optional[typing.Dict[str, typing.Any]],
+    timeout: typing.Optional[float],
+) -> typing.Tuple[typing.Dict[str, typing.Any], typing.Optional[typing.Dict[str, typing.Any]]]:
+    """
+    Arguments of the ``navigate`` call and of the separate ``wait`` call, if one is needed.
+    """
+    limit = {} if timeout is None else {"timeout": timeout}
+    if wait is None:
+        # without a wait the page is read as soon as the navigation commits
+        return {"wait_until": "commit", **limit}, None
+    if wait in _NAVIGATE_WAITS and not wait_options:
+        return {"wait_until": _NAVIGATE_WAITS[wait], **limit}, None
+    return {"wait_until": "commit", **limit}, {"type": wait, **limit, **(wait_options or {})}
+
+
+def _result(
+    url: str,
+    navigation: typing.Any,
+    extracted: typing.Dict[str, typing.Any],
+    navigate: float,
+    wait: float,
+    extract: float,
+    extractions: typing.Dict[str, float],
+    start: float,
+) -> PageLoad:
+    if "markdown" in extracted:
+        extracted["markdown"] = _markdown(extracted["markdown"])
+    return PageLoad(
+        url=url,
+        navigation=navigation,
+        **extracted,
+        timings=LoadTimings(
+            navigate=navigate,
+            wait=wait,
+            extract=extract,
+            extractions=extractions,
+            total=time.perf_counter() - start,
+        ),
+    )
+
+
+def load_and_extract(
+    page: "BrowserPageClient",
+    url: str,
+    *,
+    wait: typing.Optional[Type] = "network_idle",
+    wait_options: typing.Optional[typing.Dict[str, typing.Any]] = None,
+    extract: typing.Sequence[PageExtract] = DEFAULT_EXTRACT,
+    timeout: typing.Optional[float] = None,
+    request_options: typing.Optional[RequestOptions] = None,
+) -> PageLoad:
+    """
+    Navigates to ``url``, waits for ``wait`` and then runs the extractions in parallel threads.
+    """
+    names = _check_extract(extract)
+    calls: typing.Dict[str, typing.Callable[[], typing.Any]] = {
+        "markdown": lambda: page.get_markdown(request_options=request_options),
+        "text": lambda: page.get_text(request_options=request_options),
+        "elements": lambda: page.get_elements(request_options=request_options),
+        "html": lambda: page.get_html(request_options=request_options),
+    }
+    start = time.perf_counter()
+    navigate, wait_call = _plan(wait, wait_options, timeout)
+    navigation = unwrap_response(page.navigate(url=url, **navigate, request_options=request_options))
+    navigated = time.perf_counter()
+    if wait_call is not None:
+        unwrap_response(page.wait(**wait_call, request_options=request_options))
+    waited = time.perf_counter()
+    extractions: typing.Dict[str, float] = {}
+
+    def timed(name: str) -> typing.Any:
+        begin = time.perf_counter()
+        try:
+            return unwrap_response(calls[name]())
+        finally:
+            extractions[name] = time.perf_counter() - begin
+
+    extracted: typing.Dict[str, typing.Any] = {}
+    if names:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(names)) as executor:
+            futures = {name: executor.submit(timed, name) for name in names}
+            extracted = {name: future.result() for name, future in futures.items()}
+    return _result(
+        url,
+        navigation,
+        extracted,
+        navigated - start,
+        waited - navigated,
+        time.perf_counter() - waited,
+        extractions,
+        start,
+    )
+
+
+async def load_and_extract_async(
+    page: "AsyncBrowserPageClient",
+    url: str,
+    *,
+    wait: typing.Optional[Type] = "network_idle",
+    wait_options: typing.Optional[typing.Dict[str, typing.Any]] = None,
+    extract: typing.Sequence[PageExtract] = DEFAULT_EXTRACT,
+    timeout: typing.Optional[float] = None,
+    request_options: typing.Optional[RequestOptions] = None,
+) -> PageLoad:
+    """
+    Async counterpart of ``load_and_extract``; the extractions are gathered concurrently.
+    """
+    names = _check_extract(extract)
+    calls: typing.Dict[str, typing.Callable[[], typing.Awaitable[typing.Any]]] = {
+        "markdown": lambda: page.get_markdown(request_options=request_options),
+        "text": lambda: page.get_text(request_options=request_options),
+        "elements": lambda: page.get_elements(request_options=request_options),
+        "html": lambda: page.get_html(request_options=request_options),
+    }
+    start = time.perf_counter()
+    navigate, wait_call = _plan(wait, wait_options, timeout)
+    navigation = unwrap_response(await page.navigate(url=url, **navigate, request_options=request_options))
+    navigated = time.perf_counter()
+    if wait_call is not None:
+        unwrap_response(await page.wait(**wait_call, request_options=request_options))
+    waited = time.perf_counter()
+    extractions: typing.Dict[str, float] = {}
+
+    async def timed(name: str) -> typing.Any:
+        begin = time.perf_counter()
+        try:
+            return unwrap_response(await calls[name]())
+        finally:
+            extractions[name] = time.perf_counter() - begin
+
+    values = await asyncio.gather(*(timed(name) for name in names))
+    return _result(
+        url,
+        navigation,
+        dict(zip(names, values)),
+        navigated - start,
+        waited - navigated,
+        time.perf_counter() - waited,
+        extractions,
+        start,
+    )
@@ -0,0 +1,622 @@
+import asyncio
+import collections
+import concurrent.futures
+import hashlib
+import json
+import posixpath
+import re
+import threading
+import time
+import typing
+import urllib.parse
+import uuid
+
+import pydantic
+from ..core.envelope import unwrap_response
+from ..core.pydantic_utilities import IS_PYDANTIC_V2, UniversalBaseModel
+
+if typing.TYPE_CHECKING:
+    from ..browser_page.client import AsyncBrowserPageClient, BrowserPageClient
+    from .client import AsyncBrowserTabsClient, BrowserTabsClient
+
+CrawlExtract = typing.Literal["markdown", "text", "links"]
+CrawlSink = typing.Union[str, typing.TextIO, typing.Callable[[typing.Dict[str, typing.Any]], typing.Any]]
+
+DEFAULT_EXTRACT: typing.Tuple[CrawlExtract, ...] = ("markdown", "text", "links")
+# links to these are not followed; they would not render as a page
+DEFAULT_SKIP_EXTENSIONS = frozenset(
+    ".7z .avi .css .dmg .exe .gif .gz .ico .jpeg .jpg .js .mov .mp3 .mp4 .pdf .png .svg .tar .tgz .webm .webp"
+    " .woff .woff2 .zip".split()
+)
+
+_MARKER = "__agent_sandbox_crawl__"
+# navigation is started in the page rather than with browser_page.navigate, which would block the
+# active tab until the load finished; the token tells the new document apart from the old one
+_NAVIGATE = "(() => { window.%(marker)s = %(token)s; location.href = %(url)s; return true; })()"
+_LOADED = "(() => document.readyState === 'complete' && window.%(marker)s !== %(token)s)()"
+_LINKS = (
+    "(() => ({ url: location.href, title: document.title,"
+    " links: Array.from(document.querySelectorAll('a[href]'), (a) => a.href) }))()"
+)
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+class CrawlStats(UniversalBaseModel):
+    """
+    Counters of a finished crawl
+    """
+
+    pages: int = pydantic.Field()
+    """
+    Pages extracted and written, not counting duplicates
+    """
+
+    duplicates: int = pydantic.Field()
+    """
+    Pages whose content matched an earlier page
+    """
+
+    errors: int = pydantic.Field()
+    seconds: float = pydantic.Field()
+    pages_per_second: float = pydantic.Field()
+    pages_per_sandbox: typing.List[int] = pydantic.Field()
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+def normalize_url(url: str, base: typing.Optional[str] = None) -> typing.Optional[str]:
+    """
+    Canonical form used for deduplication, or None for URLs that are not http(s).
+
+    Resolves ``url`` against ``base``, lowercases the scheme and host, drops the fragment and default
+    ports, and sorts the query parameters.
+    """
+    parts = urllib.parse.urlsplit(urllib.parse.urljoin(base, url) if base else url)
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS or not parts.hostname:
+        return None
+    host = parts.hostname.lower()
+    try:
+        port = parts.port
+    except ValueError:
+        return None
+    netloc = host if port in (None, _DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+    query = urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(parts.query, keep_blank_values=True)))
+    return urllib.parse.urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+def _domain(url: str) -> str:
+    return urllib.parse.urlsplit(url).netloc
+
+
+def _markdown(data: typing.Any) -> str:
+    if isinstance(data, dict):
+        for key in ("markdown", "content", "text"):
+            if isinstance(data.get(key), str):
+                return data[key]
+        return json.dumps(data)
+    return "" if data is None else str(data)
+
+
+def _evaluated(data: typing.Any) -> typing.Any:
+    # evaluate returns the expression's value either as the data itself or wrapped in a result field
+    if isinstance(data, dict) and "result" in data and len(data) <= 2:
+        return data["result"]
+    return data
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(" ".join(text.split()).encode()).hexdigest()
+
+
+class _Frontier:
+    """
+    Breadth-first URL queue with per-domain politeness: at most ``per_domain`` pages of a domain load at once,
+    and consecutive page starts on a domain are ``delay`` seconds apart.
+    """
+
+    def __init__(self, max_pages: int, per_domain: int, delay: float):
+        self._queue: typing.Deque[typing.Tuple[str, int]] = collections.deque()
+        self._seen: typing.Set[str] = set()
+        self._active: typing.Dict[str, int] = collections.defaultdict(int)
+        self._last_start: typing.Dict[str, float] = {}
+        self._max_pages = max_pages
+        self._per_domain = per_domain
+        self._delay = delay
+        self._claimed = 0
+        self._in_flight = 0
+
+    def add(self, url: str, depth: int) -> bool:
+        if url in self._seen:
+            return False
+        self._seen.add(url)
+        self._queue.append((url, depth))
+        return True
+
+    def see(self, url: str) -> None:
+        self._seen.add(url)
+
+    def claim(self, now: float) -> typing.Tuple[str, typing.Any]:
+        """
+        ``("url", (url, depth))``, ``("wait", seconds)`` until something may become available, or ``("done", None)``.
+        """
+        if self._claimed >= self._max_pages or (not self._queue and not self._in_flight):
+            return "done", None
+        wait = 0.05
+        for position, (url, depth) in enumerate(self._queue):
+            domain = _domain(url)
+            if self._active[domain] >= self._per_domain:
+                continue
+            ready_at = self._last_start.get(domain, float("-inf")) + self._delay
+            if ready_at > now:
+                wait = min(wait, ready_at - now)
+                continue
+            del self._queue[position]
+            self._active[domain] += 1
+            self._last_start[domain] = now
+            self._claimed += 1
+            self._in_flight += 1
+            return "url", (url, depth)
+        return "wait", wait
+
+    def finish(self, url: str) -> None:
+        self._active[_domain(url)] -= 1
+        self._in_flight -= 1
+
+
+class _Sink:
+    def __init__(self, sink: typing.Optional[CrawlSink]):
+        self._owned: typing.Optional[typing.TextIO] = None
+        self._write: typing.Callable[[typing.Dict[str, typing.Any]], typing.Any]
+        if sink is None:
+            self._write = lambda record: None
+        elif isinstance(sink, str):
+            self._owned = open(sink, "w", encoding="utf-8")
+            self._write = self._line(self._owned)
+        elif callable(sink):
+            self._write = sink
+        else:
+            self._write = self._line(sink)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _line(file: typing.TextIO) -> typing.Callable[[typing.Dict[str, typing.Any]], None]:
+        def write(record: typing.Dict[str, typing.Any]) -> None:
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            file.flush()
+
+        return write
+
+    def write(self, record: typing.Dict[str, typing.Any]) -> None:
+        with self._lock:
+            self._write(record)
+
+    def close(self) -> None:
+        if self._owned is not None:
+            self._owned.close()
+
+
+class _Tab:
+    def __init__(self, sandbox: int, index: int):
+        self.sandbox = sandbox
+        self.index = index
+
+
+class _BaseCrawler:
+    def __init__(
+        self,
+        seeds: typing.Iterable[str],
+        *,
+        sink: typing.Optional[CrawlSink] = None,
+        tabs: int = 4,
+        max_pages: int = 100,
+        max_depth: int = 3,
+        allowed_domains: typing.Optional[typing.Iterable[str]] = None,
+        include: typing.Optional[typing.Iterable[str]] = None,
+        exclude: typing.Optional[typing.Iterable[str]] = None,
+        per_domain: int = 2,
+        delay: float = 0.0,
+        extract: typing.Sequence[CrawlExtract] = DEFAULT_EXTRACT,
+        page_timeout: float = 30.0,
+        poll_interval: float = 0.1,
+    ):
+        if tabs < 1 or per_domain < 1:
+            raise ValueError("tabs and per_domain must be at least 1")
+        unknown = set(extract) - set(DEFAULT_EXTRACT)
+        if unknown:
+            raise ValueError(f"Unknown extract {sorted(unknown)}; expected a subset of {list(DEFAULT_EXTRACT)}")
+        seeds = [url for url in (normalize_url(seed) for seed in seeds) if url]
+        if not seeds:
+            raise ValueError("At least one http(s) seed URL is required")
+        self._tabs_per_sandbox = tabs
+        self._max_depth = max_depth
+        self._domains = set(allowed_domains) if allowed_domains is not None else {_domain(url) for url in seeds}
+        self._include = [re.compile(pattern) for pattern in include or []]
+        self._exclude = [re.compile(pattern) for pattern in exclude or []]
+        self._extract = tuple(extract)
+        self._page_timeout = page_timeout
+        self._poll_interval = poll_interval
+        self._frontier = _Frontier(max_pages, per_domain, delay)
+        for url in seeds:
+            self._frontier.add(url, 0)
+        self._sink_target = sink
+        self._sink: typing.Optional[_Sink] = None
+        self._content: typing.Dict[str, str] = {}
+        self._state = threading.Lock()
+        self._counts = {"pages": 0, "duplicates": 0, "errors": 0}
+        self._per_sandbox: typing.List[int] = []
+        self._started: typing.Optional[float] = None
+        self._finished: typing.Optional[float] = None
+
+    @property
+    def stats(self) -> CrawlStats:
+        start = self._started or time.perf_counter()
+        seconds = (self._finished or time.perf_counter()) - start
+        return CrawlStats(
+            seconds=seconds,
+            pages_per_second=self._counts["pages"] / seconds if seconds > 0 else 0.0,
+            pages_per_sandbox=list(self._per_sandbox),
+            **self._counts,
+        )
+
+    def _in_scope(self, url: str) -> bool:
+        path = urllib.parse.urlsplit(url).path.lower()
+        if self._domains and _domain(url) not in self._domains:
+            return False
+        if posixpath.splitext(path)[1] in DEFAULT_SKIP_EXTENSIONS:
+            return False
+        if self._include and not any(pattern.search(url) for pattern in self._include):
+            return False
+        return not any(pattern.search(url) for pattern in self._exclude)
+
+    def _claim(self) -> typing.Tuple[str, typing.Any]:
+        with self._state:
+            return self._frontier.claim(time.perf_counter())
+
+    def _record(
+        self, tab: _Tab, url: str, depth: int, extracted: typing.Dict[str, typing.Any], seconds: float
+    ) -> typing.Dict[str, typing.Any]:
+        """
+        Dedupes the page by content, queues its in-scope links and returns its sink record.
+        """
+        page = _evaluated(extracted.get("page")) or {}
+        final_url = normalize_url(page.get("url") or url) or url
+        text = extracted.get("text")
+        markdown = extracted.get("markdown")
+        digest = _content_hash(text if text is not None else markdown or "")
+        record: typing.Dict[str, typing.Any] = {"url": url, "final_url": final_url, "depth": depth}
+        with self._state:
+            self._frontier.see(final_url)
+            original = self._content.get(digest)
+            if original is not None:
+                self._counts["duplicates"] += 1
+                record.update(content_hash=digest, duplicate_of=original)
+                return record
+            self._content[digest] = url
+            self._counts["pages"] += 1
+            self._per_sandbox[tab.sandbox] += 1
+            links = []
+            for href in page.get("links") or []:
+                link = normalize_url(href, final_url) if isinstance(href, str) else None
+                if link and link not in links:
+                    links.append(link)
+                    if depth < self._max_depth and self._in_scope(link):
+                        self._frontier.add(link, depth + 1)
+        record.update(title=page.get("title"), content_hash=digest)
+        if "markdown" in self._extract:
+            record["markdown"] = markdown
+        if "text" in self._extract:
+            record["text"] = text
+        if "links" in self._extract:
+            record["links"] = links
+        record.update(sandbox=tab.sandbox, tab=tab.index, seconds=round(seconds, 3))
+        return record
+
+    def _error(self, url: str, depth: int, error: BaseException) -> typing.Dict[str, typing.Any]:
+        with self._state:
+            self._counts["errors"] += 1
+        return {"url": url, "depth": depth, "error": str(error) or type(error).__name__}
+
+    @staticmethod
+    def _navigate_expression(url: str, token: str) -> str:
+        return _NAVIGATE % {"marker": _MARKER, "token": json.dumps(token), "url": json.dumps(url)}
+
+    @staticmethod
+    def _loaded_expression(token: str) -> str:
+        return _LOADED % {"marker": _MARKER, "token": json.dumps(token)}
+
+
+class _Sandbox:
+    def __init__(self, tabs: typing.Any, page: typing.Any):
+        self.tabs = tabs
+        self.page = page
+        self.active: typing.Optional[int] = None
+        self.indices: typing.List[int] = []
+
+
+class Crawler(_BaseCrawler):
+    """
+    Crawls sites with a pool of browser tabs, streaming one JSON record per page.
+
+    Every sandbox gets ``tabs`` tabs. A tab starts loading its next URL in the page
+    and hands the browser over to the other tabs while it loads; once its document is
+    complete it is activated again and its markdown, text and links are fetched
+    concurrently. Page-level calls act on the active tab, so each sandbox's tabs take
+    turns on those short steps while their loads overlap.
+
+    URLs are deduplicated after normalization, and pages by a hash of their text.
+    Links within ``allowed_domains`` (by default the seeds' hosts) are followed
+    breadth-first up to ``max_depth``. Each domain gets at most ``per_domain``
+    concurrent loads, started at least ``delay`` seconds apart. Each page record
+    (``url``, ``final_url``, ``title``, ``markdown``, ``text``, ``links``,
+    ``content_hash`` ...) goes to ``sink``, a JSONL path, text file or callable, as it
+    is extracted. Duplicates and failures are written too, with ``duplicate_of`` or
+    ``error``.
+
+    Examples
+    --------
+    from agent_sandbox import Sandbox
+
+    client = Sandbox(
+        base_url="https://yourhost.com/path/to/api",
+    )
+    crawler = client.browser_tabs.crawler(["https://docs.example.com/"], sink="pages.jsonl", tabs=6)
+    stats = crawler.run()
+    print(stats.pages, stats.pages_per_second)
+    """
+
+    def __init__(
+        self,
+        sandboxes: typing.Sequence[typing.Tuple["BrowserTabsClient", "BrowserPageClient"]],
+        seeds: typing.Iterable[str],
+        **kwargs: typing.Any,
+    ):
+        super().__init__(seeds, **kwargs)
+        self._sandboxes = [_Sandbox(tabs, page) for tabs, page in sandboxes]
+        self._locks = [threading.Lock() for _ in self._sandboxes]
+        self._wakeup = threading.Condition(self._state)
+
+    def run(self) -> CrawlStats:
+        """
+        Crawl until the frontier is exhausted or ``max_pages`` pages were claimed.
+        """
+        self._sink = _Sink(self._sink_target)
+        self._per_sandbox = [0] * len(self._sandboxes)
+        self._started = time.perf_counter()
+        extractors = concurrent.futures.ThreadPoolExecutor(max_workers=len(self._extract) * len(self._sandboxes))
+        try:
+            tabs = [tab for position in range(len(self._sandboxes)) for tab in self._open(position)]
+            threads = [
+                threading.Thread(target=self._work, args=(tab, extractors), name=f"crawl-{tab.sandbox}-{tab.index}")
+                for tab in tabs
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            self._finished = time.perf_counter()
+            extractors.shutdown(wait=False)
+            for sandbox in self._sandboxes:
+                self._close(sandbox)
+            self._sink.close()
+        return self.stats
+
+    def _open(self, position: int) -> typing.List[_Tab]:
+        sandbox = self._sandboxes[position]
+        # new tabs are appended, so the pool's indices follow the tabs that were already open
+        existing = unwrap_response(sandbox.tabs.list()) or []
+        for _ in range(self._tabs_per_sandbox):
+            unwrap_response(sandbox.tabs.create(url="about:blank"))
+        sandbox.indices = list(range(len(existing), len(existing) + self._tabs_per_sandbox))
+        return [_Tab(position, index) for index in sandbox.indices]
+
+    def _close(self, sandbox: _Sandbox) -> None:
+        for index in sorted(sandbox.indices, reverse=True):
+            try:
+                sandbox.tabs.close(index)
+            except Exception:
+                pass
+        sandbox.indices = []
+
+    def _work(self, tab: _Tab, extractors: concurrent.futures.Executor) -> None:
+        while True:
+            with self._wakeup:
+                kind, value = self._frontier.claim(time.perf_counter())
+                if kind == "wait":
+                    self._wakeup.wait(value)
+                    continue
+            if kind == "done":
+                with self._wakeup:
+                    self._wakeup.notify_all()
+                return
+            url, depth = value
+            start = time.perf_counter()
+            try:
+                extracted = self._visit(tab, url, extractors)
+                record = self._record(tab, url, depth, extracted, time.perf_counter() - start)
+            except Exception as e:
+                record = self._error(url, depth, e)
+            finally:
+                with self._wakeup:
+                    self._frontier.finish(url)
+                    self._wakeup.notify_all()
+            typing.cast(_Sink, self._sink).write(record)
+
+    def _activate(self, tab: _Tab) -> _Sandbox:
+        sandbox = self._sandboxes[tab.sandbox]
+        if sandbox.active != tab.index:
+            unwrap_response(sandbox.tabs.activate(tab.index))
+            sandbox.active = tab.index
+        return sandbox
+
+    def _visit(
+        self, tab: _Tab, url: str, extractors: concurrent.futures.Executor
+    ) -> typing.Dict[str, typing.Any]:
+        token = uuid.uuid4().hex
+        lock = self._locks[tab.sandbox]
+        with lock:
+            sandbox = self._activate(tab)
+            unwrap_response(sandbox.page.evaluate(expression=self._navigate_expression(url, token)))
+        deadline = time.perf_counter() + self._page_timeout
+        while True:
+            # the load runs in the browser meanwhile; other tabs use the page API until then
+            time.sleep(self._poll_interval)
+            with lock:
+                sandbox = self._activate(tab)
+                try:
+                    loaded = _evaluated(
+                        unwrap_response(sandbox.page.evaluate(expression=self._loaded_expression(token)))
+                    )
+                except Exception:
+                    # evaluating while the old document is torn down can fail; the next poll decides
+                    loaded = False
+                if loaded is True:
+                    return self._extract_page(sandbox, extractors)
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"{url} did not finish loading within {self._page_timeout}s")
+
+    def _extract_page(
+        self, sandbox: _Sandbox, extractors: concurrent.futures.Executor
+    ) -> typing.Dict[str, typing.Any]:
+        calls: typing.Dict[str, typing.Callable[[], typing.Any]] = {
+            "page": lambda: sandbox.page.evaluate(expression=_LINKS),
+        }
+        if "markdown" in self._extract:
+            calls["markdown"] = sandbox.page.get_markdown
+        if "text" in self._extract:
+            calls["text"] = sandbox.page.get_text
+        futures = {name: extractors.submit(call) for name, call in calls.items()}
+        extracted = {name: unwrap_response(future.result()) for name, future in futures.items()}
+        if "markdown" in extracted:
+            extracted["markdown"] = _markdown(extracted["markdown"])
+        return extracted
+
+
+class AsyncCrawler(_BaseCrawler):
+    """
+    Async counterpart of ``Crawler``.
+    """
+
+    def __init__(
+        self,
+        sandboxes: typing.Sequence[typing.Tuple["AsyncBrowserTabsClient", "AsyncBrowserPageClient"]],
+        seeds: typing.Iterable[str],
+        **kwargs: typing.Any,
+    ):
+        super().__init__(seeds, **kwargs)
+        self._sandboxes = [_Sandbox(tabs, page) for tabs, page in sandboxes]
+        self._locks: typing.List[asyncio.Lock] = []
+        self._wakeup: typing.Optional[asyncio.Condition] = None
+
+    async def run(self) -> CrawlStats:
+        """
+        Crawl until the frontier is exhausted or ``max_pages`` pages were claimed.
+        """
+        self._locks = [asyncio.Lock() for _ in self._sandboxes]
+        self._wakeup = asyncio.Condition()
+        self._sink = _Sink(self._sink_target)
+        self._per_sandbox = [0] * len(self._sandboxes)
+        self._started = time.perf_counter()
+        try:
+            opened = await asyncio.gather(*(self._open(position) for position in range(len(self._sandboxes))))
+            await asyncio.gather(*(self._work(tab) for tabs in opened for tab in tabs))
+        finally:
+            self._finished = time.perf_counter()
+            for sandbox in self._sandboxes:
+                await self._close(sandbox)
+            self._sink.close()
+        return self.stats
+
+    async def _open(self, position: int) -> typing.List[_Tab]:
+        sandbox = self._sandboxes[position]
+        existing = unwrap_response(await sandbox.tabs.list()) or []
+        for _ in range(self._tabs_per_sandbox):
+            unwrap_response(await sandbox.tabs.create(url="about:blank"))
+        sandbox.indices = list(range(len(existing), len(existing) + self._tabs_per_sandbox))
+        return [_Tab(position, index) for index in sandbox.indices]
+
+    async def _close(self, sandbox: _Sandbox) -> None:
+        for index in sorted(sandbox.indices, reverse=True):
+            try:
+                await sandbox.tabs.close(index)
+            except Exception:
+                pass
+        sandbox.indices = []
+
+    async def _work(self, tab: _Tab) -> None:
+        wakeup = typing.cast(asyncio.Condition, self._wakeup)
+        while True:
+            kind, value = self._claim()
+            if kind == "wait":
+                async with wakeup:
+                    try:
+                        await asyncio.wait_for(wakeup.wait(), value)
+                    except asyncio.TimeoutError:
+                        pass
+                continue
+            if kind == "done":
+                async with wakeup:
+                    wakeup.notify_all()
+                return
+            url, depth = value
+            start = time.perf_counter()
+            try:
+                extracted = await self._visit(tab, url)
+                record = self._record(tab, url, depth, extracted, time.perf_counter() - start)
+            except Exception as e:
+                record = self._error(url, depth, e)
+            finally:
+                with self._state:
+                    self._frontier.finish(url)
+                async with wakeup:
+                    wakeup.notify_all()
+            typing.cast(_Sink, self._sink).write(record)
+
+    async def _activate(self, tab: _Tab) -> _Sandbox:
+        sandbox = self._sandboxes[tab.sandbox]
+        if sandbox.active != tab.index:
+            unwrap_response(await sandbox.tabs.activate(tab.index))
+            sandbox.active = tab.index
+        return sandbox
+
+    async def _visit(self, tab: _Tab, url: str) -> typing.Dict[str, typing.Any]:
+        token = uuid.uuid4().hex
+        lock = self._locks[tab.sandbox]
+        async with lock:
+            sandbox = await self._activate(tab)
+            unwrap_response(await sandbox.page.evaluate(expression=self._navigate_expression(url, token)))
+        deadline = time.perf_counter() + self._page_timeout
+        while True:
+            await asyncio.sleep(self._poll_interval)
+            async with lock:
+                sandbox = await self._activate(tab)
+                try:
+                    loaded = _evaluated(
+                        unwrap_response(await sandbox.page.evaluate(expression=self._loaded_expression(token)))
+                    )
+                except Exception:
+                    loaded = False
+                if loaded is True:
+                    return await self._extract_page(sandbox)
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"{url} did not finish loading within {self._page_timeout}s")
+
+    async def _extract_page(self, sandbox: _Sandbox) -> typing.Dict[str, typing.Any]:
+        calls = {"page": sandbox.page.evaluate(expression=_LINKS)}
+        if "markdown" in self._extract:
+            calls["markdown"] = sandbox.page.get_markdown()
+        if "text" in self._extract:
+            calls["text"] = sandbox.page.get_text()
+        responses = await asyncio.gather(*calls.values())
+        extracted = {name: unwrap_response(response) for name, response in zip(calls, responses)}
+        if "markdown" in extracted:
+            extracted["markdown"] = _markdown(extracted["markdown"])
+        return extracted
@@ -0,0 +1,232 @@
+import typing
+
+from .client import AsyncBrowserTabsClient, BrowserTabsClient
+from .crawl import DEFAULT_EXTRACT, AsyncCrawler, Crawler, CrawlExtract, CrawlSink
+
+if typing.TYPE_CHECKING:
+    from ..client import AsyncSandbox, Sandbox
+
+
+class ExtendedBrowserTabsClient(BrowserTabsClient):
+    """
+    `BrowserTabsClient` with the tab-pool crawler.
+    """
+
+    def crawler(
+        self,
+        seeds: typing.Sequence[str],
+        *,
+        sink: typing.Optional[CrawlSink] = None,
+        tabs: int = 4,
+        sandboxes: typing.Optional[typing.Sequence["Sandbox"]] = None,
+        max_pages: int = 100,
+        max_depth: int = 3,
+        allowed_domains: typing.Optional[typing.Sequence[str]] = None,
+        include: typing.Optional[typing.Sequence[str]] = None,
+        exclude: typing.Optional[typing.Sequence[str]] = None,
+        per_domain: int = 2,
+        delay: float = 0.0,
+        extract: typing.Sequence[CrawlExtract] = DEFAULT_EXTRACT,
+        page_timeout: float = 30.0,
+    ) -> Crawler:
+        """
+        Crawler that loads pages in a pool of browser tabs and streams one JSON record per page
+
+        Each tab starts its next load and yields the browser to the other tabs until the document is complete,
+        so page loads overlap; markdown, text and links are then fetched concurrently.
+
+        Parameters
+        ----------
+        seeds : typing.Sequence[str]
+            URLs to start from
+
+        sink : typing.Optional[CrawlSink]
+            JSONL file path, writable text file, or callable receiving each record
+
+        tabs : int
+            Tabs opened per sandbox
+
+        sandboxes : typing.Optional[typing.Sequence[Sandbox]]
+            Sandboxes to crawl with; by default this client's sandbox only
+
+        max_pages : int
+            Most pages to visit
+
+        max_depth : int
+            Most link hops from a seed
+
+        allowed_domains : typing.Optional[typing.Sequence[str]]
+            Hosts (with port, if any) whose links are followed; by default the seeds' hosts
+
+        include : typing.Optional[typing.Sequence[str]]
+            Regular expressions; when given, only matching URLs are followed
+
+        exclude : typing.Optional[typing.Sequence[str]]
+            Regular expressions of URLs never followed
+
+        per_domain : int
+            Most concurrent page loads per host
+
+        delay : float
+            Seconds between the starts of two page loads on the same host
+
+        extract : typing.Sequence[CrawlExtract]
+            Fields written per page: `markdown`, `text` and/or `links`
+
+        page_timeout : float
+            Seconds a page may take to load
+
+        Returns
+        -------
+        Crawler
+            Call `run()` to crawl; it returns `CrawlStats`
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        crawler = client.browser_tabs.crawler(["https://docs.example.com/"], sink="pages.jsonl", tabs=6)
+        stats = crawler.run()
+        print(f"{stats.pages} pages, {stats.pages_per_second:.1f} pages/s")
+        """
+        from ..browser_page.client import BrowserPageClient  # noqa: E402
+
+        clients = (
+            [(self, BrowserPageClient(client_wrapper=self._raw_client._client_wrapper))]
+            if sandboxes is None
+            else [(sandbox.browser_tabs, sandbox.browser_page) for sandbox in sandboxes]
+        )
+        return Crawler(
+            clients,
+            seeds,
+            sink=sink,
+            tabs=tabs,
+            max_pages=max_pages,
+            max_depth=max_depth,
+            allowed_domains=allowed_domains,
+            include=include,
+            exclude=exclude,
+            per_domain=per_domain,
+            delay=delay,
+            extract=extract,
+            page_timeout=page_timeout,
+        )
+
+
+class AsyncExtendedBrowserTabsClient(AsyncBrowserTabsClient):
+    """
+    `AsyncBrowserTabsClient` with the tab-pool crawler.
+    """
+
+    def crawler(
+        self,
+        seeds: typing.Sequence[str],
+        *,
+        sink: typing.Optional[CrawlSink] = None,
+        tabs: int = 4,
+        sandboxes: typing.Optional[typing.Sequence["AsyncSandbox"]] = None,
+        max_pages: int = 100,
+        max_depth: int = 3,
+        allowed_domains: typing.Optional[typing.Sequence[str]] = None,
+        include: typing.Optional[typing.Sequence[str]] = None,
+        exclude: typing.Optional[typing.Sequence[str]] = None,
+        per_domain: int = 2,
+        delay: float = 0.0,
+        extract: typing.Sequence[CrawlExtract] = DEFAULT_EXTRACT,
+        page_timeout: float = 30.0,
+    ) -> AsyncCrawler:
+        """
+        Crawler that loads pages in a pool of browser tabs and streams one JSON record per page
+
+        Each tab starts its next load and yields the browser to the other tabs until the document is complete,
+        so page loads overlap; markdown, text and links are then fetched concurrently.
+
+        Parameters
+        ----------
+        seeds : typing.Sequence[str]
+            URLs to start from
+
+        sink : typing.Optional[CrawlSink]
+            JSONL file path, writable text file, or callable receiving each record
+
+        tabs : int
+            Tabs opened per sandbox
+
+        sandboxes : typing.Optional[typing.Sequence[AsyncSandbox]]
+            Sandboxes to crawl with; by default this client's sandbox only
+
+        max_pages : int
+            Most pages to visit
+
+        max_depth : int
+            Most link hops from a seed
+
+        allowed_domains : typing.Optional[typing.Sequence[str]]
+            Hosts (with port, if any) whose links are followed; by default the seeds' hosts
+
+        include : typing.Optional[typing.Sequence[str]]
+            Regular expressions; when given, only matching URLs are followed
+
+        exclude : typing.Optional[typing.Sequence[str]]
+            Regular expressions of URLs never followed
+
+        per_domain : int
+            Most concurrent page loads per host
+
+        delay : float
+            Seconds between the starts of two page loads on the same host
+
+        extract : typing.Sequence[CrawlExtract]
+            Fields written per page: `markdown`, `text` and/or `links`
+
+        page_timeout : float
+            Seconds a page may take to load
+
+        Returns
+        -------
+        AsyncCrawler
+            Call `run()` to crawl; it returns `CrawlStats`
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            crawler = client.browser_tabs.crawler(["https://docs.example.com/"], sink="pages.jsonl")
+            stats = await crawler.run()
+
+
+        asyncio.run(main())
+        """
+        from ..browser_page.client import AsyncBrowserPageClient  # noqa: E402
+
+        clients = (
+            [(self, AsyncBrowserPageClient(client_wrapper=self._raw_client._client_wrapper))]
+            if sandboxes is None
+            else [(sandbox.browser_tabs, sandbox.browser_page) for sandbox in sandboxes]
+        )
+        return AsyncCrawler(
+            clients,
+            seeds,
+            sink=sink,
+            tabs=tabs,
+            max_pages=max_pages,
+            max_depth=max_depth,
+            allowed_domains=allowed_domains,
+            include=include,
+            exclude=exclude,
+            per_domain=per_domain,
+            delay=delay,
+            extract=extract,
+            page_timeout=page_timeout,
+        )
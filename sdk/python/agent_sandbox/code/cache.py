@@ -0,0 +1,524 @@
+import collections
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import typing
+
+import pydantic
+from ..core.envelope import unwrap_response
+from ..core.pydantic_utilities import IS_PYDANTIC_V2, UniversalBaseModel, parse_obj_as
+from ..core.request_options import RequestOptions
+from ..types.response_code_execute_response import ResponseCodeExecuteResponse
+from ..types.response_node_js_execute_response import ResponseNodeJsExecuteResponse
+
+if typing.TYPE_CHECKING:
+    from ..client import AsyncSandbox, Sandbox
+
+# this is used as the default value for optional parameters
+OMIT = typing.cast(typing.Any, ...)
+
+_RESULT_TYPES: typing.Dict[str, typing.Type[typing.Any]] = {
+    "code": ResponseCodeExecuteResponse,
+    "nodejs": ResponseNodeJsExecuteResponse,
+}
+
+# Snippets matching these read clocks, randomness, the network or the environment, so their output
+# is not a function of the cache key. The check is a heuristic; pass deterministic= to override it.
+DEFAULT_BYPASS_PATTERNS: typing.Tuple[str, ...] = (
+    r"\brandom\b",
+    r"\bsecrets\b",
+    r"\buuid\b",
+    r"\burandom\b",
+    r"\btime\.(time|time_ns|monotonic|perf_counter)\b",
+    r"\b(datetime|date)\.(now|today|utcnow)\b",
+    r"\b(requests|httpx|urllib|aiohttp|socket)\b",
+    r"\binput\s*\(",
+    r"\bos\.environ\b",
+    r"\bMath\.random\b",
+    r"\bDate\.now\b",
+    r"\bnew\s+Date\s*\(\s*\)",
+    r"\bperformance\.now\b",
+    r"\bprocess\.(hrtime|env)\b",
+    r"\bcrypto\b",
+    r"\bfetch\s*\(",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS execution_cache (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL
+)
+"""
+
+
+class CacheStats(UniversalBaseModel):
+    """
+    Counters of an execution cache
+    """
+
+    requests: int = pydantic.Field()
+    hits: int = pydantic.Field()
+    memory_hits: int = pydantic.Field()
+    disk_hits: int = pydantic.Field()
+    misses: int = pydantic.Field()
+    bypassed: int = pydantic.Field()
+    """
+    Executions that skipped the cache as non-deterministic
+    """
+
+    stored: int = pydantic.Field()
+    """
+    Results written to the cache; failed executions are not stored unless `cache_failures`
+    """
+
+    evictions: int = pydantic.Field()
+    """
+    Entries dropped from the in-memory tier to stay within `max_entries`
+    """
+
+    entries: int = pydantic.Field()
+    """
+    Entries currently held in memory
+    """
+
+    hit_rate: float = pydantic.Field()
+    """
+    Hits divided by cacheable requests (hits plus misses)
+    """
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+def _jsonable(value: typing.Any) -> typing.Any:
+    return value.dict() if isinstance(value, UniversalBaseModel) else str(value)
+
+
+def _canonical(value: typing.Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=_jsonable)
+
+
+def _succeeded(result: typing.Any) -> bool:
+    if getattr(result, "success", None) is False or result.data is None:
+        return False
+    return result.data.status == "ok" and result.data.exit_code in (None, 0)
+
+
+class _BaseExecutionCache:
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1024,
+        path: typing.Optional[str] = None,
+        ttl: typing.Optional[float] = None,
+        fingerprint_ttl: typing.Optional[float] = 600,
+        bypass_patterns: typing.Sequence[str] = DEFAULT_BYPASS_PATTERNS,
+        cache_failures: bool = False,
+        request_options: typing.Optional[RequestOptions] = None,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._fingerprint_ttl = fingerprint_ttl
+        self._bypass = re.compile("|".join(f"(?:{p})" for p in bypass_patterns)) if bypass_patterns else None
+        self._cache_failures = cache_failures
+        self._request_options = request_options
+        self._entries: "collections.OrderedDict[str, typing.Tuple[float, typing.Any]]" = collections.OrderedDict()
+        self._fingerprints: typing.Dict[str, typing.Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+        self._db: typing.Optional[sqlite3.Connection] = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(_SCHEMA)
+            self._db.commit()
+        self._counts = {
+            "requests": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "stored": 0,
+            "evictions": 0,
+        }
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            counts = dict(self._counts)
+            entries = len(self._entries)
+        hits = counts["memory_hits"] + counts["disk_hits"]
+        lookups = hits + counts["misses"]
+        return CacheStats(hits=hits, entries=entries, hit_rate=hits / lookups if lookups else 0.0, **counts)
+
+    def is_deterministic(self, code: str) -> bool:
+        """
+        Whether ``code`` is cacheable under the bypass patterns.
+        """
+        return self._bypass is None or self._bypass.search(code) is None
+
+    def clear(self) -> None:
+        """
+        Drop every cached result, on disk too, and forget the runtime fingerprints.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._fingerprints.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM execution_cache")
+                self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _request(self, deterministic: typing.Optional[bool], code: str) -> bool:
+        """
+        Counts a request and returns whether it may use the cache.
+        """
+        cacheable = self.is_deterministic(code) if deterministic is None else deterministic
+        with self._lock:
+            self._counts["requests"] += 1
+            if not cacheable:
+                self._counts["bypassed"] += 1
+        return cacheable
+
+    def _stale_fingerprint(self, runtime: str) -> bool:
+        cached = self._fingerprints.get(runtime)
+        if cached is None:
+            return True
+        return self._fingerprint_ttl is not None and time.monotonic() - cached[0] >= self._fingerprint_ttl
+
+    def _set_fingerprint(self, runtime: str, parts: typing.Sequence[typing.Any]) -> str:
+        digest = hashlib.sha256(_canonical([unwrap_response(part) for part in parts]).encode()).hexdigest()
+        self._fingerprints[runtime] = (time.monotonic(), digest)
+        return digest
+
+    def _key(self, kind: str, fingerprint: str, request: typing.Mapping[str, typing.Any]) -> str:
+        return hashlib.sha256(_canonical({"kind": kind, "runtime": fingerprint, **request}).encode()).hexdigest()
+
+    def _expired(self, created_at: float) -> bool:
+        return self._ttl is not None and time.time() - created_at >= self._ttl
+
+    def _lookup(self, kind: str, key: str) -> typing.Optional[typing.Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry[0]):
+                self._entries.move_to_end(key)
+                self._counts["memory_hits"] += 1
+                return entry[1]
+            row = None
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM execution_cache WHERE key = ? AND kind = ?", (key, kind)
+                ).fetchone()
+            if row is not None and not self._expired(row[1]):
+                result = parse_obj_as(_RESULT_TYPES[kind], json.loads(row[0]))
+                self._remember(key, row[1], result)
+                self._counts["disk_hits"] += 1
+                return result
+            self._counts["misses"] += 1
+            return None
+
+    def _store(self, kind: str, key: str, result: typing.Any) -> None:
+        if not self._cache_failures and not _succeeded(result):
+            return
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, created_at, result)
+            self._counts["stored"] += 1
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO execution_cache (key, kind, value, created_at) VALUES (?, ?, ?, ?)",
+                    (key, kind, _canonical(result.dict()), created_at),
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, created_at: float, result: typing.Any) -> None:
+        self._entries[key] = (created_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._counts["evictions"] += 1
+
+
+def _code_request(
+    language: str, code: str, cwd: typing.Optional[str]
+) -> typing.Tuple[str, typing.Dict[str, typing.Any]]:
+    runtime = "nodejs" if language == "javascript" else "python"
+    return runtime, {"language": language, "code": code, "cwd": cwd}
+
+
+def _nodejs_request(
+    code: str,
+    stdin: typing.Optional[str],
+    files: typing.Optional[typing.Mapping[str, typing.Optional[str]]],
+    cwd: typing.Optional[str],
+    version: typing.Optional[str],
+) -> typing.Dict[str, typing.Any]:
+    return {
+        "language": "javascript",
+        "code": code,
+        "stdin": stdin,
+        "files": dict(files or {}),
+        "cwd": cwd,
+        "version": version,
+    }
+
+
+def _omit(value: typing.Any) -> typing.Any:
+    return OMIT if value is None else value
+
+
+class ExecutionCache(_BaseExecutionCache):
+    """
+    Memoizes stateless ``code.execute_code`` and ``nodejs.execute_code`` results by content.
+
+    The cache key is a SHA-256 over the language, code, stdin, input files, cwd
+    and a fingerprint of the runtime: the installed packages
+    (``sandbox.get_python_packages`` / ``get_nodejs_packages``) and
+    ``code.get_info``, re-read every ``fingerprint_ttl`` seconds, so installing a
+    package invalidates earlier results. Results live in an in-memory LRU of
+    ``max_entries`` and, when ``path`` is given, in a SQLite file shared across
+    processes and runs. Snippets that look non-deterministic (clocks, randomness,
+    network, environment) bypass the cache unless ``deterministic=True`` is
+    passed; only successful executions are stored unless ``cache_failures``.
+
+    Examples
+    --------
+    from agent_sandbox import Sandbox
+    from agent_sandbox.code.cache import ExecutionCache
+
+    client = Sandbox(
+        base_url="https://yourhost.com/path/to/api",
+    )
+    with ExecutionCache(client, path="execution-cache.sqlite") as cache:
+        for sample in samples:
+            result = cache.execute_code(language="python", code=sample.solution)
+        print(cache.stats.hit_rate)
+    """
+
+    def __init__(self, client: "Sandbox", **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._client = client
+
+    def __enter__(self) -> "ExecutionCache":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def fingerprint(self, runtime: typing.Literal["python", "nodejs"]) -> str:
+        """
+        Digest of the sandbox's ``runtime`` packages and language info, as used in cache keys.
+        """
+        with self._lock:
+            if not self._stale_fingerprint(runtime):
+                return self._fingerprints[runtime][1]
+        packages = (
+            self._client.sandbox.get_python_packages
+            if runtime == "python"
+            else self._client.sandbox.get_nodejs_packages
+        )
+        parts = [
+            packages(request_options=self._request_options),
+            self._client.code.get_info(request_options=self._request_options),
+        ]
+        with self._lock:
+            return self._set_fingerprint(runtime, parts)
+
+    def execute_code(
+        self,
+        *,
+        language: str,
+        code: str,
+        timeout: typing.Optional[int] = None,
+        cwd: typing.Optional[str] = None,
+        deterministic: typing.Optional[bool] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> ResponseCodeExecuteResponse:
+        """
+        ``code.execute_code(stateful=False)`` through the cache.
+        """
+        options = request_options or self._request_options
+
+        def execute() -> ResponseCodeExecuteResponse:
+            return self._client.code.execute_code(
+                language=language,
+                code=code,
+                timeout=_omit(timeout),
+                cwd=_omit(cwd),
+                stateful=False,
+                request_options=options,
+            )
+
+        if not self._request(deterministic, code):
+            return execute()
+        runtime, request = _code_request(language, code, cwd)
+        key = self._key("code", self.fingerprint(runtime), request)
+        cached = self._lookup("code", key)
+        if cached is not None:
+            return cached
+        result = execute()
+        self._store("code", key, result)
+        return result
+
+    def nodejs_execute(
+        self,
+        *,
+        code: str,
+        timeout: typing.Optional[int] = None,
+        stdin: typing.Optional[str] = None,
+        files: typing.Optional[typing.Dict[str, typing.Optional[str]]] = None,
+        cwd: typing.Optional[str] = None,
+        version: typing.Optional[str] = None,
+        deterministic: typing.Optional[bool] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> ResponseNodeJsExecuteResponse:
+        """
+        Stateless ``nodejs.execute_code`` through the cache.
+        """
+        options = request_options or self._request_options
+
+        def execute() -> ResponseNodeJsExecuteResponse:
+            return self._client.nodejs.execute_code(
+                code=code,
+                timeout=_omit(timeout),
+                stdin=_omit(stdin),
+                files=_omit(files),
+                cwd=_omit(cwd),
+                version=_omit(version),
+                request_options=options,
+            )
+
+        if not self._request(deterministic, code):
+            return execute()
+        key = self._key("nodejs", self.fingerprint("nodejs"), _nodejs_request(code, stdin, files, cwd, version))
+        cached = self._lookup("nodejs", key)
+        if cached is not None:
+            return cached
+        result = execute()
+        self._store("nodejs", key, result)
+        return result
+
+
+class AsyncExecutionCache(_BaseExecutionCache):
+    """
+    Async counterpart of ``ExecutionCache``; the SQLite tier is accessed inline, as its queries are local.
+    """
+
+    def __init__(self, client: "AsyncSandbox", **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._client = client
+
+    async def __aenter__(self) -> "AsyncExecutionCache":
+        return self
+
+    async def __aexit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    async def fingerprint(self, runtime: typing.Literal["python", "nodejs"]) -> str:
+        """
+        Digest of the sandbox's ``runtime`` packages and language info, as used in cache keys.
+        """
+        with self._lock:
+            if not self._stale_fingerprint(runtime):
+                return self._fingerprints[runtime][1]
+        packages = (
+            self._client.sandbox.get_python_packages
+            if runtime == "python"
+            else self._client.sandbox.get_nodejs_packages
+        )
+        parts = [
+            await packages(request_options=self._request_options),
+            await self._client.code.get_info(request_options=self._request_options),
+        ]
+        with self._lock:
+            return self._set_fingerprint(runtime, parts)
+
+    async def execute_code(
+        self,
+        *,
+        language: str,
+        code: str,
+        timeout: typing.Optional[int] = None,
+        cwd: typing.Optional[str] = None,
+        deterministic: typing.Optional[bool] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> ResponseCodeExecuteResponse:
+        """
+        ``code.execute_code(stateful=False)`` through the cache.
+        """
+        options = request_options or self._request_options
+
+        async def execute() -> ResponseCodeExecuteResponse:
+            return await self._client.code.execute_code(
+                language=language,
+                code=code,
+                timeout=_omit(timeout),
+                cwd=_omit(cwd),
+                stateful=False,
+                request_options=options,
+            )
+
+        if not self._request(deterministic, code):
+            return await execute()
+        runtime, request = _code_request(language, code, cwd)
+        key = self._key("code", await self.fingerprint(runtime), request)
+        cached = self._lookup("code", key)
+        if cached is not None:
+            return cached
+        result = await execute()
+        self._store("code", key, result)
+        return result
+
+    async def nodejs_execute(
+        self,
+        *,
+        code: str,
+        timeout: typing.Optional[int] = None,
+        stdin: typing.Optional[str] = None,
+        files: typing.Optional[typing.Dict[str, typing.Optional[str]]] = None,
+        cwd: typing.Optional[str] = None,
+        version: typing.Optional[str] = None,
+        deterministic: typing.Optional[bool] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> ResponseNodeJsExecuteResponse:
+        """
+        Stateless ``nodejs.execute_code`` through the cache.
+        """
+        options = request_options or self._request_options
+
+        async def execute() -> ResponseNodeJsExecuteResponse:
+            return await self._client.nodejs.execute_code(
+                code=code,
+                timeout=_omit(timeout),
+                stdin=_omit(stdin),
+                files=_omit(files),
+                cwd=_omit(cwd),
+                version=_omit(version),
+                request_options=options,
+            )
+
+        if not self._request(deterministic, code):
+            return await execute()
+        key = self._key("nodejs", await self.fingerprint("nodejs"), _nodejs_request(code, stdin, files, cwd, version))
+        cached = self._lookup("nodejs", key)
+        if cached is not None:
+            return cached
+        result = await execute()
+        self._store("nodejs", key, result)
+        return result
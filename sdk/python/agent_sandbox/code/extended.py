@@ -0,0 +1,199 @@
+import typing
+
+from ..core.request_options import RequestOptions
+from .client import AsyncCodeClient, CodeClient
+from .map import AsyncCodeMap, CodeMap, MapLanguage
+
+if typing.TYPE_CHECKING:
+    from ..client import AsyncSandbox, Sandbox
+
+
+class ExtendedCodeClient(CodeClient):
+    """
+    `CodeClient` with parallel map over code runtimes.
+    """
+
+    def map(
+        self,
+        func_source: str,
+        iterable: typing.Iterable[typing.Any],
+        *,
+        language: MapLanguage = "python",
+        workers: int = 4,
+        chunksize: typing.Optional[int] = None,
+        ordered: bool = True,
+        sandboxes: typing.Optional[typing.Sequence["Sandbox"]] = None,
+        max_retries: int = 2,
+        func_name: typing.Optional[str] = None,
+        timeout: typing.Optional[int] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> CodeMap:
+        """
+        Apply a function to every input inside sandbox runtimes, like `multiprocessing.Pool.imap`
+
+        Inputs are JSON-encoded in chunks and spread over `workers` stateful sessions
+        (`execute_code(stateful=True)`), which are closed when the map ends.
+
+        Parameters
+        ----------
+        func_source : str
+            Source defining the function (the last top-level `def` / `function`), or a callable expression
+            such as `lambda x: x * x` / `(x) => x * x`
+
+        iterable : typing.Iterable[typing.Any]
+            JSON-serializable inputs; results must be JSON-serializable too
+
+        language : MapLanguage
+            `python` or `javascript`
+
+        workers : int
+            Number of sessions running chunks concurrently
+
+        chunksize : typing.Optional[int]
+            Inputs per request; by default about four chunks per worker
+
+        ordered : bool
+            Yield results in input order; when False they are yielded as chunks complete
+
+        sandboxes : typing.Optional[typing.Sequence[Sandbox]]
+            Sandboxes to spread the workers over; by default this client's sandbox only
+
+        max_retries : int
+            Times a chunk is retried, preferably on another worker, when its session fails to report
+
+        func_name : typing.Optional[str]
+            Name of the function in `func_source` when it is not the last one defined
+
+        timeout : typing.Optional[int]
+            Execution timeout in seconds per chunk
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        CodeMap
+            Iterator of results; exceptions raised by the function are re-raised as `RuntimeError`
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        totals = list(client.code.map("lambda n: sum(i * i for i in range(n))", range(10_000), workers=8))
+        """
+        return CodeMap(
+            [self] if sandboxes is None else [sandbox.code for sandbox in sandboxes],
+            func_source=func_source,
+            iterable=iterable,
+            language=language,
+            workers=workers,
+            chunksize=chunksize,
+            ordered=ordered,
+            max_retries=max_retries,
+            func_name=func_name,
+            timeout=timeout,
+            request_options=request_options,
+        )
+
+
+class AsyncExtendedCodeClient(AsyncCodeClient):
+    """
+    `AsyncCodeClient` with parallel map over code runtimes.
+    """
+
+    def map(
+        self,
+        func_source: str,
+        iterable: typing.Iterable[typing.Any],
+        *,
+        language: MapLanguage = "python",
+        workers: int = 4,
+        chunksize: typing.Optional[int] = None,
+        ordered: bool = True,
+        sandboxes: typing.Optional[typing.Sequence["AsyncSandbox"]] = None,
+        max_retries: int = 2,
+        func_name: typing.Optional[str] = None,
+        timeout: typing.Optional[int] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> AsyncCodeMap:
+        """
+        Apply a function to every input inside sandbox runtimes, like `multiprocessing.Pool.imap`
+
+        Inputs are JSON-encoded in chunks and spread over `workers` stateful sessions
+        (`execute_code(stateful=True)`), which are closed when the map ends.
+
+        Parameters
+        ----------
+        func_source : str
+            Source defining the function (the last top-level `def` / `function`), or a callable expression
+            such as `lambda x: x * x` / `(x) => x * x`
+
+        iterable : typing.Iterable[typing.Any]
+            JSON-serializable inputs; results must be JSON-serializable too
+
+        language : MapLanguage
+            `python` or `javascript`
+
+        workers : int
+            Number of sessions running chunks concurrently
+
+        chunksize : typing.Optional[int]
+            Inputs per request; by default about four chunks per worker
+
+        ordered : bool
+            Yield results in input order; when False they are yielded as chunks complete
+
+        sandboxes : typing.Optional[typing.Sequence[AsyncSandbox]]
+            Sandboxes to spread the workers over; by default this client's sandbox only
+
+        max_retries : int
+            Times a chunk is retried, preferably on another worker, when its session fails to report
+
+        func_name : typing.Optional[str]
+            Name of the function in `func_source` when it is not the last one defined
+
+        timeout : typing.Optional[int]
+            Execution timeout in seconds per chunk
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        AsyncCodeMap
+            Async iterator of results; exceptions raised by the function are re-raised as `RuntimeError`
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            async for square in client.code.map("(x) => x * x", range(1000), language="javascript"):
+                print(square)
+
+
+        asyncio.run(main())
+        """
+        return AsyncCodeMap(
+            [self] if sandboxes is None else [sandbox.code for sandbox in sandboxes],
+            func_source=func_source,
+            iterable=iterable,
+            language=language,
+            workers=workers,
+            chunksize=chunksize,
+            ordered=ordered,
+            max_retries=max_retries,
+            func_name=func_name,
+            timeout=timeout,
+            request_options=request_options,
+        )
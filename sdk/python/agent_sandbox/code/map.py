@@ -0,0 +1,543 @@
+import ast
+import asyncio
+import json
+import math
+import queue
+import re
+import threading
+import time
+import typing
+import uuid
+
+from ..core.envelope import unwrap_response
+from ..core.request_options import RequestOptions
+
+if typing.TYPE_CHECKING:
+    from .client import AsyncCodeClient, CodeClient
+
+# this is used as the default value for optional parameters
+OMIT = typing.cast(typing.Any, ...)
+
+MapLanguage = typing.Literal["python", "javascript"]
+
+_MARKER = "__CODE_MAP__"
+_MARKER_LINE = re.compile(re.escape(_MARKER) + r"(\{.*\})")
+_JS_FUNCTION = re.compile(r"^\s*function\s+([A-Za-z_$][\w$]*)", re.MULTILINE)
+
+_PYTHON_SETUP = """
+try:
+    exec(%(defs)r, globals())
+    __agent_sandbox_map_fn = eval(%(expr)r, globals())
+    exec(%(runner)r, globals())
+except Exception as __agent_sandbox_map_error:
+    print(%(marker)r + __import__("json").dumps({"error": repr(__agent_sandbox_map_error), "setup": True}))
+"""
+
+_PYTHON_RUNNER = """
+def __agent_sandbox_map_run(payload):
+    import json
+    results = []
+    for index, item in enumerate(json.loads(payload)):
+        try:
+            results.append(__agent_sandbox_map_fn(item))
+        except Exception as e:
+            print(%(marker)r + json.dumps({"error": repr(e), "index": index}))
+            return
+    try:
+        print(%(marker)r + json.dumps({"results": results}))
+    except (TypeError, ValueError) as e:
+        print(%(marker)r + json.dumps({"error": "results are not JSON serializable: " + repr(e)}))
+"""
+
+_JAVASCRIPT_SETUP = """
+try {
+  (0, eval)(%(defs)s);
+  globalThis.__agentSandboxMapFn = (0, eval)(%(expr)s);
+  globalThis.__agentSandboxMapRun = function (payload) {
+    const results = [];
+    const items = JSON.parse(payload);
+    for (let index = 0; index < items.length; index++) {
+      try {
+        results.push(globalThis.__agentSandboxMapFn(items[index]));
+      } catch (e) {
+        console.log(%(marker)s + JSON.stringify({ error: String(e), index }));
+        return;
+      }
+    }
+    console.log(%(marker)s + JSON.stringify({ results }));
+  };
+} catch (e) {
+  console.log(%(marker)s + JSON.stringify({ error: String(e), setup: true }));
+}
+"""
+
+
+class _FunctionError(RuntimeError):
+    """
+    The function raised (or could not be defined); retrying elsewhere would fail the same way.
+    """
+
+
+class _ChunkLost(Exception):
+    """
+    The chunk did not report a result (session lost, timeout, transport error); it is retried.
+    """
+
+
+class _Chunk:
+    def __init__(self, index: int, start: int, items: typing.List[typing.Any]):
+        self.index = index
+        self.start = start
+        self.items = items
+        self.attempts = 0
+        self.failed_on: typing.Set[int] = set()
+
+
+class _Worker:
+    def __init__(self, worker_id: int, client: typing.Any):
+        self.worker_id = worker_id
+        self.client = client
+        self.session_id = uuid.uuid4().hex
+        self.ready = False
+        self.used = False
+
+    def reset(self) -> str:
+        """
+        Switches to a fresh session, returning the old one.
+        """
+        old, self.session_id, self.ready = self.session_id, uuid.uuid4().hex, False
+        return old
+
+
+def _setup_code(language: str, func_source: str, func_name: typing.Optional[str]) -> str:
+    if language == "python":
+        if func_name is not None:
+            defs, expr = func_source, func_name
+        else:
+            try:
+                tree = ast.parse(func_source.strip())
+            except SyntaxError as e:
+                raise ValueError(f"func_source is not valid Python: {e}") from e
+            names = [node.name for node in tree.body if isinstance(node, ast.FunctionDef)]
+            if len(tree.body) == 1 and isinstance(tree.body[0], ast.Expr):
+                defs, expr = "", func_source.strip()
+            elif names:
+                defs, expr = func_source, names[-1]
+            else:
+                raise ValueError("func_source must define a function or be a callable expression")
+        runner = _PYTHON_RUNNER % {"marker": _MARKER}
+        return _PYTHON_SETUP % {"defs": defs, "expr": expr, "runner": runner, "marker": _MARKER}
+    if language == "javascript":
+        names = _JS_FUNCTION.findall(func_source)
+        if func_name is not None:
+            defs, expr = func_source, func_name
+        elif names:
+            defs, expr = func_source, names[-1]
+        else:
+            defs, expr = "", "(" + func_source.strip().rstrip(";") + ")"
+        fields = {"defs": json.dumps(defs), "expr": json.dumps(expr), "marker": json.dumps(_MARKER)}
+        return _JAVASCRIPT_SETUP % fields
+    raise ValueError(f"Unsupported language {language!r}, expected python or javascript")
+
+
+def _call_code(language: str, payload: str) -> str:
+    if language == "python":
+        return f"__agent_sandbox_map_run({payload!r})"
+    return f"globalThis.__agentSandboxMapRun({json.dumps(payload)});"
+
+
+def _output_text(result: typing.Any) -> str:
+    text = [result.stdout or ""]
+    for output in result.outputs or []:
+        if isinstance(output, dict) and isinstance(output.get("text"), str):
+            text.append(output["text"])
+    return "\n".join(text)
+
+
+def _default_chunksize(count: int, workers: int) -> int:
+    # the same heuristic as multiprocessing.Pool.map: about four chunks per worker
+    return max(1, math.ceil(count / (workers * 4)))
+
+
+class _BaseCodeMap:
+    def __init__(
+        self,
+        *,
+        func_source: str,
+        iterable: typing.Iterable[typing.Any],
+        language: MapLanguage = "python",
+        workers: int = 4,
+        chunksize: typing.Optional[int] = None,
+        ordered: bool = True,
+        max_retries: int = 2,
+        func_name: typing.Optional[str] = None,
+        timeout: typing.Optional[int] = None,
+        close_sessions: bool = True,
+        request_options: typing.Optional[RequestOptions] = None,
+    ):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if chunksize is not None and chunksize < 1:
+            raise ValueError("chunksize must be at least 1")
+        self._setup = _setup_code(language, func_source, func_name)
+        self._language = language
+        items = list(iterable)
+        size = chunksize or _default_chunksize(len(items), workers)
+        self._chunks = [
+            _Chunk(i, start, items[start : start + size]) for i, start in enumerate(range(0, len(items), size))
+        ]
+        self._pending: typing.List[_Chunk] = list(self._chunks)
+        self._in_flight = 0
+        self._workers = workers
+        self._ordered = ordered
+        self._max_retries = max_retries
+        self._timeout = timeout
+        self._close_sessions = close_sessions
+        self._request_options = request_options
+        self._stopped = False
+        self.items = len(items)
+        self.retries = 0
+        self.elapsed: typing.Optional[float] = None
+
+    @property
+    def chunks(self) -> int:
+        return len(self._chunks)
+
+    @property
+    def items_per_second(self) -> typing.Optional[float]:
+        """
+        Throughput of the finished map, or None while it is running.
+        """
+        if not self.elapsed:
+            return None
+        return self.items / self.elapsed
+
+    def _code(self, worker: _Worker, chunk: _Chunk) -> str:
+        call = _call_code(self._language, json.dumps(chunk.items))
+        return call if worker.ready else self._setup + "\n" + call
+
+    def _results(self, worker: _Worker, chunk: _Chunk, response: typing.Any) -> typing.List[typing.Any]:
+        """
+        Results of a chunk, raising ``RuntimeError`` for errors raised by the function and ``_ChunkLost``
+        when the chunk produced no report.
+        """
+        try:
+            result = unwrap_response(response)
+        except Exception as e:
+            raise _ChunkLost(str(e)) from e
+        reports = [json.loads(match) for match in _MARKER_LINE.findall(_output_text(result))]
+        if not reports:
+            raise _ChunkLost(f"no result reported (status {getattr(result, 'status', None)!r})")
+        worker.ready = True
+        for report in reports:
+            if "error" in report:
+                index = report.get("index")
+                if report.get("setup"):
+                    raise _FunctionError(f"map function could not be defined: {report['error']}")
+                where = f"input {chunk.start + index}" if index is not None else f"the chunk at input {chunk.start}"
+                raise _FunctionError(f"map function failed on {where}: {report['error']}")
+        results = reports[-1]["results"]
+        if len(results) != len(chunk.items):
+            raise _ChunkLost(f"expected {len(chunk.items)} results, got {len(results)}")
+        return results
+
+    def _take(self, worker: _Worker) -> typing.Optional[_Chunk]:
+        """
+        Next pending chunk for ``worker``, preferring chunks that have not already failed on it.
+        """
+        if not self._pending:
+            return None
+        position = next((i for i, c in enumerate(self._pending) if worker.worker_id not in c.failed_on), 0)
+        self._in_flight += 1
+        return self._pending.pop(position)
+
+    def _requeue(self, worker: _Worker, chunk: _Chunk, error: BaseException) -> None:
+        chunk.attempts += 1
+        chunk.failed_on.add(worker.worker_id)
+        if chunk.attempts > self._max_retries:
+            raise RuntimeError(f"chunk {chunk.index} failed {chunk.attempts} times, last error: {error}") from error
+        self.retries += 1
+        self._pending.append(chunk)
+
+    def _finished(self) -> bool:
+        return self._stopped or (not self._pending and not self._in_flight)
+
+    def _execute_kwargs(self, worker: _Worker, chunk: _Chunk) -> typing.Dict[str, typing.Any]:
+        return dict(
+            language=self._language,
+            code=self._code(worker, chunk),
+            stateful=True,
+            session_id=worker.session_id,
+            timeout=OMIT if self._timeout is None else self._timeout,
+            request_options=self._request_options,
+        )
+
+    def _session_client(self, worker: _Worker) -> typing.Any:
+        """
+        The Jupyter or Node.js client owning the worker's stateful session, for closing it.
+        """
+        wrapper = worker.client._raw_client._client_wrapper
+        if self._language == "python":
+            from ..jupyter.client import AsyncJupyterClient, JupyterClient  # noqa: E402
+
+            sync = JupyterClient
+            asynchronous = AsyncJupyterClient
+        else:
+            from ..nodejs.client import AsyncNodejsClient, NodejsClient  # noqa: E402
+
+            sync = NodejsClient
+            asynchronous = AsyncNodejsClient
+        from ..core.client_wrapper import AsyncClientWrapper  # noqa: E402
+
+        return (asynchronous if isinstance(wrapper, AsyncClientWrapper) else sync)(client_wrapper=wrapper)
+
+    def _assign(self, clients: typing.Sequence[typing.Any]) -> typing.List[_Worker]:
+        if not clients:
+            raise ValueError("at least one sandbox is required")
+        return [_Worker(i, clients[i % len(clients)]) for i in range(self._workers)]
+
+
+class CodeMap(_BaseCodeMap):
+    """
+    Iterator over the results of applying a function to every input inside sandbox runtimes,
+    in the style of ``multiprocessing.Pool.imap``.
+
+    Inputs are split into chunks and JSON-encoded. Each of ``workers`` threads owns a stateful
+    ``code.execute_code`` session, on the given sandboxes in turn; the function is defined in a
+    session with its first chunk. Results are yielded in input order, or as chunks complete when
+    ``ordered=False``. A chunk whose session fails to report (transport error, lost session,
+    timeout) is retried, preferably on another worker, up to ``max_retries`` times; an exception
+    raised by the function itself is re-raised as ``RuntimeError`` without retrying.
+    """
+
+    def __init__(self, clients: typing.Sequence["CodeClient"], **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._worker_states = self._assign(clients)
+        self._cond = threading.Condition()
+        self._done: "queue.Queue[typing.Tuple[int, typing.Any]]" = queue.Queue()
+        self._threads: typing.List[threading.Thread] = []
+        self._iterator: typing.Optional[typing.Iterator[typing.Any]] = None
+
+    def __enter__(self) -> "CodeMap":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def __iter__(self) -> typing.Iterator[typing.Any]:
+        if self._iterator is None:
+            self._iterator = self._yield_results()
+        return self._iterator
+
+    def __next__(self) -> typing.Any:
+        return next(iter(self))
+
+    def close(self) -> None:
+        """
+        Stop handing out chunks, wait for the running ones and close the sessions.
+        """
+        if self._iterator is not None:
+            typing.cast(typing.Generator[typing.Any, None, None], self._iterator).close()
+        self._stop()
+
+    def _stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _yield_results(self) -> typing.Iterator[typing.Any]:
+        started = time.monotonic()
+        for worker in self._worker_states[: len(self._chunks)]:
+            thread = threading.Thread(target=self._work, args=(worker,), name="code-map", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        try:
+            buffered: typing.Dict[int, typing.List[typing.Any]] = {}
+            next_index = 0
+            for _ in range(len(self._chunks)):
+                index, outcome = self._done.get()
+                if isinstance(outcome, BaseException):
+                    raise outcome
+                if not self._ordered:
+                    yield from outcome
+                    continue
+                buffered[index] = outcome
+                while next_index in buffered:
+                    yield from buffered.pop(next_index)
+                    next_index += 1
+            self.elapsed = time.monotonic() - started
+        finally:
+            self._stop()
+
+    def _work(self, worker: _Worker) -> None:
+        try:
+            while True:
+                with self._cond:
+                    while not self._finished() and not self._pending:
+                        self._cond.wait()
+                    if self._finished():
+                        return
+                    chunk = typing.cast(_Chunk, self._take(worker))
+                try:
+                    worker.used = True
+                    response = worker.client.execute_code(**self._execute_kwargs(worker, chunk))
+                    results = self._results(worker, chunk, response)
+                except _FunctionError as e:
+                    self._fail(chunk, e)
+                    return
+                except Exception as e:
+                    self._close_session(worker, worker.reset())
+                    with self._cond:
+                        self._in_flight -= 1
+                        try:
+                            self._requeue(worker, chunk, e)
+                        except RuntimeError as fatal:
+                            self._stopped = True
+                            self._done.put((chunk.index, fatal))
+                        self._cond.notify_all()
+                    continue
+                with self._cond:
+                    self._in_flight -= 1
+                    self._cond.notify_all()
+                self._done.put((chunk.index, results))
+        finally:
+            if worker.used:
+                self._close_session(worker, worker.session_id)
+
+    def _fail(self, chunk: _Chunk, error: BaseException) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._stopped = True
+            self._cond.notify_all()
+        self._done.put((chunk.index, error))
+
+    def _close_session(self, worker: _Worker, session_id: str) -> None:
+        if not self._close_sessions:
+            return
+        try:
+            self._session_client(worker).delete_session(session_id, request_options=self._request_options)
+        except Exception:
+            pass
+
+
+class AsyncCodeMap(_BaseCodeMap):
+    """
+    Async counterpart of ``CodeMap``; workers are asyncio tasks.
+    """
+
+    def __init__(self, clients: typing.Sequence["AsyncCodeClient"], **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._worker_states = self._assign(clients)
+        self._cond: typing.Optional[asyncio.Condition] = None
+        self._done: typing.Optional["asyncio.Queue[typing.Tuple[int, typing.Any]]"] = None
+        self._tasks: typing.List["asyncio.Future[None]"] = []
+        self._iterator: typing.Optional[typing.AsyncIterator[typing.Any]] = None
+
+    async def __aenter__(self) -> "AsyncCodeMap":
+        return self
+
+    async def __aexit__(self, *args: typing.Any) -> None:
+        await self.close()
+
+    def __aiter__(self) -> typing.AsyncIterator[typing.Any]:
+        if self._iterator is None:
+            self._iterator = self._yield_results()
+        return self._iterator
+
+    async def __anext__(self) -> typing.Any:
+        return await self.__aiter__().__anext__()
+
+    async def close(self) -> None:
+        """
+        Stop handing out chunks, wait for the running ones and close the sessions.
+        """
+        if self._iterator is not None:
+            await typing.cast(typing.AsyncGenerator[typing.Any, None], self._iterator).aclose()
+        await self._stop()
+
+    async def _stop(self) -> None:
+        if self._cond is not None:
+            async with self._cond:
+                self._stopped = True
+                self._cond.notify_all()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _yield_results(self) -> typing.AsyncIterator[typing.Any]:
+        started = time.monotonic()
+        self._cond = asyncio.Condition()
+        self._done = asyncio.Queue()
+        for worker in self._worker_states[: len(self._chunks)]:
+            self._tasks.append(asyncio.ensure_future(self._work(worker)))
+        try:
+            buffered: typing.Dict[int, typing.List[typing.Any]] = {}
+            next_index = 0
+            for _ in range(len(self._chunks)):
+                index, outcome = await self._done.get()
+                if isinstance(outcome, BaseException):
+                    raise outcome
+                if not self._ordered:
+                    for result in outcome:
+                        yield result
+                    continue
+                buffered[index] = outcome
+                while next_index in buffered:
+                    for result in buffered.pop(next_index):
+                        yield result
+                    next_index += 1
+            self.elapsed = time.monotonic() - started
+        finally:
+            await self._stop()
+
+    async def _work(self, worker: _Worker) -> None:
+        cond = typing.cast(asyncio.Condition, self._cond)
+        done = typing.cast("asyncio.Queue[typing.Tuple[int, typing.Any]]", self._done)
+        try:
+            while True:
+                async with cond:
+                    while not self._finished() and not self._pending:
+                        await cond.wait()
+                    if self._finished():
+                        return
+                    chunk = typing.cast(_Chunk, self._take(worker))
+                try:
+                    worker.used = True
+                    response = await worker.client.execute_code(**self._execute_kwargs(worker, chunk))
+                    results = self._results(worker, chunk, response)
+                except _FunctionError as e:
+                    async with cond:
+                        self._in_flight -= 1
+                        self._stopped = True
+                        cond.notify_all()
+                    done.put_nowait((chunk.index, e))
+                    return
+                except Exception as e:
+                    await self._close_session(worker, worker.reset())
+                    async with cond:
+                        self._in_flight -= 1
+                        try:
+                            self._requeue(worker, chunk, e)
+                        except RuntimeError as fatal:
+                            self._stopped = True
+                            done.put_nowait((chunk.index, fatal))
+                        cond.notify_all()
+                    continue
+                async with cond:
+                    self._in_flight -= 1
+                    cond.notify_all()
+                done.put_nowait((chunk.index, results))
+        finally:
+            if worker.used:
+                await self._close_session(worker, worker.session_id)
+
+    async def _close_session(self, worker: _Worker, session_id: str) -> None:
+        if not self._close_sessions:
+            return
+        try:
+            await self._session_client(worker).delete_session(session_id, request_options=self._request_options)
+        except Exception:
+            pass
@@ -0,0 +1,17 @@
+import typing
+
+from .api_error import ApiError
+
+
+def unwrap_response(response: typing.Any) -> typing.Any:
+    """
+    Return the ``data`` of a ``{success, message, data}`` envelope.
+
+    Most sandbox endpoints report expected failures as ``HTTP 200`` with
+    ``success=false``; this raises ``ApiError`` with the whole envelope as its
+    body instead, so helpers built on top of the generated clients can treat
+    both failure modes the same way.
+    """
+    if getattr(response, "success", None) is False:
+        raise ApiError(body=response)
+    return getattr(response, "data", None)
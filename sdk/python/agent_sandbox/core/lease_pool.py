@@ -0,0 +1,567 @@
+import abc
+import asyncio
+import collections
+import contextlib
+import threading
+import time
+import typing
+
+from .request_options import RequestOptions
+
+KeyT = typing.TypeVar("KeyT", bound=typing.Hashable)
+LeaseT = typing.TypeVar("LeaseT", bound="_BaseLease")
+
+
+class _BaseLease:
+    """
+    A server-side session handed out by a lease pool.
+    """
+
+    def __init__(self, *, session_id: str, key: typing.Any):
+        self.session_id = session_id
+        self.key = key
+        self.uses = 0
+        self.dirty = False
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+
+    def mark_dirty(self) -> None:
+        self.dirty = True
+
+
+class _BaseLeasePool(typing.Generic[KeyT, LeaseT]):
+    """
+    Bookkeeping shared by the sync and async lease pools: idle sessions per key,
+    leased sessions by id and the number of sessions being created.
+    """
+
+    # what the pool hands out, for error messages
+    _noun = "session"
+
+    def __init__(
+        self,
+        *,
+        size: int,
+        max_uses: typing.Optional[int],
+        max_sessions: typing.Optional[int],
+        health_interval: float,
+        lease_timeout: float,
+        request_options: typing.Optional[RequestOptions],
+    ):
+        if size < 0:
+            raise ValueError("size must not be negative")
+        self._size = size
+        self._max_uses = max_uses
+        self._max_sessions = max_sessions
+        self._health_interval = health_interval
+        self._lease_timeout = lease_timeout
+        self._request_options = request_options
+        self._idle: typing.Dict[KeyT, typing.Deque[LeaseT]] = {}
+        self._leased: typing.Dict[str, LeaseT] = {}
+        self._pending = 0
+        self._closed = False
+        # sessions closed because they could not be reused
+        self._discarded = 0
+        self.hits = 0
+        self.misses = 0
+        self.created = 0
+        self.failed_probes = 0
+
+    @property
+    def idle(self) -> int:
+        return sum(len(leases) for leases in self._idle.values())
+
+    @property
+    def leased(self) -> int:
+        return len(self._leased)
+
+    @property
+    def owned(self) -> int:
+        """
+        Sessions created by this pool that are still open, including ones being created.
+        """
+        return self.idle + self.leased + self._pending
+
+    def _interval(self) -> float:
+        return self._health_interval
+
+    def _has_capacity(self) -> bool:
+        return self._max_sessions is None or self.owned < self._max_sessions
+
+    def _over_capacity(self) -> int:
+        return 0
+
+    def _take_idle(self, key: KeyT) -> typing.Optional[LeaseT]:
+        leases = self._idle.setdefault(key, collections.deque())
+        # most recently returned first: it is the least likely to have expired
+        return leases.pop() if leases else None
+
+    def _take_lru_idle(self, keep: typing.Optional[KeyT] = None) -> typing.Optional[LeaseT]:
+        candidates = [leases for key, leases in self._idle.items() if leases and key != keep]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda leases: leases[0].last_used_at).popleft()
+
+    def _put_idle(self, lease: LeaseT) -> None:
+        lease.last_used_at = time.monotonic()
+        self._idle.setdefault(lease.key, collections.deque()).append(lease)
+
+    def _should_discard(self, lease: LeaseT) -> bool:
+        return self._closed or lease.dirty or (self._max_uses is not None and lease.uses >= self._max_uses)
+
+    def _take_stale(self) -> typing.List[LeaseT]:
+        # sessions returned within the last interval were just reset; only probe the others
+        cutoff = time.monotonic() - self._interval()
+        stale = []
+        for leases in self._idle.values():
+            stale.extend(lease for lease in leases if lease.last_used_at <= cutoff)
+            fresh = [lease for lease in leases if lease.last_used_at > cutoff]
+            leases.clear()
+            leases.extend(fresh)
+        return stale
+
+    def _shortfall(self) -> typing.List[KeyT]:
+        return [key for key, leases in self._idle.items() if len(leases) < self._size]
+
+
+class _LeasePool(_BaseLeasePool[KeyT, LeaseT], abc.ABC):
+    """
+    Thread-based lease pool. Subclasses create (``_start``), prepare (``_setup``),
+    reset on return (``_renew``), probe and delete their sessions.
+    """
+
+    _thread_name = "lease-pool"
+
+    def __init__(self, **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._lock = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+
+    @abc.abstractmethod
+    def _start(self, key: KeyT) -> LeaseT:
+        """
+        Create a session for ``key``.
+        """
+
+    @abc.abstractmethod
+    def _setup(self, lease: LeaseT) -> bool:
+        """
+        Prepare a new session; ``False`` discards it.
+        """
+
+    @abc.abstractmethod
+    def _renew(self, lease: LeaseT) -> bool:
+        """
+        Reset a returned session for the next user; ``False`` discards it.
+        """
+
+    @abc.abstractmethod
+    def _probe(self, lease: LeaseT) -> bool:
+        """
+        Check that an idle session is still usable.
+        """
+
+    @abc.abstractmethod
+    def _delete(self, lease: LeaseT) -> None:
+        """
+        Close the session on the server.
+        """
+
+    def _prime(self) -> None:
+        """
+        Called before every acquire.
+        """
+
+    def _refresh(self) -> None:
+        """
+        Called before warming and at the start of every health check.
+        """
+
+    def start(self) -> None:
+        """
+        Start the background health-check thread.
+        """
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self._thread_name, daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """
+        Stop health checks and close every idle session; leased sessions are closed when returned.
+        """
+        self._closed = True
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            leases = [lease for idle in self._idle.values() for lease in idle]
+            self._idle.clear()
+            self._lock.notify_all()
+        for lease in leases:
+            self._discard(lease, count=False)
+
+    @contextlib.contextmanager
+    def _lease(self, key: KeyT) -> typing.Iterator[LeaseT]:
+        lease = self._acquire(key)
+        try:
+            yield lease
+        except BaseException:
+            lease.dirty = True
+            raise
+        finally:
+            self.release(lease)
+
+    def _acquire(self, key: KeyT) -> LeaseT:
+        deadline = time.monotonic() + self._lease_timeout
+        self._prime()
+        while True:
+            evicted = None
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError(f"{self._noun[0].upper()}{self._noun[1:]} pool is closed")
+                lease = self._take_idle(key)
+                if lease is not None:
+                    self.hits += 1
+                    self._leased[lease.session_id] = lease
+                    return lease
+                if not self._has_capacity():
+                    evicted = self._take_lru_idle(keep=key)
+                    if evicted is None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError(f"No {self._noun} became available within lease_timeout")
+                        self._lock.wait(remaining)
+                        continue
+                else:
+                    self.misses += 1
+                    self._pending += 1
+            if evicted is not None:
+                self._discard(evicted)
+                continue
+            lease = self._create(key)
+            with self._lock:
+                self._leased[lease.session_id] = lease
+            return lease
+
+    def release(self, lease: LeaseT) -> None:
+        """
+        Return a leased session, resetting it or closing it if it cannot be reused.
+        """
+        with self._lock:
+            if self._leased.pop(lease.session_id, None) is None:
+                return
+        lease.uses += 1
+        if not self._should_discard(lease) and self._renew(lease):
+            with self._lock:
+                if not self._closed:
+                    self._put_idle(lease)
+                    self._lock.notify()
+                    return
+        self._discard(lease)
+
+    def _warm(self, key: KeyT, count: typing.Optional[int]) -> int:
+        target = self._size if count is None else count
+        self._refresh()
+        created = 0
+        while True:
+            with self._lock:
+                idle = self._idle.setdefault(key, collections.deque())
+                if self._closed or len(idle) >= target or not self._has_capacity():
+                    return created
+                self._pending += 1
+            lease = self._create(key)
+            with self._lock:
+                self._put_idle(lease)
+                self._lock.notify()
+            created += 1
+
+    def _create(self, key: KeyT) -> LeaseT:
+        lease: typing.Optional[LeaseT] = None
+        try:
+            lease = self._start(key)
+            self.created += 1
+            if not self._setup(lease):
+                raise RuntimeError(f"Failed to prepare {self._noun} {lease.session_id}")
+            return lease
+        except BaseException:
+            if lease is not None:
+                self._cleanup(lease)
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._lock.notify()
+
+    def _discard(self, lease: LeaseT, count: bool = True) -> None:
+        if count:
+            self._discarded += 1
+        self._cleanup(lease)
+        with self._lock:
+            self._lock.notify()
+
+    def _cleanup(self, lease: LeaseT) -> None:
+        try:
+            self._delete(lease)
+        except Exception:
+            pass
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval()):
+            try:
+                self.check()
+            except Exception:
+                pass
+
+    def check(self) -> None:
+        """
+        Run one health-check round; called periodically by the background thread.
+        """
+        self._refresh()
+        with self._lock:
+            excess = [self._take_lru_idle() for _ in range(self._over_capacity())]
+            probing = self._take_stale()
+        for lease in excess:
+            if lease is not None:
+                self._discard(lease)
+        for lease in probing:
+            if not self._probe(lease):
+                self.failed_probes += 1
+                self._discard(lease)
+                continue
+            with self._lock:
+                self._put_idle(lease)
+                self._lock.notify()
+        with self._lock:
+            shortfall = self._shortfall()
+        for key in shortfall:
+            if self._stop.is_set():
+                return
+            self._warm(key, None)
+
+
+class _AsyncLeasePool(_BaseLeasePool[KeyT, LeaseT], abc.ABC):
+    """
+    Async counterpart of ``_LeasePool``; health checks run as an asyncio task.
+    """
+
+    def __init__(self, **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._lock: typing.Optional[asyncio.Condition] = None
+        self._task: typing.Optional["asyncio.Task[None]"] = None
+
+    @abc.abstractmethod
+    async def _start(self, key: KeyT) -> LeaseT:
+        """
+        Create a session for ``key``.
+        """
+
+    @abc.abstractmethod
+    async def _setup(self, lease: LeaseT) -> bool:
+        """
+        Prepare a new session; ``False`` discards it.
+        """
+
+    @abc.abstractmethod
+    async def _renew(self, lease: LeaseT) -> bool:
+        """
+        Reset a returned session for the next user; ``False`` discards it.
+        """
+
+    @abc.abstractmethod
+    async def _probe(self, lease: LeaseT) -> bool:
+        """
+        Check that an idle session is still usable.
+        """
+
+    @abc.abstractmethod
+    async def _delete(self, lease: LeaseT) -> None:
+        """
+        Close the session on the server.
+        """
+
+    async def _prime(self) -> None:
+        """
+        Called before every acquire.
+        """
+
+    async def _refresh(self) -> None:
+        """
+        Called before warming and at the start of every health check.
+        """
+
+    @property
+    def _cond(self) -> asyncio.Condition:
+        # created lazily so the pool can be constructed outside a running loop
+        if self._lock is None:
+            self._lock = asyncio.Condition()
+        return self._lock
+
+    def start(self) -> None:
+        """
+        Start the background health-check task.
+        """
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def close(self) -> None:
+        """
+        Stop health checks and close every idle session; leased sessions are closed when returned.
+        """
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        async with self._cond:
+            leases = [lease for idle in self._idle.values() for lease in idle]
+            self._idle.clear()
+            self._cond.notify_all()
+        await asyncio.gather(*(self._cleanup(lease) for lease in leases))
+
+    @contextlib.asynccontextmanager
+    async def _lease(self, key: KeyT) -> typing.AsyncIterator[LeaseT]:
+        lease = await self._acquire(key)
+        try:
+            yield lease
+        except BaseException:
+            lease.dirty = True
+            raise
+        finally:
+            await self.release(lease)
+
+    async def _acquire(self, key: KeyT) -> LeaseT:
+        deadline = time.monotonic() + self._lease_timeout
+        await self._prime()
+        while True:
+            evicted = None
+            async with self._cond:
+                if self._closed:
+                    raise RuntimeError(f"{self._noun[0].upper()}{self._noun[1:]} pool is closed")
+                lease = self._take_idle(key)
+                if lease is not None:
+                    self.hits += 1
+                    self._leased[lease.session_id] = lease
+                    return lease
+                if not self._has_capacity():
+                    evicted = self._take_lru_idle(keep=key)
+                    if evicted is None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError(f"No {self._noun} became available within lease_timeout")
+                        try:
+                            await asyncio.wait_for(self._cond.wait(), remaining)
+                        except asyncio.TimeoutError:
+                            pass
+                        continue
+                else:
+                    self.misses += 1
+                    self._pending += 1
+            if evicted is not None:
+                await self._discard(evicted)
+                continue
+            lease = await self._create(key)
+            async with self._cond:
+                self._leased[lease.session_id] = lease
+            return lease
+
+    async def release(self, lease: LeaseT) -> None:
+        """
+        Return a leased session, resetting it or closing it if it cannot be reused.
+        """
+        async with self._cond:
+            if self._leased.pop(lease.session_id, None) is None:
+                return
+        lease.uses += 1
+        if not self._should_discard(lease) and await self._renew(lease):
+            async with self._cond:
+                if not self._closed:
+                    self._put_idle(lease)
+                    self._cond.notify()
+                    return
+        await self._discard(lease)
+
+    async def _warm(self, key: KeyT, count: typing.Optional[int]) -> int:
+        target = self._size if count is None else count
+        await self._refresh()
+        async with self._cond:
+            idle = self._idle.setdefault(key, collections.deque())
+            wanted = 0
+            while not self._closed and len(idle) + wanted < target and self._has_capacity():
+                wanted += 1
+                self._pending += 1
+        results = await asyncio.gather(*(self._create(key) for _ in range(wanted)), return_exceptions=True)
+        leases = [lease for lease in results if not isinstance(lease, BaseException)]
+        async with self._cond:
+            for lease in leases:
+                self._put_idle(lease)
+            self._cond.notify(len(leases))
+        errors = [error for error in results if isinstance(error, BaseException)]
+        if errors and not leases:
+            raise errors[0]
+        return len(leases)
+
+    async def _create(self, key: KeyT) -> LeaseT:
+        lease: typing.Optional[LeaseT] = None
+        try:
+            lease = await self._start(key)
+            self.created += 1
+            if not await self._setup(lease):
+                raise RuntimeError(f"Failed to prepare {self._noun} {lease.session_id}")
+            return lease
+        except BaseException:
+            if lease is not None:
+                await self._cleanup(lease)
+            raise
+        finally:
+            async with self._cond:
+                self._pending -= 1
+                self._cond.notify()
+
+    async def _discard(self, lease: LeaseT, count: bool = True) -> None:
+        if count:
+            self._discarded += 1
+        await self._cleanup(lease)
+        async with self._cond:
+            self._cond.notify()
+
+    async def _cleanup(self, lease: LeaseT) -> None:
+        try:
+            await self._delete(lease)
+        except Exception:
+            pass
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval())
+            try:
+                await self.check()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass
+
+    async def check(self) -> None:
+        """
+        Run one health-check round; called periodically by the background task.
+        """
+        await self._refresh()
+        async with self._cond:
+            excess = [self._take_lru_idle() for _ in range(self._over_capacity())]
+            probing = self._take_stale()
+        await asyncio.gather(*(self._discard(lease) for lease in excess if lease is not None))
+        healthy = await asyncio.gather(*(self._probe(lease) for lease in probing))
+        for lease, ok in zip(probing, healthy):
+            if ok:
+                async with self._cond:
+                    self._put_idle(lease)
+                    self._cond.notify()
+            else:
+                self.failed_probes += 1
+                await self._discard(lease)
+        async with self._cond:
+            shortfall = self._shortfall()
+        for key in shortfall:
+            await self._warm(key, None)
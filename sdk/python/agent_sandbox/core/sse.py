@@ -0,0 +1,107 @@
+import typing
+
+import pydantic
+from .pydantic_utilities import IS_PYDANTIC_V2, UniversalBaseModel
+
+
+class ServerSentEvent(UniversalBaseModel):
+    """
+    A single event decoded from a `text/event-stream` response
+    """
+
+    event: str = pydantic.Field(default="message")
+    """
+    Event type (`message` when the stream does not name it)
+    """
+
+    data: str = pydantic.Field(default="")
+    """
+    Event payload; multiple `data:` lines are joined with newlines
+    """
+
+    id: typing.Optional[str] = pydantic.Field(default=None)
+    """
+    Event id, to be sent back as `Last-Event-ID` when reconnecting
+    """
+
+    retry: typing.Optional[int] = pydantic.Field(default=None)
+    """
+    Reconnection delay requested by the server, in milliseconds
+    """
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+class SSEDecoder:
+    """
+    Incremental decoder for the `text/event-stream` format.
+
+    Feed it one line at a time (without the line terminator); it returns an event
+    whenever a blank line completes one.
+    """
+
+    def __init__(self) -> None:
+        self._event: typing.Optional[str] = None
+        self._data: typing.List[str] = []
+        self._id: typing.Optional[str] = None
+        self._retry: typing.Optional[int] = None
+
+    def decode(self, line: str) -> typing.Optional[ServerSentEvent]:
+        if not line:
+            if self._event is None and not self._data and self._id is None and self._retry is None:
+                return None
+            sse = ServerSentEvent(
+                event=self._event or "message",
+                data="\n".join(self._data),
+                id=self._id,
+                retry=self._retry,
+            )
+            self._event = None
+            self._data = []
+            self._id = None
+            self._retry = None
+            return sse
+
+        if line.startswith(":"):
+            return None
+
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+
+        if field == "event":
+            self._event = value
+        elif field == "data":
+            self._data.append(value)
+        elif field == "id":
+            if "\0" not in value:
+                self._id = value
+        elif field == "retry":
+            try:
+                self._retry = int(value)
+            except (TypeError, ValueError):
+                pass
+        return None
+
+
+def iter_sse(lines: typing.Iterator[str]) -> typing.Iterator[ServerSentEvent]:
+    decoder = SSEDecoder()
+    for line in lines:
+        sse = decoder.decode(line.rstrip("\r\n"))
+        if sse is not None:
+            yield sse
+
+
+async def aiter_sse(lines: typing.AsyncIterator[str]) -> typing.AsyncIterator[ServerSentEvent]:
+    decoder = SSEDecoder()
+    async for line in lines:
+        sse = decoder.decode(line.rstrip("\r\n"))
+        if sse is not None:
+            yield sse
@@ -0,0 +1,347 @@
+import hashlib
+import posixpath
+import shlex
+import typing
+import uuid
+
+from ..core.api_error import ApiError
+from ..core.envelope import unwrap_response
+from ..core.request_options import RequestOptions
+from ..errors.conflict_error import ConflictError
+from .types.str_replace_editor_request_replace_mode import StrReplaceEditorRequestReplaceMode
+
+if typing.TYPE_CHECKING:
+    from ..bash.client import AsyncBashClient, BashClient
+    from .client import AsyncFileClient, FileClient
+
+# exit code used by the commit script when the target no longer matches the fetched version
+_CONFLICT_EXIT_CODE = 3
+
+
+def _commit_script(path: str, tmp_path: str, expected_sha256: str) -> str:
+    target = shlex.quote(path)
+    tmp = shlex.quote(tmp_path)
+    return (
+        f'if [ "$(sha256sum -- {target} | cut -d" " -f1)" != "{expected_sha256}" ]; then '
+        f"rm -f -- {tmp}; exit {_CONFLICT_EXIT_CODE}; fi; "
+        f"chmod --reference={target} -- {tmp} 2>/dev/null; "
+        f"mv -f -- {tmp} {target} || {{ rm -f -- {tmp}; exit 1; }}"
+    )
+
+
+def _line_numbers(content: str, needle: str) -> typing.List[int]:
+    lines = []
+    start = content.find(needle)
+    while start >= 0:
+        lines.append(content.count("\n", 0, start) + 1)
+        start = content.find(needle, start + 1)
+    return lines
+
+
+class _BaseEditTransaction:
+    def __init__(self, *, path: str, request_options: typing.Optional[RequestOptions] = None):
+        self._path = path
+        self._request_options = request_options
+        self._original: typing.Optional[str] = None
+        self._content: typing.Optional[str] = None
+        self._sha256: typing.Optional[str] = None
+        self._edits = 0
+        self._committed = False
+        # bash session the commit scripts run in; created by the first commit and closed with the transaction
+        self._session_id: typing.Optional[str] = None
+        self._entered = False
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def content(self) -> str:
+        """
+        Working copy of the file with all edits so far applied.
+        """
+        if self._content is None:
+            raise RuntimeError("Edit transaction has not been started")
+        return self._content
+
+    @property
+    def sha256(self) -> typing.Optional[str]:
+        """
+        Hex digest of the fetched version, or of the written version after commit.
+        """
+        return self._sha256
+
+    @property
+    def edits(self) -> int:
+        return self._edits
+
+    @property
+    def committed(self) -> bool:
+        return self._committed
+
+    def str_replace(
+        self,
+        old_str: str,
+        new_str: str = "",
+        *,
+        replace_mode: typing.Optional[StrReplaceEditorRequestReplaceMode] = None,
+    ) -> int:
+        """
+        Replace ``old_str`` in the working copy, with the same rules as
+        ``str_replace_editor(command="str_replace")``: without ``replace_mode``
+        the match must be unique. Returns the number of replacements made.
+        """
+        content = self.content
+        occurrences = content.count(old_str) if old_str else 0
+        if occurrences == 0:
+            raise ValueError(
+                f"No replacement was performed, old_str `{old_str}` did not appear verbatim in {self._path}."
+            )
+        if replace_mode is None and occurrences > 1:
+            raise ValueError(
+                f"No replacement was performed. Multiple occurrences of old_str `{old_str}` "
+                f"in lines {_line_numbers(content, old_str)}. Please ensure it is unique."
+            )
+        if replace_mode == "ALL":
+            self._content = content.replace(old_str, new_str)
+        elif replace_mode == "LAST":
+            head, _, tail = content.rpartition(old_str)
+            self._content = head + new_str + tail
+            occurrences = 1
+        else:
+            self._content = content.replace(old_str, new_str, 1)
+            occurrences = 1
+        self._edits += 1
+        return occurrences
+
+    def insert(self, insert_line: int, new_str: str) -> None:
+        """
+        Insert ``new_str`` AFTER line ``insert_line`` (1-based; ``0`` inserts at
+        the top), like ``str_replace_editor(command="insert")``.
+        """
+        lines = self.content.split("\n")
+        if insert_line < 0 or insert_line > len(lines):
+            raise ValueError(
+                f"Invalid `insert_line` parameter: {insert_line}. "
+                f"It should be within the range of lines of the file: [0, {len(lines)}]"
+            )
+        self._content = "\n".join(lines[:insert_line] + new_str.split("\n") + lines[insert_line:])
+        self._edits += 1
+
+    def rollback(self) -> None:
+        """
+        Discard all pending edits; nothing has been written to the sandbox yet.
+        """
+        self._content = self._original
+        self._edits = 0
+
+    def _begin(self, raw: bytes) -> None:
+        self._original = self._content = raw.decode("utf-8")
+        self._sha256 = hashlib.sha256(raw).hexdigest()
+        self._edits = 0
+        self._committed = False
+
+    def _session(self) -> typing.Dict[str, str]:
+        return {} if self._session_id is None else {"session_id": self._session_id}
+
+    def _tmp_path(self) -> str:
+        directory, name = posixpath.split(self._path)
+        return posixpath.join(directory, f".{name}.{uuid.uuid4().hex[:12]}.edit")
+
+    def _finish(self, exec_result: typing.Any, expected_sha256: str, encoded: bytes) -> None:
+        # remember the session before checking for failure, so it is closed either way
+        self._session_id = getattr(getattr(exec_result, "data", None), "session_id", None) or self._session_id
+        data = unwrap_response(exec_result)
+        if data.exit_code == _CONFLICT_EXIT_CODE:
+            raise ConflictError(
+                body={
+                    "path": self._path,
+                    "message": f"{self._path} changed since it was fetched for editing",
+                    "expected_sha256": expected_sha256,
+                }
+            )
+        if data.exit_code != 0:
+            raise ApiError(body=exec_result)
+        self._original = self._content
+        self._sha256 = hashlib.sha256(encoded).hexdigest()
+        self._edits = 0
+        self._committed = True
+
+
+class EditTransaction(_BaseEditTransaction):
+    """
+    Collects ``str_replace``/``insert`` edits against one fetched copy of a file
+    and applies them with a single atomic write.
+
+    Edits are validated locally as they are made, so a bad edit fails before
+    anything touches the sandbox. On commit the new content is written to a
+    temporary file next to the target and renamed over it only if the target
+    still hashes to the fetched version; otherwise ``ConflictError`` is raised
+    and the file is left untouched. Leaving the ``with`` block with an exception
+    discards the pending edits. The check-and-rename runs in one bash session
+    owned by the transaction, closed when the ``with`` block exits (or after
+    ``commit`` when used without ``with``).
+
+    Examples
+    --------
+    from agent_sandbox import Sandbox
+
+    client = Sandbox(
+        base_url="https://yourhost.com/path/to/api",
+    )
+    with client.file.edit(path="/home/gem/app.py") as tx:
+        tx.str_replace("def old_name(", "def new_name(")
+        tx.insert(0, "import logging")
+    """
+
+    def __init__(self, file_client: "FileClient", bash_client: "BashClient", **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._file_client = file_client
+        self._bash_client = bash_client
+
+    def __enter__(self) -> "EditTransaction":
+        self.begin()
+        self._entered = True
+        return self
+
+    def __exit__(self, exc_type: typing.Any, *args: typing.Any) -> None:
+        try:
+            if exc_type is None:
+                self.commit()
+            else:
+                self.rollback()
+        finally:
+            self._entered = False
+            self.close()
+
+    def close(self) -> None:
+        """
+        Close the bash session the commits ran in, if any.
+        """
+        session_id, self._session_id = self._session_id, None
+        if session_id is not None:
+            try:
+                self._bash_client.close_session(session_id, request_options=self._request_options)
+            except Exception:
+                pass
+
+    def begin(self) -> None:
+        """
+        Fetch the current version of the file; called by ``__enter__``.
+        """
+        self._begin(b"".join(self._file_client.download_file(path=self._path, request_options=self._request_options)))
+
+    def commit(self) -> None:
+        """
+        Atomically write the working copy if any edits are pending.
+        """
+        if self._sha256 is None:
+            raise RuntimeError("Edit transaction has not been started")
+        if self._edits == 0:
+            return
+        encoded = self.content.encode("utf-8")
+        tmp_path = self._tmp_path()
+        unwrap_response(
+            self._file_client.write_file(file=tmp_path, content=self.content, request_options=self._request_options)
+        )
+        try:
+            result = self._bash_client.exec(
+                command=_commit_script(self._path, tmp_path, self._sha256),
+                request_options=self._request_options,
+                **self._session(),
+            )
+            self._finish(result, self._sha256, encoded)
+        finally:
+            if not self._entered:
+                self.close()
+
+
+class AsyncEditTransaction(_BaseEditTransaction):
+    """
+    Async counterpart of ``EditTransaction``.
+
+    Examples
+    --------
+    import asyncio
+
+    from agent_sandbox import AsyncSandbox
+
+    client = AsyncSandbox(
+        base_url="https://yourhost.com/path/to/api",
+    )
+
+
+    async def main() -> None:
+        async with client.file.edit(path="/home/gem/app.py") as tx:
+            tx.str_replace("def old_name(", "def new_name(")
+
+
+    asyncio.run(main())
+    """
+
+    def __init__(self, file_client: "AsyncFileClient", bash_client: "AsyncBashClient", **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._file_client = file_client
+        self._bash_client = bash_client
+
+    async def __aenter__(self) -> "AsyncEditTransaction":
+        await self.begin()
+        self._entered = True
+        return self
+
+    async def __aexit__(self, exc_type: typing.Any, *args: typing.Any) -> None:
+        try:
+            if exc_type is None:
+                await self.commit()
+            else:
+                self.rollback()
+        finally:
+            self._entered = False
+            await self.close()
+
+    async def close(self) -> None:
+        """
+        Close the bash session the commits ran in, if any.
+        """
+        session_id, self._session_id = self._session_id, None
+        if session_id is not None:
+            try:
+                await self._bash_client.close_session(session_id, request_options=self._request_options)
+            except Exception:
+                pass
+
+    async def begin(self) -> None:
+        """
+        Fetch the current version of the file; called by ``__aenter__``.
+        """
+        chunks = [
+            chunk
+            async for chunk in self._file_client.download_file(path=self._path, request_options=self._request_options)
+        ]
+        self._begin(b"".join(chunks))
+
+    async def commit(self) -> None:
+        """
+        Atomically write the working copy if any edits are pending.
+        """
+        if self._sha256 is None:
+            raise RuntimeError("Edit transaction has not been started")
+        if self._edits == 0:
+            return
+        encoded = self.content.encode("utf-8")
+        tmp_path = self._tmp_path()
+        unwrap_response(
+            await self._file_client.write_file(
+                file=tmp_path, content=self.content, request_options=self._request_options
+            )
+        )
+        try:
+            result = await self._bash_client.exec(
+                command=_commit_script(self._path, tmp_path, self._sha256),
+                request_options=self._request_options,
+                **self._session(),
+            )
+            self._finish(result, self._sha256, encoded)
+        finally:
+            if not self._entered:
+                await self.close()
@@ -0,0 +1,243 @@
+import typing
+
+from ..bash.client import AsyncBashClient, BashClient
+from ..core.request_options import RequestOptions
+from .client import AsyncFileClient, FileClient
+from .edit import AsyncEditTransaction, EditTransaction
+from .reader import AsyncFileReader, FileReader
+
+
+class ExtendedFileClient(FileClient):
+    """
+    `FileClient` with paged line reads and atomic edit transactions.
+    """
+
+    def reader(
+        self,
+        *,
+        path: str,
+        start_line: int = 0,
+        page_lines: int = 1000,
+        prefetch: bool = True,
+        follow: bool = False,
+        follow_timeout: int = 30,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> FileReader:
+        """
+        Page through a (potentially huge) file by line ranges
+
+        The next page is prefetched while the current one is consumed, and byte
+        offsets seen at page boundaries are reused so later reads seek directly.
+
+        Parameters
+        ----------
+        path : str
+            Absolute file path
+
+        start_line : int
+            Line to start reading from (0-based)
+
+        page_lines : int
+            Number of lines per page
+
+        prefetch : bool
+            Whether to fetch the next page concurrently with consuming the current one
+
+        follow : bool
+            Keep waiting for appended lines at end of file instead of stopping (`tail -f`)
+
+        follow_timeout : int
+            Maximum seconds to block in `watch_wait` before re-checking the file
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        FileReader
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        with client.file.reader(path="/var/log/app.log") as reader:
+            for page in reader:
+                print("".join(page.lines), end="")
+        """
+        return FileReader(
+            self,
+            path=path,
+            start_line=start_line,
+            page_lines=page_lines,
+            prefetch=prefetch,
+            follow=follow,
+            follow_timeout=follow_timeout,
+            request_options=request_options,
+        )
+
+    def edit(self, *, path: str, request_options: typing.Optional[RequestOptions] = None) -> EditTransaction:
+        """
+        Batch `str_replace`/`insert` edits to one file into a single atomic write
+
+        The file is fetched once when the `with` block is entered; edits are
+        validated locally and written together when it exits cleanly, after
+        checking that the file has not changed in the meantime.
+
+        Parameters
+        ----------
+        path : str
+            Absolute file path
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        EditTransaction
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        with client.file.edit(path="/home/gem/app.py") as tx:
+            tx.str_replace("def old_name(", "def new_name(")
+            tx.insert(0, "import logging")
+        """
+        return EditTransaction(
+            self,
+            BashClient(client_wrapper=self._raw_client._client_wrapper),
+            path=path,
+            request_options=request_options,
+        )
+
+
+class AsyncExtendedFileClient(AsyncFileClient):
+    """
+    `AsyncFileClient` with paged line reads and atomic edit transactions.
+    """
+
+    def reader(
+        self,
+        *,
+        path: str,
+        start_line: int = 0,
+        page_lines: int = 1000,
+        prefetch: bool = True,
+        follow: bool = False,
+        follow_timeout: int = 30,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> AsyncFileReader:
+        """
+        Page through a (potentially huge) file by line ranges
+
+        The next page is prefetched while the current one is consumed, and byte
+        offsets seen at page boundaries are reused so later reads seek directly.
+
+        Parameters
+        ----------
+        path : str
+            Absolute file path
+
+        start_line : int
+            Line to start reading from (0-based)
+
+        page_lines : int
+            Number of lines per page
+
+        prefetch : bool
+            Whether to fetch the next page concurrently with consuming the current one
+
+        follow : bool
+            Keep waiting for appended lines at end of file instead of stopping (`tail -f`)
+
+        follow_timeout : int
+            Maximum seconds to block in `watch_wait` before re-checking the file
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        AsyncFileReader
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            async with client.file.reader(path="/var/log/app.log", follow=True) as reader:
+                async for page in reader:
+                    print("".join(page.lines), end="")
+
+
+        asyncio.run(main())
+        """
+        return AsyncFileReader(
+            self,
+            path=path,
+            start_line=start_line,
+            page_lines=page_lines,
+            prefetch=prefetch,
+            follow=follow,
+            follow_timeout=follow_timeout,
+            request_options=request_options,
+        )
+
+    def edit(self, *, path: str, request_options: typing.Optional[RequestOptions] = None) -> AsyncEditTransaction:
+        """
+        Batch `str_replace`/`insert` edits to one file into a single atomic write
+
+        The file is fetched once when the `async with` block is entered; edits are
+        validated locally and written together when it exits cleanly, after
+        checking that the file has not changed in the meantime.
+
+        Parameters
+        ----------
+        path : str
+            Absolute file path
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        AsyncEditTransaction
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            async with client.file.edit(path="/home/gem/app.py") as tx:
+                tx.str_replace("def old_name(", "def new_name(")
+                tx.insert(0, "import logging")
+
+
+        asyncio.run(main())
+        """
+        return AsyncEditTransaction(
+            self,
+            AsyncBashClient(client_wrapper=self._raw_client._client_wrapper),
+            path=path,
+            request_options=request_options,
+        )
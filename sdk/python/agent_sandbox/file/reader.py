@@ -0,0 +1,453 @@
+import asyncio
+import concurrent.futures
+import typing
+
+import pydantic
+from ..core.api_error import ApiError
+from ..core.envelope import unwrap_response
+from ..core.pydantic_utilities import IS_PYDANTIC_V2, UniversalBaseModel
+from ..core.request_options import RequestOptions
+
+if typing.TYPE_CHECKING:
+    from .client import AsyncFileClient, FileClient
+
+
+class FilePage(UniversalBaseModel):
+    """
+    A contiguous range of lines read from a file
+    """
+
+    path: str = pydantic.Field()
+    """
+    Path of the file the page was read from
+    """
+
+    start_line: int = pydantic.Field()
+    """
+    First line of the page (0-based)
+    """
+
+    lines: typing.List[str] = pydantic.Field()
+    """
+    Lines of the page, each including its trailing newline when present
+    """
+
+    byte_offset: typing.Optional[int] = pydantic.Field(default=None)
+    """
+    Byte offset of `start_line`, when known
+    """
+
+    end_byte_offset: typing.Optional[int] = pydantic.Field(default=None)
+    """
+    Byte offset just past the last line of the page, when known
+    """
+
+    @property
+    def end_line(self) -> int:
+        return self.start_line + len(self.lines)
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+class _LineIndex:
+    """
+    Sparse, size-capped map of line number -> byte offset.
+
+    Entries are recorded at page boundaries, so the index grows with the number
+    of pages read rather than the size of the file; the oldest entries are
+    evicted once ``max_entries`` is reached.
+    """
+
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._offsets: typing.Dict[int, int] = {}
+
+    def add(self, line: int, offset: typing.Optional[int]) -> None:
+        if offset is None or line in self._offsets:
+            return
+        if len(self._offsets) >= self._max_entries:
+            del self._offsets[next(iter(self._offsets))]
+        self._offsets[line] = offset
+
+    def get(self, line: int) -> typing.Optional[int]:
+        return self._offsets.get(line)
+
+    def floor(self, line: int) -> typing.Optional[typing.Tuple[int, int]]:
+        best: typing.Optional[typing.Tuple[int, int]] = None
+        for known_line, offset in self._offsets.items():
+            if known_line <= line and (best is None or known_line > best[0]):
+                best = (known_line, offset)
+        return best
+
+
+class _LineSplitter:
+    """
+    Incrementally splits a byte stream into at most ``limit`` lines after
+    skipping ``skip`` leading lines, tracking how many bytes were consumed.
+    """
+
+    def __init__(self, limit: int, skip: int = 0):
+        self.lines: typing.List[str] = []
+        self.skipped_bytes = 0
+        self.consumed_bytes = 0
+        self._limit = limit
+        self._skip = skip
+        self._buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Returns True once ``limit`` lines have been collected.
+        """
+        self._buffer += chunk
+        start = 0
+        while len(self.lines) < self._limit:
+            end = self._buffer.find(b"\n", start)
+            if end < 0:
+                break
+            raw = bytes(self._buffer[start : end + 1])
+            start = end + 1
+            self.consumed_bytes += len(raw)
+            if self._skip > 0:
+                self._skip -= 1
+                self.skipped_bytes += len(raw)
+            else:
+                self.lines.append(raw.decode("utf-8"))
+        del self._buffer[:start]
+        return len(self.lines) >= self._limit
+
+    def finish(self, keep_partial: bool) -> None:
+        if keep_partial and self._buffer and self._skip == 0 and len(self.lines) < self._limit:
+            self.consumed_bytes += len(self._buffer)
+            self.lines.append(bytes(self._buffer).decode("utf-8"))
+        self._buffer = bytearray()
+
+
+def _split_lines(content: str, keep_partial: bool) -> typing.List[str]:
+    lines = content.split("\n")
+    tail = lines.pop()
+    lines = [line + "\n" for line in lines]
+    if tail and keep_partial:
+        lines.append(tail)
+    return lines
+
+
+def _with_range(request_options: typing.Optional[RequestOptions], offset: int) -> RequestOptions:
+    options = typing.cast(RequestOptions, dict(request_options or {}))
+    options["additional_headers"] = {**(options.get("additional_headers") or {}), "Range": f"bytes={offset}-"}
+    return options
+
+
+class _BaseFileReader:
+    def __init__(
+        self,
+        *,
+        path: str,
+        start_line: int = 0,
+        page_lines: int = 1000,
+        prefetch: bool = True,
+        follow: bool = False,
+        follow_timeout: int = 30,
+        max_index_entries: int = 4096,
+        request_options: typing.Optional[RequestOptions] = None,
+    ):
+        if page_lines <= 0:
+            raise ValueError("page_lines must be positive")
+        self._path = path
+        self._start_line = start_line
+        self._page_lines = page_lines
+        self._prefetch = prefetch
+        self._follow = follow
+        self._follow_timeout = follow_timeout
+        self._request_options = request_options
+        self._index = _LineIndex(max_index_entries)
+        self._ranged = True
+        self._closed = False
+        if start_line == 0:
+            self._index.add(0, 0)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def offset_of(self, line: int) -> typing.Optional[int]:
+        """
+        Byte offset of ``line`` if it has been observed at a page boundary.
+        """
+        return self._index.get(line)
+
+    def _range_base(self, start_line: int) -> typing.Optional[typing.Tuple[int, int]]:
+        if not self._ranged:
+            return None
+        base = self._index.floor(start_line)
+        if base is None or start_line - base[0] > self._page_lines:
+            return None
+        return base
+
+    def _page_from_splitter(self, start_line: int, base_offset: int, splitter: _LineSplitter) -> FilePage:
+        page = FilePage(
+            path=self._path,
+            start_line=start_line,
+            lines=splitter.lines,
+            byte_offset=base_offset + splitter.skipped_bytes,
+            end_byte_offset=base_offset + splitter.consumed_bytes,
+        )
+        self._record(page)
+        return page
+
+    def _page_from_content(self, start_line: int, limit: int, content: str) -> FilePage:
+        lines = _split_lines(content, keep_partial=not self._follow)[:limit]
+        byte_offset = self._index.get(start_line)
+        end_byte_offset = (
+            byte_offset + sum(len(line.encode("utf-8")) for line in lines) if byte_offset is not None else None
+        )
+        page = FilePage(
+            path=self._path,
+            start_line=start_line,
+            lines=lines,
+            byte_offset=byte_offset,
+            end_byte_offset=end_byte_offset,
+        )
+        self._record(page)
+        return page
+
+    def _record(self, page: FilePage) -> None:
+        self._index.add(page.start_line, page.byte_offset)
+        self._index.add(page.end_line, page.end_byte_offset)
+
+
+class FileReader(_BaseFileReader):
+    """
+    Iterates a file in pages of lines, fetching the next page while the current
+    one is being consumed.
+
+    Byte offsets observed at page boundaries are remembered, so subsequent reads
+    (the next page, a re-read, or a ``follow`` tail read) seek straight to the
+    offset with a ranged download instead of asking the server to count lines
+    from the top of the file again. Servers that ignore ``Range`` fall back to
+    ``read_file`` line ranges transparently. At most two pages are held in memory
+    at any time.
+
+    With ``follow=True`` the iterator does not stop at end of file: it blocks on
+    ``watch_wait`` for the path and yields newly appended lines, ``tail -f``
+    style. Incomplete trailing lines are held back until their newline arrives.
+    ``follow_timeout`` bounds each wait, which also bounds how late a write that
+    lands between the last read and the next wait is noticed.
+
+    Examples
+    --------
+    from agent_sandbox import Sandbox
+
+    client = Sandbox(
+        base_url="https://yourhost.com/path/to/api",
+    )
+    with client.file.reader(path="/var/log/app.log", page_lines=5000) as reader:
+        for page in reader:
+            print("".join(page.lines), end="")
+    """
+
+    def __init__(self, client: "FileClient", **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._client = client
+        self._executor: typing.Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+    def __enter__(self) -> "FileReader":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def __iter__(self) -> typing.Iterator[FilePage]:
+        line = self._start_line
+        pending: typing.Optional["concurrent.futures.Future[FilePage]"] = None
+        try:
+            while not self._closed:
+                page = pending.result() if pending is not None else self._fetch(line, self._page_lines)
+                pending = None
+                line = page.end_line
+                exhausted = len(page.lines) < self._page_lines
+                if not exhausted and self._prefetch:
+                    pending = self._get_executor().submit(self._fetch, line, self._page_lines)
+                if page.lines:
+                    yield page
+                if exhausted:
+                    if not self._follow:
+                        return
+                    self._client.watch_wait(
+                        path=self._path,
+                        timeout=self._follow_timeout,
+                        event_types=["write"],
+                        request_options=self._request_options,
+                    )
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    def iter_lines(self) -> typing.Iterator[str]:
+        for page in self:
+            yield from page.lines
+
+    def read_lines(self, start_line: int, count: typing.Optional[int] = None) -> FilePage:
+        """
+        Read up to ``count`` lines (default: one page) starting at ``start_line``.
+        """
+        return self._fetch(start_line, count if count is not None else self._page_lines)
+
+    def close(self) -> None:
+        self._closed = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        return self._executor
+
+    def _fetch(self, start_line: int, limit: int) -> FilePage:
+        base = self._range_base(start_line)
+        if base is not None:
+            page = self._fetch_range(start_line, limit, *base)
+            if page is not None:
+                return page
+        response = self._client.read_file(
+            file=self._path,
+            start_line=start_line,
+            end_line=start_line + limit,
+            request_options=self._request_options,
+        )
+        return self._page_from_content(start_line, limit, unwrap_response(response).content)
+
+    def _fetch_range(self, start_line: int, limit: int, base_line: int, base_offset: int) -> typing.Optional[FilePage]:
+        splitter = _LineSplitter(limit, skip=start_line - base_line)
+        try:
+            with self._client.with_raw_response.download_file(
+                path=self._path, request_options=_with_range(self._request_options, base_offset)
+            ) as response:
+                if base_offset > 0 and "content-range" not in response.headers:
+                    self._ranged = False
+                    return None
+                for chunk in response.data:
+                    if splitter.feed(chunk):
+                        break
+        except ApiError as exc:
+            if exc.status_code != 416:
+                raise
+        splitter.finish(keep_partial=not self._follow)
+        return self._page_from_splitter(start_line, base_offset, splitter)
+
+
+class AsyncFileReader(_BaseFileReader):
+    """
+    Async counterpart of ``FileReader``; the next page is prefetched in a task
+    while the current one is being consumed.
+
+    Examples
+    --------
+    import asyncio
+
+    from agent_sandbox import AsyncSandbox
+
+    client = AsyncSandbox(
+        base_url="https://yourhost.com/path/to/api",
+    )
+
+
+    async def main() -> None:
+        async with client.file.reader(path="/var/log/app.log", follow=True) as reader:
+            async for line in reader.iter_lines():
+                print(line, end="")
+
+
+    asyncio.run(main())
+    """
+
+    def __init__(self, client: "AsyncFileClient", **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._client = client
+
+    async def __aenter__(self) -> "AsyncFileReader":
+        return self
+
+    async def __aexit__(self, *args: typing.Any) -> None:
+        await self.close()
+
+    async def __aiter__(self) -> typing.AsyncIterator[FilePage]:
+        line = self._start_line
+        pending: typing.Optional["asyncio.Task[FilePage]"] = None
+        try:
+            while not self._closed:
+                page = await pending if pending is not None else await self._fetch(line, self._page_lines)
+                pending = None
+                line = page.end_line
+                exhausted = len(page.lines) < self._page_lines
+                if not exhausted and self._prefetch:
+                    pending = asyncio.ensure_future(self._fetch(line, self._page_lines))
+                if page.lines:
+                    yield page
+                if exhausted:
+                    if not self._follow:
+                        return
+                    await self._client.watch_wait(
+                        path=self._path,
+                        timeout=self._follow_timeout,
+                        event_types=["write"],
+                        request_options=self._request_options,
+                    )
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def iter_lines(self) -> typing.AsyncIterator[str]:
+        async for page in self:
+            for line in page.lines:
+                yield line
+
+    async def read_lines(self, start_line: int, count: typing.Optional[int] = None) -> FilePage:
+        """
+        Read up to ``count`` lines (default: one page) starting at ``start_line``.
+        """
+        return await self._fetch(start_line, count if count is not None else self._page_lines)
+
+    async def close(self) -> None:
+        self._closed = True
+
+    async def _fetch(self, start_line: int, limit: int) -> FilePage:
+        base = self._range_base(start_line)
+        if base is not None:
+            page = await self._fetch_range(start_line, limit, *base)
+            if page is not None:
+                return page
+        response = await self._client.read_file(
+            file=self._path,
+            start_line=start_line,
+            end_line=start_line + limit,
+            request_options=self._request_options,
+        )
+        return self._page_from_content(start_line, limit, unwrap_response(response).content)
+
+    async def _fetch_range(
+        self, start_line: int, limit: int, base_line: int, base_offset: int
+    ) -> typing.Optional[FilePage]:
+        splitter = _LineSplitter(limit, skip=start_line - base_line)
+        try:
+            async with self._client.with_raw_response.download_file(
+                path=self._path, request_options=_with_range(self._request_options, base_offset)
+            ) as response:
+                if base_offset > 0 and "content-range" not in response.headers:
+                    self._ranged = False
+                    return None
+                async for chunk in response.data:
+                    if splitter.feed(chunk):
+                        break
+        except ApiError as exc:
+            if exc.status_code != 416:
+                raise
+        splitter.finish(keep_partial=not self._follow)
+        return self._page_from_splitter(start_line, base_offset, splitter)
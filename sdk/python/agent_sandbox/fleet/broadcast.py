@@ -0,0 +1,470 @@
+import asyncio
+import collections
+import concurrent.futures
+import math
+import time
+import typing
+import urllib.parse
+
+import httpx
+import pydantic
+from ..client import AsyncSandbox, Sandbox
+from ..core.envelope import unwrap_response
+from ..core.pydantic_utilities import IS_PYDANTIC_V2, UniversalBaseModel
+
+SyncOperation = typing.Callable[[Sandbox], typing.Any]
+AsyncOperation = typing.Callable[[AsyncSandbox], typing.Awaitable[typing.Any]]
+_Outcome = typing.Tuple[bool, typing.Any, typing.Optional[str]]
+_Timed = typing.Tuple[float, typing.Optional[_Outcome], typing.Optional[BaseException]]
+
+
+class BroadcastResult(UniversalBaseModel):
+    """
+    Outcome of a broadcast operation on one sandbox
+    """
+
+    index: int = pydantic.Field()
+    """
+    Position of the sandbox in the fleet
+    """
+
+    target: str = pydantic.Field()
+    """
+    Base URL of the sandbox
+    """
+
+    ok: bool = pydantic.Field()
+    """
+    Whether the call succeeded; commands must also exit with code 0
+    """
+
+    latency: float = pydantic.Field()
+    """
+    Seconds from sending the request to receiving the result
+    """
+
+    data: typing.Optional[typing.Any] = pydantic.Field(default=None)
+    """
+    Unwrapped response data
+    """
+
+    error: typing.Optional[str] = pydantic.Field(default=None)
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+class BroadcastStats(UniversalBaseModel):
+    """
+    Aggregate statistics of a broadcast
+    """
+
+    total: int = pydantic.Field()
+    completed: int = pydantic.Field()
+    succeeded: int = pydantic.Field()
+    failed: int = pydantic.Field()
+    success_rate: float = pydantic.Field()
+    """
+    Succeeded / completed, 0.0 when nothing has completed yet
+    """
+
+    p50: typing.Optional[float] = pydantic.Field(default=None)
+    p90: typing.Optional[float] = pydantic.Field(default=None)
+    p99: typing.Optional[float] = pydantic.Field(default=None)
+    max: typing.Optional[float] = pydantic.Field(default=None)
+    stragglers: typing.List[str] = pydantic.Field(default_factory=list)
+    """
+    Targets that took longer than `straggler_factor` times the median, slowest first
+    """
+
+    pending: typing.List[str] = pydantic.Field(default_factory=list)
+    """
+    Targets that have not completed yet
+    """
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+def _percentile(ordered: typing.Sequence[float], pct: float) -> typing.Optional[float]:
+    if not ordered:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _host(base_url: str) -> str:
+    return urllib.parse.urlsplit(base_url).netloc or base_url
+
+
+def _outcome(response: typing.Any) -> _Outcome:
+    data = unwrap_response(response)
+    exit_code = getattr(data, "exit_code", None)
+    if exit_code not in (None, 0):
+        return False, data, f"exit code {exit_code}"
+    return True, data, None
+
+
+class _BaseBroadcast:
+    def __init__(
+        self,
+        targets: typing.Sequence[str],
+        *,
+        max_concurrency: int,
+        per_host_limit: typing.Optional[int],
+        straggler_factor: float,
+    ):
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+        self._targets = list(targets)
+        self._max_concurrency = max_concurrency
+        self._per_host_limit = per_host_limit
+        self._straggler_factor = straggler_factor
+        # per-host queues, visited round-robin so one large host cannot hog the global slots
+        self._queues: "collections.OrderedDict[str, typing.Deque[int]]" = collections.OrderedDict()
+        for index, target in enumerate(self._targets):
+            self._queues.setdefault(_host(target), collections.deque()).append(index)
+        self._host_in_flight: typing.Counter[str] = collections.Counter()
+        self._in_flight = 0
+        self._started = False
+        self.results: typing.List[BroadcastResult] = []
+
+    def _launchable(self) -> typing.List[int]:
+        picks = []
+        progressed = True
+        while progressed and self._in_flight < self._max_concurrency and self._queues:
+            progressed = False
+            for host in list(self._queues):
+                if self._in_flight >= self._max_concurrency:
+                    break
+                if self._per_host_limit is not None and self._host_in_flight[host] >= self._per_host_limit:
+                    continue
+                queue = self._queues[host]
+                picks.append(queue.popleft())
+                self._host_in_flight[host] += 1
+                self._in_flight += 1
+                progressed = True
+                if queue:
+                    self._queues.move_to_end(host)
+                else:
+                    del self._queues[host]
+        return picks
+
+    def _record(
+        self, index: int, latency: float, outcome: typing.Optional[_Outcome], error: typing.Optional[BaseException]
+    ) -> BroadcastResult:
+        target = self._targets[index]
+        self._host_in_flight[_host(target)] -= 1
+        self._in_flight -= 1
+        if outcome is not None:
+            ok, data, message = outcome
+        else:
+            ok, data, message = False, None, f"{type(error).__name__}: {error}"
+        result = BroadcastResult(index=index, target=target, ok=ok, latency=latency, data=data, error=message)
+        self.results.append(result)
+        return result
+
+    def _claim(self) -> None:
+        if self._started:
+            raise RuntimeError("A broadcast can only be iterated once")
+        self._started = True
+
+    @property
+    def stats(self) -> BroadcastStats:
+        """
+        Statistics over the results received so far.
+        """
+        latencies = sorted(result.latency for result in self.results)
+        succeeded = sum(result.ok for result in self.results)
+        median = _percentile(latencies, 50)
+        stragglers = []
+        if median is not None and len(latencies) > 1:
+            threshold = median * self._straggler_factor
+            slow = sorted((r for r in self.results if r.latency > threshold), key=lambda r: r.latency, reverse=True)
+            stragglers = [result.target for result in slow]
+        done = {result.index for result in self.results}
+        return BroadcastStats(
+            total=len(self._targets),
+            completed=len(self.results),
+            succeeded=succeeded,
+            failed=len(self.results) - succeeded,
+            success_rate=succeeded / len(self.results) if self.results else 0.0,
+            p50=median,
+            p90=_percentile(latencies, 90),
+            p99=_percentile(latencies, 99),
+            max=latencies[-1] if latencies else None,
+            stragglers=stragglers,
+            pending=[target for index, target in enumerate(self._targets) if index not in done],
+        )
+
+
+class Broadcast(_BaseBroadcast):
+    """
+    Runs one operation on every sandbox of a ``Fleet``; iterate it to receive
+    ``BroadcastResult`` objects in completion order.
+    """
+
+    def __init__(self, clients: typing.Sequence[Sandbox], operation: SyncOperation, **kwargs: typing.Any):
+        super().__init__([client._client_wrapper.get_base_url() for client in clients], **kwargs)
+        self._clients = list(clients)
+        self._operation = operation
+
+    def __iter__(self) -> typing.Iterator[BroadcastResult]:
+        self._claim()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self._max_concurrency) as executor:
+            running: typing.Dict[concurrent.futures.Future, int] = {}
+            while True:
+                for index in self._launchable():
+                    running[executor.submit(self._call, index)] = index
+                if not running:
+                    return
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    yield self._record(index, *future.result())
+
+    def _call(self, index: int) -> _Timed:
+        start = time.perf_counter()
+        try:
+            outcome = _outcome(self._operation(self._clients[index]))
+            return time.perf_counter() - start, outcome, None
+        except Exception as exc:
+            return time.perf_counter() - start, None, exc
+
+    def wait(self) -> BroadcastStats:
+        """
+        Run the broadcast to completion and return its statistics.
+        """
+        for _ in self:
+            pass
+        return self.stats
+
+
+class AsyncBroadcast(_BaseBroadcast):
+    """
+    Async counterpart of ``Broadcast``.
+    """
+
+    def __init__(self, clients: typing.Sequence[AsyncSandbox], operation: AsyncOperation, **kwargs: typing.Any):
+        super().__init__([client._client_wrapper.get_base_url() for client in clients], **kwargs)
+        self._clients = list(clients)
+        self._operation = operation
+
+    async def __aiter__(self) -> typing.AsyncIterator[BroadcastResult]:
+        self._claim()
+        running: typing.Dict["asyncio.Future[typing.Any]", int] = {}
+        try:
+            while True:
+                for index in self._launchable():
+                    running[asyncio.ensure_future(self._call(index))] = index
+                if not running:
+                    return
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    yield self._record(index, *future.result())
+        finally:
+            for future in running:
+                future.cancel()
+
+    async def _call(self, index: int) -> _Timed:
+        start = time.perf_counter()
+        try:
+            outcome = _outcome(await self._operation(self._clients[index]))
+            return time.perf_counter() - start, outcome, None
+        except Exception as exc:
+            return time.perf_counter() - start, None, exc
+
+    async def wait(self) -> BroadcastStats:
+        """
+        Run the broadcast to completion and return its statistics.
+        """
+        async for _ in self:
+            pass
+        return self.stats
+
+
+class _BaseFleet:
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 32,
+        per_host_limit: typing.Optional[int] = 4,
+        straggler_factor: float = 3.0,
+    ):
+        self._broadcast_kwargs = dict(
+            max_concurrency=max_concurrency, per_host_limit=per_host_limit, straggler_factor=straggler_factor
+        )
+
+
+class Fleet(_BaseFleet):
+    """
+    A set of sandboxes to run the same operation on.
+
+    Targets are base URLs or ``Sandbox`` clients; clients for URLs share one
+    connection pool. At most ``max_concurrency`` calls are in flight overall and
+    ``per_host_limit`` per host (``None`` for no per-host limit). Every method
+    returns a ``Broadcast`` that yields results as they complete; ``stats`` then
+    has the success rate, latency percentiles and stragglers.
+
+    Examples
+    --------
+    from agent_sandbox.fleet import Fleet
+
+    fleet = Fleet(["http://10.0.0.1:8080", "http://10.0.0.2:8080"], max_concurrency=64, per_host_limit=4)
+    broadcast = fleet.bash_exec(command="pip install -U requests")
+    for result in broadcast:
+        print(result.target, result.ok, f"{result.latency:.2f}s")
+    print(broadcast.stats)
+    """
+
+    def __init__(
+        self,
+        targets: typing.Sequence[typing.Union[str, Sandbox]],
+        *,
+        headers: typing.Optional[typing.Dict[str, str]] = None,
+        timeout: typing.Optional[float] = None,
+        **kwargs: typing.Any,
+    ):
+        super().__init__(**kwargs)
+        self._httpx_client: typing.Optional[httpx.Client] = None
+        self.clients: typing.List[Sandbox] = []
+        for target in targets:
+            if isinstance(target, str):
+                if self._httpx_client is None:
+                    self._httpx_client = httpx.Client(
+                        timeout=timeout if timeout is not None else 60, follow_redirects=True
+                    )
+                target = Sandbox(base_url=target, headers=headers, timeout=timeout, httpx_client=self._httpx_client)
+            self.clients.append(target)
+
+    def __enter__(self) -> "Fleet":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the connection pool shared by the clients created from URLs.
+        """
+        if self._httpx_client is not None:
+            self._httpx_client.close()
+
+    def run(self, operation: SyncOperation) -> Broadcast:
+        """
+        Broadcast an arbitrary call, e.g. ``lambda c: c.sandbox.get_context()``.
+        """
+        return Broadcast(self.clients, operation, **self._broadcast_kwargs)
+
+    def bash_exec(self, *, command: str, **kwargs: typing.Any) -> Broadcast:
+        """
+        Run ``bash.exec`` everywhere; a non-zero exit code counts as a failure.
+        """
+        return self.run(lambda client: client.bash.exec(command=command, **kwargs))
+
+    def shell_exec(self, *, command: str, **kwargs: typing.Any) -> Broadcast:
+        """
+        Run ``shell.exec_command`` everywhere; a non-zero exit code counts as a failure.
+        """
+        return self.run(lambda client: client.shell.exec_command(command=command, **kwargs))
+
+    def write_file(self, *, file: str, content: str, **kwargs: typing.Any) -> Broadcast:
+        """
+        Write the same file on every sandbox with ``file.write_file``.
+        """
+        return self.run(lambda client: client.file.write_file(file=file, content=content, **kwargs))
+
+
+class AsyncFleet(_BaseFleet):
+    """
+    Async counterpart of ``Fleet``.
+
+    Examples
+    --------
+    import asyncio
+
+    from agent_sandbox.fleet import AsyncFleet
+
+
+    async def main() -> None:
+        async with AsyncFleet(["http://10.0.0.1:8080", "http://10.0.0.2:8080"]) as fleet:
+            broadcast = fleet.bash_exec(command="pip install -U requests")
+            async for result in broadcast:
+                print(result.target, result.ok)
+            print(broadcast.stats)
+
+
+    asyncio.run(main())
+    """
+
+    def __init__(
+        self,
+        targets: typing.Sequence[typing.Union[str, AsyncSandbox]],
+        *,
+        headers: typing.Optional[typing.Dict[str, str]] = None,
+        timeout: typing.Optional[float] = None,
+        **kwargs: typing.Any,
+    ):
+        super().__init__(**kwargs)
+        self._httpx_client: typing.Optional[httpx.AsyncClient] = None
+        self.clients: typing.List[AsyncSandbox] = []
+        for target in targets:
+            if isinstance(target, str):
+                if self._httpx_client is None:
+                    self._httpx_client = httpx.AsyncClient(
+                        timeout=timeout if timeout is not None else 60, follow_redirects=True
+                    )
+                target = AsyncSandbox(
+                    base_url=target, headers=headers, timeout=timeout, httpx_client=self._httpx_client
+                )
+            self.clients.append(target)
+
+    async def __aenter__(self) -> "AsyncFleet":
+        return self
+
+    async def __aexit__(self, *args: typing.Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """
+        Close the connection pool shared by the clients created from URLs.
+        """
+        if self._httpx_client is not None:
+            await self._httpx_client.aclose()
+
+    def run(self, operation: AsyncOperation) -> AsyncBroadcast:
+        """
+        Broadcast an arbitrary call, e.g. ``lambda c: c.sandbox.get_context()``.
+        """
+        return AsyncBroadcast(self.clients, operation, **self._broadcast_kwargs)
+
+    def bash_exec(self, *, command: str, **kwargs: typing.Any) -> AsyncBroadcast:
+        """
+        Run ``bash.exec`` everywhere; a non-zero exit code counts as a failure.
+        """
+        return self.run(lambda client: client.bash.exec(command=command, **kwargs))
+
+    def shell_exec(self, *, command: str, **kwargs: typing.Any) -> AsyncBroadcast:
+        """
+        Run ``shell.exec_command`` everywhere; a non-zero exit code counts as a failure.
+        """
+        return self.run(lambda client: client.shell.exec_command(command=command, **kwargs))
+
+    def write_file(self, *, file: str, content: str, **kwargs: typing.Any) -> AsyncBroadcast:
+        """
+        Write the same file on every sandbox with ``file.write_file``.
+        """
+        return self.run(lambda client: client.file.write_file(file=file, content=content, **kwargs))
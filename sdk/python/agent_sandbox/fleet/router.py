@@ -0,0 +1,581 @@
+import asyncio
+import bisect
+import hashlib
+import threading
+import typing
+import uuid
+
+import httpx
+import pydantic
+from ..client import AsyncSandbox, Sandbox
+from ..core.envelope import unwrap_response
+from ..core.pydantic_utilities import IS_PYDANTIC_V2, UniversalBaseModel
+
+LoadMetric = typing.Literal["sessions", "memory"]
+ClientT = typing.TypeVar("ClientT", Sandbox, AsyncSandbox)
+
+# minting an id that hashes onto the chosen node takes about as many tries as there are nodes
+_MAX_MINT_ATTEMPTS = 4096
+
+
+class RouterNode(UniversalBaseModel):
+    """
+    State of one sandbox behind a session router
+    """
+
+    target: str = pydantic.Field()
+    """
+    Base URL of the sandbox
+    """
+
+    healthy: bool = pydantic.Field()
+    load: typing.Optional[float] = pydantic.Field(default=None)
+    """
+    Last measured load: live Jupyter and Node.js sessions, or memory usage in percent
+    """
+
+    placed: int = pydantic.Field()
+    """
+    Sessions placed on the node since its load was last measured
+    """
+
+    pinned: int = pydantic.Field()
+    """
+    Sessions known to live on the node
+    """
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class _HashRing:
+    def __init__(self, vnodes: int):
+        self._vnodes = vnodes
+        self._points: typing.List[int] = []
+        self._owners: typing.List[str] = []
+
+    def add(self, node: str) -> None:
+        for i in range(self._vnodes):
+            point = _hash(f"{node}#{i}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove(self, node: str) -> None:
+        kept = [(p, o) for p, o in zip(self._points, self._owners) if o != node]
+        self._points = [p for p, _ in kept]
+        self._owners = [o for _, o in kept]
+
+    def owner(self, key: str) -> typing.Optional[str]:
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[index]
+
+
+class _Node(typing.Generic[ClientT]):
+    def __init__(self, target: str, client: ClientT):
+        self.target = target
+        self.client = client
+        self.healthy = True
+        self.load: typing.Optional[float] = None
+        self.placed = 0
+
+
+class _BaseSessionRouter(typing.Generic[ClientT]):
+    def __init__(self, *, load: LoadMetric = "sessions", vnodes: int = 64, health_interval: float = 15.0):
+        if load not in ("sessions", "memory"):
+            raise ValueError("load must be 'sessions' or 'memory'")
+        self._metric = load
+        self._health_interval = health_interval
+        self._ring = _HashRing(vnodes)
+        self._nodes: typing.Dict[str, _Node[ClientT]] = {}
+        self._pins: typing.Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def nodes(self) -> typing.List[RouterNode]:
+        pinned: typing.Dict[str, int] = {}
+        for target in self._pins.values():
+            pinned[target] = pinned.get(target, 0) + 1
+        return [
+            RouterNode(target=n.target, healthy=n.healthy, load=n.load, placed=n.placed, pinned=pinned.get(n.target, 0))
+            for n in self._nodes.values()
+        ]
+
+    def _add(self, client: ClientT) -> str:
+        target = client._client_wrapper.get_base_url()
+        with self._lock:
+            if target in self._nodes:
+                raise ValueError(f"Sandbox {target} is already routed")
+            self._nodes[target] = _Node(target, client)
+            self._ring.add(target)
+        return target
+
+    def _remove(self, target: str) -> typing.List[str]:
+        with self._lock:
+            if self._nodes.pop(target, None) is None:
+                raise KeyError(target)
+            self._ring.remove(target)
+            lost = [session_id for session_id, node in self._pins.items() if node == target]
+            for session_id in lost:
+                del self._pins[session_id]
+        return lost
+
+    def target_for(self, session_id: str) -> str:
+        """
+        Base URL of the sandbox holding ``session_id``: its pin if known, else its place on the hash ring.
+        """
+        with self._lock:
+            target = self._pins.get(session_id) or self._ring.owner(session_id)
+        if target is None:
+            raise RuntimeError("The session router has no sandboxes")
+        return target
+
+    def client_for(self, session_id: str) -> ClientT:
+        """
+        Client of the sandbox holding ``session_id``.
+        """
+        return self._nodes[self.target_for(session_id)].client
+
+    def pin(self, session_id: str, target: str) -> None:
+        """
+        Record that ``session_id`` lives on ``target``, e.g. for sessions created before routing.
+        """
+        with self._lock:
+            if target not in self._nodes:
+                raise KeyError(target)
+            self._pins[session_id] = target
+
+    def unpin(self, session_id: str) -> None:
+        with self._lock:
+            self._pins.pop(session_id, None)
+
+    def mark_unhealthy(self, target: str) -> None:
+        """
+        Stop placing new sessions on ``target`` until its next successful health check.
+        """
+        node = self._nodes.get(target)
+        if node is not None:
+            node.healthy = False
+
+    def _score(self, node: _Node[ClientT]) -> typing.Tuple[float, int]:
+        if self._metric == "sessions":
+            return ((node.load or 0.0) + node.placed, 0)
+        # memory readings do not move until the next check, so spread ties by recent placements
+        return (node.load or 0.0, node.placed)
+
+    def _place(self, exclude: typing.Collection[str]) -> typing.Tuple[str, _Node[ClientT]]:
+        """
+        Picks the least loaded healthy node and mints a session id that the hash
+        ring maps to it, so routers without the pin (other workers, restarts)
+        still find the session as long as the node set is unchanged.
+        """
+        with self._lock:
+            candidates = [n for n in self._nodes.values() if n.healthy and n.target not in exclude]
+            if not candidates:
+                raise RuntimeError("No healthy sandbox available for a new session")
+            node = min(candidates, key=self._score)
+            session_id = uuid.uuid4().hex
+            for _ in range(_MAX_MINT_ATTEMPTS):
+                if self._ring.owner(session_id) == node.target:
+                    break
+                session_id = uuid.uuid4().hex
+            node.placed += 1
+            self._pins[session_id] = node.target
+        return session_id, node
+
+    def _measure(self, data: typing.Any) -> typing.Optional[float]:
+        if self._metric == "memory":
+            cgroup = getattr(data, "cgroup", None)
+            return getattr(cgroup, "mem_usage_pct", None)
+        return float(sum(len(getattr(listing, "sessions", None) or {}) for listing in data))
+
+    def _update(self, node: _Node[ClientT], load: typing.Optional[float], healthy: bool) -> None:
+        node.healthy = healthy
+        if healthy:
+            node.load = load
+            node.placed = 0
+
+
+def _transport_error(exc: BaseException) -> bool:
+    return isinstance(exc, (httpx.TransportError, ConnectionError))
+
+
+class SessionRouter(_BaseSessionRouter[Sandbox]):
+    """
+    Routes stateful Jupyter, Node.js and code sessions across a fleet of sandboxes.
+
+    A new session is placed on the healthy sandbox with the lowest load (live
+    Jupyter and Node.js sessions, or cgroup memory usage from
+    ``sandbox.observe_live`` with ``load="memory"``) and given an id that a
+    consistent-hash ring maps to that sandbox. Later calls with the id go to the
+    same sandbox: sessions the router placed or was told about are pinned, and
+    other ids fall back to the ring, where adding or removing a sandbox only
+    moves about 1/N of them. Sandboxes whose health check or session creation
+    fails stop receiving new sessions, which are created elsewhere instead;
+    existing sessions stay where their state is.
+
+    Examples
+    --------
+    from agent_sandbox.fleet import SessionRouter
+
+    with SessionRouter(["http://10.0.0.1:8080", "http://10.0.0.2:8080"]) as router:
+        first = router.jupyter_execute(code="x = 41")
+        session_id = first.data.session_id
+        result = router.jupyter_execute(code="x + 1", session_id=session_id)
+        print(router.target_for(session_id), result.data.outputs)
+    """
+
+    def __init__(
+        self,
+        targets: typing.Sequence[typing.Union[str, Sandbox]],
+        *,
+        headers: typing.Optional[typing.Dict[str, str]] = None,
+        timeout: typing.Optional[float] = None,
+        **kwargs: typing.Any,
+    ):
+        super().__init__(**kwargs)
+        self._headers = headers
+        self._timeout = timeout
+        self._httpx_client: typing.Optional[httpx.Client] = None
+        self._stop = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+        for target in targets:
+            self.add_node(target)
+
+    def __enter__(self) -> "SessionRouter":
+        self.start()
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """
+        Measure every sandbox now and then every ``health_interval`` seconds in a background thread.
+        """
+        self.check()
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="session-router", daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """
+        Stop health checks and close the connection pool shared by the clients created from URLs.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._httpx_client is not None:
+            self._httpx_client.close()
+
+    def add_node(self, target: typing.Union[str, Sandbox]) -> str:
+        """
+        Add a sandbox, given as a base URL or client. Returns its base URL.
+        """
+        if isinstance(target, str):
+            if self._httpx_client is None:
+                self._httpx_client = httpx.Client(
+                    timeout=self._timeout if self._timeout is not None else 60, follow_redirects=True
+                )
+            target = Sandbox(
+                base_url=target, headers=self._headers, timeout=self._timeout, httpx_client=self._httpx_client
+            )
+        return self._add(target)
+
+    def remove_node(self, target: str) -> typing.List[str]:
+        """
+        Remove a sandbox. Returns the pinned sessions that lived on it, which are forgotten.
+        """
+        return self._remove(target)
+
+    def check(self) -> None:
+        """
+        Measure the load of every sandbox; ones that do not answer are marked unhealthy.
+        """
+        for node in list(self._nodes.values()):
+            try:
+                self._update(node, self._measure(self._probe(node.client)), healthy=True)
+            except Exception:
+                self._update(node, None, healthy=False)
+
+    def _probe(self, client: Sandbox) -> typing.Any:
+        if self._metric == "memory":
+            return unwrap_response(client.sandbox.observe_live())
+        return [unwrap_response(client.jupyter.list_sessions()), unwrap_response(client.nodejs.list_sessions())]
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._health_interval):
+            self.check()
+
+    def new_session(self, create: typing.Callable[[Sandbox, str], typing.Any]) -> typing.Tuple[str, typing.Any]:
+        """
+        Place a new session and run ``create(client, session_id)`` on its sandbox.
+        On a connection failure the sandbox is marked unhealthy and the session is
+        placed elsewhere. Returns the session id and what ``create`` returned.
+        """
+        tried: typing.Set[str] = set()
+        last_error: typing.Optional[BaseException] = None
+        while True:
+            try:
+                session_id, node = self._place(exclude=tried)
+            except RuntimeError as exc:
+                raise exc from last_error
+            try:
+                return session_id, create(node.client, session_id)
+            except Exception as exc:
+                self.unpin(session_id)
+                if not _transport_error(exc):
+                    raise
+                self.mark_unhealthy(node.target)
+                tried.add(node.target)
+                last_error = exc
+
+    def jupyter_execute(
+        self, *, code: str, session_id: typing.Optional[str] = None, **kwargs: typing.Any
+    ) -> typing.Any:
+        """
+        ``jupyter.execute_code`` on the sandbox holding ``session_id``; without one,
+        a Jupyter session is created on the least loaded sandbox first.
+        """
+        if session_id is None:
+            create_kwargs = {key: kwargs[key] for key in ("kernel_name", "cwd") if key in kwargs}
+            session_id, _ = self.new_session(
+                lambda client, sid: unwrap_response(client.jupyter.create_session(session_id=sid, **create_kwargs))
+            )
+        return self.client_for(session_id).jupyter.execute_code(code=code, session_id=session_id, **kwargs)
+
+    def nodejs_execute(
+        self, *, code: str, session_id: typing.Optional[str] = None, **kwargs: typing.Any
+    ) -> typing.Any:
+        """
+        Stateful ``nodejs.execute_code`` on the sandbox holding ``session_id``; without
+        one, a Node.js session is created on the least loaded sandbox first.
+        """
+        if session_id is None:
+            create_kwargs = {key: kwargs[key] for key in ("cwd", "version") if key in kwargs}
+            session_id, _ = self.new_session(
+                lambda client, sid: unwrap_response(client.nodejs.create_session(session_id=sid, **create_kwargs))
+            )
+        return self.client_for(session_id).nodejs.execute_code(
+            code=code, stateful=True, session_id=session_id, **kwargs
+        )
+
+    def code_execute(
+        self, *, language: str, code: str, session_id: typing.Optional[str] = None, **kwargs: typing.Any
+    ) -> typing.Any:
+        """
+        Stateful ``code.execute_code`` on the sandbox holding ``session_id``; without
+        one, the first call creates the session on the least loaded sandbox.
+        """
+        if session_id is None:
+            return self.new_session(
+                lambda client, sid: client.code.execute_code(
+                    language=language, code=code, stateful=True, session_id=sid, **kwargs
+                )
+            )[1]
+        return self.client_for(session_id).code.execute_code(
+            language=language, code=code, stateful=True, session_id=session_id, **kwargs
+        )
+
+
+class AsyncSessionRouter(_BaseSessionRouter[AsyncSandbox]):
+    """
+    Async counterpart of ``SessionRouter``; health checks run as an asyncio task.
+
+    Examples
+    --------
+    import asyncio
+
+    from agent_sandbox.fleet import AsyncSessionRouter
+
+
+    async def main() -> None:
+        async with AsyncSessionRouter(["http://10.0.0.1:8080", "http://10.0.0.2:8080"], load="memory") as router:
+            first = await router.nodejs_execute(code="let n = 1")
+            await router.nodejs_execute(code="n + 1", session_id=first.data.session_id)
+
+
+    asyncio.run(main())
+    """
+
+    def __init__(
+        self,
+        targets: typing.Sequence[typing.Union[str, AsyncSandbox]],
+        *,
+        headers: typing.Optional[typing.Dict[str, str]] = None,
+        timeout: typing.Optional[float] = None,
+        **kwargs: typing.Any,
+    ):
+        super().__init__(**kwargs)
+        self._headers = headers
+        self._timeout = timeout
+        self._httpx_client: typing.Optional[httpx.AsyncClient] = None
+        self._task: typing.Optional["asyncio.Task[None]"] = None
+        for target in targets:
+            self.add_node(target)
+
+    async def __aenter__(self) -> "AsyncSessionRouter":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: typing.Any) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """
+        Measure every sandbox now and then every ``health_interval`` seconds in a background task.
+        """
+        await self.check()
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def close(self) -> None:
+        """
+        Stop health checks and close the connection pool shared by the clients created from URLs.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._httpx_client is not None:
+            await self._httpx_client.aclose()
+
+    def add_node(self, target: typing.Union[str, AsyncSandbox]) -> str:
+        """
+        Add a sandbox, given as a base URL or client. Returns its base URL.
+        """
+        if isinstance(target, str):
+            if self._httpx_client is None:
+                self._httpx_client = httpx.AsyncClient(
+                    timeout=self._timeout if self._timeout is not None else 60, follow_redirects=True
+                )
+            target = AsyncSandbox(
+                base_url=target, headers=self._headers, timeout=self._timeout, httpx_client=self._httpx_client
+            )
+        return self._add(target)
+
+    def remove_node(self, target: str) -> typing.List[str]:
+        """
+        Remove a sandbox. Returns the pinned sessions that lived on it, which are forgotten.
+        """
+        return self._remove(target)
+
+    async def check(self) -> None:
+        """
+        Measure the load of every sandbox concurrently; ones that do not answer are marked unhealthy.
+        """
+        nodes = list(self._nodes.values())
+        results = await asyncio.gather(*(self._probe(node.client) for node in nodes), return_exceptions=True)
+        for node, result in zip(nodes, results):
+            if isinstance(result, BaseException):
+                self._update(node, None, healthy=False)
+            else:
+                self._update(node, self._measure(result), healthy=True)
+
+    async def _probe(self, client: AsyncSandbox) -> typing.Any:
+        if self._metric == "memory":
+            return unwrap_response(await client.sandbox.observe_live())
+        jupyter, nodejs = await asyncio.gather(client.jupyter.list_sessions(), client.nodejs.list_sessions())
+        return [unwrap_response(jupyter), unwrap_response(nodejs)]
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._health_interval)
+            try:
+                await self.check()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass
+
+    async def new_session(
+        self, create: typing.Callable[[AsyncSandbox, str], typing.Awaitable[typing.Any]]
+    ) -> typing.Tuple[str, typing.Any]:
+        """
+        Place a new session and await ``create(client, session_id)`` on its sandbox.
+        On a connection failure the sandbox is marked unhealthy and the session is
+        placed elsewhere. Returns the session id and what ``create`` returned.
+        """
+        tried: typing.Set[str] = set()
+        last_error: typing.Optional[BaseException] = None
+        while True:
+            try:
+                session_id, node = self._place(exclude=tried)
+            except RuntimeError as exc:
+                raise exc from last_error
+            try:
+                return session_id, await create(node.client, session_id)
+            except Exception as exc:
+                self.unpin(session_id)
+                if not _transport_error(exc):
+                    raise
+                self.mark_unhealthy(node.target)
+                tried.add(node.target)
+                last_error = exc
+
+    async def jupyter_execute(
+        self, *, code: str, session_id: typing.Optional[str] = None, **kwargs: typing.Any
+    ) -> typing.Any:
+        """
+        ``jupyter.execute_code`` on the sandbox holding ``session_id``; without one,
+        a Jupyter session is created on the least loaded sandbox first.
+        """
+        if session_id is None:
+            create_kwargs = {key: kwargs[key] for key in ("kernel_name", "cwd") if key in kwargs}
+
+            async def create(client: AsyncSandbox, sid: str) -> typing.Any:
+                return unwrap_response(await client.jupyter.create_session(session_id=sid, **create_kwargs))
+
+            session_id, _ = await self.new_session(create)
+        return await self.client_for(session_id).jupyter.execute_code(code=code, session_id=session_id, **kwargs)
+
+    async def nodejs_execute(
+        self, *, code: str, session_id: typing.Optional[str] = None, **kwargs: typing.Any
+    ) -> typing.Any:
+        """
+        Stateful ``nodejs.execute_code`` on the sandbox holding ``session_id``; without
+        one, a Node.js session is created on the least loaded sandbox first.
+        """
+        if session_id is None:
+            create_kwargs = {key: kwargs[key] for key in ("cwd", "version") if key in kwargs}
+
+            async def create(client: AsyncSandbox, sid: str) -> typing.Any:
+                return unwrap_response(await client.nodejs.create_session(session_id=sid, **create_kwargs))
+
+            session_id, _ = await self.new_session(create)
+        return await self.client_for(session_id).nodejs.execute_code(
+            code=code, stateful=True, session_id=session_id, **kwargs
+        )
+
+    async def code_execute(
+        self, *, language: str, code: str, session_id: typing.Optional[str] = None, **kwargs: typing.Any
+    ) -> typing.Any:
+        """
+        Stateful ``code.execute_code`` on the sandbox holding ``session_id``; without
+        one, the first call creates the session on the least loaded sandbox.
+        """
+        if session_id is None:
+
+            async def create(client: AsyncSandbox, sid: str) -> typing.Any:
+                return await client.code.execute_code(
+                    language=language, code=code, stateful=True, session_id=sid, **kwargs
+                )
+
+            return (await self.new_session(create))[1]
+        return await self.client_for(session_id).code.execute_code(
+            language=language, code=code, stateful=True, session_id=session_id, **kwargs
+        )
@@ -0,0 +1,714 @@
+import os
+import typing
+
+from ..bash.client import AsyncBashClient, BashClient
+from ..core.envelope import unwrap_response
+from ..core.request_options import RequestOptions
+from .client import AsyncJupyterClient, JupyterClient
+from .pool import DEFAULT_PRELOAD, AsyncKernelPool, KernelPool
+from .stream import DEFAULT_SPOOL_DIR, AsyncJupyterOutputStream, JupyterOutputStream
+from .transfer import (
+    DEFAULT_TRANSFER_DIR,
+    TransferFormat,
+    _check_name,
+    _discard_local,
+    _dump_local,
+    _export_code,
+    _export_meta,
+    _finish_local,
+    _import_code,
+    _kernel_output,
+    _local_target,
+    _remote_path,
+    _remove_code,
+)
+
+# this is used as the default value for optional parameters
+OMIT = typing.cast(typing.Any, ...)
+
+
+class ExtendedJupyterClient(JupyterClient):
+    """
+    `JupyterClient` with kernel pools, variable transfer and output streaming.
+    """
+
+    def kernel_pool(
+        self,
+        *,
+        size: int = 2,
+        preload: typing.Optional[str] = DEFAULT_PRELOAD,
+        max_uses: typing.Optional[int] = None,
+        max_sessions: typing.Optional[int] = None,
+        health_interval: float = 300.0,
+        lease_timeout: float = 60.0,
+        timeout: typing.Optional[int] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> KernelPool:
+        """
+        Create a pool of prewarmed Jupyter kernels keyed by (kernel_name, cwd)
+
+        Kernels run the preload snippet when started and are cleared with `%reset -f` on return,
+        then preloaded again; they are retired instead after `max_uses` leases or when dirty.
+
+        Parameters
+        ----------
+        size : int
+            Number of idle kernels to keep warm per (kernel_name, cwd)
+
+        preload : typing.Optional[str]
+            Code run in every new kernel and after every reset, by default importing numpy and pandas
+
+        max_uses : typing.Optional[int]
+            Retire a kernel after this many leases instead of resetting it
+
+        max_sessions : typing.Optional[int]
+            Upper bound on the kernels owned by this pool
+
+        health_interval : float
+            Seconds between health-check rounds; idle kernels are probed so they do not expire
+
+        lease_timeout : float
+            Max seconds `lease` waits for a kernel when `max_sessions` is reached
+
+        timeout : typing.Optional[int]
+            Execution timeout in seconds for the preload and reset code
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        KernelPool
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        with client.jupyter.kernel_pool(size=4, preload="import numpy as np") as pool:
+            with pool.lease(kernel_name="python3") as kernel:
+                client.jupyter.execute_code(code="np.arange(10).sum()", session_id=kernel.session_id)
+        """
+        return KernelPool(
+            self,
+            size=size,
+            preload=preload,
+            max_uses=max_uses,
+            max_sessions=max_sessions,
+            health_interval=health_interval,
+            lease_timeout=lease_timeout,
+            timeout=timeout,
+            request_options=request_options,
+        )
+
+    def fetch(
+        self,
+        session_id: str,
+        var_name: str,
+        *,
+        format: TransferFormat = "auto",
+        mmap: bool = True,
+        allow_pickle: bool = False,
+        local_path: typing.Optional[str] = None,
+        transfer_dir: str = DEFAULT_TRANSFER_DIR,
+        timeout: typing.Optional[int] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> typing.Any:
+        """
+        Copy a variable out of a Jupyter session as binary data instead of its printed repr
+
+        The kernel serializes the object to a file in the sandbox (NPY for NumPy arrays, Arrow IPC for
+        pandas objects and Arrow tables, or Parquet/pickle on request), which is streamed back with
+        `file.download_file` and loaded locally; NPY and Arrow files are memory-mapped when `mmap`.
+
+        Parameters
+        ----------
+        session_id : str
+            Session holding the variable
+
+        var_name : str
+            Name of the variable, optionally dotted (`results.frame`)
+
+        format : TransferFormat
+            `auto` picks NPY or Arrow by type, falling back to pickle when `allow_pickle`
+
+        mmap : bool
+            Memory-map the downloaded file instead of reading it into memory
+
+        allow_pickle : bool
+            Allow pickle transfer for objects without a binary format; unpickling runs code from the sandbox
+
+        local_path : typing.Optional[str]
+            Where to keep the downloaded file; by default a temporary file that is removed once loaded
+
+        transfer_dir : str
+            Directory in the sandbox for the temporary export, removed after the download
+
+        timeout : typing.Optional[int]
+            Execution timeout in seconds for the serialization
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        typing.Any
+            The variable, as a NumPy array, pandas object, Arrow table or unpickled object
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        client.jupyter.execute_code(code="import numpy as np; a = np.random.rand(1000, 1000)", session_id="s1")
+        array = client.jupyter.fetch("s1", "a")
+        """
+        from ..file.client import FileClient  # noqa: E402
+
+        meta = _export_meta(
+            self.execute_code(
+                code=_export_code(var_name, format, allow_pickle, transfer_dir),
+                session_id=session_id,
+                timeout=OMIT if timeout is None else timeout,
+                request_options=request_options,
+            )
+        )
+        path, temporary = _local_target(local_path, meta)
+        file_client = FileClient(client_wrapper=self._raw_client._client_wrapper)
+        try:
+            with open(path, "wb") as f:
+                for chunk in file_client.download_file(path=meta["path"], request_options=request_options):
+                    f.write(chunk)
+        except BaseException:
+            _discard_local(path, temporary)
+            raise
+        finally:
+            try:
+                self.execute_code(
+                    code=_remove_code(meta["path"]), session_id=session_id, request_options=request_options
+                )
+            except Exception:
+                pass
+        return _finish_local(path, temporary, meta, mmap, allow_pickle)
+
+    def push(
+        self,
+        session_id: str,
+        name: str,
+        obj: typing.Any,
+        *,
+        format: TransferFormat = "auto",
+        mmap: bool = True,
+        transfer_dir: str = DEFAULT_TRANSFER_DIR,
+        timeout: typing.Optional[int] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> None:
+        """
+        Bind a local object to a variable in a Jupyter session without embedding it in the code string
+
+        The object is serialized locally (NPY for NumPy arrays, Arrow IPC for pandas objects and Arrow
+        tables, raw bytes for `str`/`bytes`, otherwise pickle), streamed into the sandbox with
+        `file.upload_file`, and loaded by the kernel; NPY and Arrow files are memory-mapped when `mmap`.
+
+        Parameters
+        ----------
+        session_id : str
+            Session to bind the variable in
+
+        name : str
+            Variable name, optionally dotted (`state.frame`)
+
+        obj : typing.Any
+            The object to transfer
+
+        format : TransferFormat
+            `auto` picks NPY, Arrow or raw bytes by type and falls back to pickle
+
+        mmap : bool
+            Memory-map the uploaded file in the kernel instead of reading it into memory
+
+        transfer_dir : str
+            Directory in the sandbox for the uploaded file, removed once the kernel has loaded it
+
+        timeout : typing.Optional[int]
+            Execution timeout in seconds for the load
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        None
+
+        Examples
+        --------
+        import numpy as np
+
+        from agent_sandbox import Sandbox
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        client.jupyter.push("s1", "embeddings", np.random.rand(100_000, 768).astype(np.float32))
+        client.jupyter.execute_code(code="embeddings.mean(axis=0)", session_id="s1")
+        """
+        from ..file.client import FileClient  # noqa: E402
+
+        _check_name(name)
+        path, meta = _dump_local(obj, format)
+        remote_path = _remote_path(transfer_dir, meta)
+        try:
+            with open(path, "rb") as f:
+                unwrap_response(
+                    FileClient(client_wrapper=self._raw_client._client_wrapper).upload_file(
+                        file=f, path=remote_path, request_options=request_options
+                    )
+                )
+        finally:
+            os.unlink(path)
+        _kernel_output(
+            self.execute_code(
+                code=_import_code(name, remote_path, meta, mmap),
+                session_id=session_id,
+                timeout=OMIT if timeout is None else timeout,
+                request_options=request_options,
+            )
+        )
+
+    def execute_code_stream(
+        self,
+        *,
+        code: str,
+        session_id: typing.Optional[str] = None,
+        kernel_name: typing.Optional[str] = None,
+        timeout: typing.Optional[float] = None,
+        poll_wait: float = 1.0,
+        spool_dir: str = DEFAULT_SPOOL_DIR,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> JupyterOutputStream:
+        """
+        Execute Python code in a Jupyter session and iterate over its outputs as they are produced
+
+        The cell runs as a normal `execute_code` request on the kernel's main thread, so magics, `!` shell
+        escapes, top-level `await`, signals and IPython's execution hooks behave as they do there. While
+        it runs, and only then, its stdout/stderr writes (including those of threads it starts) and
+        `display()` calls go to a spool file in the sandbox, which is followed through `bash.follow` and
+        yielded as `JupyterOutput` objects; the final expression value and exception follow once the
+        cell has finished. Leaving the loop early interrupts the kernel with SIGINT (`kill -INT`).
+
+        Parameters
+        ----------
+        code : str
+            Python code to execute
+
+        session_id : typing.Optional[str]
+            Session to run in; when omitted a session is created for the cell and deleted afterwards
+
+        kernel_name : typing.Optional[str]
+            Kernel for the session created when `session_id` is omitted
+
+        timeout : typing.Optional[float]
+            Execution timeout in seconds, as for `execute_code`; the cell is interrupted when it is reached
+            and the stream ends with status `timeout`
+
+        poll_wait : float
+            Longest time in seconds one poll of the spool follower waits for new output
+
+        spool_dir : str
+            Sandbox directory for the spool file, which is removed when the stream ends
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        JupyterOutputStream
+            Iterator of `JupyterOutput`; `status` holds `ok`, `error`, `cancelled` or `timeout` once it ends
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        with client.jupyter.execute_code_stream(code="train(epochs=100)", session_id="s1") as stream:
+            for output in stream:
+                print(output.text, end="")
+        print(stream.status)
+        """
+        return JupyterOutputStream(
+            self,
+            BashClient(client_wrapper=self._raw_client._client_wrapper),
+            code=code,
+            session_id=session_id,
+            kernel_name=kernel_name,
+            timeout=timeout,
+            poll_wait=poll_wait,
+            spool_dir=spool_dir,
+            request_options=request_options,
+        )
+
+
+class AsyncExtendedJupyterClient(AsyncJupyterClient):
+    """
+    `AsyncJupyterClient` with kernel pools, variable transfer and output streaming.
+    """
+
+    def kernel_pool(
+        self,
+        *,
+        size: int = 2,
+        preload: typing.Optional[str] = DEFAULT_PRELOAD,
+        max_uses: typing.Optional[int] = None,
+        max_sessions: typing.Optional[int] = None,
+        health_interval: float = 300.0,
+        lease_timeout: float = 60.0,
+        timeout: typing.Optional[int] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> AsyncKernelPool:
+        """
+        Create a pool of prewarmed Jupyter kernels keyed by (kernel_name, cwd)
+
+        Kernels run the preload snippet when started and are cleared with `%reset -f` on return,
+        then preloaded again; they are retired instead after `max_uses` leases or when dirty.
+
+        Parameters
+        ----------
+        size : int
+            Number of idle kernels to keep warm per (kernel_name, cwd)
+
+        preload : typing.Optional[str]
+            Code run in every new kernel and after every reset, by default importing numpy and pandas
+
+        max_uses : typing.Optional[int]
+            Retire a kernel after this many leases instead of resetting it
+
+        max_sessions : typing.Optional[int]
+            Upper bound on the kernels owned by this pool
+
+        health_interval : float
+            Seconds between health-check rounds; idle kernels are probed so they do not expire
+
+        lease_timeout : float
+            Max seconds `lease` waits for a kernel when `max_sessions` is reached
+
+        timeout : typing.Optional[int]
+            Execution timeout in seconds for the preload and reset code
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        AsyncKernelPool
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            async with client.jupyter.kernel_pool(size=4, preload="import numpy as np") as pool:
+                async with pool.lease(kernel_name="python3") as kernel:
+                    await client.jupyter.execute_code(code="np.arange(10).sum()", session_id=kernel.session_id)
+
+
+        asyncio.run(main())
+        """
+        return AsyncKernelPool(
+            self,
+            size=size,
+            preload=preload,
+            max_uses=max_uses,
+            max_sessions=max_sessions,
+            health_interval=health_interval,
+            lease_timeout=lease_timeout,
+            timeout=timeout,
+            request_options=request_options,
+        )
+
+    async def fetch(
+        self,
+        session_id: str,
+        var_name: str,
+        *,
+        format: TransferFormat = "auto",
+        mmap: bool = True,
+        allow_pickle: bool = False,
+        local_path: typing.Optional[str] = None,
+        transfer_dir: str = DEFAULT_TRANSFER_DIR,
+        timeout: typing.Optional[int] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> typing.Any:
+        """
+        Copy a variable out of a Jupyter session as binary data instead of its printed repr
+
+        The kernel serializes the object to a file in the sandbox (NPY for NumPy arrays, Arrow IPC for
+        pandas objects and Arrow tables, or Parquet/pickle on request), which is streamed back with
+        `file.download_file` and loaded locally; NPY and Arrow files are memory-mapped when `mmap`.
+
+        Parameters
+        ----------
+        session_id : str
+            Session holding the variable
+
+        var_name : str
+            Name of the variable, optionally dotted (`results.frame`)
+
+        format : TransferFormat
+            `auto` picks NPY or Arrow by type, falling back to pickle when `allow_pickle`
+
+        mmap : bool
+            Memory-map the downloaded file instead of reading it into memory
+
+        allow_pickle : bool
+            Allow pickle transfer for objects without a binary format; unpickling runs code from the sandbox
+
+        local_path : typing.Optional[str]
+            Where to keep the downloaded file; by default a temporary file that is removed once loaded
+
+        transfer_dir : str
+            Directory in the sandbox for the temporary export, removed after the download
+
+        timeout : typing.Optional[int]
+            Execution timeout in seconds for the serialization
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        typing.Any
+            The variable, as a NumPy array, pandas object, Arrow table or unpickled object
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            await client.jupyter.execute_code(code="import pandas as pd; df = pd.read_csv('data.csv')", session_id="s1")
+            frame = await client.jupyter.fetch("s1", "df")
+
+
+        asyncio.run(main())
+        """
+        from ..file.client import AsyncFileClient  # noqa: E402
+
+        meta = _export_meta(
+            await self.execute_code(
+                code=_export_code(var_name, format, allow_pickle, transfer_dir),
+                session_id=session_id,
+                timeout=OMIT if timeout is None else timeout,
+                request_options=request_options,
+            )
+        )
+        path, temporary = _local_target(local_path, meta)
+        file_client = AsyncFileClient(client_wrapper=self._raw_client._client_wrapper)
+        try:
+            with open(path, "wb") as f:
+                async for chunk in file_client.download_file(path=meta["path"], request_options=request_options):
+                    f.write(chunk)
+        except BaseException:
+            _discard_local(path, temporary)
+            raise
+        finally:
+            try:
+                await self.execute_code(
+                    code=_remove_code(meta["path"]), session_id=session_id, request_options=request_options
+                )
+            except Exception:
+                pass
+        return _finish_local(path, temporary, meta, mmap, allow_pickle)
+
+    async def push(
+        self,
+        session_id: str,
+        name: str,
+        obj: typing.Any,
+        *,
+        format: TransferFormat = "auto",
+        mmap: bool = True,
+        transfer_dir: str = DEFAULT_TRANSFER_DIR,
+        timeout: typing.Optional[int] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> None:
+        """
+        Bind a local object to a variable in a Jupyter session without embedding it in the code string
+
+        The object is serialized locally (NPY for NumPy arrays, Arrow IPC for pandas objects and Arrow
+        tables, raw bytes for `str`/`bytes`, otherwise pickle), streamed into the sandbox with
+        `file.upload_file`, and loaded by the kernel; NPY and Arrow files are memory-mapped when `mmap`.
+
+        Parameters
+        ----------
+        session_id : str
+            Session to bind the variable in
+
+        name : str
+            Variable name, optionally dotted (`state.frame`)
+
+        obj : typing.Any
+            The object to transfer
+
+        format : TransferFormat
+            `auto` picks NPY, Arrow or raw bytes by type and falls back to pickle
+
+        mmap : bool
+            Memory-map the uploaded file in the kernel instead of reading it into memory
+
+        transfer_dir : str
+            Directory in the sandbox for the uploaded file, removed once the kernel has loaded it
+
+        timeout : typing.Optional[int]
+            Execution timeout in seconds for the load
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        None
+
+        Examples
+        --------
+        import asyncio
+
+        import pandas as pd
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            await client.jupyter.push("s1", "df", pd.read_csv("local.csv"))
+            await client.jupyter.execute_code(code="df.describe()", session_id="s1")
+
+
+        asyncio.run(main())
+        """
+        from ..file.client import AsyncFileClient  # noqa: E402
+
+        _check_name(name)
+        path, meta = _dump_local(obj, format)
+        remote_path = _remote_path(transfer_dir, meta)
+        try:
+            with open(path, "rb") as f:
+                unwrap_response(
+                    await AsyncFileClient(client_wrapper=self._raw_client._client_wrapper).upload_file(
+                        file=f, path=remote_path, request_options=request_options
+                    )
+                )
+        finally:
+            os.unlink(path)
+        _kernel_output(
+            await self.execute_code(
+                code=_import_code(name, remote_path, meta, mmap),
+                session_id=session_id,
+                timeout=OMIT if timeout is None else timeout,
+                request_options=request_options,
+            )
+        )
+
+    def execute_code_stream(
+        self,
+        *,
+        code: str,
+        session_id: typing.Optional[str] = None,
+        kernel_name: typing.Optional[str] = None,
+        timeout: typing.Optional[float] = None,
+        poll_wait: float = 1.0,
+        spool_dir: str = DEFAULT_SPOOL_DIR,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> AsyncJupyterOutputStream:
+        """
+        Execute Python code in a Jupyter session and iterate over its outputs as they are produced
+
+        The cell runs as a normal `execute_code` request on the kernel's main thread, so magics, `!` shell
+        escapes, top-level `await`, signals and IPython's execution hooks behave as they do there. While
+        it runs, and only then, its stdout/stderr writes (including those of threads it starts) and
+        `display()` calls go to a spool file in the sandbox, which is followed through `bash.follow` and
+        yielded as `JupyterOutput` objects; the final expression value and exception follow once the
+        cell has finished. Leaving the loop early interrupts the kernel with SIGINT (`kill -INT`).
+
+        Parameters
+        ----------
+        code : str
+            Python code to execute
+
+        session_id : typing.Optional[str]
+            Session to run in; when omitted a session is created for the cell and deleted afterwards
+
+        kernel_name : typing.Optional[str]
+            Kernel for the session created when `session_id` is omitted
+
+        timeout : typing.Optional[float]
+            Execution timeout in seconds, as for `execute_code`; the cell is interrupted when it is reached
+            and the stream ends with status `timeout`
+
+        poll_wait : float
+            Longest time in seconds one poll of the spool follower waits for new output
+
+        spool_dir : str
+            Sandbox directory for the spool file, which is removed when the stream ends
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        AsyncJupyterOutputStream
+            Iterator of `JupyterOutput`; `status` holds `ok`, `error`, `cancelled` or `timeout` once it ends
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            stream = client.jupyter.execute_code_stream(code="train(epochs=100)", session_id="s1")
+            async with stream:
+                async for output in stream:
+                    if output.output_type == "error":
+                        break
+
+
+        asyncio.run(main())
+        """
+        return AsyncJupyterOutputStream(
+            self,
+            AsyncBashClient(client_wrapper=self._raw_client._client_wrapper),
+            code=code,
+            session_id=session_id,
+            kernel_name=kernel_name,
+            timeout=timeout,
+            poll_wait=poll_wait,
+            spool_dir=spool_dir,
+            request_options=request_options,
+        )
@@ -0,0 +1,309 @@
+import typing
+
+from ..core.envelope import unwrap_response
+from ..core.lease_pool import _AsyncLeasePool, _BaseLease, _BaseLeasePool, _LeasePool
+from ..core.request_options import RequestOptions
+
+if typing.TYPE_CHECKING:
+    from .client import AsyncJupyterClient, JupyterClient
+
+KernelKey = typing.Tuple[typing.Optional[str], typing.Optional[str]]
+
+DEFAULT_PRELOAD = "import numpy as np\nimport pandas as pd"
+
+
+def _prepare_code(cwd: typing.Optional[str], preload: typing.Optional[str], reset: bool) -> str:
+    """
+    Clears the user namespace (on return only), moves back to the kernel's
+    directory and runs the preload snippet. Modules imported by the preload stay
+    in ``sys.modules`` across resets, so re-running it after ``%reset -f`` only
+    rebinds the names.
+    """
+    lines = ["%reset -f"] if reset else []
+    if cwd is not None:
+        lines.append(f"__import__('os').chdir({cwd!r})")
+    if preload:
+        lines.append(preload)
+    return "\n".join(lines) or "pass"
+
+
+class PooledKernel(_BaseLease):
+    """
+    A warm Jupyter kernel leased from a ``KernelPool``.
+
+    Run code in it with ``client.jupyter.execute_code(session_id=kernel.session_id, ...)``.
+    Call ``mark_dirty()`` when the lease left state behind that ``%reset -f``
+    cannot undo (monkeypatched modules, threads, changed ``sys.path``); the
+    kernel is then retired instead of being returned to the pool.
+    """
+
+    key: KernelKey
+
+    def __init__(self, *, session_id: str, key: KernelKey):
+        super().__init__(session_id=session_id, key=key)
+
+    @property
+    def kernel_name(self) -> typing.Optional[str]:
+        return self.key[0]
+
+    @property
+    def cwd(self) -> typing.Optional[str]:
+        return self.key[1]
+
+    def __repr__(self) -> str:
+        return f"PooledKernel(session_id={self.session_id!r}, kernel_name={self.kernel_name!r}, uses={self.uses})"
+
+
+class _BaseKernelPool(_BaseLeasePool[KernelKey, PooledKernel]):
+    _noun = "Jupyter kernel"
+
+    def __init__(
+        self,
+        *,
+        size: int = 2,
+        preload: typing.Optional[str] = DEFAULT_PRELOAD,
+        max_uses: typing.Optional[int] = None,
+        max_sessions: typing.Optional[int] = None,
+        health_interval: float = 300.0,
+        lease_timeout: float = 60.0,
+        timeout: typing.Optional[int] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ):
+        super().__init__(
+            size=size,
+            max_uses=max_uses,
+            max_sessions=max_sessions,
+            health_interval=health_interval,
+            lease_timeout=lease_timeout,
+            request_options=request_options,
+        )
+        self._preload = preload
+        self._timeout = timeout
+
+    @property
+    def retired(self) -> int:
+        """
+        Kernels shut down instead of being returned to the pool.
+        """
+        return self._discarded
+
+    def _execute_kwargs(self, kernel: PooledKernel, reset: bool) -> typing.Dict[str, typing.Any]:
+        kwargs: typing.Dict[str, typing.Any] = {
+            "code": _prepare_code(kernel.cwd, self._preload, reset),
+            "session_id": kernel.session_id,
+            "request_options": self._request_options,
+        }
+        if self._timeout is not None:
+            kwargs["timeout"] = self._timeout
+        return kwargs
+
+    @staticmethod
+    def _create_kwargs(key: KernelKey) -> typing.Dict[str, typing.Any]:
+        kernel_name, cwd = key
+        kwargs: typing.Dict[str, typing.Any] = {}
+        if kernel_name is not None:
+            kwargs["kernel_name"] = kernel_name
+        if cwd is not None:
+            kwargs["cwd"] = cwd
+        return kwargs
+
+    @staticmethod
+    def _check_prepared(response: typing.Any) -> bool:
+        result = unwrap_response(response)
+        return result is not None and result.status == "ok"
+
+
+class KernelPool(_BaseKernelPool, _LeasePool[KernelKey, PooledKernel]):
+    """
+    Keeps started Jupyter kernels per (kernel_name, cwd) and leases them out.
+
+    New kernels are created with ``jupyter.create_session`` ahead of demand and
+    run the ``preload`` snippet (by default ``import numpy as np`` and
+    ``import pandas as pd``), so the first ``execute_code`` of a task pays neither
+    kernel start-up nor the imports. On return a kernel is cleared with
+    ``%reset -f`` and the preload is re-run; kernels that fail to reset, were
+    marked dirty or reached ``max_uses`` are retired instead. While used as a
+    context manager a background thread probes idle kernels (keeping them from
+    expiring) and tops every key back up to ``size``.
+
+    Examples
+    --------
+    from agent_sandbox import Sandbox
+
+    client = Sandbox(
+        base_url="https://yourhost.com/path/to/api",
+    )
+    with client.jupyter.kernel_pool(size=4, max_uses=20) as pool:
+        pool.warm(kernel_name="python3", cwd="/home/gem/project")
+        with pool.lease(kernel_name="python3", cwd="/home/gem/project") as kernel:
+            client.jupyter.execute_code(code="pd.read_csv('data.csv').describe()", session_id=kernel.session_id)
+    """
+
+    _thread_name = "jupyter-kernel-pool"
+
+    def __init__(self, client: "JupyterClient", **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._client = client
+
+    def __enter__(self) -> "KernelPool":
+        self.start()
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def lease(
+        self, *, kernel_name: typing.Optional[str] = None, cwd: typing.Optional[str] = None
+    ) -> typing.ContextManager[PooledKernel]:
+        """
+        Lease a kernel for the ``with`` block. Leaving the block with an exception
+        retires the kernel rather than returning it to the pool.
+        """
+        return self._lease((kernel_name, cwd))
+
+    def acquire(self, *, kernel_name: typing.Optional[str] = None, cwd: typing.Optional[str] = None) -> PooledKernel:
+        """
+        Take a kernel out of the pool; pair every call with ``release``.
+        """
+        return self._acquire((kernel_name, cwd))
+
+    def warm(
+        self,
+        *,
+        kernel_name: typing.Optional[str] = None,
+        cwd: typing.Optional[str] = None,
+        count: typing.Optional[int] = None,
+    ) -> int:
+        """
+        Start idle kernels for a key until it has ``count`` (default ``size``),
+        within ``max_sessions``. Returns the number of kernels started.
+        """
+        return self._warm((kernel_name, cwd), count)
+
+    def _start(self, key: KernelKey) -> PooledKernel:
+        created = unwrap_response(
+            self._client.create_session(**self._create_kwargs(key), request_options=self._request_options)
+        )
+        return PooledKernel(session_id=created.session_id, key=key)
+
+    def _setup(self, kernel: PooledKernel) -> bool:
+        return self._prepare(kernel, reset=False)
+
+    def _renew(self, kernel: PooledKernel) -> bool:
+        return self._prepare(kernel, reset=True)
+
+    def _prepare(self, kernel: PooledKernel, reset: bool) -> bool:
+        try:
+            return self._check_prepared(self._client.execute_code(**self._execute_kwargs(kernel, reset)))
+        except Exception:
+            return False
+
+    def _probe(self, kernel: PooledKernel) -> bool:
+        try:
+            return self._check_prepared(
+                self._client.execute_code(
+                    code="pass", session_id=kernel.session_id, request_options=self._request_options
+                )
+            )
+        except Exception:
+            return False
+
+    def _delete(self, kernel: PooledKernel) -> None:
+        self._client.delete_session(kernel.session_id, request_options=self._request_options)
+
+
+class AsyncKernelPool(_BaseKernelPool, _AsyncLeasePool[KernelKey, PooledKernel]):
+    """
+    Async counterpart of ``KernelPool``; health checks run as an asyncio task.
+
+    Examples
+    --------
+    import asyncio
+
+    from agent_sandbox import AsyncSandbox
+
+    client = AsyncSandbox(
+        base_url="https://yourhost.com/path/to/api",
+    )
+
+
+    async def main() -> None:
+        async with client.jupyter.kernel_pool(size=4) as pool:
+            async with pool.lease(kernel_name="python3") as kernel:
+                await client.jupyter.execute_code(code="np.arange(10).sum()", session_id=kernel.session_id)
+
+
+    asyncio.run(main())
+    """
+
+    def __init__(self, client: "AsyncJupyterClient", **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._client = client
+
+    async def __aenter__(self) -> "AsyncKernelPool":
+        self.start()
+        return self
+
+    async def __aexit__(self, *args: typing.Any) -> None:
+        await self.close()
+
+    def lease(
+        self, *, kernel_name: typing.Optional[str] = None, cwd: typing.Optional[str] = None
+    ) -> typing.AsyncContextManager[PooledKernel]:
+        """
+        Lease a kernel for the ``async with`` block. Leaving the block with an
+        exception retires the kernel rather than returning it to the pool.
+        """
+        return self._lease((kernel_name, cwd))
+
+    async def acquire(
+        self, *, kernel_name: typing.Optional[str] = None, cwd: typing.Optional[str] = None
+    ) -> PooledKernel:
+        """
+        Take a kernel out of the pool; pair every call with ``release``.
+        """
+        return await self._acquire((kernel_name, cwd))
+
+    async def warm(
+        self,
+        *,
+        kernel_name: typing.Optional[str] = None,
+        cwd: typing.Optional[str] = None,
+        count: typing.Optional[int] = None,
+    ) -> int:
+        """
+        Start idle kernels for a key until it has ``count`` (default ``size``),
+        within ``max_sessions``. Kernels are started concurrently. Returns the number started.
+        """
+        return await self._warm((kernel_name, cwd), count)
+
+    async def _start(self, key: KernelKey) -> PooledKernel:
+        created = unwrap_response(
+            await self._client.create_session(**self._create_kwargs(key), request_options=self._request_options)
+        )
+        return PooledKernel(session_id=created.session_id, key=key)
+
+    async def _setup(self, kernel: PooledKernel) -> bool:
+        return await self._prepare(kernel, reset=False)
+
+    async def _renew(self, kernel: PooledKernel) -> bool:
+        return await self._prepare(kernel, reset=True)
+
+    async def _prepare(self, kernel: PooledKernel, reset: bool) -> bool:
+        try:
+            return self._check_prepared(await self._client.execute_code(**self._execute_kwargs(kernel, reset)))
+        except Exception:
+            return False
+
+    async def _probe(self, kernel: PooledKernel) -> bool:
+        try:
+            return self._check_prepared(
+                await self._client.execute_code(
+                    code="pass", session_id=kernel.session_id, request_options=self._request_options
+                )
+            )
+        except Exception:
+            return False
+
+    async def _delete(self, kernel: PooledKernel) -> None:
+        await self._client.delete_session(kernel.session_id, request_options=self._request_options)
@@ -0,0 +1,553 @@
+import asyncio
+import concurrent.futures
+import json
+import math
+import re
+import shlex
+import typing
+import uuid
+
+from ..bash.follow import AsyncBashFollower, BashFollower
+from ..core.envelope import unwrap_response
+from ..core.request_options import RequestOptions
+from ..types.jupyter_output import JupyterOutput
+from .transfer import _kernel_output
+
+if typing.TYPE_CHECKING:
+    from ..bash.client import AsyncBashClient, BashClient
+    from .client import AsyncJupyterClient, JupyterClient
+
+# this is used as the default value for optional parameters
+OMIT = typing.cast(typing.Any, ...)
+
+DEFAULT_SPOOL_DIR = "/tmp/agent-sandbox-jupyter-stream"
+
+_MARKER = "__JUPYTER_STREAM__"
+_MARKER_LINE = re.compile(re.escape(_MARKER) + r"(\{.*\})")
+_RUNTIME_MODULE = "__agent_sandbox_jupyter_stream_v2__"
+# last line of every spool; output lines are JSON objects, so it cannot be mistaken for one
+_END = "__JUPYTER_STREAM_END__"
+
+# Installed once per kernel as a hidden module that only defines functions; nothing is hooked until a cell is
+# armed. `arm` opens the spool file and registers a one-shot IPython `pre_run_cell` callback. The next cell
+# uses it up: if it is the armed code, its stdout, stderr and display() calls (from any thread, while it runs)
+# are appended to the spool as JSON lines, and a `post_run_cell` callback puts everything back and ends the
+# spool. Any other cell only ends the spool, so a cell sent by someone else in between is never captured.
+# The cell itself runs as a normal execute request on the kernel's main thread.
+_RUNTIME = r"""
+import json, os, sys, threading
+
+
+class _Spool:
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.file = open(path, "a", encoding="utf-8")
+        self.lock = threading.Lock()
+
+    def put(self, output):
+        line = json.dumps(output, default=str)
+        with self.lock:
+            if not self.file.closed:
+                self.file.write(line + "\n")
+                self.file.flush()
+
+    def end(self, end):
+        with self.lock:
+            if not self.file.closed:
+                self.file.write(end + "\n")
+                self.file.close()
+
+
+class _Stream:
+    def __init__(self, name, spool, fallback):
+        self.name = name
+        self.spool = spool
+        self.fallback = fallback
+
+    def write(self, text):
+        if text:
+            self.spool.put({"output_type": "stream", "name": self.name, "text": text})
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self.fallback, name)
+
+
+class _Run:
+    def __init__(self, shell, code, path, end):
+        self.shell = shell
+        self.code = code
+        self.end = end
+        self.spool = _Spool(path)
+        self.saved = {}
+
+    def pre(self, info=None):
+        self.shell.events.unregister("pre_run_cell", self.pre)
+        if getattr(info, "raw_cell", None) != self.code:
+            self.spool.end(self.end)
+            return
+        publisher = self.shell.display_pub
+        self.saved = {"stdout": sys.stdout, "stderr": sys.stderr, "publish": vars(publisher).get("publish")}
+        sys.stdout = self.stdout = _Stream("stdout", self.spool, sys.stdout)
+        sys.stderr = self.stderr = _Stream("stderr", self.spool, sys.stderr)
+        publisher.publish = self.publish
+        self.shell.events.register("post_run_cell", self.post)
+
+    def publish(self, data, metadata=None, *args, **kwargs):
+        self.spool.put({"output_type": "display_data", "data": data, "metadata": metadata or {}})
+
+    def post(self, result=None):
+        self.shell.events.unregister("post_run_cell", self.post)
+        # streams the cell replaced itself are left alone
+        if sys.stdout is self.stdout:
+            sys.stdout = self.saved["stdout"]
+        if sys.stderr is self.stderr:
+            sys.stderr = self.saved["stderr"]
+        publisher = self.shell.display_pub
+        if self.saved["publish"] is None:
+            vars(publisher).pop("publish", None)
+        else:
+            publisher.publish = self.saved["publish"]
+        self.spool.end(self.end)
+
+
+def arm(code, path, end):
+    from IPython import get_ipython
+
+    shell = get_ipython()
+    if shell is None:
+        raise RuntimeError("Streaming needs an IPython kernel")
+    shell.events.register("pre_run_cell", _Run(shell, code, path, end).pre)
+    return {"pid": os.getpid()}
+"""
+
+# Runs in the sandbox's shell: prints the spool's lines as they are appended, up to the end line, then removes
+# the file.
+_FOLLOW = r"""
+import os, sys, time
+path, end = sys.argv[1], sys.argv[2].encode() + b"\n"
+line = b""
+with open(path, "rb") as spool:
+    while True:
+        chunk = spool.readline()
+        if not chunk:
+            time.sleep(0.01)
+            continue
+        line += chunk
+        if not line.endswith(b"\n"):
+            continue
+        if line == end:
+            break
+        sys.stdout.buffer.write(line)
+        sys.stdout.flush()
+        line = b""
+try:
+    os.unlink(path)
+except OSError:
+    pass
+"""
+
+
+def _arm_code(code: str, path: str) -> str:
+    call = f"__jt_modules[{_RUNTIME_MODULE!r}].arm({code!r}, {path!r}, {_END!r})"
+    return "\n".join(
+        [
+            "__jt_modules = __import__('sys').modules",
+            f"if {_RUNTIME_MODULE!r} not in __jt_modules:",
+            f"    __jt_modules[{_RUNTIME_MODULE!r}] = __import__('types').ModuleType({_RUNTIME_MODULE!r})",
+            f"    exec({_RUNTIME!r}, __jt_modules[{_RUNTIME_MODULE!r}].__dict__)",
+            f"print({_MARKER!r} + __import__('json').dumps({call}))",
+            "del __jt_modules",
+        ]
+    )
+
+
+def _armed(response: typing.Any) -> typing.Dict[str, typing.Any]:
+    match = _MARKER_LINE.search(_kernel_output(response))
+    if match is None:
+        raise RuntimeError("The kernel did not report the stream state")
+    return json.loads(match.group(1))
+
+
+class _SpoolLines:
+    """
+    Splits the followed spool into outputs, merging consecutive writes to the same stream.
+    """
+
+    def __init__(self) -> None:
+        self._partial = ""
+
+    def feed(self, data: str) -> typing.List[JupyterOutput]:
+        lines = (self._partial + data).split("\n")
+        self._partial = lines.pop()
+        outputs: typing.List[typing.Dict[str, typing.Any]] = []
+        for line in lines:
+            if not line:
+                continue
+            output = json.loads(line)
+            last = outputs[-1] if outputs else None
+            if output["output_type"] == "stream" and last is not None and last.get("name") == output["name"]:
+                last["text"] += output["text"]
+            else:
+                outputs.append(output)
+        return [JupyterOutput(**output) for output in outputs]
+
+
+class _BaseJupyterOutputStream:
+    def __init__(
+        self,
+        *,
+        code: str,
+        session_id: typing.Optional[str] = None,
+        kernel_name: typing.Optional[str] = None,
+        timeout: typing.Optional[float] = None,
+        poll_wait: float = 1.0,
+        spool_dir: str = DEFAULT_SPOOL_DIR,
+        request_options: typing.Optional[RequestOptions] = None,
+    ):
+        if poll_wait <= 0:
+            raise ValueError("poll_wait must be positive")
+        self._code = code
+        self._session_id = session_id
+        self._owns_session = session_id is None
+        self._kernel_name = kernel_name
+        self._timeout = timeout
+        self._poll_wait = poll_wait
+        self._request_options = request_options
+        self._spool = f"{spool_dir.rstrip('/')}/{uuid.uuid4().hex}.jsonl"
+        self._pid: typing.Optional[int] = None
+        # bash session running the spool follower
+        self._follow_session: typing.Optional[str] = None
+        self._started = False
+        self._status: typing.Optional[str] = None
+
+    @property
+    def session_id(self) -> typing.Optional[str]:
+        """
+        Jupyter session the cell runs in, once known.
+        """
+        return self._session_id
+
+    @property
+    def status(self) -> typing.Optional[str]:
+        """
+        `ok`, `error`, `cancelled` or `timeout` once the cell has ended, otherwise None.
+        """
+        return self._status
+
+    def _follow_command(self) -> str:
+        return f"python3 -c {shlex.quote(_FOLLOW)} {shlex.quote(self._spool)} {shlex.quote(_END)}"
+
+    def _interrupt_command(self, running: bool) -> str:
+        # the spool can go right away: the kernel and the follower keep writing and reading their open files
+        remove = f"rm -f {shlex.quote(self._spool)}"
+        return f"kill -INT {self._pid}; {remove}" if running else remove
+
+    def _execute_kwargs(self) -> typing.Dict[str, typing.Any]:
+        return dict(
+            code=self._code,
+            session_id=self._session_id,
+            timeout=OMIT if self._timeout is None else math.ceil(self._timeout),
+            request_options=self._request_options,
+        )
+
+    @staticmethod
+    def _failed(follower: typing.Any, stderr: typing.List[str]) -> None:
+        finished = follower.finished
+        if finished is not None and finished.status == "completed" and finished.exit_code:
+            raise RuntimeError(f"Following the cell's output failed: {''.join(stderr).strip()}")
+
+    def _outputs(self, response: typing.Any) -> typing.List[JupyterOutput]:
+        """
+        What the kernel returned outside the spool: the final expression's value, the error, and output written
+        past the hooks (e.g. straight to the file descriptors).
+        """
+        result = unwrap_response(response)
+        if self._status is None:
+            self._status = result.status
+        return list(result.outputs)
+
+
+class JupyterOutputStream(_BaseJupyterOutputStream):
+    """
+    Iterator over the outputs of a Jupyter cell as the kernel produces them.
+
+    The cell runs as a normal ``execute_code`` request, on the kernel's main thread,
+    so signals, top-level ``await``, magics and IPython's execution hooks behave as
+    usual. For the duration of that one cell its stdout, stderr and ``display()``
+    calls are appended to a spool file in the sandbox, which the iterator follows
+    through ``bash.follow``; consecutive stream writes are merged. The final
+    expression's value and the error, if any, come from the ``execute_code``
+    response once the cell has finished. Breaking out of the loop, or calling
+    ``close()``, before the cell has finished interrupts the kernel with SIGINT.
+    """
+
+    def __init__(self, jupyter: "JupyterClient", bash: "BashClient", **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._jupyter = jupyter
+        self._bash = bash
+        self._cell: typing.Optional["concurrent.futures.Future[typing.Any]"] = None
+        self._iterator: typing.Optional[typing.Iterator[JupyterOutput]] = None
+
+    def __enter__(self) -> "JupyterOutputStream":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def __iter__(self) -> typing.Iterator[JupyterOutput]:
+        if self._iterator is None:
+            self._iterator = self._outputs_stream()
+        return self._iterator
+
+    def __next__(self) -> JupyterOutput:
+        return next(iter(self))
+
+    def close(self) -> None:
+        if self._iterator is not None:
+            typing.cast(typing.Generator[JupyterOutput, None, None], self._iterator).close()
+        elif self._owns_session and self._session_id is not None:
+            self._delete_session()
+
+    def cancel(self) -> None:
+        """
+        Interrupt the cell if it is still running; iteration ends with status `cancelled`.
+        """
+        self.close()
+
+    def _delete_session(self) -> None:
+        try:
+            self._jupyter.delete_session(typing.cast(str, self._session_id), request_options=self._request_options)
+        except Exception:
+            pass
+
+    def _outputs_stream(self) -> typing.Iterator[JupyterOutput]:
+        if self._session_id is None:
+            create = self._jupyter.create_session(
+                kernel_name=OMIT if self._kernel_name is None else self._kernel_name,
+                request_options=self._request_options,
+            )
+            self._session_id = unwrap_response(create).session_id
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        try:
+            armed = _armed(
+                self._jupyter.execute_code(
+                    code=_arm_code(self._code, self._spool),
+                    session_id=self._session_id,
+                    request_options=self._request_options,
+                )
+            )
+            self._pid = armed["pid"]
+            started = unwrap_response(
+                self._bash.exec(command=self._follow_command(), async_mode=True, request_options=self._request_options)
+            )
+            self._follow_session = started.session_id
+            self._cell = executor.submit(self._execute)
+            self._started = True
+            follower = BashFollower(
+                self._bash,
+                session_id=started.session_id,
+                command_id=started.command_id,
+                wait_timeout=self._poll_wait,
+                request_options=self._request_options,
+            )
+            lines, stderr = _SpoolLines(), []
+            try:
+                for event in follower:
+                    if event.type == "output" and event.stream == "stdout":
+                        yield from lines.feed(event.data)
+                    elif event.type == "output":
+                        stderr.append(event.data)
+            except Exception:
+                # a failed cell request stops the follower; its error is the one worth raising
+                done, _ = concurrent.futures.wait([self._cell], timeout=self._poll_wait)
+                if not done or self._cell.exception() is None:
+                    raise
+            response = self._cell.result()
+            self._failed(follower, stderr)
+            yield from self._outputs(response)
+        finally:
+            if self._started and self._status is None:
+                self._interrupt()
+                self._status = "cancelled"
+                concurrent.futures.wait([typing.cast(concurrent.futures.Future, self._cell)], timeout=self._poll_wait)
+            executor.shutdown(wait=False)
+            self._stop_following()
+            if self._owns_session:
+                self._delete_session()
+
+    def _execute(self) -> typing.Any:
+        try:
+            response = self._jupyter.execute_code(**self._execute_kwargs())
+        except BaseException:
+            # the spool may never be ended, so the follower is stopped instead
+            self._stop_following()
+            raise
+        if getattr(response.data, "status", None) == "timeout":
+            # the server stopped waiting, but the cell may still be running
+            self._interrupt()
+        return response
+
+    def _interrupt(self) -> None:
+        """
+        Send SIGINT to the kernel if the cell is still running, and remove the spool.
+        """
+        if self._pid is None:
+            return
+        command = self._interrupt_command(self._cell is None or not self._cell.done())
+        try:
+            result = unwrap_response(self._bash.exec(command=command, request_options=self._request_options))
+            self._bash.close_session(result.session_id, request_options=self._request_options)
+        except Exception:
+            pass
+
+    def _stop_following(self) -> None:
+        session_id, self._follow_session = self._follow_session, None
+        if session_id is not None:
+            try:
+                self._bash.close_session(session_id, request_options=self._request_options)
+            except Exception:
+                pass
+
+
+class AsyncJupyterOutputStream(_BaseJupyterOutputStream):
+    """
+    Async counterpart of ``JupyterOutputStream``.
+    """
+
+    def __init__(self, jupyter: "AsyncJupyterClient", bash: "AsyncBashClient", **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._jupyter = jupyter
+        self._bash = bash
+        self._cell: typing.Optional["asyncio.Future[typing.Any]"] = None
+        self._iterator: typing.Optional[typing.AsyncIterator[JupyterOutput]] = None
+
+    async def __aenter__(self) -> "AsyncJupyterOutputStream":
+        return self
+
+    async def __aexit__(self, *args: typing.Any) -> None:
+        await self.close()
+
+    def __aiter__(self) -> typing.AsyncIterator[JupyterOutput]:
+        if self._iterator is None:
+            self._iterator = self._outputs_stream()
+        return self._iterator
+
+    async def __anext__(self) -> JupyterOutput:
+        return await self.__aiter__().__anext__()
+
+    async def close(self) -> None:
+        if self._iterator is not None:
+            await typing.cast(typing.AsyncGenerator[JupyterOutput, None], self._iterator).aclose()
+        elif self._owns_session and self._session_id is not None:
+            await self._delete_session()
+
+    async def cancel(self) -> None:
+        """
+        Interrupt the cell if it is still running; iteration ends with status `cancelled`.
+        """
+        await self.close()
+
+    async def _delete_session(self) -> None:
+        try:
+            await self._jupyter.delete_session(
+                typing.cast(str, self._session_id), request_options=self._request_options
+            )
+        except Exception:
+            pass
+
+    async def _outputs_stream(self) -> typing.AsyncIterator[JupyterOutput]:
+        if self._session_id is None:
+            create = await self._jupyter.create_session(
+                kernel_name=OMIT if self._kernel_name is None else self._kernel_name,
+                request_options=self._request_options,
+            )
+            self._session_id = unwrap_response(create).session_id
+        try:
+            armed = _armed(
+                await self._jupyter.execute_code(
+                    code=_arm_code(self._code, self._spool),
+                    session_id=self._session_id,
+                    request_options=self._request_options,
+                )
+            )
+            self._pid = armed["pid"]
+            started = unwrap_response(
+                await self._bash.exec(
+                    command=self._follow_command(), async_mode=True, request_options=self._request_options
+                )
+            )
+            self._follow_session = started.session_id
+            self._cell = asyncio.ensure_future(self._execute())
+            self._started = True
+            follower = AsyncBashFollower(
+                self._bash,
+                session_id=started.session_id,
+                command_id=started.command_id,
+                wait_timeout=self._poll_wait,
+                request_options=self._request_options,
+            )
+            lines, stderr = _SpoolLines(), []
+            try:
+                async for event in follower:
+                    if event.type == "output" and event.stream == "stdout":
+                        for output in lines.feed(event.data):
+                            yield output
+                    elif event.type == "output":
+                        stderr.append(event.data)
+            except Exception:
+                # a failed cell request stops the follower; its error is the one worth raising
+                done, _ = await asyncio.wait({self._cell}, timeout=self._poll_wait)
+                if not done or self._cell.exception() is None:
+                    raise
+            response = await self._cell
+            self._failed(follower, stderr)
+            for output in self._outputs(response):
+                yield output
+        finally:
+            if self._started and self._status is None:
+                await self._interrupt()
+                self._status = "cancelled"
+                cell = typing.cast("asyncio.Future[typing.Any]", self._cell)
+                await asyncio.wait({cell}, timeout=self._poll_wait)
+                if not cell.done():
+                    cell.cancel()
+            await self._stop_following()
+            if self._owns_session:
+                await self._delete_session()
+
+    async def _execute(self) -> typing.Any:
+        try:
+            response = await self._jupyter.execute_code(**self._execute_kwargs())
+        except BaseException:
+            # the spool may never be ended, so the follower is stopped instead
+            await self._stop_following()
+            raise
+        if getattr(response.data, "status", None) == "timeout":
+            # the server stopped waiting, but the cell may still be running
+            await self._interrupt()
+        return response
+
+    async def _interrupt(self) -> None:
+        """
+        Send SIGINT to the kernel if the cell is still running, and remove the spool.
+        """
+        if self._pid is None:
+            return
+        command = self._interrupt_command(self._cell is None or not self._cell.done())
+        try:
+            result = unwrap_response(await self._bash.exec(command=command, request_options=self._request_options))
+            await self._bash.close_session(result.session_id, request_options=self._request_options)
+        except Exception:
+            pass
+
+    async def _stop_following(self) -> None:
+        session_id, self._follow_session = self._follow_session, None
+        if session_id is not None:
+            try:
+                await self._bash.close_session(session_id, request_options=self._request_options)
+            except Exception:
+                pass
@@ -0,0 +1,298 @@
+import json
+import os
+import pickle
+import re
+import sys
+import tempfile
+import typing
+import uuid
+
+from ..core.envelope import unwrap_response
+
+TransferFormat = typing.Literal["auto", "npy", "arrow", "parquet", "raw", "pickle"]
+
+DEFAULT_TRANSFER_DIR = "/tmp/agent-sandbox-transfer"
+
+_MARKER = "__JUPYTER_TRANSFER__"
+_MARKER_LINE = re.compile(re.escape(_MARKER) + r"(\{.*\})")
+_FORMATS = ("auto", "npy", "arrow", "parquet", "raw", "pickle")
+_EXTENSIONS = {"npy": ".npy", "arrow": ".arrow", "parquet": ".parquet", "raw": ".bin", "pickle": ".pkl"}
+_FRAME_KINDS = ("pandas.DataFrame", "pandas.Series", "pyarrow.Table")
+_RAW_KINDS = ("builtins.bytes", "builtins.bytearray", "builtins.str")
+
+# runs inside the kernel; everything it defines is removed again before returning
+_EXPORT_FUNCTION = """
+def __jt_export(obj, stem, fmt, allow_pickle):
+    import json, os, pickle
+    kind = type(obj).__module__.split(".")[0] + "." + type(obj).__name__
+    if fmt == "auto":
+        fmt = "raw" if kind in %(raw_kinds)r else "pickle"
+        try:
+            import numpy
+            if isinstance(obj, numpy.ndarray) and not obj.dtype.hasobject:
+                fmt = "npy"
+        except ImportError:
+            pass
+        if kind in %(frame_kinds)r:
+            try:
+                import pyarrow
+                fmt = "arrow"
+            except ImportError:
+                pass
+    if fmt == "pickle" and not allow_pickle:
+        raise TypeError(f"{kind} has no binary format; pass allow_pickle=True to transfer it as a pickle")
+    path = stem + %(extensions)r[fmt]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if fmt == "npy":
+        import numpy
+        numpy.save(path, obj, allow_pickle=False)
+    elif fmt in ("arrow", "parquet"):
+        import pyarrow
+        if kind == "pandas.Series":
+            obj = obj.to_frame()
+        table = obj if isinstance(obj, pyarrow.Table) else pyarrow.Table.from_pandas(obj)
+        if fmt == "arrow":
+            with pyarrow.OSFile(path, "wb") as sink, pyarrow.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        else:
+            import pyarrow.parquet
+            pyarrow.parquet.write_table(table, path)
+    elif fmt == "raw":
+        with open(path, "wb") as f:
+            f.write(obj.encode() if isinstance(obj, str) else obj)
+    else:
+        with open(path, "wb") as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    meta = {"format": fmt, "path": path, "size": os.path.getsize(path), "kind": kind}
+    print(%(marker)r + json.dumps(meta))
+"""
+
+# the reverse direction: binds an uploaded file to a name and removes it; mapped data outlives the unlink
+_IMPORT_FUNCTION = """
+def __jt_import(path, fmt, kind, mmap):
+    import os
+    try:
+        if fmt == "npy":
+            import numpy
+            return numpy.load(path, mmap_mode="r" if mmap else None, allow_pickle=False)
+        if fmt in ("raw", "pickle"):
+            with open(path, "rb") as f:
+                data = f.read()
+            if fmt == "pickle":
+                import pickle
+                return pickle.loads(data)
+            if kind == "builtins.str":
+                return data.decode()
+            return bytearray(data) if kind == "builtins.bytearray" else data
+        import pyarrow
+        if fmt == "arrow":
+            import pyarrow.ipc
+            source = pyarrow.memory_map(path, "r") if mmap else pyarrow.OSFile(path, "rb")
+            table = pyarrow.ipc.open_file(source).read_all()
+        else:
+            import pyarrow.parquet
+            table = pyarrow.parquet.read_table(path, memory_map=mmap)
+        if kind == "pyarrow.Table":
+            return table
+        frame = table.to_pandas()
+        return frame.iloc[:, 0] if kind == "pandas.Series" else frame
+    finally:
+        os.remove(path)
+"""
+
+
+def _kind(obj: typing.Any) -> str:
+    return type(obj).__module__.split(".")[0] + "." + type(obj).__name__
+
+
+def _check_name(var_name: str) -> None:
+    if not var_name or not all(part.isidentifier() for part in var_name.split(".")):
+        raise ValueError(f"Not a variable name: {var_name!r}")
+
+
+def _check_format(fmt: str) -> None:
+    if fmt not in _FORMATS:
+        raise ValueError(f"Unknown transfer format {fmt!r}, expected one of {', '.join(_FORMATS)}")
+
+
+def _export_code(var_name: str, fmt: str, allow_pickle: bool, transfer_dir: str) -> str:
+    _check_name(var_name)
+    _check_format(fmt)
+    stem = f"{transfer_dir.rstrip('/')}/{uuid.uuid4().hex}"
+    return "\n".join(
+        [
+            _EXPORT_FUNCTION
+            % {"marker": _MARKER, "raw_kinds": _RAW_KINDS, "frame_kinds": _FRAME_KINDS, "extensions": _EXTENSIONS},
+            "try:",
+            f"    __jt_export({var_name}, {stem!r}, {fmt!r}, {allow_pickle!r})",
+            "finally:",
+            "    del __jt_export",
+        ]
+    )
+
+
+def _remove_code(path: str) -> str:
+    return f"__import__('os').remove({path!r})"
+
+
+def _kernel_output(response: typing.Any) -> str:
+    """
+    Stdout of an execution, raising ``RuntimeError`` with the kernel's exception when it failed.
+    """
+    result = unwrap_response(response)
+    text = []
+    for output in result.outputs:
+        if output.output_type == "error":
+            raise RuntimeError(f"{output.ename}: {output.evalue}")
+        if output.output_type == "stream" and output.text:
+            text.append(output.text)
+    if result.status != "ok":
+        raise RuntimeError(f"Kernel execution ended with status {result.status!r}")
+    return "".join(text)
+
+
+def _export_meta(response: typing.Any) -> typing.Dict[str, typing.Any]:
+    match = _MARKER_LINE.search(_kernel_output(response))
+    if match is None:
+        raise RuntimeError("The kernel did not report the exported file")
+    return json.loads(match.group(1))
+
+
+def _local_target(
+    local_path: typing.Optional[str], meta: typing.Mapping[str, typing.Any]
+) -> typing.Tuple[str, bool]:
+    """
+    Where to store the download, and whether it is a temporary file the caller did not ask for.
+    """
+    if local_path is not None:
+        return local_path, False
+    fd, path = tempfile.mkstemp(prefix="jupyter-fetch-", suffix=_EXTENSIONS.get(meta["format"], ""))
+    os.close(fd)
+    return path, True
+
+
+def _require(module: str, fmt: str) -> typing.Any:
+    try:
+        return __import__(module, fromlist=["_"])
+    except ImportError as e:
+        raise ImportError(f"Loading {fmt} data requires {module.split('.')[0]} to be installed locally") from e
+
+
+def _from_raw(data: bytes, kind: str) -> typing.Any:
+    if kind == "builtins.str":
+        return data.decode()
+    return bytearray(data) if kind == "builtins.bytearray" else data
+
+
+def _load(path: str, meta: typing.Mapping[str, typing.Any], mmap: bool, allow_pickle: bool) -> typing.Any:
+    """
+    Loads a downloaded export, memory-mapping NPY and Arrow files when ``mmap``.
+    """
+    fmt, kind = meta["format"], meta["kind"]
+    if fmt not in _EXTENSIONS:
+        raise ValueError(f"Unknown transfer format {fmt!r}")
+    if fmt == "npy":
+        numpy = _require("numpy", fmt)
+        return numpy.load(path, mmap_mode="r" if mmap else None, allow_pickle=False)
+    if fmt == "raw":
+        with open(path, "rb") as f:
+            data = f.read()
+        return _from_raw(data, kind)
+    if fmt == "pickle":
+        # unpickling runs code from the sandbox, so it stays opt-in even if the kernel claims otherwise
+        if not allow_pickle:
+            raise ValueError("Refusing to unpickle data from the sandbox without allow_pickle=True")
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    if fmt == "arrow":
+        ipc = _require("pyarrow.ipc", fmt)
+        pyarrow = _require("pyarrow", fmt)
+        source = pyarrow.memory_map(path, "r") if mmap else pyarrow.OSFile(path, "rb")
+        table = ipc.open_file(source).read_all()
+    else:
+        parquet = _require("pyarrow.parquet", fmt)
+        table = parquet.read_table(path, memory_map=mmap)
+    if kind == "pyarrow.Table":
+        return table
+    frame = table.to_pandas()
+    return frame.iloc[:, 0] if kind == "pandas.Series" else frame
+
+
+def _finish_local(
+    path: str, temporary: bool, meta: typing.Mapping[str, typing.Any], mmap: bool, allow_pickle: bool
+) -> typing.Any:
+    try:
+        return _load(path, meta, mmap, allow_pickle)
+    finally:
+        # a mapping outlives the unlinked file on POSIX; elsewhere mapped files are left for the OS to clean up
+        if temporary and (not mmap or os.name == "posix"):
+            os.unlink(path)
+
+
+def _discard_local(path: str, temporary: bool) -> None:
+    if temporary and os.path.exists(path):
+        os.unlink(path)
+
+
+def _local_format(obj: typing.Any, kind: str, fmt: str) -> str:
+    """
+    Resolves ``auto`` for a local object; a NumPy array implies NumPy is already imported.
+    """
+    if fmt != "auto":
+        return fmt
+    if kind in _RAW_KINDS:
+        return "raw"
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and isinstance(obj, numpy.ndarray) and not obj.dtype.hasobject:
+        return "npy"
+    if kind in _FRAME_KINDS:
+        return "arrow"
+    return "pickle"
+
+
+def _dump_local(obj: typing.Any, fmt: str) -> typing.Tuple[str, typing.Dict[str, typing.Any]]:
+    """
+    Serializes ``obj`` to a temporary file, returning its path and the metadata the kernel needs to load it.
+    """
+    _check_format(fmt)
+    kind = _kind(obj)
+    fmt = _local_format(obj, kind, fmt)
+    fd, path = tempfile.mkstemp(prefix="jupyter-push-", suffix=_EXTENSIONS[fmt])
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if fmt == "npy":
+                _require("numpy", fmt).save(f, obj, allow_pickle=False)
+            elif fmt in ("arrow", "parquet"):
+                pyarrow = _require("pyarrow", fmt)
+                if kind == "pandas.Series":
+                    obj = obj.to_frame()
+                table = obj if isinstance(obj, pyarrow.Table) else pyarrow.Table.from_pandas(obj)
+                if fmt == "arrow":
+                    with _require("pyarrow.ipc", fmt).new_file(f, table.schema) as writer:
+                        writer.write_table(table)
+                else:
+                    _require("pyarrow.parquet", fmt).write_table(table, f)
+            elif fmt == "raw":
+                f.write(obj.encode() if isinstance(obj, str) else obj)
+            else:
+                pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path, {"format": fmt, "kind": kind, "size": os.path.getsize(path)}
+
+
+def _remote_path(transfer_dir: str, meta: typing.Mapping[str, typing.Any]) -> str:
+    return f"{transfer_dir.rstrip('/')}/{uuid.uuid4().hex}{_EXTENSIONS[meta['format']]}"
+
+
+def _import_code(name: str, path: str, meta: typing.Mapping[str, typing.Any], mmap: bool) -> str:
+    return "\n".join(
+        [
+            _IMPORT_FUNCTION,
+            "try:",
+            f"    {name} = __jt_import({path!r}, {meta['format']!r}, {meta['kind']!r}, {mmap!r})",
+            "finally:",
+            "    del __jt_import",
+        ]
+    )
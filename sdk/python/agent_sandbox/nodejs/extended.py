@@ -0,0 +1,107 @@
+import typing
+
+from ..core.request_options import RequestOptions
+from .client import AsyncNodejsClient, NodejsClient
+from .files import DEFAULT_BLOB_DIR, AsyncNodejsBlobStore, NodejsBlobStore
+
+
+class ExtendedNodejsClient(NodejsClient):
+    """
+    `NodejsClient` with the content-addressed file store.
+    """
+
+    def blob_store(
+        self,
+        *,
+        root: str = DEFAULT_BLOB_DIR,
+        min_size: int = 1024,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> NodejsBlobStore:
+        """
+        Ship `execute_code` files by content hash, uploading each distinct file once
+
+        Files of at least `min_size` bytes are uploaded to `root/<sha256>` the first time they are seen;
+        later calls send a name-to-hash map and a one-line bootstrap that copies them next to the script.
+
+        Parameters
+        ----------
+        root : str
+            Sandbox directory holding the uploaded blobs
+
+        min_size : int
+            Files smaller than this many bytes are sent inline
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration for the blob uploads.
+
+        Returns
+        -------
+        NodejsBlobStore
+            Object with the same `execute_code` signature and upload `stats`
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        store = client.nodejs.blob_store()
+        store.execute_code(code="console.log(require('./lib.js').version)", files={"lib.js": library_source})
+        """
+        return NodejsBlobStore(self, root=root, min_size=min_size, request_options=request_options)
+
+
+class AsyncExtendedNodejsClient(AsyncNodejsClient):
+    """
+    `AsyncNodejsClient` with the content-addressed file store.
+    """
+
+    def blob_store(
+        self,
+        *,
+        root: str = DEFAULT_BLOB_DIR,
+        min_size: int = 1024,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> AsyncNodejsBlobStore:
+        """
+        Ship `execute_code` files by content hash, uploading each distinct file once
+
+        Files of at least `min_size` bytes are uploaded to `root/<sha256>` the first time they are seen;
+        later calls send a name-to-hash map and a one-line bootstrap that copies them next to the script.
+
+        Parameters
+        ----------
+        root : str
+            Sandbox directory holding the uploaded blobs
+
+        min_size : int
+            Files smaller than this many bytes are sent inline
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration for the blob uploads.
+
+        Returns
+        -------
+        AsyncNodejsBlobStore
+            Object with the same `execute_code` signature and upload `stats`
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            store = client.nodejs.blob_store()
+            await store.execute_code(code="console.log(require('./lib.js').version)", files={"lib.js": library_source})
+
+
+        asyncio.run(main())
+        """
+        return AsyncNodejsBlobStore(self, root=root, min_size=min_size, request_options=request_options)
@@ -0,0 +1,358 @@
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import typing
+
+import pydantic
+from ..core.envelope import unwrap_response
+from ..core.pydantic_utilities import IS_PYDANTIC_V2, UniversalBaseModel
+from ..core.request_options import RequestOptions
+from ..types.response_node_js_execute_response import ResponseNodeJsExecuteResponse
+
+if typing.TYPE_CHECKING:
+    from .client import AsyncNodejsClient, NodejsClient
+
+# this is used as the default value for optional parameters
+OMIT = typing.cast(typing.Any, ...)
+
+DEFAULT_BLOB_DIR = "/tmp/agent-sandbox-blobs"
+
+_MISSING_MARKER = "__NODEJS_MISSING_BLOBS__"
+_MISSING_LINE = re.compile(re.escape(_MISSING_MARKER) + r"(\[[^\]]*\])")
+# ES modules hoist their imports above any prelude, so such snippets keep their files inline
+_ESM = re.compile(r"^\s*(import\s[^(]|export\s)", re.MULTILINE)
+
+# whitespace and comments, which may sit anywhere in the prologue
+_GAP = r"(?:\s|//[^\n]*|/\*[\s\S]*?\*/)*"
+# a shebang, then the directive prologue ("use strict"; ...): the bootstrap goes after both, since a shebang
+# is only valid on the first line and a directive only before any other statement
+_PROLOGUE = re.compile(
+    r"(?:#![^\n]*(?:\n|\Z))?"
+    + _GAP
+    + r"""(?:(?:"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')[ \t]*(?:;|(?=\r?\n)|\Z)"""
+    + _GAP
+    + ")*"
+)
+
+# One line, inserted without a line break, so the user's code keeps its line numbers. Copies each blob next
+# to the script (or into the REPL's cwd) before the code runs; copy-on-write where the filesystem supports
+# it, so edits to a materialized file never reach the store. The leading ";" ends a directive written
+# without one, which would otherwise be called with the bootstrap as its argument.
+_BOOTSTRAP = (
+    ";(() => {"
+    ' const req = typeof require === "function" ? require : process.getBuiltinModule;'
+    ' const fs = req("fs"), path = req("path");'
+    " const root = %(root)s, files = %(files)s;"
+    ' const dir = typeof __dirname === "string" ? __dirname : process.cwd();'
+    " const missing = [...new Set(Object.values(files))].filter((h) => !fs.existsSync(path.join(root, h)));"
+    " if (missing.length) throw new Error(%(marker)s + JSON.stringify(missing));"
+    " for (const [name, h] of Object.entries(files)) {"
+    " const target = path.resolve(dir, name);"
+    " fs.mkdirSync(path.dirname(target), { recursive: true });"
+    " fs.copyFileSync(path.join(root, h), target, fs.constants.COPYFILE_FICLONE);"
+    " }"
+    " })();"
+)
+
+
+class BlobStats(UniversalBaseModel):
+    """
+    Counters of a Node.js file blob store
+    """
+
+    calls: int = pydantic.Field()
+    blobs: int = pydantic.Field()
+    """
+    Distinct blobs known to be in the sandbox
+    """
+
+    uploaded_bytes: int = pydantic.Field()
+    """
+    Bytes uploaded into the store
+    """
+
+    reused_bytes: int = pydantic.Field()
+    """
+    File bytes referenced by hash instead of being sent again
+    """
+
+    inline_bytes: int = pydantic.Field()
+    """
+    File bytes sent inline (files under `min_size`, or ES module snippets)
+    """
+
+    reuploads: int = pydantic.Field()
+    """
+    Blobs uploaded again after the sandbox reported them missing
+    """
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+def _digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def _missing(response: typing.Any) -> typing.List[str]:
+    """
+    Blobs the bootstrap could not find, or an empty list when it ran.
+    """
+    data = getattr(response, "data", None)
+    if data is None:
+        return []
+    text = [data.stdout or "", data.stderr or ""]
+    for output in data.outputs or []:
+        text.extend(str(value) for value in (output.text, output.ename, output.evalue) if value)
+        text.extend(output.traceback or [])
+    match = _MISSING_LINE.search("\n".join(text))
+    return json.loads(match.group(1)) if match else []
+
+
+class _BaseBlobStore:
+    def __init__(
+        self,
+        *,
+        root: str = DEFAULT_BLOB_DIR,
+        min_size: int = 1024,
+        request_options: typing.Optional[RequestOptions] = None,
+    ):
+        self._root = root.rstrip("/")
+        self._min_size = min_size
+        self._request_options = request_options
+        self._known: typing.Set[str] = set()
+        self._counts = {"calls": 0, "uploaded_bytes": 0, "reused_bytes": 0, "inline_bytes": 0, "reuploads": 0}
+
+    @property
+    def stats(self) -> BlobStats:
+        return BlobStats(blobs=len(self._known), **self._counts)
+
+    def forget(self) -> None:
+        """
+        Forget which blobs were uploaded, e.g. after the sandbox was recreated.
+        """
+        self._known.clear()
+
+    def _blob_path(self, digest: str) -> str:
+        return f"{self._root}/{digest}"
+
+    def _split(
+        self, code: str, files: typing.Optional[typing.Mapping[str, typing.Optional[str]]]
+    ) -> typing.Tuple[typing.Dict[str, typing.Optional[str]], typing.Dict[str, str], typing.Dict[str, bytes]]:
+        """
+        Splits ``files`` into those sent inline and those referenced by hash, with the referenced blobs' contents.
+        """
+        inline: typing.Dict[str, typing.Optional[str]] = {}
+        refs: typing.Dict[str, str] = {}
+        blobs: typing.Dict[str, bytes] = {}
+        esm = _ESM.search(code) is not None
+        for name, text in (files or {}).items():
+            content = (text or "").encode()
+            if esm or text is None or len(content) < self._min_size:
+                inline[name] = text
+                self._counts["inline_bytes"] += len(content)
+                continue
+            digest = _digest(content)
+            refs[name] = digest
+            blobs[digest] = content
+        return inline, refs, blobs
+
+    def _code(self, code: str, refs: typing.Mapping[str, str]) -> str:
+        if not refs:
+            return code
+        fields = {
+            "root": json.dumps(self._root),
+            "files": json.dumps(refs, sort_keys=True),
+            "marker": json.dumps(_MISSING_MARKER),
+        }
+        prologue = _PROLOGUE.match(code).end()  # type: ignore[union-attr]
+        head = code[:prologue]
+        if head.startswith("#!") and "\n" not in head:
+            # nothing but a shebang: the bootstrap must not end up in its comment
+            head += "\n"
+        return head + _BOOTSTRAP % fields + code[prologue:]
+
+    def _count_reuse(
+        self, refs: typing.Mapping[str, str], blobs: typing.Mapping[str, bytes], uploaded: typing.Set[str]
+    ) -> None:
+        self._counts["reused_bytes"] += sum(len(blobs[digest]) for digest in refs.values() if digest not in uploaded)
+
+
+class NodejsBlobStore(_BaseBlobStore):
+    """
+    Ships ``nodejs.execute_code`` files through a content-addressed store in the sandbox.
+
+    Each file of at least ``min_size`` bytes is hashed (SHA-256) and uploaded once to
+    ``root/<hash>`` with ``file.upload_file``; calls then send only a name-to-hash map
+    and a one-line bootstrap that copies the blobs next to the script before the code
+    runs, so a harness that sends the same helper modules with every snippet uploads
+    them once. Blobs the sandbox no longer has are uploaded again and the call retried.
+    Smaller files, and snippets using ES module syntax (whose imports would run before
+    the bootstrap), are sent inline as before.
+
+    Examples
+    --------
+    from agent_sandbox import Sandbox
+
+    client = Sandbox(
+        base_url="https://yourhost.com/path/to/api",
+    )
+    store = client.nodejs.blob_store()
+    helpers = {"lib/helpers.js": open("helpers.js").read()}
+    for case in cases:
+        store.execute_code(code=f"require('./lib/helpers.js').check({case!r})", files=helpers)
+    print(store.stats.reused_bytes)
+    """
+
+    def __init__(self, client: "NodejsClient", **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._client = client
+        self._lock = threading.Lock()
+        self._uploading: typing.Dict[str, threading.Lock] = {}
+
+    def execute_code(
+        self,
+        *,
+        code: str,
+        files: typing.Optional[typing.Dict[str, typing.Optional[str]]] = None,
+        timeout: typing.Optional[int] = OMIT,
+        stdin: typing.Optional[str] = OMIT,
+        stateful: typing.Optional[bool] = OMIT,
+        session_id: typing.Optional[str] = OMIT,
+        cwd: typing.Optional[str] = OMIT,
+        version: typing.Optional[str] = OMIT,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> ResponseNodeJsExecuteResponse:
+        """
+        ``nodejs.execute_code`` with ``files`` shipped by hash.
+        """
+        with self._lock:
+            self._counts["calls"] += 1
+            inline, refs, blobs = self._split(code, files)
+        uploaded = self._upload(blobs, force=set())
+        kwargs = dict(
+            code=self._code(code, refs),
+            files=inline or OMIT,
+            timeout=timeout,
+            stdin=stdin,
+            stateful=stateful,
+            session_id=session_id,
+            cwd=cwd,
+            version=version,
+            request_options=request_options or self._request_options,
+        )
+        response = self._client.execute_code(**kwargs)
+        missing = [digest for digest in _missing(response) if digest in blobs] if refs else []
+        if missing:
+            uploaded |= self._upload(blobs, force=set(missing))
+            with self._lock:
+                self._counts["reuploads"] += len(missing)
+            response = self._client.execute_code(**kwargs)
+        with self._lock:
+            self._count_reuse(refs, blobs, uploaded)
+        return response
+
+    def _upload(self, blobs: typing.Mapping[str, bytes], force: typing.Set[str]) -> typing.Set[str]:
+        from ..file.client import FileClient  # noqa: E402
+
+        file_client = FileClient(client_wrapper=self._client._raw_client._client_wrapper)
+        uploaded: typing.Set[str] = set()
+        for digest, content in blobs.items():
+            with self._lock:
+                if digest in force:
+                    self._known.discard(digest)
+                lock = self._uploading.setdefault(digest, threading.Lock())
+            # concurrent calls sharing a new blob upload it once; the others wait for that upload
+            with lock:
+                if digest in self._known:
+                    continue
+                unwrap_response(
+                    file_client.upload_file(
+                        file=(digest, content), path=self._blob_path(digest), request_options=self._request_options
+                    )
+                )
+                with self._lock:
+                    self._known.add(digest)
+                    self._counts["uploaded_bytes"] += len(content)
+                uploaded.add(digest)
+        return uploaded
+
+
+class AsyncNodejsBlobStore(_BaseBlobStore):
+    """
+    Async counterpart of ``NodejsBlobStore``.
+    """
+
+    def __init__(self, client: "AsyncNodejsClient", **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._client = client
+        self._uploading: typing.Dict[str, asyncio.Lock] = {}
+
+    async def execute_code(
+        self,
+        *,
+        code: str,
+        files: typing.Optional[typing.Dict[str, typing.Optional[str]]] = None,
+        timeout: typing.Optional[int] = OMIT,
+        stdin: typing.Optional[str] = OMIT,
+        stateful: typing.Optional[bool] = OMIT,
+        session_id: typing.Optional[str] = OMIT,
+        cwd: typing.Optional[str] = OMIT,
+        version: typing.Optional[str] = OMIT,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> ResponseNodeJsExecuteResponse:
+        """
+        ``nodejs.execute_code`` with ``files`` shipped by hash.
+        """
+        self._counts["calls"] += 1
+        inline, refs, blobs = self._split(code, files)
+        uploaded = await self._upload(blobs, force=set())
+        kwargs = dict(
+            code=self._code(code, refs),
+            files=inline or OMIT,
+            timeout=timeout,
+            stdin=stdin,
+            stateful=stateful,
+            session_id=session_id,
+            cwd=cwd,
+            version=version,
+            request_options=request_options or self._request_options,
+        )
+        response = await self._client.execute_code(**kwargs)
+        missing = [digest for digest in _missing(response) if digest in blobs] if refs else []
+        if missing:
+            uploaded |= await self._upload(blobs, force=set(missing))
+            self._counts["reuploads"] += len(missing)
+            response = await self._client.execute_code(**kwargs)
+        self._count_reuse(refs, blobs, uploaded)
+        return response
+
+    async def _upload(self, blobs: typing.Mapping[str, bytes], force: typing.Set[str]) -> typing.Set[str]:
+        from ..file.client import AsyncFileClient  # noqa: E402
+
+        file_client = AsyncFileClient(client_wrapper=self._client._raw_client._client_wrapper)
+        uploaded: typing.Set[str] = set()
+        for digest, content in blobs.items():
+            if digest in force:
+                self._known.discard(digest)
+            lock = self._uploading.setdefault(digest, asyncio.Lock())
+            async with lock:
+                if digest in self._known:
+                    continue
+                unwrap_response(
+                    await file_client.upload_file(
+                        file=(digest, content), path=self._blob_path(digest), request_options=self._request_options
+                    )
+                )
+                self._known.add(digest)
+                self._counts["uploaded_bytes"] += len(content)
+                uploaded.add(digest)
+        return uploaded
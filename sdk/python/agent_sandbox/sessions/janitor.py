@@ -0,0 +1,630 @@
+import asyncio
+import collections
+import math
+import threading
+import time
+import typing
+
+import pydantic
+from ..core.envelope import unwrap_response
+from ..core.pydantic_utilities import IS_PYDANTIC_V2, UniversalBaseModel
+from ..core.request_options import RequestOptions
+
+if typing.TYPE_CHECKING:
+    from ..client import AsyncSandbox, Sandbox
+
+SessionKind = typing.Literal["shell", "bash", "jupyter", "nodejs"]
+ReapReason = typing.Literal["idle", "count", "usage", "memory"]
+_Key = typing.Tuple[str, str]
+_Listing = typing.Dict[str, typing.Tuple[typing.Any, bool]]
+_KINDS = ("shell", "bash", "jupyter", "nodejs")
+
+
+class ReapedSession(UniversalBaseModel):
+    """
+    A session closed by the janitor
+    """
+
+    kind: SessionKind = pydantic.Field()
+    session_id: str = pydantic.Field()
+    reason: ReapReason = pydantic.Field()
+    """
+    `idle` when unused for longer than `idle_ttl`, `count` when over `max_sessions`, `usage` when the
+    shell service was above `max_usage_ratio`, `memory` when the sandbox was above `memory_budget`
+    """
+
+    idle_seconds: float = pydantic.Field()
+    """
+    Seconds since the session was last seen in use
+    """
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+class JanitorStats(UniversalBaseModel):
+    """
+    Counters of a session janitor
+    """
+
+    sweeps: int = pydantic.Field()
+    tracked: int = pydantic.Field()
+    """
+    Sessions currently tracked
+    """
+
+    reclaimed: int = pydantic.Field()
+    """
+    Sessions closed by the janitor
+    """
+
+    reclaimed_by_reason: typing.Dict[str, int] = pydantic.Field(default_factory=dict)
+    reclaimed_by_kind: typing.Dict[str, int] = pydantic.Field(default_factory=dict)
+    vanished: int = pydantic.Field()
+    """
+    Tracked sessions that disappeared from the server's listing (closed elsewhere or expired)
+    """
+
+    errors: int = pydantic.Field()
+    """
+    Listing, stats or close calls that failed
+    """
+
+    memory_bytes: typing.Optional[int] = pydantic.Field(default=None)
+    """
+    Sandbox memory usage at the last sweep, when a `memory_budget` is set
+    """
+
+    last_sweep_seconds: typing.Optional[float] = pydantic.Field(default=None)
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+class _TrackedSession:
+    __slots__ = ("kind", "session_id", "version", "marker", "busy", "tracked_at", "last_active")
+
+    def __init__(self, kind: str, session_id: str, version: typing.Optional[str]):
+        self.kind = kind
+        self.session_id = session_id
+        self.version = version
+        self.marker: typing.Any = None
+        self.busy = False
+        self.tracked_at = self.last_active = time.monotonic()
+
+
+def _listing(kind: str, data: typing.Any) -> _Listing:
+    """
+    Maps session id to (last-used marker, busy) from a listing response. The
+    marker is only compared with the previous poll, so server and client
+    clocks never need to agree.
+    """
+    if kind == "bash":
+        return {
+            info.session_id: (info.last_used_at, info.current_command is not None)
+            for info in data or []
+            if info.status != "closed"
+        }
+    sessions = getattr(data, "sessions", None) or {}
+    if kind == "shell":
+        return {sid: (info.last_used_at, info.current_command is not None) for sid, info in sessions.items()}
+    if kind == "nodejs":
+        return {sid: (info.last_used, info.state.upper() == "EXECUTING") for sid, info in sessions.items()}
+    # Jupyter's listing does not say whether a cell is running; see ``_reapable``
+    return {sid: (info.last_used, False) for sid, info in sessions.items()}
+
+
+class _BaseSessionJanitor:
+    def __init__(
+        self,
+        *,
+        idle_ttl: typing.Optional[float] = 600.0,
+        max_sessions: typing.Optional[int] = None,
+        max_usage_ratio: typing.Optional[float] = None,
+        memory_budget: typing.Optional[int] = None,
+        memory_min_idle: float = 60.0,
+        memory_max_per_sweep: int = 2,
+        memory_settle: float = 2.0,
+        reap_jupyter: bool = False,
+        interval: float = 30.0,
+        request_options: typing.Optional[RequestOptions] = None,
+    ):
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        if max_usage_ratio is not None and not 0 < max_usage_ratio <= 1:
+            raise ValueError("max_usage_ratio must be in (0, 1]")
+        if memory_min_idle < 0 or memory_settle < 0:
+            raise ValueError("memory_min_idle and memory_settle must not be negative")
+        if memory_max_per_sweep < 1:
+            raise ValueError("memory_max_per_sweep must be at least 1")
+        self._idle_ttl = idle_ttl
+        self._max_sessions = max_sessions
+        self._max_usage_ratio = max_usage_ratio
+        self._memory_budget = memory_budget
+        self._memory_min_idle = memory_min_idle
+        self._memory_max_per_sweep = memory_max_per_sweep
+        self._memory_settle = memory_settle
+        self._reap_jupyter = reap_jupyter
+        self._interval = interval
+        self._request_options = request_options
+        # least recently active first
+        self._tracked: "collections.OrderedDict[_Key, _TrackedSession]" = collections.OrderedDict()
+        self._sweeps = 0
+        self._by_reason: typing.Counter[str] = collections.Counter()
+        self._by_kind: typing.Counter[str] = collections.Counter()
+        self._vanished = 0
+        self._errors = 0
+        self._memory_bytes: typing.Optional[int] = None
+        self._last_sweep: typing.Optional[float] = None
+
+    @property
+    def stats(self) -> JanitorStats:
+        return JanitorStats(
+            sweeps=self._sweeps,
+            tracked=len(self._tracked),
+            reclaimed=sum(self._by_reason.values()),
+            reclaimed_by_reason=dict(self._by_reason),
+            reclaimed_by_kind=dict(self._by_kind),
+            vanished=self._vanished,
+            errors=self._errors,
+            memory_bytes=self._memory_bytes,
+            last_sweep_seconds=self._last_sweep,
+        )
+
+    def _track(self, kind: str, session_id: str, version: typing.Optional[str]) -> None:
+        if kind not in _KINDS:
+            raise ValueError(f"Unknown session kind {kind!r}, expected one of {', '.join(_KINDS)}")
+        key = (kind, session_id)
+        if key not in self._tracked:
+            self._tracked[key] = _TrackedSession(kind, session_id, version)
+        self._touch(kind, session_id)
+
+    def _touch(self, kind: str, session_id: str) -> None:
+        session = self._tracked.get((kind, session_id))
+        if session is not None:
+            session.last_active = time.monotonic()
+            self._tracked.move_to_end((kind, session_id))
+
+    def _groups(self) -> typing.List[typing.Tuple[str, typing.Optional[str]]]:
+        return sorted({(s.kind, s.version) for s in self._tracked.values()}, key=lambda g: (g[0], g[1] or ""))
+
+    def _observe(self, kind: str, version: typing.Optional[str], listing: _Listing, listed_at: float) -> None:
+        now = time.monotonic()
+        for key, session in list(self._tracked.items()):
+            # sessions tracked while the listing was in flight may not be in it yet
+            if session.kind != kind or session.version != version or session.tracked_at >= listed_at:
+                continue
+            entry = listing.get(session.session_id)
+            if entry is None:
+                del self._tracked[key]
+                self._vanished += 1
+                continue
+            marker, busy = entry
+            if busy or (session.marker is not None and marker != session.marker):
+                session.last_active = now
+                self._tracked.move_to_end(key)
+            session.marker, session.busy = marker, busy
+
+    def _idle(self, session: _TrackedSession) -> float:
+        return time.monotonic() - session.last_active
+
+    def _take(self, session: _TrackedSession, reason: str) -> ReapedSession:
+        del self._tracked[(session.kind, session.session_id)]
+        return ReapedSession(
+            kind=session.kind,  # type: ignore[arg-type]
+            session_id=session.session_id,
+            reason=reason,  # type: ignore[arg-type]
+            idle_seconds=round(self._idle(session), 3),
+        )
+
+    def _reapable(self, session: _TrackedSession) -> bool:
+        # a long-running cell looks idle to the janitor, so Jupyter sessions are only closed when asked for
+        return not session.busy and (session.kind != "jupyter" or self._reap_jupyter)
+
+    def _lru(self, kind: typing.Optional[str] = None) -> typing.Optional[_TrackedSession]:
+        return next((s for s in self._tracked.values() if self._reapable(s) and kind in (None, s.kind)), None)
+
+    def _plan(self, shell_stats: typing.Any) -> typing.List[typing.Tuple[ReapedSession, _TrackedSession]]:
+        """
+        Picks the sessions to close for the TTL, count and usage limits; only reapable sessions are picked.
+        """
+        planned = []
+        if self._idle_ttl is not None:
+            for session in list(self._tracked.values()):
+                if self._reapable(session) and self._idle(session) >= self._idle_ttl:
+                    planned.append((self._take(session, "idle"), session))
+        while self._max_sessions is not None and len(self._tracked) > self._max_sessions:
+            session = self._lru()
+            if session is None:
+                break
+            planned.append((self._take(session, "count"), session))
+        if self._max_usage_ratio is not None and shell_stats is not None and shell_stats.max_sessions:
+            # the stats predate this sweep, so shell sessions already picked count towards the excess
+            excess = shell_stats.total_sessions - math.floor(self._max_usage_ratio * shell_stats.max_sessions)
+            excess -= sum(1 for reaped, _ in planned if reaped.kind == "shell")
+            for _ in range(excess):
+                session = self._lru("shell")
+                if session is None:
+                    break
+                planned.append((self._take(session, "usage"), session))
+        return planned
+
+    def _record(self, reaped: ReapedSession) -> None:
+        self._by_reason[reaped.reason] += 1
+        self._by_kind[reaped.kind] += 1
+
+    def _next_for_memory(self) -> typing.Optional[typing.Tuple[ReapedSession, _TrackedSession]]:
+        # memory held by something other than the tracked sessions must not drain the recently used ones
+        session = self._lru()
+        if session is None or self._idle(session) < self._memory_min_idle:
+            return None
+        return self._take(session, "memory"), session
+
+    def _over_memory(self, snapshot: typing.Any) -> bool:
+        cgroup = getattr(unwrap_response(snapshot), "cgroup", None)
+        self._memory_bytes = getattr(cgroup, "mem_current_bytes", None)
+        return self._memory_bytes is not None and self._memory_bytes > typing.cast(int, self._memory_budget)
+
+
+class SessionJanitor(_BaseSessionJanitor):
+    """
+    Closes shell, bash, Jupyter and Node.js sessions that were created through it
+    (or registered with ``track``) once they are no longer needed.
+
+    Every ``interval`` seconds a background thread lists the sessions of each
+    tracked kind, treats a session as active whenever its server-side last-used
+    time changes or it is running a command, and closes, least recently used
+    first: sessions idle for longer than ``idle_ttl``; sessions beyond
+    ``max_sessions``; shell sessions while ``get_session_stats`` reports a usage
+    ratio above ``max_usage_ratio``; and sessions while the sandbox's memory
+    (``sandbox.observe_live``) is above ``memory_budget`` bytes. Memory reaping
+    only closes sessions idle for at least ``memory_min_idle`` seconds, at most
+    ``memory_max_per_sweep`` per sweep, and waits ``memory_settle`` seconds
+    after each close before measuring again. Shell, bash and Node.js sessions
+    busy with a command are never closed. Jupyter's listing does not report a
+    running cell, so a long cell would look idle: Jupyter sessions are tracked
+    but only closed with ``reap_jupyter=True`` (then ``touch`` them while a cell
+    runs, or keep ``idle_ttl`` above the longest cell) or by ``close(reap=True)``.
+    Sessions that disappear from the listing are forgotten.
+
+    Examples
+    --------
+    from agent_sandbox import Sandbox
+    from agent_sandbox.sessions import SessionJanitor
+
+    client = Sandbox(
+        base_url="https://yourhost.com/path/to/api",
+    )
+    with SessionJanitor(client, idle_ttl=300, max_sessions=20) as janitor:
+        session_id = janitor.create_session("bash")
+        client.bash.exec(command="pip install pandas", session_id=session_id)
+    print(janitor.stats.reclaimed_by_reason)
+    """
+
+    def __init__(self, client: "Sandbox", **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._client = client
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+
+    def __enter__(self) -> "SessionJanitor":
+        self.start()
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """
+        Start the background sweep thread.
+        """
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="session-janitor", daemon=True)
+            self._thread.start()
+
+    def close(self, reap: bool = False) -> None:
+        """
+        Stop sweeping; with ``reap``, also close every session still tracked.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if reap:
+            with self._lock:
+                sessions = list(self._tracked.values())
+                self._tracked.clear()
+            for session in sessions:
+                self._close(session)
+
+    def track(self, kind: SessionKind, session_id: str, *, version: typing.Optional[str] = None) -> None:
+        """
+        Put an existing session under the janitor's care; ``version`` is the Node.js version it runs on.
+        """
+        with self._lock:
+            self._track(kind, session_id, version)
+
+    def untrack(self, kind: SessionKind, session_id: str) -> None:
+        with self._lock:
+            self._tracked.pop((kind, session_id), None)
+
+    def touch(self, kind: SessionKind, session_id: str) -> None:
+        """
+        Mark a session as just used, without waiting for the next listing to notice.
+        """
+        with self._lock:
+            self._touch(kind, session_id)
+
+    def create_session(self, kind: SessionKind, **kwargs: typing.Any) -> str:
+        """
+        Create a session with the resource's ``create_session`` and track it. Returns its id.
+        """
+        resource = getattr(self._client, kind)
+        data = unwrap_response(resource.create_session(request_options=self._request_options, **kwargs))
+        session_id = data.session_id
+        self.track(kind, session_id, version=kwargs.get("version"))
+        return session_id
+
+    def sweep(self) -> typing.List[ReapedSession]:
+        """
+        Poll the server once and close what is over a limit; called periodically by the background thread.
+        """
+        started = time.monotonic()
+        with self._lock:
+            groups = self._groups()
+        for kind, version in groups:
+            listed_at = time.monotonic()
+            try:
+                listing = _listing(kind, unwrap_response(self._list(kind, version)))
+            except Exception:
+                self._errors += 1
+                continue
+            with self._lock:
+                self._observe(kind, version, listing, listed_at)
+        shell_stats = None
+        if self._max_usage_ratio is not None and any(kind == "shell" for kind, _ in groups):
+            try:
+                shell_stats = unwrap_response(
+                    self._client.shell.get_session_stats(request_options=self._request_options)
+                )
+            except Exception:
+                self._errors += 1
+        with self._lock:
+            planned = self._plan(shell_stats)
+        reaped = []
+        for result, session in planned:
+            self._close(session)
+            self._record(result)
+            reaped.append(result)
+        for attempt in range(self._memory_max_per_sweep if self._memory_budget is not None else 0):
+            # give the server time to release a closed session's memory before measuring again
+            if attempt and self._stop.wait(self._memory_settle):
+                break
+            try:
+                over = self._over_memory(self._client.sandbox.observe_live(request_options=self._request_options))
+            except Exception:
+                self._errors += 1
+                break
+            with self._lock:
+                victim = self._next_for_memory() if over else None
+            if victim is None:
+                break
+            self._close(victim[1])
+            self._record(victim[0])
+            reaped.append(victim[0])
+        self._sweeps += 1
+        self._last_sweep = time.monotonic() - started
+        return reaped
+
+    def _list(self, kind: str, version: typing.Optional[str]) -> typing.Any:
+        options = self._request_options
+        if kind == "shell":
+            return self._client.shell.list_sessions(request_options=options)
+        if kind == "bash":
+            return self._client.bash.sessions(request_options=options)
+        if kind == "jupyter":
+            return self._client.jupyter.list_sessions(request_options=options)
+        return self._client.nodejs.list_sessions(version=version, request_options=options)
+
+    def _close(self, session: _TrackedSession) -> None:
+        options = self._request_options
+        try:
+            if session.kind == "shell":
+                self._client.shell.cleanup_session(session.session_id, request_options=options)
+            elif session.kind == "bash":
+                self._client.bash.close_session(session.session_id, request_options=options)
+            elif session.kind == "jupyter":
+                self._client.jupyter.delete_session(session.session_id, request_options=options)
+            else:
+                self._client.nodejs.delete_session(session.session_id, version=session.version, request_options=options)
+        except Exception:
+            self._errors += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                self.sweep()
+            except Exception:
+                self._errors += 1
+
+
+class AsyncSessionJanitor(_BaseSessionJanitor):
+    """
+    Async counterpart of ``SessionJanitor``; sweeps run as an asyncio task.
+
+    Examples
+    --------
+    import asyncio
+
+    from agent_sandbox import AsyncSandbox
+    from agent_sandbox.sessions import AsyncSessionJanitor
+
+    client = AsyncSandbox(
+        base_url="https://yourhost.com/path/to/api",
+    )
+
+
+    async def main() -> None:
+        async with AsyncSessionJanitor(client, idle_ttl=300) as janitor:
+            session_id = await janitor.create_session("nodejs", cwd="/home/gem")
+            await client.nodejs.execute_code(code="1 + 1", session_id=session_id)
+
+
+    asyncio.run(main())
+    """
+
+    def __init__(self, client: "AsyncSandbox", **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._client = client
+        self._task: typing.Optional["asyncio.Task[None]"] = None
+
+    async def __aenter__(self) -> "AsyncSessionJanitor":
+        self.start()
+        return self
+
+    async def __aexit__(self, *args: typing.Any) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        """
+        Start the background sweep task.
+        """
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def close(self, reap: bool = False) -> None:
+        """
+        Stop sweeping; with ``reap``, also close every session still tracked.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if reap:
+            sessions = list(self._tracked.values())
+            self._tracked.clear()
+            await asyncio.gather(*(self._close(session) for session in sessions))
+
+    def track(self, kind: SessionKind, session_id: str, *, version: typing.Optional[str] = None) -> None:
+        """
+        Put an existing session under the janitor's care; ``version`` is the Node.js version it runs on.
+        """
+        self._track(kind, session_id, version)
+
+    def untrack(self, kind: SessionKind, session_id: str) -> None:
+        self._tracked.pop((kind, session_id), None)
+
+    def touch(self, kind: SessionKind, session_id: str) -> None:
+        """
+        Mark a session as just used, without waiting for the next listing to notice.
+        """
+        self._touch(kind, session_id)
+
+    async def create_session(self, kind: SessionKind, **kwargs: typing.Any) -> str:
+        """
+        Create a session with the resource's ``create_session`` and track it. Returns its id.
+        """
+        resource = getattr(self._client, kind)
+        data = unwrap_response(await resource.create_session(request_options=self._request_options, **kwargs))
+        session_id = data.session_id
+        self.track(kind, session_id, version=kwargs.get("version"))
+        return session_id
+
+    async def sweep(self) -> typing.List[ReapedSession]:
+        """
+        Poll the server once and close what is over a limit; called periodically by the background task.
+        """
+        started = time.monotonic()
+        groups = self._groups()
+        listed_at = time.monotonic()
+        listings = await asyncio.gather(
+            *(self._list(kind, version) for kind, version in groups), return_exceptions=True
+        )
+        for (kind, version), response in zip(groups, listings):
+            try:
+                if isinstance(response, BaseException):
+                    raise response
+                self._observe(kind, version, _listing(kind, unwrap_response(response)), listed_at)
+            except Exception:
+                self._errors += 1
+        shell_stats = None
+        if self._max_usage_ratio is not None and any(kind == "shell" for kind, _ in groups):
+            try:
+                shell_stats = unwrap_response(
+                    await self._client.shell.get_session_stats(request_options=self._request_options)
+                )
+            except Exception:
+                self._errors += 1
+        planned = self._plan(shell_stats)
+        await asyncio.gather(*(self._close(session) for _, session in planned))
+        reaped = []
+        for result, _ in planned:
+            self._record(result)
+            reaped.append(result)
+        for attempt in range(self._memory_max_per_sweep if self._memory_budget is not None else 0):
+            if attempt:
+                await asyncio.sleep(self._memory_settle)
+            try:
+                over = self._over_memory(await self._client.sandbox.observe_live(request_options=self._request_options))
+            except Exception:
+                self._errors += 1
+                break
+            victim = self._next_for_memory() if over else None
+            if victim is None:
+                break
+            await self._close(victim[1])
+            self._record(victim[0])
+            reaped.append(victim[0])
+        self._sweeps += 1
+        self._last_sweep = time.monotonic() - started
+        return reaped
+
+    async def _list(self, kind: str, version: typing.Optional[str]) -> typing.Any:
+        options = self._request_options
+        if kind == "shell":
+            return await self._client.shell.list_sessions(request_options=options)
+        if kind == "bash":
+            return await self._client.bash.sessions(request_options=options)
+        if kind == "jupyter":
+            return await self._client.jupyter.list_sessions(request_options=options)
+        return await self._client.nodejs.list_sessions(version=version, request_options=options)
+
+    async def _close(self, session: _TrackedSession) -> None:
+        options = self._request_options
+        try:
+            if session.kind == "shell":
+                await self._client.shell.cleanup_session(session.session_id, request_options=options)
+            elif session.kind == "bash":
+                await self._client.bash.close_session(session.session_id, request_options=options)
+            elif session.kind == "jupyter":
+                await self._client.jupyter.delete_session(session.session_id, request_options=options)
+            else:
+                await self._client.nodejs.delete_session(
+                    session.session_id, version=session.version, request_options=options
+                )
+        except Exception:
+            self._errors += 1
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._errors += 1
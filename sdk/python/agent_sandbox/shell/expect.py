@@ -0,0 +1,399 @@
+import asyncio
+import re
+import threading
+import time
+import typing
+
+from ..core.envelope import unwrap_response
+from ..core.request_options import RequestOptions
+from .stream import (
+    _TERMINAL_STATUSES,
+    AsyncShellEventStream,
+    ShellEventStream,
+    ShellOutputEvent,
+    ShellStatusEvent,
+    ShellStreamEvent,
+)
+
+if typing.TYPE_CHECKING:
+    from .extended import AsyncExtendedShellClient, ExtendedShellClient
+
+Pattern = typing.Union[str, "re.Pattern[str]"]
+
+# how long close() waits for the reader to see the program's final status
+_CLOSE_TIMEOUT = 1.0
+
+
+def _compile(pattern: typing.Union[Pattern, typing.Sequence[Pattern]]) -> typing.List["re.Pattern[str]"]:
+    patterns = [pattern] if isinstance(pattern, (str, re.Pattern)) else list(pattern)
+    if not patterns:
+        raise ValueError("expect() needs at least one pattern")
+    return [p if isinstance(p, re.Pattern) else re.compile(p) for p in patterns]
+
+
+class _SlidingBuffer:
+    """
+    Output received but not consumed by a match yet, capped at ``max_size`` characters.
+
+    Each search only rescans the last ``window`` characters that were already
+    searched, so matches spanning chunk boundaries are found without rescanning
+    the whole buffer on every chunk. Matches longer than ``window`` may be missed.
+    """
+
+    def __init__(self, max_size: int, window: int):
+        self.text = ""
+        self.dropped = 0
+        self._max_size = max_size
+        self._window = window
+        self._searched = 0
+
+    def feed(self, data: str) -> None:
+        self.text += data
+        excess = len(self.text) - self._max_size
+        if excess > 0:
+            self.text = self.text[excess:]
+            self._searched = max(0, self._searched - excess)
+            self.dropped += excess
+
+    def search(
+        self, patterns: typing.Sequence["re.Pattern[str]"]
+    ) -> typing.Optional[typing.Tuple[int, "re.Match[str]"]]:
+        start = max(0, self._searched - self._window)
+        best: typing.Optional[typing.Tuple[int, "re.Match[str]"]] = None
+        for index, pattern in enumerate(patterns):
+            match = pattern.search(self.text, start)
+            if match is not None and (best is None or match.start() < best[1].start()):
+                best = (index, match)
+        self._searched = len(self.text)
+        return best
+
+    def consume(self, end: int) -> None:
+        self.text = self.text[end:]
+        self._searched = 0
+
+
+class _BaseShellProcess:
+    def __init__(
+        self,
+        *,
+        session_id: str,
+        max_buffer: int = 1_000_000,
+        search_window: int = 4096,
+        request_options: typing.Optional[RequestOptions] = None,
+    ):
+        self.session_id = session_id
+        self._buffer = _SlidingBuffer(max_buffer, search_window)
+        self._request_options = request_options
+        self._closed = False
+        self._error: typing.Optional[BaseException] = None
+        self.status: typing.Optional[str] = None
+        self.exit_code: typing.Optional[int] = None
+        self.match: typing.Optional["re.Match[str]"] = None
+        self.before = ""
+        self._last_sequence: typing.Optional[int] = None
+
+    @property
+    def exited(self) -> bool:
+        return self.status in _TERMINAL_STATUSES
+
+    @property
+    def buffer(self) -> str:
+        """
+        Output received since the last match.
+        """
+        return self._buffer.text
+
+    def _replayed(self, event: ShellStreamEvent) -> bool:
+        """
+        Whether a re-attached stream sent an event already seen, in case it replays despite ``Last-Event-ID``.
+        """
+        # event ids are sequence numbers; without one there is nothing to compare against
+        event_id = getattr(event, "id", None)
+        if event_id is None or not event_id.isdigit():
+            return False
+        if self._last_sequence is not None and int(event_id) <= self._last_sequence:
+            return True
+        self._last_sequence = int(event_id)
+        return False
+
+    def _lost(self) -> ConnectionError:
+        return ConnectionError(f"Lost the output stream of shell session {self.session_id} before the program exited")
+
+    def _on_event(self, event: ShellStreamEvent) -> None:
+        if self._replayed(event):
+            return
+        if isinstance(event, ShellOutputEvent):
+            self._buffer.feed(event.output)
+        elif isinstance(event, ShellStatusEvent):
+            self.status = event.status
+            if event.exit_code is not None:
+                self.exit_code = event.exit_code
+
+    def _try_match(self, patterns: typing.Sequence["re.Pattern[str]"]) -> typing.Optional[int]:
+        hit = self._buffer.search(patterns)
+        if hit is None:
+            return None
+        index, match = hit
+        self.match = match
+        self.before = self._buffer.text[: match.start()]
+        self._buffer.consume(match.end())
+        return index
+
+    def _check_end(self, timeout: float, remaining: float) -> None:
+        if self._error is not None:
+            raise self._error
+        if self.exited or self._closed:
+            self.before = self._buffer.text
+            raise EOFError(f"Process in shell session {self.session_id} ended ({self.status}) before a match")
+        if remaining <= 0:
+            raise TimeoutError(
+                f"No match within {timeout}s in shell session {self.session_id}; "
+                f"last output: {self._buffer.text[-200:]!r}"
+            )
+
+
+class ShellProcess(_BaseShellProcess):
+    """
+    Expect-style driver for an interactive program running in a shell session.
+
+    Output is consumed incrementally from the command's SSE stream by a
+    background thread, and ``expect`` returns as soon as one of its patterns
+    matches the output received since the previous match, instead of sleeping
+    and polling ``view``. After a match, ``match`` holds the ``re.Match`` and
+    ``before`` the text that preceded it. ``expect`` raises ``TimeoutError`` when
+    nothing matches in time and ``EOFError`` when the program exits first.
+
+    Examples
+    --------
+    from agent_sandbox import Sandbox
+
+    client = Sandbox(
+        base_url="https://yourhost.com/path/to/api",
+    )
+    with client.shell.spawn(command="python3 -i") as proc:
+        proc.expect(r">>> ")
+        proc.sendline("print(6 * 7)")
+        proc.expect(r"(\\d+)\\r?\\n>>> ")
+        print(proc.match.group(1))
+    """
+
+    def __init__(self, client: "ExtendedShellClient", stream: ShellEventStream, **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._client = client
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._read, args=(stream,), name="shell-expect", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "ShellProcess":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def expect(self, pattern: typing.Union[Pattern, typing.Sequence[Pattern]], timeout: float = 30.0) -> int:
+        """
+        Wait until one of the patterns matches and return its index in the list.
+        """
+        patterns = _compile(pattern)
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                index = self._try_match(patterns)
+                if index is not None:
+                    return index
+                remaining = deadline - time.monotonic()
+                self._check_end(timeout, remaining)
+                self._cond.wait(remaining)
+
+    def send(self, text: str) -> None:
+        """
+        Write ``text`` to the program without pressing enter.
+        """
+        unwrap_response(
+            self._client.write_to_process(
+                id=self.session_id, input=text, press_enter=False, request_options=self._request_options
+            )
+        )
+
+    def sendline(self, text: str = "") -> None:
+        """
+        Write ``text`` to the program and press enter.
+        """
+        unwrap_response(
+            self._client.write_to_process(
+                id=self.session_id, input=text, press_enter=True, request_options=self._request_options
+            )
+        )
+
+    def wait(self, timeout: typing.Optional[float] = None) -> typing.Optional[int]:
+        """
+        Wait for the program to exit and return its exit code.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self.exited and self._error is None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"Process in shell session {self.session_id} still running after {timeout}s")
+                self._cond.wait(remaining)
+        if self._error is not None:
+            raise self._error
+        return self.exit_code
+
+    def close(self, kill: bool = True) -> None:
+        """
+        Stop reading output, killing the program first unless ``kill`` is False.
+        """
+        if self._closed:
+            return
+        if kill and not self.exited:
+            try:
+                self._client.kill_process(id=self.session_id, request_options=self._request_options)
+            except Exception:
+                pass
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        # the reader ends with the stream once the program is gone
+        self._thread.join(timeout=_CLOSE_TIMEOUT)
+
+    def _read(self, stream: ShellEventStream) -> None:
+        try:
+            with stream:
+                for event in stream:
+                    with self._cond:
+                        self._on_event(event)
+                        self._cond.notify_all()
+                    if self._closed:
+                        return
+            if not self.exited and not self._closed:
+                raise self._lost()
+        except Exception as exc:
+            with self._cond:
+                self._error = exc
+                self._cond.notify_all()
+
+
+class AsyncShellProcess(_BaseShellProcess):
+    """
+    Async counterpart of ``ShellProcess``; output is read by an asyncio task.
+
+    Examples
+    --------
+    import asyncio
+
+    from agent_sandbox import AsyncSandbox
+
+    client = AsyncSandbox(
+        base_url="https://yourhost.com/path/to/api",
+    )
+
+
+    async def main() -> None:
+        async with await client.shell.spawn(command="python3 -i") as proc:
+            await proc.expect(r">>> ")
+            await proc.sendline("print(6 * 7)")
+            await proc.expect(r">>> ")
+            print(proc.before)
+
+
+    asyncio.run(main())
+    """
+
+    def __init__(self, client: "AsyncExtendedShellClient", stream: AsyncShellEventStream, **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._client = client
+        self._changed = asyncio.Event()
+        self._task = asyncio.ensure_future(self._read(stream))
+
+    async def __aenter__(self) -> "AsyncShellProcess":
+        return self
+
+    async def __aexit__(self, *args: typing.Any) -> None:
+        await self.close()
+
+    async def expect(self, pattern: typing.Union[Pattern, typing.Sequence[Pattern]], timeout: float = 30.0) -> int:
+        """
+        Wait until one of the patterns matches and return its index in the list.
+        """
+        patterns = _compile(pattern)
+        deadline = time.monotonic() + timeout
+        while True:
+            self._changed.clear()
+            index = self._try_match(patterns)
+            if index is not None:
+                return index
+            remaining = deadline - time.monotonic()
+            self._check_end(timeout, remaining)
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    async def send(self, text: str) -> None:
+        """
+        Write ``text`` to the program without pressing enter.
+        """
+        unwrap_response(
+            await self._client.write_to_process(
+                id=self.session_id, input=text, press_enter=False, request_options=self._request_options
+            )
+        )
+
+    async def sendline(self, text: str = "") -> None:
+        """
+        Write ``text`` to the program and press enter.
+        """
+        unwrap_response(
+            await self._client.write_to_process(
+                id=self.session_id, input=text, press_enter=True, request_options=self._request_options
+            )
+        )
+
+    async def wait(self, timeout: typing.Optional[float] = None) -> typing.Optional[int]:
+        """
+        Wait for the program to exit and return its exit code.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.exited and self._error is None:
+            self._changed.clear()
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise TimeoutError(f"Process in shell session {self.session_id} still running after {timeout}s")
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+        if self._error is not None:
+            raise self._error
+        return self.exit_code
+
+    async def close(self, kill: bool = True) -> None:
+        """
+        Stop reading output, killing the program first unless ``kill`` is False.
+        """
+        if self._closed:
+            return
+        if kill and not self.exited:
+            try:
+                await self._client.kill_process(id=self.session_id, request_options=self._request_options)
+            except Exception:
+                pass
+        self._closed = True
+        self._changed.set()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _read(self, stream: AsyncShellEventStream) -> None:
+        try:
+            async with stream:
+                async for event in stream:
+                    self._on_event(event)
+                    self._changed.set()
+            if not self.exited and not self._closed:
+                raise self._lost()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            self._error = exc
+            self._changed.set()
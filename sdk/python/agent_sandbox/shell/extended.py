@@ -0,0 +1,828 @@
+import typing
+
+from ..bash.capture import (
+    DEFAULT_HEARTBEAT,
+    DEFAULT_LOG_DIR,
+    AsyncCapturedOutput,
+    CapturedOutput,
+    CapturedResult,
+    exec_command_captured,
+    exec_command_captured_async,
+)
+from ..core.envelope import unwrap_response
+from ..core.request_options import RequestOptions
+from ..types.shell_command_result import ShellCommandResult
+from .client import AsyncShellClient, ShellClient
+from .expect import AsyncShellProcess, ShellProcess
+from .pool import AsyncShellSessionPool, ShellSessionPool
+from .stream import AsyncShellEventStream, ShellEventStream
+
+# this is used as the default value for optional parameters
+OMIT = typing.cast(typing.Any, ...)
+
+
+class ExtendedShellClient(ShellClient):
+    """
+    `ShellClient` with event streams, session pools, interactive processes and full-output capture.
+    """
+
+    def exec_command_stream(
+        self,
+        *,
+        command: str,
+        id: typing.Optional[str] = OMIT,
+        exec_dir: typing.Optional[str] = OMIT,
+        timeout: typing.Optional[float] = OMIT,
+        strict: typing.Optional[bool] = OMIT,
+        no_change_timeout: typing.Optional[int] = OMIT,
+        hard_timeout: typing.Optional[float] = OMIT,
+        preserve_symlinks: typing.Optional[bool] = OMIT,
+        truncate: typing.Optional[bool] = OMIT,
+        max_reconnects: int = 3,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> ShellEventStream:
+        """
+        Execute command in the specified shell session and stream its output as Server-Sent Events
+
+        Yields `ShellOutputEvent` for output chunks and `ShellStatusEvent` for status updates, ending
+        once the command completes, hits its hard timeout or is terminated; `no_change_timeout` does
+        not end it. A closed or dropped connection is resumed through `view` with `Last-Event-ID`
+        rather than by re-running the command.
+
+        Parameters
+        ----------
+        command : str
+            Shell command to execute
+
+        id : typing.Optional[str]
+            Unique identifier of the target shell session, if not provided, one will be automatically created
+
+        exec_dir : typing.Optional[str]
+            Working directory for command execution (must use absolute path)
+
+        timeout : typing.Optional[float]
+            Maximum time (seconds) to wait for command completion before returning running status
+
+        strict : typing.Optional[bool]
+            Strict mode for working directory validation. If True, returns error when working directory does not exist. If False or None, silently falls back to session working directory.
+
+        no_change_timeout : typing.Optional[int]
+            Timeout (seconds) for detecting no new output from a command. If no output change is detected within this time, command returns with NO_CHANGE_TIMEOUT status. Overrides session-level setting for this command only.
+
+        hard_timeout : typing.Optional[float]
+            Hard timeout (seconds) for command execution. When reached, the command is forcefully stopped and current console output is returned with HARD_TIMEOUT status. Unlike timeout (which only affects HTTP response timing), this actually terminates the command.
+
+        preserve_symlinks : typing.Optional[bool]
+            If True, preserve symlinks in working directory path (pwd shows symlink path). If False, symlinks are resolved to physical paths. Defaults to False for backward compatibility.
+
+        truncate : typing.Optional[bool]
+            If True, truncate output when it exceeds 30000 characters (default: True)
+
+        max_reconnects : int
+            Maximum number of consecutive reconnection attempts after the stream drops
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        ShellEventStream
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        with client.shell.exec_command_stream(command="make test") as stream:
+            for event in stream:
+                if event.type == "output":
+                    print(event.output, end="")
+        """
+        return ShellEventStream(
+            self._raw_client._client_wrapper,
+            path="v1/shell/exec",
+            body={
+                "id": id,
+                "exec_dir": exec_dir,
+                "command": command,
+                "timeout": timeout,
+                "strict": strict,
+                "no_change_timeout": no_change_timeout,
+                "hard_timeout": hard_timeout,
+                "preserve_symlinks": preserve_symlinks,
+                "truncate": truncate,
+            },
+            session_id=id if isinstance(id, str) else None,
+            max_reconnects=max_reconnects,
+            request_options=request_options,
+        )
+
+    def view_stream(
+        self,
+        *,
+        id: str,
+        max_reconnects: int = 3,
+        last_event_id: typing.Optional[str] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> ShellEventStream:
+        """
+        Stream the output of the specified shell session as Server-Sent Events
+
+        Parameters
+        ----------
+        id : str
+            Unique identifier of the target shell session
+
+        max_reconnects : int
+            Maximum number of consecutive reconnection attempts after the stream drops
+
+        last_event_id : typing.Optional[str]
+            Resume after this event, as received from an earlier stream's `last_event_id`
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        ShellEventStream
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        with client.shell.view_stream(id="id") as stream:
+            for event in stream:
+                print(event)
+        """
+        return ShellEventStream(
+            self._raw_client._client_wrapper,
+            path="v1/shell/view",
+            body={"id": id},
+            session_id=id,
+            max_reconnects=max_reconnects,
+            last_event_id=last_event_id,
+            request_options=request_options,
+        )
+
+    def session_pool(
+        self,
+        *,
+        size: int = 2,
+        max_sessions: typing.Optional[int] = None,
+        reserve: int = 1,
+        max_uses: typing.Optional[int] = None,
+        health_interval: float = 30.0,
+        lease_timeout: float = 60.0,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> ShellSessionPool:
+        """
+        Create a pool of prewarmed shell sessions keyed by (exec_dir, env) profile
+
+        Sessions are reset on return and closed instead when they are dirty. Used as a context
+        manager, the pool runs background health probes and keeps itself within the server's
+        session limit reported by `get_session_stats`.
+
+        Parameters
+        ----------
+        size : int
+            Number of idle sessions to keep warm per profile
+
+        max_sessions : typing.Optional[int]
+            Upper bound on the sessions owned by this pool
+
+        reserve : int
+            Number of server session slots to always leave free for other clients
+
+        max_uses : typing.Optional[int]
+            Close a session after this many leases instead of reusing it
+
+        health_interval : float
+            Seconds between health-check rounds, capped at half the server's session timeout
+
+        lease_timeout : float
+            Max seconds `lease` waits for a session when the server limit is reached
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        ShellSessionPool
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        with client.shell.session_pool(size=4) as pool:
+            with pool.lease(exec_dir="/home/gem/project") as session:
+                client.shell.exec_command(id=session.session_id, command="pytest -q")
+        """
+        return ShellSessionPool(
+            self,
+            size=size,
+            max_sessions=max_sessions,
+            reserve=reserve,
+            max_uses=max_uses,
+            health_interval=health_interval,
+            lease_timeout=lease_timeout,
+            request_options=request_options,
+        )
+
+    def spawn(
+        self,
+        *,
+        command: str,
+        id: typing.Optional[str] = OMIT,
+        exec_dir: typing.Optional[str] = OMIT,
+        no_change_timeout: typing.Optional[int] = OMIT,
+        hard_timeout: typing.Optional[float] = OMIT,
+        max_buffer: int = 1_000_000,
+        search_window: int = 4096,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> ShellProcess:
+        """
+        Start an interactive program and drive it expect-style with `expect` / `send` / `sendline`
+
+        The program's output is consumed incrementally from the SSE stream of `exec_command`, and
+        input is written with `write_to_process`.
+
+        Parameters
+        ----------
+        command : str
+            Command starting the interactive program
+
+        id : typing.Optional[str]
+            Shell session to run it in; a new session is created if not provided
+
+        exec_dir : typing.Optional[str]
+            Working directory for the program (must use absolute path)
+
+        no_change_timeout : typing.Optional[int]
+            Seconds without output before the server reports `no_change_timeout`; the stream stays open
+
+        hard_timeout : typing.Optional[float]
+            Hard timeout (seconds) after which the program is forcefully stopped
+
+        max_buffer : int
+            Max characters of unmatched output kept; older output is dropped
+
+        search_window : int
+            Characters of already searched output rescanned when new output arrives, i.e. the longest match found across chunks
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        ShellProcess
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        with client.shell.spawn(command="python3 -i") as proc:
+            proc.expect(r">>> ")
+            proc.sendline("print(6 * 7)")
+            proc.expect(r">>> ")
+            print(proc.before)
+        """
+        if id is OMIT or id is None:
+            id = unwrap_response(
+                self.create_session(exec_dir=exec_dir, request_options=request_options)
+            ).session_id
+        stream = self.exec_command_stream(
+            command=command,
+            id=id,
+            exec_dir=exec_dir,
+            no_change_timeout=no_change_timeout,
+            hard_timeout=hard_timeout,
+            request_options=request_options,
+        )
+        return ShellProcess(
+            self,
+            stream,
+            session_id=id,
+            max_buffer=max_buffer,
+            search_window=search_window,
+            request_options=request_options,
+        )
+
+    def exec_command_captured(
+        self,
+        *,
+        command: str,
+        id: typing.Optional[str] = OMIT,
+        exec_dir: typing.Optional[str] = OMIT,
+        timeout: typing.Optional[float] = OMIT,
+        no_change_timeout: typing.Optional[int] = OMIT,
+        hard_timeout: typing.Optional[float] = OMIT,
+        preview_bytes: int = 20_000,
+        log_dir: str = DEFAULT_LOG_DIR,
+        heartbeat: typing.Optional[float] = DEFAULT_HEARTBEAT,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> CapturedResult[ShellCommandResult, CapturedOutput]:
+        """
+        Execute a command in a shell session without losing output to the 30,000 character truncation
+
+        The command's combined output goes to a file inside the sandbox. If it fits in
+        `preview_bytes` it is returned as usual and the file removed; otherwise the head and tail
+        are returned around a note naming the file, which is kept and exposed as `stdout_log`.
+        Output is returned when the command ends, so use `exec_command_stream` for interactive programs.
+        While it runs, a progress line is printed to the terminal every `heartbeat` seconds so a long, busy
+        command is not reported as `no_change_timeout`; those lines are removed from the returned output.
+
+        Parameters
+        ----------
+        command : str
+            Shell command to execute
+
+        id : typing.Optional[str]
+            Unique identifier of the target shell session, if not provided, one will be automatically created
+
+        exec_dir : typing.Optional[str]
+            Working directory for command execution (must use absolute path)
+
+        timeout : typing.Optional[float]
+            Maximum time (seconds) to wait for command completion before returning running status
+
+        no_change_timeout : typing.Optional[int]
+            Timeout (seconds) for detecting no new output from the command
+
+        hard_timeout : typing.Optional[float]
+            Hard timeout (seconds) for command execution; logs of a command stopped this way are always kept
+
+        preview_bytes : int
+            Max bytes of output returned inline
+
+        log_dir : str
+            Directory inside the sandbox for the full log
+
+        heartbeat : typing.Optional[float]
+            Seconds between progress lines while the command runs (at most half of `no_change_timeout`); None disables them
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        CapturedResult[ShellCommandResult, CapturedOutput]
+
+        Examples
+        --------
+        from agent_sandbox import Sandbox
+
+        client = Sandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+        captured = client.shell.exec_command_captured(command="npm test")
+        if captured.truncated:
+            for chunk in captured.stdout_log.iter_bytes():
+                print(chunk.decode(errors="replace"), end="")
+        """
+        return exec_command_captured(
+            self,
+            command=command,
+            id=id,
+            exec_dir=exec_dir,
+            timeout=timeout,
+            no_change_timeout=no_change_timeout,
+            hard_timeout=hard_timeout,
+            preview_bytes=preview_bytes,
+            log_dir=log_dir,
+            heartbeat=heartbeat,
+            request_options=request_options,
+        )
+
+
+class AsyncExtendedShellClient(AsyncShellClient):
+    """
+    `AsyncShellClient` with event streams, session pools, interactive processes and full-output capture.
+    """
+
+    def exec_command_stream(
+        self,
+        *,
+        command: str,
+        id: typing.Optional[str] = OMIT,
+        exec_dir: typing.Optional[str] = OMIT,
+        timeout: typing.Optional[float] = OMIT,
+        strict: typing.Optional[bool] = OMIT,
+        no_change_timeout: typing.Optional[int] = OMIT,
+        hard_timeout: typing.Optional[float] = OMIT,
+        preserve_symlinks: typing.Optional[bool] = OMIT,
+        truncate: typing.Optional[bool] = OMIT,
+        max_reconnects: int = 3,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> AsyncShellEventStream:
+        """
+        Execute command in the specified shell session and stream its output as Server-Sent Events
+
+        Yields `ShellOutputEvent` for output chunks and `ShellStatusEvent` for status updates, ending
+        once the command completes, hits its hard timeout or is terminated; `no_change_timeout` does
+        not end it. A closed or dropped connection is resumed through `view` with `Last-Event-ID`
+        rather than by re-running the command.
+
+        Parameters
+        ----------
+        command : str
+            Shell command to execute
+
+        id : typing.Optional[str]
+            Unique identifier of the target shell session, if not provided, one will be automatically created
+
+        exec_dir : typing.Optional[str]
+            Working directory for command execution (must use absolute path)
+
+        timeout : typing.Optional[float]
+            Maximum time (seconds) to wait for command completion before returning running status
+
+        strict : typing.Optional[bool]
+            Strict mode for working directory validation. If True, returns error when working directory does not exist. If False or None, silently falls back to session working directory.
+
+        no_change_timeout : typing.Optional[int]
+            Timeout (seconds) for detecting no new output from a command. If no output change is detected within this time, command returns with NO_CHANGE_TIMEOUT status. Overrides session-level setting for this command only.
+
+        hard_timeout : typing.Optional[float]
+            Hard timeout (seconds) for command execution. When reached, the command is forcefully stopped and current console output is returned with HARD_TIMEOUT status. Unlike timeout (which only affects HTTP response timing), this actually terminates the command.
+
+        preserve_symlinks : typing.Optional[bool]
+            If True, preserve symlinks in working directory path (pwd shows symlink path). If False, symlinks are resolved to physical paths. Defaults to False for backward compatibility.
+
+        truncate : typing.Optional[bool]
+            If True, truncate output when it exceeds 30000 characters (default: True)
+
+        max_reconnects : int
+            Maximum number of consecutive reconnection attempts after the stream drops
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        AsyncShellEventStream
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            async with client.shell.exec_command_stream(command="make test") as stream:
+                async for event in stream:
+                    if event.type == "output":
+                        print(event.output, end="")
+
+
+        asyncio.run(main())
+        """
+        return AsyncShellEventStream(
+            self._raw_client._client_wrapper,
+            path="v1/shell/exec",
+            body={
+                "id": id,
+                "exec_dir": exec_dir,
+                "command": command,
+                "timeout": timeout,
+                "strict": strict,
+                "no_change_timeout": no_change_timeout,
+                "hard_timeout": hard_timeout,
+                "preserve_symlinks": preserve_symlinks,
+                "truncate": truncate,
+            },
+            session_id=id if isinstance(id, str) else None,
+            max_reconnects=max_reconnects,
+            request_options=request_options,
+        )
+
+    def view_stream(
+        self,
+        *,
+        id: str,
+        max_reconnects: int = 3,
+        last_event_id: typing.Optional[str] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> AsyncShellEventStream:
+        """
+        Stream the output of the specified shell session as Server-Sent Events
+
+        Parameters
+        ----------
+        id : str
+            Unique identifier of the target shell session
+
+        max_reconnects : int
+            Maximum number of consecutive reconnection attempts after the stream drops
+
+        last_event_id : typing.Optional[str]
+            Resume after this event, as received from an earlier stream's `last_event_id`
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        AsyncShellEventStream
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            async with client.shell.view_stream(id="id") as stream:
+                async for event in stream:
+                    print(event)
+
+
+        asyncio.run(main())
+        """
+        return AsyncShellEventStream(
+            self._raw_client._client_wrapper,
+            path="v1/shell/view",
+            body={"id": id},
+            session_id=id,
+            max_reconnects=max_reconnects,
+            last_event_id=last_event_id,
+            request_options=request_options,
+        )
+
+    def session_pool(
+        self,
+        *,
+        size: int = 2,
+        max_sessions: typing.Optional[int] = None,
+        reserve: int = 1,
+        max_uses: typing.Optional[int] = None,
+        health_interval: float = 30.0,
+        lease_timeout: float = 60.0,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> AsyncShellSessionPool:
+        """
+        Create a pool of prewarmed shell sessions keyed by (exec_dir, env) profile
+
+        Sessions are reset on return and closed instead when they are dirty. Used as a context
+        manager, the pool runs background health probes and keeps itself within the server's
+        session limit reported by `get_session_stats`.
+
+        Parameters
+        ----------
+        size : int
+            Number of idle sessions to keep warm per profile
+
+        max_sessions : typing.Optional[int]
+            Upper bound on the sessions owned by this pool
+
+        reserve : int
+            Number of server session slots to always leave free for other clients
+
+        max_uses : typing.Optional[int]
+            Close a session after this many leases instead of reusing it
+
+        health_interval : float
+            Seconds between health-check rounds, capped at half the server's session timeout
+
+        lease_timeout : float
+            Max seconds `lease` waits for a session when the server limit is reached
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        AsyncShellSessionPool
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            async with client.shell.session_pool(size=4) as pool:
+                async with pool.lease(exec_dir="/home/gem/project") as session:
+                    await client.shell.exec_command(id=session.session_id, command="pytest -q")
+
+
+        asyncio.run(main())
+        """
+        return AsyncShellSessionPool(
+            self,
+            size=size,
+            max_sessions=max_sessions,
+            reserve=reserve,
+            max_uses=max_uses,
+            health_interval=health_interval,
+            lease_timeout=lease_timeout,
+            request_options=request_options,
+        )
+
+    async def spawn(
+        self,
+        *,
+        command: str,
+        id: typing.Optional[str] = OMIT,
+        exec_dir: typing.Optional[str] = OMIT,
+        no_change_timeout: typing.Optional[int] = OMIT,
+        hard_timeout: typing.Optional[float] = OMIT,
+        max_buffer: int = 1_000_000,
+        search_window: int = 4096,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> AsyncShellProcess:
+        """
+        Start an interactive program and drive it expect-style with `expect` / `send` / `sendline`
+
+        The program's output is consumed incrementally from the SSE stream of `exec_command`, and
+        input is written with `write_to_process`.
+
+        Parameters
+        ----------
+        command : str
+            Command starting the interactive program
+
+        id : typing.Optional[str]
+            Shell session to run it in; a new session is created if not provided
+
+        exec_dir : typing.Optional[str]
+            Working directory for the program (must use absolute path)
+
+        no_change_timeout : typing.Optional[int]
+            Seconds without output before the server reports `no_change_timeout`; the stream stays open
+
+        hard_timeout : typing.Optional[float]
+            Hard timeout (seconds) after which the program is forcefully stopped
+
+        max_buffer : int
+            Max characters of unmatched output kept; older output is dropped
+
+        search_window : int
+            Characters of already searched output rescanned when new output arrives, i.e. the longest match found across chunks
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        AsyncShellProcess
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            async with await client.shell.spawn(command="python3 -i") as proc:
+                await proc.expect(r">>> ")
+                await proc.sendline("print(6 * 7)")
+                await proc.expect(r">>> ")
+                print(proc.before)
+
+
+        asyncio.run(main())
+        """
+        if id is OMIT or id is None:
+            id = unwrap_response(
+                await self.create_session(exec_dir=exec_dir, request_options=request_options)
+            ).session_id
+        stream = self.exec_command_stream(
+            command=command,
+            id=id,
+            exec_dir=exec_dir,
+            no_change_timeout=no_change_timeout,
+            hard_timeout=hard_timeout,
+            request_options=request_options,
+        )
+        return AsyncShellProcess(
+            self,
+            stream,
+            session_id=id,
+            max_buffer=max_buffer,
+            search_window=search_window,
+            request_options=request_options,
+        )
+
+    async def exec_command_captured(
+        self,
+        *,
+        command: str,
+        id: typing.Optional[str] = OMIT,
+        exec_dir: typing.Optional[str] = OMIT,
+        timeout: typing.Optional[float] = OMIT,
+        no_change_timeout: typing.Optional[int] = OMIT,
+        hard_timeout: typing.Optional[float] = OMIT,
+        preview_bytes: int = 20_000,
+        log_dir: str = DEFAULT_LOG_DIR,
+        heartbeat: typing.Optional[float] = DEFAULT_HEARTBEAT,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> CapturedResult[ShellCommandResult, AsyncCapturedOutput]:
+        """
+        Execute a command in a shell session without losing output to the 30,000 character truncation
+
+        The command's combined output goes to a file inside the sandbox. If it fits in
+        `preview_bytes` it is returned as usual and the file removed; otherwise the head and tail
+        are returned around a note naming the file, which is kept and exposed as `stdout_log`.
+        Output is returned when the command ends, so use `exec_command_stream` for interactive programs.
+        While it runs, a progress line is printed to the terminal every `heartbeat` seconds so a long, busy
+        command is not reported as `no_change_timeout`; those lines are removed from the returned output.
+
+        Parameters
+        ----------
+        command : str
+            Shell command to execute
+
+        id : typing.Optional[str]
+            Unique identifier of the target shell session, if not provided, one will be automatically created
+
+        exec_dir : typing.Optional[str]
+            Working directory for command execution (must use absolute path)
+
+        timeout : typing.Optional[float]
+            Maximum time (seconds) to wait for command completion before returning running status
+
+        no_change_timeout : typing.Optional[int]
+            Timeout (seconds) for detecting no new output from the command
+
+        hard_timeout : typing.Optional[float]
+            Hard timeout (seconds) for command execution; logs of a command stopped this way are always kept
+
+        preview_bytes : int
+            Max bytes of output returned inline
+
+        log_dir : str
+            Directory inside the sandbox for the full log
+
+        heartbeat : typing.Optional[float]
+            Seconds between progress lines while the command runs (at most half of `no_change_timeout`); None disables them
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        CapturedResult[ShellCommandResult, AsyncCapturedOutput]
+
+        Examples
+        --------
+        import asyncio
+
+        from agent_sandbox import AsyncSandbox
+
+        client = AsyncSandbox(
+            base_url="https://yourhost.com/path/to/api",
+        )
+
+
+        async def main() -> None:
+            captured = await client.shell.exec_command_captured(command="npm test")
+            if captured.truncated:
+                await captured.stdout_log.save("npm-test.log.gz", compress=True)
+
+
+        asyncio.run(main())
+        """
+        return await exec_command_captured_async(
+            self,
+            command=command,
+            id=id,
+            exec_dir=exec_dir,
+            timeout=timeout,
+            no_change_timeout=no_change_timeout,
+            hard_timeout=hard_timeout,
+            preview_bytes=preview_bytes,
+            log_dir=log_dir,
+            heartbeat=heartbeat,
+            request_options=request_options,
+        )
@@ -0,0 +1,349 @@
+import re
+import shlex
+import typing
+
+from ..core.envelope import unwrap_response
+from ..core.lease_pool import _AsyncLeasePool, _BaseLease, _BaseLeasePool, _LeasePool
+from ..core.request_options import RequestOptions
+from ..types.shell_session_stats import ShellSessionStats
+
+if typing.TYPE_CHECKING:
+    from .client import AsyncShellClient, ShellClient
+
+ProfileKey = typing.Tuple[typing.Optional[str], typing.Tuple[typing.Tuple[str, str], ...]]
+
+_ENV_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_ENV_MARKER = "__SHELL_POOL_ENV__"
+_ENV_FINGERPRINT = re.compile(_ENV_MARKER + r"(\d+ \d+)")
+# variables that change on their own and must not make a session look dirty
+_VOLATILE_ENV = "_|OLDPWD|PWD|SHLVL"
+
+
+def _profile_key(exec_dir: typing.Optional[str], env: typing.Optional[typing.Mapping[str, str]]) -> ProfileKey:
+    for name in env or ():
+        if not _ENV_NAME.match(name):
+            raise ValueError(f"Invalid environment variable name: {name!r}")
+    return (exec_dir, tuple(sorted((env or {}).items())))
+
+
+def _reset_script(working_dir: str, env: typing.Tuple[typing.Tuple[str, str], ...]) -> str:
+    """
+    Moves back to the profile's directory, re-exports its variables and prints a
+    checksum of the environment so leftovers from the previous lease can be detected.
+    """
+    parts = [f"cd -- {shlex.quote(working_dir)}"]
+    parts.extend(f"export {name}={shlex.quote(value)}" for name, value in env)
+    parts.append(f"echo {_ENV_MARKER}$(env | grep -Ev '^({_VOLATILE_ENV})=' | sort | cksum)")
+    return " && ".join(parts)
+
+
+class PooledShellSession(_BaseLease):
+    """
+    A warm shell session leased from a ``ShellSessionPool``.
+
+    Run commands in it with ``client.shell.exec_command(id=session.session_id, ...)``.
+    Call ``mark_dirty()`` when the lease left state behind that a reset cannot undo
+    (background jobs, shell options, functions); the session is then closed instead
+    of being returned to the pool.
+    """
+
+    key: ProfileKey
+
+    def __init__(self, *, session_id: str, key: ProfileKey, working_dir: str):
+        super().__init__(session_id=session_id, key=key)
+        self.working_dir = working_dir
+        self._fingerprint: typing.Optional[str] = None
+
+    @property
+    def exec_dir(self) -> typing.Optional[str]:
+        return self.key[0]
+
+    @property
+    def env(self) -> typing.Dict[str, str]:
+        return dict(self.key[1])
+
+    def __repr__(self) -> str:
+        return f"PooledShellSession(session_id={self.session_id!r}, working_dir={self.working_dir!r}, uses={self.uses})"
+
+
+class _BaseShellSessionPool(_BaseLeasePool[ProfileKey, PooledShellSession]):
+    _noun = "shell session"
+
+    def __init__(
+        self,
+        *,
+        size: int = 2,
+        max_sessions: typing.Optional[int] = None,
+        reserve: int = 1,
+        max_uses: typing.Optional[int] = None,
+        health_interval: float = 30.0,
+        lease_timeout: float = 60.0,
+        request_options: typing.Optional[RequestOptions] = None,
+    ):
+        super().__init__(
+            size=size,
+            max_uses=max_uses,
+            max_sessions=max_sessions,
+            health_interval=health_interval,
+            lease_timeout=lease_timeout,
+            request_options=request_options,
+        )
+        self._reserve = reserve
+        # sessions created (+) or closed (-) by this pool since the last stats refresh
+        self._delta = 0
+        self.stats: typing.Optional[ShellSessionStats] = None
+
+    @property
+    def recycled(self) -> int:
+        """
+        Sessions closed instead of being returned to the pool.
+        """
+        return self._discarded
+
+    def _interval(self) -> float:
+        if self.stats is not None and self.stats.session_timeout > 0:
+            # probing keeps sessions from expiring on the server
+            return min(self._health_interval, self.stats.session_timeout / 2)
+        return self._health_interval
+
+    def _has_capacity(self) -> bool:
+        if not super()._has_capacity():
+            return False
+        if self.stats is None:
+            return True
+        total = self.stats.total_sessions + self._delta + self._pending
+        return total < self.stats.max_sessions - self._reserve
+
+    def _over_capacity(self) -> int:
+        if self.stats is None:
+            return 0
+        return max(0, self.stats.total_sessions + self._delta - (self.stats.max_sessions - self._reserve))
+
+    def _check_reset(self, session: PooledShellSession, response: typing.Any) -> bool:
+        result = unwrap_response(response)
+        if result is None or result.status != "completed" or result.exit_code not in (0, None):
+            return False
+        match = _ENV_FINGERPRINT.search(result.output or "")
+        if match is None:
+            return False
+        if session._fingerprint is None:
+            session._fingerprint = match.group(1)
+            return True
+        return session._fingerprint == match.group(1)
+
+    def _create_kwargs(self, key: ProfileKey) -> typing.Dict[str, typing.Any]:
+        exec_dir = key[0]
+        return {**({} if exec_dir is None else {"exec_dir": exec_dir}), "request_options": self._request_options}
+
+    def _reset_kwargs(self, session: PooledShellSession) -> typing.Dict[str, typing.Any]:
+        return {
+            "id": session.session_id,
+            "command": _reset_script(session.exec_dir or session.working_dir, session.key[1]),
+            "request_options": self._request_options,
+        }
+
+
+class ShellSessionPool(_BaseShellSessionPool, _LeasePool[ProfileKey, PooledShellSession]):
+    """
+    Keeps warm shell sessions per (exec_dir, environment) profile and leases them out.
+
+    A lease hands out an idle session of the requested profile, creating one only
+    when none is available. On return the session is reset (``cd`` back to its
+    directory, profile variables re-exported) and compared against the environment
+    it was warmed with; sessions that changed, failed, were marked dirty or reached
+    ``max_uses`` are closed and replaced instead. While used as a context manager a
+    background thread probes idle sessions, tops every profile back up to ``size``
+    and uses ``get_session_stats`` to stay ``reserve`` sessions below the server's
+    ``max_sessions``, trimming least recently used idle sessions when it is over.
+
+    Examples
+    --------
+    from agent_sandbox import Sandbox
+
+    client = Sandbox(
+        base_url="https://yourhost.com/path/to/api",
+    )
+    with client.shell.session_pool(size=4) as pool:
+        pool.warm(exec_dir="/home/gem/project", env={"CI": "1"})
+        with pool.lease(exec_dir="/home/gem/project", env={"CI": "1"}) as session:
+            client.shell.exec_command(id=session.session_id, command="pytest -q")
+    """
+
+    _thread_name = "shell-session-pool"
+
+    def __init__(self, client: "ShellClient", **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._client = client
+
+    def __enter__(self) -> "ShellSessionPool":
+        self.start()
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def lease(
+        self, *, exec_dir: typing.Optional[str] = None, env: typing.Optional[typing.Mapping[str, str]] = None
+    ) -> typing.ContextManager[PooledShellSession]:
+        """
+        Lease a session for the ``with`` block. Leaving the block with an exception
+        closes the session rather than returning it to the pool.
+        """
+        return self._lease(_profile_key(exec_dir, env))
+
+    def acquire(
+        self, *, exec_dir: typing.Optional[str] = None, env: typing.Optional[typing.Mapping[str, str]] = None
+    ) -> PooledShellSession:
+        """
+        Take a session out of the pool; pair every call with ``release``.
+        """
+        return self._acquire(_profile_key(exec_dir, env))
+
+    def warm(
+        self,
+        *,
+        exec_dir: typing.Optional[str] = None,
+        env: typing.Optional[typing.Mapping[str, str]] = None,
+        count: typing.Optional[int] = None,
+    ) -> int:
+        """
+        Create idle sessions for a profile until it has ``count`` (default ``size``),
+        within server limits. Returns the number of sessions created.
+        """
+        return self._warm(_profile_key(exec_dir, env), count)
+
+    def _start(self, key: ProfileKey) -> PooledShellSession:
+        created = unwrap_response(self._client.create_session(**self._create_kwargs(key)))
+        self._delta += 1
+        return PooledShellSession(session_id=created.session_id, key=key, working_dir=created.working_dir)
+
+    def _setup(self, session: PooledShellSession) -> bool:
+        return self._reset(session)
+
+    def _renew(self, session: PooledShellSession) -> bool:
+        return self._reset(session)
+
+    def _probe(self, session: PooledShellSession) -> bool:
+        return self._reset(session)
+
+    def _reset(self, session: PooledShellSession) -> bool:
+        try:
+            return self._check_reset(session, self._client.exec_command(**self._reset_kwargs(session)))
+        except Exception:
+            return False
+
+    def _delete(self, session: PooledShellSession) -> None:
+        self._delta -= 1
+        self._client.cleanup_session(session.session_id, request_options=self._request_options)
+
+    def _prime(self) -> None:
+        if self.stats is None:
+            self._refresh()
+
+    def _refresh(self) -> None:
+        try:
+            self.stats = unwrap_response(self._client.get_session_stats(request_options=self._request_options))
+            self._delta = 0
+        except Exception:
+            pass
+
+
+class AsyncShellSessionPool(_BaseShellSessionPool, _AsyncLeasePool[ProfileKey, PooledShellSession]):
+    """
+    Async counterpart of ``ShellSessionPool``; health checks run as an asyncio task.
+
+    Examples
+    --------
+    import asyncio
+
+    from agent_sandbox import AsyncSandbox
+
+    client = AsyncSandbox(
+        base_url="https://yourhost.com/path/to/api",
+    )
+
+
+    async def main() -> None:
+        async with client.shell.session_pool(size=4) as pool:
+            async with pool.lease(exec_dir="/home/gem/project") as session:
+                await client.shell.exec_command(id=session.session_id, command="pytest -q")
+
+
+    asyncio.run(main())
+    """
+
+    def __init__(self, client: "AsyncShellClient", **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._client = client
+
+    async def __aenter__(self) -> "AsyncShellSessionPool":
+        self.start()
+        return self
+
+    async def __aexit__(self, *args: typing.Any) -> None:
+        await self.close()
+
+    def lease(
+        self, *, exec_dir: typing.Optional[str] = None, env: typing.Optional[typing.Mapping[str, str]] = None
+    ) -> typing.AsyncContextManager[PooledShellSession]:
+        """
+        Lease a session for the ``async with`` block. Leaving the block with an
+        exception closes the session rather than returning it to the pool.
+        """
+        return self._lease(_profile_key(exec_dir, env))
+
+    async def acquire(
+        self, *, exec_dir: typing.Optional[str] = None, env: typing.Optional[typing.Mapping[str, str]] = None
+    ) -> PooledShellSession:
+        """
+        Take a session out of the pool; pair every call with ``release``.
+        """
+        return await self._acquire(_profile_key(exec_dir, env))
+
+    async def warm(
+        self,
+        *,
+        exec_dir: typing.Optional[str] = None,
+        env: typing.Optional[typing.Mapping[str, str]] = None,
+        count: typing.Optional[int] = None,
+    ) -> int:
+        """
+        Create idle sessions for a profile until it has ``count`` (default ``size``),
+        within server limits. Sessions are created concurrently. Returns the number created.
+        """
+        return await self._warm(_profile_key(exec_dir, env), count)
+
+    async def _start(self, key: ProfileKey) -> PooledShellSession:
+        created = unwrap_response(await self._client.create_session(**self._create_kwargs(key)))
+        self._delta += 1
+        return PooledShellSession(session_id=created.session_id, key=key, working_dir=created.working_dir)
+
+    async def _setup(self, session: PooledShellSession) -> bool:
+        return await self._reset(session)
+
+    async def _renew(self, session: PooledShellSession) -> bool:
+        return await self._reset(session)
+
+    async def _probe(self, session: PooledShellSession) -> bool:
+        return await self._reset(session)
+
+    async def _reset(self, session: PooledShellSession) -> bool:
+        try:
+            return self._check_reset(session, await self._client.exec_command(**self._reset_kwargs(session)))
+        except Exception:
+            return False
+
+    async def _delete(self, session: PooledShellSession) -> None:
+        self._delta -= 1
+        await self._client.cleanup_session(session.session_id, request_options=self._request_options)
+
+    async def _prime(self) -> None:
+        if self.stats is None:
+            await self._refresh()
+
+    async def _refresh(self) -> None:
+        try:
+            self.stats = unwrap_response(await self._client.get_session_stats(request_options=self._request_options))
+            self._delta = 0
+        except Exception:
+            pass
@@ -0,0 +1,366 @@
+import asyncio
+import json
+import time
+import typing
+
+import httpx
+import pydantic
+from ..core.api_error import ApiError
+from ..core.client_wrapper import AsyncClientWrapper, SyncClientWrapper
+from ..core.pydantic_utilities import IS_PYDANTIC_V2, UniversalBaseModel
+from ..core.request_options import RequestOptions
+from ..core.sse import ServerSentEvent, aiter_sse, iter_sse
+from ..types.bash_command_status import BashCommandStatus
+
+# this is used as the default value for optional parameters
+OMIT = typing.cast(typing.Any, ...)
+
+# the command is gone; `no_change_timeout` only means it has been quiet and the stream stays open
+_TERMINAL_STATUSES = ("completed", "hard_timeout", "terminated")
+_OUTPUT_EVENTS = ("output", "message", "delta")
+
+
+class ShellOutputEvent(UniversalBaseModel):
+    """
+    A chunk of terminal output streamed from a shell session
+    """
+
+    type: typing.Literal["output"] = "output"
+    output: str = pydantic.Field()
+    """
+    Output text carried by this event
+    """
+
+    session_id: typing.Optional[str] = pydantic.Field(default=None)
+    """
+    Shell session ID
+    """
+
+    id: typing.Optional[str] = pydantic.Field(default=None)
+    """
+    SSE event id
+    """
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+class ShellStatusEvent(UniversalBaseModel):
+    """
+    A command status update streamed from a shell session
+    """
+
+    type: typing.Literal["status"] = "status"
+    status: BashCommandStatus = pydantic.Field()
+    """
+    Command execution status
+    """
+
+    session_id: typing.Optional[str] = pydantic.Field(default=None)
+    """
+    Shell session ID
+    """
+
+    command: typing.Optional[str] = pydantic.Field(default=None)
+    """
+    Last executed or currently executing command
+    """
+
+    exit_code: typing.Optional[int] = pydantic.Field(default=None)
+    """
+    Command execution exit code, only has value when status is completed
+    """
+
+    id: typing.Optional[str] = pydantic.Field(default=None)
+    """
+    SSE event id
+    """
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.status in _TERMINAL_STATUSES
+
+    if IS_PYDANTIC_V2:
+        model_config: typing.ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(extra="allow", frozen=True)  # type: ignore # Pydantic v2
+    else:
+
+        class Config:
+            frozen = True
+            smart_union = True
+            extra = pydantic.Extra.allow
+
+
+ShellStreamEvent = typing.Union[ShellOutputEvent, ShellStatusEvent]
+
+
+def _events_from_payload(
+    payload: typing.Any, event: str, event_id: typing.Optional[str], session_id: typing.Optional[str]
+) -> typing.List[ShellStreamEvent]:
+    if isinstance(payload, dict) and "success" in payload and "data" in payload:
+        payload = payload["data"]
+    if payload is None:
+        return []
+    if not isinstance(payload, dict):
+        if event in _OUTPUT_EVENTS and str(payload):
+            return [ShellOutputEvent(output=str(payload), session_id=session_id, id=event_id)]
+        return []
+
+    session_id = payload.get("session_id") or session_id
+    events: typing.List[ShellStreamEvent] = []
+    output = payload.get("output", payload.get("content"))
+    if isinstance(output, str) and output:
+        events.append(ShellOutputEvent(output=output, session_id=session_id, id=event_id))
+    if payload.get("status") is not None:
+        events.append(
+            ShellStatusEvent(
+                status=payload["status"],
+                session_id=session_id,
+                command=payload.get("command"),
+                exit_code=payload.get("exit_code"),
+                id=event_id,
+            )
+        )
+    return events
+
+
+def _events_from_sse(sse: ServerSentEvent, session_id: typing.Optional[str]) -> typing.List[ShellStreamEvent]:
+    try:
+        payload = json.loads(sse.data) if sse.data else None
+    except ValueError:
+        payload = sse.data
+    return _events_from_payload(payload, sse.event, sse.id, session_id)
+
+
+def _raise_for_status(response: httpx.Response) -> None:
+    if 200 <= response.status_code < 300:
+        return
+    try:
+        body: typing.Any = response.json()
+    except ValueError:
+        body = response.text
+    raise ApiError(status_code=response.status_code, headers=dict(response.headers), body=body)
+
+
+def _is_event_stream(response: httpx.Response) -> bool:
+    return response.headers.get("content-type", "").startswith("text/event-stream")
+
+
+class _BaseShellEventStream:
+    def __init__(
+        self,
+        *,
+        path: str,
+        body: typing.Dict[str, typing.Any],
+        session_id: typing.Optional[str] = None,
+        max_reconnects: int = 3,
+        reconnect_delay: float = 1.0,
+        last_event_id: typing.Optional[str] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ):
+        self._path = path
+        self._body = body
+        self._session_id = session_id
+        self._max_reconnects = max_reconnects
+        self._reconnect_delay = reconnect_delay
+        self._request_options = request_options
+        self._last_event_id = last_event_id
+        self._closed = False
+
+    @property
+    def session_id(self) -> typing.Optional[str]:
+        """
+        Shell session the stream is attached to, once known.
+        """
+        return self._session_id
+
+    @property
+    def last_event_id(self) -> typing.Optional[str]:
+        return self._last_event_id
+
+    def _headers(self) -> typing.Dict[str, str]:
+        headers = {"content-type": "application/json", "accept": "text/event-stream"}
+        if self._last_event_id is not None:
+            headers["last-event-id"] = self._last_event_id
+        return headers
+
+    def _observe(self, sse: ServerSentEvent) -> None:
+        if sse.id is not None:
+            self._last_event_id = sse.id
+        if sse.retry is not None:
+            self._reconnect_delay = sse.retry / 1000
+
+    def _resume(self) -> bool:
+        """
+        Switch to re-attaching through `/v1/shell/view`: re-posting `/v1/shell/exec`
+        would run the command a second time.
+        """
+        if self._closed or self._session_id is None:
+            return False
+        self._path = "v1/shell/view"
+        self._body = {"id": self._session_id}
+        return True
+
+
+class ShellEventStream(_BaseShellEventStream):
+    """
+    Iterator over the SSE events of `shell.exec_command` / `shell.view`.
+
+    Output chunks are yielded as ``ShellOutputEvent`` and status updates as
+    ``ShellStatusEvent``; iteration ends once the command has completed, hit
+    its hard timeout or been terminated. A ``no_change_timeout`` status only
+    means the command is quiet: the stream stays open. Connections the server
+    closes or that drop are re-established through `/v1/shell/view` with the
+    `Last-Event-ID` of the last event received. Breaking out of the loop, or
+    calling ``close()``, releases the HTTP connection immediately.
+    """
+
+    def __init__(self, client_wrapper: SyncClientWrapper, **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._client_wrapper = client_wrapper
+        self._iterator: typing.Optional[typing.Iterator[ShellStreamEvent]] = None
+
+    def __enter__(self) -> "ShellEventStream":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def __iter__(self) -> typing.Iterator[ShellStreamEvent]:
+        if self._iterator is None:
+            self._iterator = self._events()
+        return self._iterator
+
+    def __next__(self) -> ShellStreamEvent:
+        return next(iter(self))
+
+    def close(self) -> None:
+        self._closed = True
+        if self._iterator is not None:
+            typing.cast(typing.Generator[ShellStreamEvent, None, None], self._iterator).close()
+
+    def _events(self) -> typing.Iterator[ShellStreamEvent]:
+        failures = 0
+        while not self._closed:
+            received = False
+            try:
+                with self._client_wrapper.httpx_client.stream(
+                    self._path,
+                    method="POST",
+                    json=self._body,
+                    headers=self._headers(),
+                    request_options=self._request_options,
+                    omit=OMIT,
+                ) as response:
+                    if not 200 <= response.status_code < 300:
+                        response.read()
+                        _raise_for_status(response)
+                    if not _is_event_stream(response):
+                        response.read()
+                        yield from _events_from_payload(response.json(), "message", None, self._session_id)
+                        return
+                    for sse in iter_sse(response.iter_lines()):
+                        self._observe(sse)
+                        for event in _events_from_sse(sse, self._session_id):
+                            failures = 0
+                            received = True
+                            self._session_id = event.session_id or self._session_id
+                            yield event
+                            if isinstance(event, ShellStatusEvent) and event.is_terminal:
+                                return
+            except httpx.TransportError:
+                failures += 1
+                if failures > self._max_reconnects or not self._resume():
+                    raise
+            else:
+                if not self._resume():
+                    return
+                if received:
+                    # the server closed a live stream (e.g. after `no_change_timeout`) while the command
+                    # still runs: re-attach right away, after the last event received
+                    continue
+                failures += 1
+                if failures > self._max_reconnects:
+                    return
+            time.sleep(self._reconnect_delay)
+
+
+class AsyncShellEventStream(_BaseShellEventStream):
+    """
+    Async counterpart of ``ShellEventStream``.
+    """
+
+    def __init__(self, client_wrapper: AsyncClientWrapper, **kwargs: typing.Any):
+        super().__init__(**kwargs)
+        self._client_wrapper = client_wrapper
+        self._iterator: typing.Optional[typing.AsyncIterator[ShellStreamEvent]] = None
+
+    async def __aenter__(self) -> "AsyncShellEventStream":
+        return self
+
+    async def __aexit__(self, *args: typing.Any) -> None:
+        await self.close()
+
+    def __aiter__(self) -> typing.AsyncIterator[ShellStreamEvent]:
+        if self._iterator is None:
+            self._iterator = self._events()
+        return self._iterator
+
+    async def __anext__(self) -> ShellStreamEvent:
+        return await self.__aiter__().__anext__()
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._iterator is not None:
+            await typing.cast(typing.AsyncGenerator[ShellStreamEvent, None], self._iterator).aclose()
+
+    async def _events(self) -> typing.AsyncIterator[ShellStreamEvent]:
+        failures = 0
+        while not self._closed:
+            received = False
+            try:
+                async with self._client_wrapper.httpx_client.stream(
+                    self._path,
+                    method="POST",
+                    json=self._body,
+                    headers=self._headers(),
+                    request_options=self._request_options,
+                    omit=OMIT,
+                ) as response:
+                    if not 200 <= response.status_code < 300:
+                        await response.aread()
+                        _raise_for_status(response)
+                    if not _is_event_stream(response):
+                        await response.aread()
+                        for event in _events_from_payload(response.json(), "message", None, self._session_id):
+                            yield event
+                        return
+                    async for sse in aiter_sse(response.aiter_lines()):
+                        self._observe(sse)
+                        for event in _events_from_sse(sse, self._session_id):
+                            failures = 0
+                            received = True
+                            self._session_id = event.session_id or self._session_id
+                            yield event
+                            if isinstance(event, ShellStatusEvent) and event.is_terminal:
+                                return
+            except httpx.TransportError:
+                failures += 1
+                if failures > self._max_reconnects or not self._resume():
+                    raise
+            else:
+                if not self._resume():
+                    return
+                if received:
+                    # the server closed a live stream (e.g. after `no_change_timeout`) while the command
+                    # still runs: re-attach right away, after the last event received
+                    continue
+                failures += 1
+                if failures > self._max_reconnects:
+                    return
+            await asyncio.sleep(self._reconnect_delay)